@@ -0,0 +1,39 @@
+# VALEO-NeuroERP Keyset Pagination Indexes
+# Composite (tenant_id, sort_key, id) indexes backing cursor pagination of the list endpoints
+
+"""keyset_pagination_indexes
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns) - must match the indexes declared in app/core/models.py
+INDEXES = [
+    ('ix_crm_customers_tenant_created_id', 'crm_customers', ['tenant_id', 'created_at', 'id']),
+    ('ix_crm_leads_tenant_created_id', 'crm_leads', ['tenant_id', 'created_at', 'id']),
+    ('ix_crm_contacts_tenant_created_id', 'crm_contacts', ['tenant_id', 'created_at', 'id']),
+    ('ix_finance_accounts_tenant_number_id', 'finance_accounts', ['tenant_id', 'account_number', 'id']),
+]
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction; avoids locking large tables for writes
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,54 @@
+# VALEO-NeuroERP CRM Search Indexes
+# pg_trgm GIN indexes over the searchable text of customers, leads and contacts
+
+"""crm_search_indexes
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+# (index name, table, searchable columns) - must match register_search_index() in app/core/models.py
+INDEXES = [
+    ('ix_crm_customers_search_trgm', 'crm_customers', ['company_name', 'contact_person', 'email']),
+    ('ix_crm_leads_search_trgm', 'crm_leads', ['company_name', 'contact_person', 'email']),
+    ('ix_crm_contacts_search_trgm', 'crm_contacts', ['first_name', 'last_name', 'email']),
+]
+
+
+def _document(columns):
+    # Same expression as app.core.search_index.search_document, so queries can use the index
+    document = f"coalesce({columns[0]}, '')"
+    for column in columns[1:]:
+        document = f"(({document} || ' ') || coalesce({column}, ''))"
+    return document
+
+
+def upgrade():
+    # SQLite builds its FTS5 search tables at startup (ensure_search_indexes)
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} "
+                f"USING gin (({_document(columns)}) gin_trgm_ops)"
+            )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        for name, _, _ in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,40 @@
+# VALEO-NeuroERP Export Indexes
+# Composite (tenant_id, updated_at, id) indexes backing the streaming export and its since= filter
+
+"""export_indexes
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns) - must match the indexes declared in app/core/models.py
+INDEXES = [
+    ('ix_crm_customers_tenant_updated_id', 'crm_customers', ['tenant_id', 'updated_at', 'id']),
+    ('ix_crm_leads_tenant_updated_id', 'crm_leads', ['tenant_id', 'updated_at', 'id']),
+    ('ix_inventory_articles_tenant_updated_id', 'inventory_articles', ['tenant_id', 'updated_at', 'id']),
+    ('ix_inventory_stock_movements_tenant_updated_id', 'inventory_stock_movements', ['tenant_id', 'updated_at', 'id']),
+    ('ix_finance_journal_entries_tenant_updated_id', 'finance_journal_entries', ['tenant_id', 'updated_at', 'id']),
+]
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction; avoids locking large tables for writes
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
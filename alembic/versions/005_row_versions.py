@@ -0,0 +1,32 @@
+# VALEO-NeuroERP Row Versions
+# version columns for optimistic concurrency on accounts and articles (atomic balance/stock updates)
+
+"""row_versions
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+TABLES = ['finance_accounts', 'inventory_articles']
+
+
+def upgrade():
+    # A constant server default is a metadata-only change on PostgreSQL 11+, no table rewrite
+    for table in TABLES:
+        op.add_column(table, sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    for table in TABLES:
+        op.drop_column(table, 'version')
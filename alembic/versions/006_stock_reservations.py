@@ -0,0 +1,46 @@
+# VALEO-NeuroERP Stock Reservations
+# Reservations holding article stock for orders until committed, released or expired
+
+"""stock_reservations
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('inventory_stock_reservations',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('article_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('quantity', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('reference_number', sa.String(length=50), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['article_id'], ['inventory_articles.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_inventory_stock_reservations_tenant_id', 'inventory_stock_reservations', ['tenant_id'])
+    op.create_index('ix_inventory_stock_reservations_article_id', 'inventory_stock_reservations', ['article_id'])
+    op.create_index('ix_inventory_stock_reservations_tenant_reference', 'inventory_stock_reservations',
+                    ['tenant_id', 'reference_number'])
+    op.create_index('ix_inventory_stock_reservations_status_expires', 'inventory_stock_reservations',
+                    ['status', 'expires_at'])
+
+
+def downgrade():
+    op.drop_table('inventory_stock_reservations')
@@ -0,0 +1,55 @@
+# VALEO-NeuroERP Tenant / Soft-Delete Indexes
+# Composite and partial indexes proposed by scripts/index_advisor.py for the repository query shapes
+
+"""tenant_active_indexes
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 13:44:35.478992
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+# Repository queries only read active rows; partial indexes leave soft-deleted ones out
+ACTIVE = {'postgresql_where': sa.text('is_active = true'), 'sqlite_where': sa.text('is_active = 1')}
+
+# (index name, table, columns, partial) - must match the indexes declared in app/core/models.py
+# Replayed shapes and their plan cost before -> after
+INDEXES = [
+    # customers.get_page: chosen by the planner (SQLite, no costs)
+    ('ix_crm_customers_tenant_created_id_active', 'crm_customers', ['tenant_id', 'created_at', 'id'], True),
+    # contacts.get_page: chosen by the planner (SQLite, no costs)
+    ('ix_crm_contacts_tenant_created_id_active', 'crm_contacts', ['tenant_id', 'created_at', 'id'], True),
+    # leads.get_all_with_total(status): chosen by the planner (SQLite, no costs)
+    ('ix_crm_leads_tenant_status_active', 'crm_leads', ['tenant_id', 'status'], True),
+    # leads.get_all_with_total(assigned_to): chosen by the planner (SQLite, no costs)
+    ('ix_crm_leads_tenant_assigned_to_active', 'crm_leads', ['tenant_id', 'assigned_to'], True),
+    # leads.get_page: chosen by the planner (SQLite, no costs)
+    ('ix_crm_leads_tenant_created_id_active', 'crm_leads', ['tenant_id', 'created_at', 'id'], True),
+    # accounts.get_all_with_total(account_type): chosen by the planner (SQLite, no costs)
+    ('ix_finance_accounts_tenant_account_type_active', 'finance_accounts', ['tenant_id', 'account_type'], True),
+    # articles.get_page: chosen by the planner (SQLite, no costs)
+    ('ix_inventory_articles_tenant_created_id_active', 'inventory_articles', ['tenant_id', 'created_at', 'id'], True),
+]
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction; avoids locking large tables for writes
+    with op.get_context().autocommit_block():
+        for name, table, columns, partial in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True,
+                            **(ACTIVE if partial else {}))
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
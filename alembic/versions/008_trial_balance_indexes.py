@@ -0,0 +1,38 @@
+# VALEO-NeuroERP Trial Balance Indexes
+# Covering index summing the journal entry lines per account (index-only scan on PostgreSQL)
+
+"""trial_balance_indexes
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 18:30:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns, included columns) - must match the indexes declared in app/core/models.py
+INDEXES = [
+    ('ix_finance_journal_entry_lines_entry_account', 'finance_journal_entry_lines',
+     ['journal_entry_id', 'account_id'], ['debit_amount', 'credit_amount']),
+]
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction; avoids locking large tables for writes
+    with op.get_context().autocommit_block():
+        for name, table, columns, include in INDEXES:
+            op.create_index(name, table, columns, postgresql_include=include,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
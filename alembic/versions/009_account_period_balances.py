@@ -0,0 +1,47 @@
+# VALEO-NeuroERP Account Period Balances
+# Monthly closing balance snapshots per account, written by the period close and by postings into open periods
+
+"""account_period_balances
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17 19:30:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('finance_account_period_balances',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('account_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        sa.Column('period_end', sa.Date(), nullable=False),
+        sa.Column('debit_total', sa.Numeric(precision=15, scale=2), nullable=False),
+        sa.Column('credit_total', sa.Numeric(precision=15, scale=2), nullable=False),
+        sa.Column('closing_balance', sa.Numeric(precision=15, scale=2), nullable=False),
+        sa.Column('is_closed', sa.Boolean(), nullable=False),
+        sa.Column('closed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['account_id'], ['finance_accounts.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_finance_account_period_balances_tenant_account_period', 'finance_account_period_balances',
+                    ['tenant_id', 'account_id', 'period_start'], unique=True)
+    op.create_index('ix_finance_account_period_balances_tenant_period', 'finance_account_period_balances',
+                    ['tenant_id', 'period_start'])
+
+
+def downgrade():
+    op.drop_table('finance_account_period_balances')
@@ -0,0 +1,48 @@
+# VALEO-NeuroERP Account Ledger Index
+# Entry date copied onto the journal entry lines and a (tenant, account, date) index for the account ledger
+
+"""account_ledger_index
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns, included columns) - must match the indexes declared in app/core/models.py
+INDEXES = [
+    ('ix_finance_journal_entry_lines_tenant_account_date', 'finance_journal_entry_lines',
+     ['tenant_id', 'account_id', 'entry_date', 'id'], ['journal_entry_id', 'debit_amount', 'credit_amount']),
+]
+
+
+def upgrade():
+    op.add_column('finance_journal_entry_lines', sa.Column('entry_date', sa.DateTime(), nullable=True))
+    op.execute(
+        "UPDATE finance_journal_entry_lines SET entry_date = ("
+        "SELECT entry_date FROM finance_journal_entries "
+        "WHERE finance_journal_entries.id = finance_journal_entry_lines.journal_entry_id)"
+    )
+    op.alter_column('finance_journal_entry_lines', 'entry_date', nullable=False)
+
+    # CONCURRENTLY cannot run inside a transaction; avoids locking large tables for writes
+    with op.get_context().autocommit_block():
+        for name, table, columns, include in INDEXES:
+            op.create_index(name, table, columns, postgresql_include=include,
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    op.drop_column('finance_journal_entry_lines', 'entry_date')
@@ -0,0 +1,44 @@
+# VALEO-NeuroERP Journal Search Index
+# (tenant_id, entry_date, status) index for the journal entry search; replaces the (tenant_id, entry_date) index it extends
+
+"""journal_search_index
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns) - must match the indexes declared in app/core/models.py
+INDEXES = [
+    ('ix_finance_journal_entries_tenant_date_status', 'finance_journal_entries', ['tenant_id', 'entry_date', 'status']),
+]
+# Leading columns of the new index; no longer needed
+REPLACED = [
+    ('ix_finance_journal_entries_tenant_date', 'finance_journal_entries', ['tenant_id', 'entry_date']),
+]
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction; avoids locking large tables for writes
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _ in REPLACED:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in REPLACED:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,56 @@
+# VALEO-NeuroERP Number Ranges
+# Per-tenant number ranges for server-assigned document numbers; customer numbers become unique per tenant
+
+"""number_ranges
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('shared_number_ranges',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('document_type', sa.String(length=50), nullable=False),
+        sa.Column('prefix', sa.String(length=20), nullable=False),
+        sa.Column('width', sa.Integer(), nullable=False),
+        sa.Column('next_value', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_shared_number_ranges_tenant_type', 'shared_number_ranges',
+                    ['tenant_id', 'document_type'], unique=True)
+
+    # Ranges count per tenant, so customer numbers are unique per tenant instead of globally
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_crm_customers_tenant_number', table_name='crm_customers',
+                      postgresql_concurrently=True, if_exists=True)
+        op.create_index('ix_crm_customers_tenant_number', 'crm_customers', ['tenant_id', 'customer_number'],
+                        unique=True, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_crm_customers_customer_number', table_name='crm_customers',
+                      postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index('ix_crm_customers_customer_number', 'crm_customers', ['customer_number'],
+                        unique=True, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_crm_customers_tenant_number', table_name='crm_customers',
+                      postgresql_concurrently=True, if_exists=True)
+        op.create_index('ix_crm_customers_tenant_number', 'crm_customers', ['tenant_id', 'customer_number'],
+                        postgresql_concurrently=True, if_not_exists=True)
+    op.drop_table('shared_number_ranges')
@@ -0,0 +1,83 @@
+# VALEO-NeuroERP Journal Imports
+# DATEV journal imports with their progress and rejected rows, and the staging table their chunks are merged from
+
+"""journal_imports
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('finance_journal_imports',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('file_name', sa.String(length=255), nullable=True),
+        sa.Column('fingerprint', sa.String(length=64), nullable=False),
+        sa.Column('post', sa.Boolean(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('last_row', sa.Integer(), nullable=False),
+        sa.Column('rows', sa.Integer(), nullable=False),
+        sa.Column('entries', sa.Integer(), nullable=False),
+        sa.Column('lines', sa.Integer(), nullable=False),
+        sa.Column('failed_rows', sa.Integer(), nullable=False),
+        sa.Column('error', sa.String(length=500), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_finance_journal_imports_tenant_fingerprint', 'finance_journal_imports',
+                    ['tenant_id', 'fingerprint'], unique=True)
+
+    op.create_table('finance_journal_import_errors',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('import_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('row_number', sa.Integer(), nullable=False),
+        sa.Column('error', sa.String(length=500), nullable=False),
+        sa.ForeignKeyConstraint(['import_id'], ['finance_journal_imports.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_finance_journal_import_errors_import_row', 'finance_journal_import_errors',
+                    ['import_id', 'row_number'])
+
+    # Staging only holds the chunk being merged, in the same transaction: no WAL, no secondary indexes
+    op.create_table('finance_journal_import_lines',
+        sa.Column('import_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('journal_entry_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('line_number', sa.Integer(), nullable=False),
+        sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('entry_number', sa.String(length=50), nullable=False),
+        sa.Column('entry_date', sa.DateTime(), nullable=False),
+        sa.Column('description', sa.String(length=500), nullable=False),
+        sa.Column('reference', sa.String(length=100), nullable=True),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('account_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('debit_cents', sa.BigInteger(), nullable=False),
+        sa.Column('credit_cents', sa.BigInteger(), nullable=False),
+        sa.Column('line_description', sa.String(length=200), nullable=True),
+        sa.Column('cost_center', sa.String(length=50), nullable=True),
+        sa.PrimaryKeyConstraint('import_id', 'journal_entry_id', 'line_number'),
+        prefixes=['UNLOGGED']
+    )
+
+
+def downgrade():
+    op.drop_table('finance_journal_import_lines')
+    op.drop_index('ix_finance_journal_import_errors_import_row', table_name='finance_journal_import_errors')
+    op.drop_table('finance_journal_import_errors')
+    op.drop_index('ix_finance_journal_imports_tenant_fingerprint', table_name='finance_journal_imports')
+    op.drop_table('finance_journal_imports')
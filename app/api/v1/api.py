@@ -15,7 +15,9 @@ from app.api.v1.endpoints import (
     accounts,
     journal_entries,
     articles,
-    warehouses
+    warehouses,
+    stock_reservations,
+    export
 )
 
 # Create main API router
@@ -78,4 +80,16 @@ api_router.include_router(
     warehouses,
     prefix="/warehouses",
     tags=["inventory", "warehouses"]
+)
+
+api_router.include_router(
+    stock_reservations,
+    prefix="/stock-reservations",
+    tags=["inventory", "stock-reservations"]
+)
+
+api_router.include_router(
+    export,
+    prefix="/export",
+    tags=["export"]
 )
\ No newline at end of file
@@ -10,4 +10,6 @@ from .accounts import router as accounts
 from .journal_entries import router as journal_entries
 from .articles import router as articles
 from .warehouses import router as warehouses
+from .stock_reservations import router as stock_reservations
+from .export import router as export
 from .chart_of_accounts import router as chart_of_accounts
\ No newline at end of file
@@ -3,25 +3,31 @@ Finance Account management endpoints
 RESTful API for chart of accounts management with clean architecture
 """
 
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from datetime import date
+from typing import Optional, Union
+from uuid import UUID
+from fastapi import APIRouter, HTTPException, Query
 
-from ....core.database import get_db
-from ....infrastructure.repositories import AccountRepository
+from ....infrastructure.repositories import AccountRepository, AccountPeriodBalanceRepository, JournalEntryRepository
+from ....infrastructure.repositories.period_balances import (
+    PeriodClosedError, PeriodOrderError, parse_period, period_label
+)
+from ....infrastructure.repositories.pagination import InvalidCursorError
+from ....infrastructure.repositories.projection import InvalidFieldsError
 from ....core.dependency_container import container
 from ..schemas.finance import (
-    AccountCreate, AccountUpdate, Account
+    AccountCreate, AccountUpdate, Account, GeneralLedgerEntry
 )
-from ..schemas.base import PaginatedResponse
+from ..schemas.base import PaginatedResponse, CursorPaginatedResponse, BatchRequest, BatchResponse
+from .batch import run_batch
+from .sparse import FIELDS_DESCRIPTION, item_schema, requested_fields, respond, response_items
 
 router = APIRouter()
 
 
 @router.post("/", response_model=Account, status_code=201)
 async def create_account(
-    account_data: AccountCreate,
-    db: Session = Depends(get_db)
+    account_data: AccountCreate
 ):
     """
     Create a new account in the chart of accounts.
@@ -36,38 +42,81 @@ async def create_account(
         raise HTTPException(status_code=500, detail=f"Failed to create account: {str(e)}")
 
 
-@router.get("/", response_model=PaginatedResponse[Account])
+@router.post(":batch", response_model=BatchResponse)
+async def batch_accounts(
+    batch: BatchRequest
+):
+    """
+    Create, update or upsert many accounts at once.
+
+    Rows are validated one by one and written in chunked transactions;
+    rejected rows are reported by index while all valid rows are written.
+    Upserts match existing accounts by tenant and account number.
+    """
+    try:
+        account_repo = container.resolve(AccountRepository)
+        return await run_batch(account_repo, batch, AccountCreate, AccountUpdate)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to process account batch: {str(e)}")
+
+
+@router.get("/", response_model=Union[PaginatedResponse[Account], CursorPaginatedResponse[Account]])
 async def list_accounts(
     tenant_id: Optional[str] = Query(None, description="Filter by tenant ID"),
     account_type: Optional[str] = Query(None, description="Filter by account type"),
     category: Optional[str] = Query(None, description="Filter by category"),
     skip: int = Query(0, ge=0, description="Number of items to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of items to return"),
-    db: Session = Depends(get_db)
+    pagination: str = Query("offset", pattern="^(offset|cursor)$", description="offset (page/total) or cursor (keyset)"),
+    cursor: Optional[str] = Query(None, description="next_cursor/prev_cursor of a previous cursor page"),
+    total_mode: str = Query("exact", pattern="^(exact|estimate)$", description="exact count or planner estimate (large tenants)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
     """
     List accounts with pagination and filtering.
 
     Retrieve a paginated list of accounts with optional filtering by type and category.
+
+    With pagination=cursor (or a cursor) pages are fetched by keyset over
+    a stable ordering and cost the same at any depth.
+
+    With fields (e.g. fields=id,name for a grid view) only those columns
+    are queried and returned.
     """
     try:
         account_repo = container.resolve(AccountRepository)
+        names = requested_fields(fields, Account)
 
         # Use provided tenant_id or default to system for now
         effective_tenant_id = tenant_id or "system"
 
-        accounts = await account_repo.get_all(effective_tenant_id, skip, limit, account_type, category)
-        total = await account_repo.count(effective_tenant_id, account_type, category)
+        if pagination == "cursor" or cursor:
+            page = await account_repo.get_page(effective_tenant_id, limit, cursor, account_type, category, fields=names)
+            return respond(CursorPaginatedResponse[item_schema(Account, names)](
+                items=response_items(page.items, Account, names),
+                size=limit,
+                next_cursor=page.next_cursor,
+                prev_cursor=page.prev_cursor,
+                has_next=page.has_next,
+                has_prev=page.has_prev
+            ), names)
+
+        # Items and total in one round trip
+        result = await account_repo.get_all_with_total(effective_tenant_id, skip, limit, account_type, category, total_mode=total_mode, fields=names)
+        total = result.total
 
-        return PaginatedResponse[Account](
-            items=[Account.model_validate(account) for account in accounts],
+        return respond(PaginatedResponse[item_schema(Account, names)](
+            items=response_items(result.items, Account, names),
             total=total,
+            total_approximate=result.approximate,
             page=(skip // limit) + 1,
             size=limit,
             pages=(total + limit - 1) // limit,
             has_next=(skip + limit) < total,
             has_prev=skip > 0
-        )
+        ), names)
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list accounts: {str(e)}")
 
@@ -75,29 +124,34 @@ async def list_accounts(
 @router.get("/{account_id}", response_model=Account)
 async def get_account(
     account_id: str,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
     """
     Get account by ID.
 
-    Retrieve detailed information about a specific account.
+    Retrieve detailed information about a specific account
+    (only the listed fields with fields=...).
     """
     try:
         account_repo = container.resolve(AccountRepository)
-        account = await account_repo.get_by_id(account_id, "system")  # TODO: tenant context
+        names = requested_fields(fields, Account)
+        account = await account_repo.get_by_id(account_id, "system", fields=names)  # TODO: tenant context
         if not account:
             raise HTTPException(status_code=404, detail="Account not found")
+        if names is not None:
+            return respond(account, names)
         return Account.model_validate(account)
     except HTTPException:
         raise
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve account: {str(e)}")
 
 
 @router.get("/number/{account_number}", response_model=Account)
 async def get_account_by_number(
-    account_number: str,
-    db: Session = Depends(get_db)
+    account_number: str
 ):
     """
     Get account by account number.
@@ -119,8 +173,7 @@ async def get_account_by_number(
 @router.put("/{account_id}", response_model=Account)
 async def update_account(
     account_id: str,
-    account_data: AccountUpdate,
-    db: Session = Depends(get_db)
+    account_data: AccountUpdate
 ):
     """
     Update account information.
@@ -141,8 +194,7 @@ async def update_account(
 
 @router.delete("/{account_id}", status_code=204)
 async def delete_account(
-    account_id: str,
-    db: Session = Depends(get_db)
+    account_id: str
 ):
     """
     Delete account (soft delete).
@@ -163,16 +215,81 @@ async def delete_account(
 @router.get("/{account_id}/balance", response_model=dict)
 async def get_account_balance(
     account_id: str,
-    db: Session = Depends(get_db)
+    as_of: Optional[date] = Query(None, description="Balance at the end of this day (YYYY-MM-DD) instead of the current one"),
+    tenant_id: Optional[UUID] = Query(None, description="Tenant ID")
 ):
     """
     Get account balance.
 
-    Retrieve the current balance of a specific account.
+    Retrieve the current balance of a specific account, or with as_of its
+    balance (debit - credit) at the end of that day, read from the last
+    period snapshot plus the entries posted since.
     """
     try:
+        effective_tenant_id = tenant_id or "system"  # TODO: tenant context
+        if as_of is not None:
+            period_balance_repo = container.resolve(AccountPeriodBalanceRepository)
+            balance = await period_balance_repo.get_balance_as_of(account_id, as_of, effective_tenant_id)
+            return {"account_id": account_id, "balance": balance, "as_of": as_of}
         account_repo = container.resolve(AccountRepository)
-        balance = await account_repo.get_balance(account_id, "system")  # TODO: tenant context
+        balance = await account_repo.get_balance(account_id, effective_tenant_id)
         return {"account_id": account_id, "balance": balance}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to retrieve account balance: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve account balance: {str(e)}")
+
+
+@router.get("/{account_id}/ledger", response_model=CursorPaginatedResponse[GeneralLedgerEntry])
+async def get_account_ledger(
+    account_id: UUID,
+    tenant_id: UUID = Query(..., description="Tenant ID"),
+    start_date: Optional[date] = Query(None, description="First day (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="Last day, included (YYYY-MM-DD)"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of lines to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor of a previous page")
+):
+    """
+    Get the ledger of an account.
+
+    The posted lines of the account in date order with the running
+    balance (debit - credit), starting from the balance before start_date.
+    """
+    try:
+        entry_repo = container.resolve(JournalEntryRepository)
+        page = await entry_repo.get_account_ledger(account_id, tenant_id, start_date, end_date, limit, cursor)
+        return CursorPaginatedResponse[GeneralLedgerEntry](
+            items=[GeneralLedgerEntry(**{**item, 'entry_id': str(item['entry_id'])}) for item in page.items],
+            size=limit,
+            next_cursor=page.next_cursor,
+            prev_cursor=None,
+            has_next=page.has_next,
+            has_prev=cursor is not None
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve account ledger: {str(e)}")
+
+
+@router.post("/periods/{period}/close", response_model=dict)
+async def close_period(
+    period: str,
+    tenant_id: UUID = Query(..., description="Tenant ID")
+):
+    """
+    Close an accounting period (month, YYYY-MM).
+
+    Writes the closing balance of every account for the month; entries
+    dated in a closed period can no longer be posted. Periods close in
+    order, beginning with the month of the first posted entry.
+    """
+    try:
+        period_start = parse_period(period)
+        period_balance_repo = container.resolve(AccountPeriodBalanceRepository)
+        accounts = await period_balance_repo.close_period(period_start, tenant_id)
+        return {"period": period_label(period_start), "accounts": accounts, "closed": True}
+    except PeriodClosedError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except (PeriodOrderError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to close period: {str(e)}")
\ No newline at end of file
@@ -2,67 +2,123 @@
 Inventory Articles management endpoints
 """
 
-from fastapi import APIRouter, HTTPException
-import sqlite3
+from typing import Optional, Union
+from fastapi import APIRouter, HTTPException, Query
+
+from ....infrastructure.repositories import ArticleRepository
+from ....infrastructure.repositories.pagination import InvalidCursorError
+from ....infrastructure.repositories.projection import InvalidFieldsError
+from ....core.dependency_container import container
+from ..schemas.inventory import ArticleCreate, ArticleUpdate, Article
+from ..schemas.base import PaginatedResponse, CursorPaginatedResponse, BatchRequest, BatchResponse
+from .batch import run_batch
+from .sparse import FIELDS_DESCRIPTION, item_schema, requested_fields, respond, response_items
 
 router = APIRouter()
 
 
-@router.get("/")
-async def get_articles():
-    """Get all articles"""
-    try:
-        conn = sqlite3.connect("valeo_neuro_erp.db")
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT id, article_number, name, unit, category, sales_price, current_stock, is_active FROM inventory_articles")
-        articles = cursor.fetchall()
-
-        result = []
-        for article in articles:
-            result.append({
-                "id": article[0],
-                "article_number": article[1],
-                "name": article[2],
-                "unit": article[3],
-                "category": article[4],
-                "sales_price": article[5],
-                "current_stock": article[6],
-                "is_active": bool(article[7])
-            })
-
-        conn.close()
-        return result
+@router.post(":batch", response_model=BatchResponse)
+async def batch_articles(
+    batch: BatchRequest
+):
+    """
+    Create, update or upsert many articles at once (e.g. the nightly ERP sync).
 
+    Rows are validated one by one and written in chunked transactions;
+    rejected rows are reported by index while all valid rows are written.
+    Upserts match existing articles by tenant and article number.
+    """
+    try:
+        article_repo = container.resolve(ArticleRepository)
+        return await run_batch(article_repo, batch, ArticleCreate, ArticleUpdate)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to process article batch: {str(e)}")
+
 
+@router.get("/", response_model=Union[PaginatedResponse[Article], CursorPaginatedResponse[Article]])
+async def list_articles(
+    tenant_id: Optional[str] = Query(None, description="Filter by tenant ID"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    skip: int = Query(0, ge=0, description="Number of items to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of items to return"),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$", description="offset (page/total) or cursor (keyset)"),
+    cursor: Optional[str] = Query(None, description="next_cursor/prev_cursor of a previous cursor page"),
+    total_mode: str = Query("exact", pattern="^(exact|estimate)$", description="exact count or planner estimate (large tenants)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
+    """
+    List articles with pagination and filtering.
 
-@router.get("/{article_id}")
-async def get_article(article_id: str):
-    """Get article by ID"""
+    With pagination=cursor (or a cursor) pages are fetched by keyset over
+    a stable ordering and cost the same at any depth.
+
+    With fields (e.g. fields=id,article_number,name,sales_price for a grid
+    view) only those columns are queried and returned; the description
+    text is not read unless asked for.
+    """
     try:
-        conn = sqlite3.connect("valeo_neuro_erp.db")
-        cursor = conn.cursor()
+        article_repo = container.resolve(ArticleRepository)
+        names = requested_fields(fields, Article)
 
-        cursor.execute("SELECT id, article_number, name, unit, category, sales_price, current_stock, is_active FROM inventory_articles WHERE id = ?", (article_id,))
-        article = cursor.fetchone()
+        # Use provided tenant_id or default to system for now
+        effective_tenant_id = tenant_id or "system"
 
-        conn.close()
+        if pagination == "cursor" or cursor:
+            page = await article_repo.get_page(effective_tenant_id, limit, cursor, fields=names, category=category)
+            return respond(CursorPaginatedResponse[item_schema(Article, names)](
+                items=response_items(page.items, Article, names),
+                size=limit,
+                next_cursor=page.next_cursor,
+                prev_cursor=page.prev_cursor,
+                has_next=page.has_next,
+                has_prev=page.has_prev
+            ), names)
 
-        if not article:
-            raise HTTPException(status_code=404, detail="Article not found")
+        # Items and total in one round trip
+        result = await article_repo.get_all_with_total(
+            effective_tenant_id, skip, limit, total_mode=total_mode, fields=names, category=category
+        )
+        total = result.total
 
-        return {
-            "id": article[0],
-            "article_number": article[1],
-            "name": article[2],
-            "unit": article[3],
-            "category": article[4],
-            "sales_price": article[5],
-            "current_stock": article[6],
-            "is_active": bool(article[7])
-        }
+        return respond(PaginatedResponse[item_schema(Article, names)](
+            items=response_items(result.items, Article, names),
+            total=total,
+            total_approximate=result.approximate,
+            page=(skip // limit) + 1,
+            size=limit,
+            pages=(total + limit - 1) // limit,
+            has_next=(skip + limit) < total,
+            has_prev=skip > 0
+        ), names)
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to list articles: {str(e)}")
+
+
+@router.get("/{article_id}", response_model=Article)
+async def get_article(
+    article_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
+    """
+    Get article by ID.
 
+    Retrieve detailed information about a specific article
+    (only the listed fields with fields=...).
+    """
+    try:
+        article_repo = container.resolve(ArticleRepository)
+        names = requested_fields(fields, Article)
+        article = await article_repo.get_by_id(article_id, "system", fields=names)  # TODO: tenant context
+        if not article:
+            raise HTTPException(status_code=404, detail="Article not found")
+        if names is not None:
+            return respond(article, names)
+        return Article.model_validate(article)
+    except HTTPException:
+        raise
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve article: {str(e)}")
@@ -0,0 +1,68 @@
+"""
+Batch endpoint support
+Shared handling of POST /<resource>:batch requests (bulk create/update/upsert)
+"""
+
+import time
+from typing import Type
+
+from pydantic import BaseModel, ValidationError
+
+from ..schemas.base import BatchRequest, BatchResponse, BatchRowError
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'item'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+async def run_batch(repository, request: BatchRequest,
+                    create_schema: Type[BaseModel], update_schema: Type[BaseModel]) -> BatchResponse:
+    """
+    Validate each item on its own and hand the valid rows to the repository's
+    bulk operation. Invalid rows are reported by index instead of failing the batch.
+    """
+    started = time.perf_counter()
+    rows, indexes, errors = [], [], []
+
+    for index, item in enumerate(request.items):
+        try:
+            if request.mode == "update":
+                if not item.get("id"):
+                    raise ValueError("id: Field required")
+                changes = {key: value for key, value in item.items() if key != "id"}
+                row = update_schema.model_validate(changes).model_dump(exclude_unset=True)
+                row["id"] = item["id"]
+            else:
+                data = create_schema.model_validate({**item, "tenant_id": request.tenant_id})
+                # Upserts only overwrite the fields that were sent
+                row = data.model_dump(exclude={"tenant_id"}, exclude_unset=request.mode == "upsert")
+        except ValidationError as e:
+            errors.append(BatchRowError(index=index, error=_validation_message(e)))
+            continue
+        except ValueError as e:
+            errors.append(BatchRowError(index=index, error=str(e)))
+            continue
+        rows.append(row)
+        indexes.append(index)
+
+    bulk = {
+        "create": repository.bulk_create,
+        "update": repository.bulk_update,
+        "upsert": repository.bulk_upsert,
+    }[request.mode]
+    result = await bulk(rows, request.tenant_id, chunk_size=request.chunk_size, indexes=indexes)
+
+    errors.extend(BatchRowError(index=error.index, error=error.error) for error in result.errors)
+    errors.sort(key=lambda error: error.index)
+    return BatchResponse(
+        mode=request.mode,
+        total=len(request.items),
+        succeeded=result.succeeded,
+        failed=len(errors),
+        chunks=result.chunks,
+        duration_ms=round((time.perf_counter() - started) * 1000, 2),
+        errors=errors
+    )
@@ -3,25 +3,30 @@ CRM Contact management endpoints
 RESTful API for contact management with clean architecture
 """
 
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from typing import List, Optional, Union
+from fastapi import APIRouter, HTTPException, Query
 
-from ....core.database import get_db
-from ....infrastructure.repositories import ContactRepository
+from ....infrastructure.repositories import ContactRepository, CustomerRepository
+from ....infrastructure.repositories.pagination import InvalidCursorError
+from ....infrastructure.repositories.projection import InvalidFieldsError
 from ....core.dependency_container import container
 from ..schemas.crm import (
-    ContactCreate, ContactUpdate, Contact
+    ContactCreate, ContactUpdate, Contact, Customer
 )
-from ..schemas.base import PaginatedResponse
+from ..schemas.base import PaginatedResponse, CursorPaginatedResponse, SearchSuggestion
+from .includes import INCLUDE_DESCRIPTION, InvalidIncludeError, Relation, expand, included_fields, requested_includes
+from .sparse import FIELDS_DESCRIPTION, item_schema, requested_fields, respond, response_items
 
 router = APIRouter()
 
+CONTACT_INCLUDES = {
+    'customer': Relation('customer_id', lambda: container.resolve(CustomerRepository), Customer),
+}
+
 
 @router.post("/", response_model=Contact, status_code=201)
 async def create_contact(
-    contact_data: ContactCreate,
-    db: Session = Depends(get_db)
+    contact_data: ContactCreate
 ):
     """
     Create a new contact.
@@ -36,33 +41,85 @@ async def create_contact(
         raise HTTPException(status_code=500, detail=f"Failed to create contact: {str(e)}")
 
 
-@router.get("/", response_model=PaginatedResponse[Contact])
+@router.get("/autocomplete", response_model=List[SearchSuggestion])
+async def autocomplete_contacts(
+    q: str = Query(..., min_length=1, max_length=100, description="Prefix typed so far"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of suggestions")
+):
+    """
+    Suggest contacts whose first name, last name or email starts with the prefix.
+
+    Served from the text search index, best matches first.
+    """
+    try:
+        contact_repo = container.resolve(ContactRepository)
+        contacts = await contact_repo.autocomplete("system", q, limit)  # TODO: tenant context
+        return [SearchSuggestion(id=str(contact.id), label=f"{contact.first_name} {contact.last_name}") for contact in contacts]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to autocomplete contacts: {str(e)}")
+
+
+@router.get("/", response_model=Union[PaginatedResponse[Contact], CursorPaginatedResponse[Contact]])
 async def list_contacts(
     customer_id: Optional[str] = Query(None, description="Filter by customer ID"),
+    search: Optional[str] = Query(None, description="Search in first name, last name or email (ranked by relevance)"),
     skip: int = Query(0, ge=0, description="Number of items to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of items to return"),
-    db: Session = Depends(get_db)
+    pagination: str = Query("offset", pattern="^(offset|cursor)$", description="offset (page/total) or cursor (keyset)"),
+    cursor: Optional[str] = Query(None, description="next_cursor/prev_cursor of a previous cursor page"),
+    total_mode: str = Query("exact", pattern="^(exact|estimate)$", description="exact count or planner estimate (large tenants)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION)
 ):
     """
     List contacts with pagination and filtering.
 
     Retrieve a paginated list of contacts, optionally filtered by customer.
+    A search uses the text search index; offset pages are ordered by relevance.
+
+    With pagination=cursor (or a cursor) pages are fetched by keyset over
+    a stable ordering and cost the same at any depth.
+
+    With fields (e.g. fields=id,name for a grid view) only those columns
+    are queried and returned.
+
+    With include=customer each contact's customer is embedded, loaded
+    with one batched query per page, whatever the page size.
     """
     try:
         contact_repo = container.resolve(ContactRepository)
+        includes = requested_includes(include, CONTACT_INCLUDES)
+        names = included_fields(requested_fields(fields, Contact), includes, CONTACT_INCLUDES, Contact, contact_repo)
+
+        if pagination == "cursor" or cursor:
+            page = await contact_repo.get_page("system", limit, cursor, customer_id, search, fields=names)  # TODO: tenant context
+            return respond(CursorPaginatedResponse[item_schema(Contact, names)](
+                items=await expand(response_items(page.items, Contact, names), includes, CONTACT_INCLUDES, "system"),
+                size=limit,
+                next_cursor=page.next_cursor,
+                prev_cursor=page.prev_cursor,
+                has_next=page.has_next,
+                has_prev=page.has_prev
+            ), names)
+
+        # Items and total in one round trip
+        result = await contact_repo.get_all_with_total(
+            "system", skip, limit, customer_id, total_mode=total_mode, search=search, fields=names  # TODO: tenant context
+        )
+        total = result.total
 
-        contacts = await contact_repo.get_all("system", skip, limit, customer_id)  # TODO: tenant context
-        total = await contact_repo.count("system", customer_id)  # TODO: tenant context
-
-        return PaginatedResponse[Contact](
-            items=[Contact.model_validate(contact) for contact in contacts],
+        return respond(PaginatedResponse[item_schema(Contact, names)](
+            items=await expand(response_items(result.items, Contact, names), includes, CONTACT_INCLUDES, "system"),
             total=total,
+            total_approximate=result.approximate,
             page=(skip // limit) + 1,
             size=limit,
             pages=(total + limit - 1) // limit,
             has_next=(skip + limit) < total,
             has_prev=skip > 0
-        )
+        ), names)
+    except (InvalidCursorError, InvalidFieldsError, InvalidIncludeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list contacts: {str(e)}")
 
@@ -70,21 +127,28 @@ async def list_contacts(
 @router.get("/{contact_id}", response_model=Contact)
 async def get_contact(
     contact_id: str,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
     """
     Get contact by ID.
 
-    Retrieve detailed information about a specific contact.
+    Retrieve detailed information about a specific contact
+    (only the listed fields with fields=...).
     """
     try:
         contact_repo = container.resolve(ContactRepository)
-        contact = await contact_repo.get_by_id(contact_id, "system")  # TODO: tenant context
+        includes = requested_includes(include, CONTACT_INCLUDES)
+        names = included_fields(requested_fields(fields, Contact), includes, CONTACT_INCLUDES, Contact, contact_repo)
+        contact = await contact_repo.get_by_id(contact_id, "system", fields=names)  # TODO: tenant context
         if not contact:
             raise HTTPException(status_code=404, detail="Contact not found")
+        if names is not None:
+            return respond(contact, names)
         return Contact.model_validate(contact)
     except HTTPException:
         raise
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve contact: {str(e)}")
 
@@ -92,8 +156,7 @@ async def get_contact(
 @router.put("/{contact_id}", response_model=Contact)
 async def update_contact(
     contact_id: str,
-    contact_data: ContactUpdate,
-    db: Session = Depends(get_db)
+    contact_data: ContactUpdate
 ):
     """
     Update contact information.
@@ -114,8 +177,7 @@ async def update_contact(
 
 @router.delete("/{contact_id}", status_code=204)
 async def delete_contact(
-    contact_id: str,
-    db: Session = Depends(get_db)
+    contact_id: str
 ):
     """
     Delete contact (soft delete).
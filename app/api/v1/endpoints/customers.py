@@ -3,25 +3,26 @@ CRM Customer management endpoints
 RESTful API for customer management with clean architecture
 """
 
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from typing import List, Optional, Union
+from fastapi import APIRouter, HTTPException, Query
 
-from ....core.database import get_db
 from ....infrastructure.repositories import CustomerRepository
+from ....infrastructure.repositories.pagination import InvalidCursorError
+from ....infrastructure.repositories.projection import InvalidFieldsError
 from ....core.dependency_container import container
 from ..schemas.crm import (
     CustomerCreate, CustomerUpdate, Customer
 )
-from ..schemas.base import PaginatedResponse
+from ..schemas.base import PaginatedResponse, CursorPaginatedResponse, BatchRequest, BatchResponse, SearchSuggestion
+from .batch import run_batch
+from .sparse import FIELDS_DESCRIPTION, item_schema, requested_fields, respond, response_items
 
 router = APIRouter()
 
 
 @router.post("/", response_model=Customer, status_code=201)
 async def create_customer(
-    customer_data: CustomerCreate,
-    db: Session = Depends(get_db)
+    customer_data: CustomerCreate
 ):
     """
     Create a new customer.
@@ -32,10 +33,11 @@ async def create_customer(
     try:
         customer_repo = container.resolve(CustomerRepository)
 
-        # Check if customer number already exists
-        existing = await customer_repo.get_by_customer_number(customer_data.customer_number, customer_data.tenant_id)
-        if existing:
-            raise HTTPException(status_code=400, detail="Customer number already exists")
+        # Check if customer number already exists (omitted numbers come from the number range)
+        if customer_data.customer_number:
+            existing = await customer_repo.get_by_customer_number(customer_data.customer_number, customer_data.tenant_id)
+            if existing:
+                raise HTTPException(status_code=400, detail="Customer number already exists")
 
         customer = await customer_repo.create(customer_data.model_dump(), customer_data.tenant_id)
         return Customer.model_validate(customer)
@@ -45,38 +47,102 @@ async def create_customer(
         raise HTTPException(status_code=500, detail=f"Failed to create customer: {str(e)}")
 
 
-@router.get("/", response_model=PaginatedResponse[Customer])
+@router.post(":batch", response_model=BatchResponse)
+async def batch_customers(
+    batch: BatchRequest
+):
+    """
+    Create, update or upsert many customers at once.
+
+    Rows are validated one by one and written in chunked transactions;
+    rejected rows are reported by index while all valid rows are written.
+    Upserts match existing customers by tenant and customer number; created
+    customers without one are numbered from the customer number range.
+    """
+    try:
+        customer_repo = container.resolve(CustomerRepository)
+        return await run_batch(customer_repo, batch, CustomerCreate, CustomerUpdate)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to process customer batch: {str(e)}")
+
+
+@router.get("/autocomplete", response_model=List[SearchSuggestion])
+async def autocomplete_customers(
+    q: str = Query(..., min_length=1, max_length=100, description="Prefix typed so far"),
+    tenant_id: Optional[str] = Query(None, description="Filter by tenant ID"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of suggestions")
+):
+    """
+    Suggest customers whose company name, contact person or email starts with the prefix.
+
+    Served from the text search index, best matches first.
+    """
+    try:
+        customer_repo = container.resolve(CustomerRepository)
+        customers = await customer_repo.autocomplete(tenant_id or "system", q, limit)
+        return [SearchSuggestion(id=str(customer.id), label=customer.company_name) for customer in customers]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to autocomplete customers: {str(e)}")
+
+
+@router.get("/", response_model=Union[PaginatedResponse[Customer], CursorPaginatedResponse[Customer]])
 async def list_customers(
     tenant_id: Optional[str] = Query(None, description="Filter by tenant ID"),
     skip: int = Query(0, ge=0, description="Number of items to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of items to return"),
-    search: Optional[str] = Query(None, description="Search in company name or contact person"),
-    db: Session = Depends(get_db)
+    search: Optional[str] = Query(None, description="Search in company name, contact person or email (ranked by relevance)"),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$", description="offset (page/total) or cursor (keyset)"),
+    cursor: Optional[str] = Query(None, description="next_cursor/prev_cursor of a previous cursor page"),
+    total_mode: str = Query("exact", pattern="^(exact|estimate)$", description="exact count or planner estimate (large tenants)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
     """
     List customers with pagination and filtering.
 
     Retrieve a paginated list of customers with optional filtering by tenant and search.
+    A search uses the text search index; offset pages are ordered by relevance.
+
+    With pagination=cursor (or a cursor) pages are fetched by keyset over
+    a stable ordering and cost the same at any depth.
+
+    With fields (e.g. fields=id,name for a grid view) only those columns
+    are queried and returned.
     """
     try:
         customer_repo = container.resolve(CustomerRepository)
+        names = requested_fields(fields, Customer)
 
         # Use provided tenant_id or default to system for now
         # TODO: Get tenant from authenticated user context
         effective_tenant_id = tenant_id or "system"
 
-        customers = await customer_repo.get_all(effective_tenant_id, skip, limit, search)
-        total = await customer_repo.count(effective_tenant_id, search)
-
-        return PaginatedResponse[Customer](
-            items=[Customer.model_validate(customer) for customer in customers],
+        if pagination == "cursor" or cursor:
+            page = await customer_repo.get_page(effective_tenant_id, limit, cursor, search, fields=names)
+            return respond(CursorPaginatedResponse[item_schema(Customer, names)](
+                items=response_items(page.items, Customer, names),
+                size=limit,
+                next_cursor=page.next_cursor,
+                prev_cursor=page.prev_cursor,
+                has_next=page.has_next,
+                has_prev=page.has_prev
+            ), names)
+
+        # Items and total in one round trip
+        result = await customer_repo.get_all_with_total(effective_tenant_id, skip, limit, search, total_mode=total_mode, fields=names)
+        total = result.total
+
+        return respond(PaginatedResponse[item_schema(Customer, names)](
+            items=response_items(result.items, Customer, names),
             total=total,
+            total_approximate=result.approximate,
             page=(skip // limit) + 1,
             size=limit,
             pages=(total + limit - 1) // limit,
             has_next=(skip + limit) < total,
             has_prev=skip > 0
-        )
+        ), names)
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list customers: {str(e)}")
 
@@ -84,22 +150,28 @@ async def list_customers(
 @router.get("/{customer_id}", response_model=Customer)
 async def get_customer(
     customer_id: str,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
     """
     Get customer by ID.
 
-    Retrieve detailed information about a specific customer.
+    Retrieve detailed information about a specific customer
+    (only the listed fields with fields=...).
     """
     try:
         customer_repo = container.resolve(CustomerRepository)
+        names = requested_fields(fields, Customer)
         # TODO: Add tenant context from authentication
-        customer = await customer_repo.get_by_id(customer_id, "system")  # Temporary
+        customer = await customer_repo.get_by_id(customer_id, "system", fields=names)  # Temporary
         if not customer:
             raise HTTPException(status_code=404, detail="Customer not found")
+        if names is not None:
+            return respond(customer, names)
         return Customer.model_validate(customer)
     except HTTPException:
         raise
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve customer: {str(e)}")
 
@@ -107,8 +179,7 @@ async def get_customer(
 @router.put("/{customer_id}", response_model=Customer)
 async def update_customer(
     customer_id: str,
-    customer_data: CustomerUpdate,
-    db: Session = Depends(get_db)
+    customer_data: CustomerUpdate
 ):
     """
     Update customer information.
@@ -136,8 +207,7 @@ async def update_customer(
 
 @router.delete("/{customer_id}", status_code=204)
 async def delete_customer(
-    customer_id: str,
-    db: Session = Depends(get_db)
+    customer_id: str
 ):
     """
     Delete customer (soft delete).
@@ -0,0 +1,122 @@
+"""
+Bulk export endpoints
+Full or incremental (since=) tenant datasets streamed as NDJSON or CSV
+"""
+
+import csv
+import io
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Iterable, List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+
+from ....core.unit_of_work import get_session, unit_of_work
+from ....infrastructure.repositories.export import EXPORTS, NESTED_LINES, UnknownExportError, export_repository
+from ....infrastructure.repositories.projection import InvalidFieldsError, parse_fields
+from .sparse import FIELDS_DESCRIPTION
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+_json = TypeAdapter(Any)
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def _ndjson(rows: List[dict]) -> bytes:
+    return b"".join(_json.dump_json(row) + b"\n" for row in rows)
+
+
+def _csv(lines: Iterable[Iterable[Any]]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(lines)
+    return buffer.getvalue().encode()
+
+
+def _csv_rows(rows: List[dict], keys: List[str], line_keys: List[str]) -> Iterable[List[Any]]:
+    """One CSV row per row, or per line where rows nest lines (an entry without lines gets one)."""
+    for row in rows:
+        values = [_csv_value(row[key]) for key in keys]
+        if not line_keys:
+            yield values
+            continue
+        for line in row['lines'] or [{}]:
+            yield values + [_csv_value(line.get(key)) for key in line_keys]
+
+
+async def _export_body(entity: str, tenant_id: UUID, since: Optional[datetime],
+                       fields: Optional[List[str]], format: str, keys: List[str]) -> AsyncIterator[bytes]:
+    # The body is sent after the request's unit of work has completed,
+    # so the export runs in a unit of work of its own
+    try:
+        async with unit_of_work(f"GET /export/{entity}", read_only=True):
+            repository = export_repository(entity, get_session())
+            line_keys = NESTED_LINES.get(entity, [])
+            if format == "csv":
+                yield _csv([keys + [f"line_{key}" for key in line_keys]])
+            async for rows in repository.stream(tenant_id, since, fields):
+                if format == "ndjson":
+                    yield _ndjson(rows)
+                else:
+                    yield _csv(_csv_rows(rows, keys, line_keys))
+    except Exception as e:
+        # The status line is already sent; a truncated body is all the client can see
+        logger.error(f"Export of {entity} for tenant {tenant_id} failed: {e}")
+        raise
+
+
+@router.get("/{entity}")
+async def export_entity(
+    entity: str,
+    tenant_id: UUID = Query(..., description="Tenant ID"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson (one JSON object per line) or csv"),
+    since: Optional[datetime] = Query(None, description="Only rows with updated_at at or after this time (incremental pull)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
+    """
+    Stream all rows of an entity (customers, leads, articles, stock-movements,
+    journal-entries) for a tenant.
+
+    Rows come in (updated_at, id) order through a server-side cursor, so
+    memory stays constant however large the tenant is. Journal entries
+    carry their lines: nested under "lines" in NDJSON, one CSV row per line
+    (entry columns repeated, line columns prefixed line_). Soft-deleted rows
+    are included. For incremental pulls pass the largest updated_at
+    received so far as since; rows changed at exactly that time are sent
+    again, so deduplicate by id.
+    """
+    # TODO: Get tenant from authenticated user context
+    names = parse_fields(fields)
+    try:
+        # Validated up front: once streaming has started the status can no longer change
+        keys = export_repository(entity, None).stream_fields(names)
+    except UnknownExportError:
+        raise HTTPException(
+            status_code=404, detail=f"Unknown export {entity}; available: {', '.join(EXPORTS)}"
+        )
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        _export_body(entity, tenant_id, since, names, format, keys),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{format}"'},
+    )
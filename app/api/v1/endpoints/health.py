@@ -2,12 +2,19 @@
 Health check endpoints
 """
 
-from fastapi import APIRouter, Depends
+import asyncio
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 import time
-import sqlite3
 
-from app.core.database import get_db
+from app.core.database import get_db, engine, Base
+from app.core.db_telemetry import telemetry, estimate_row_counts
+from app.core import unit_of_work
+from app.infrastructure.repositories.entity_cache import entity_cache
+from app.infrastructure.repositories.single_flight import single_flight
+from ..schemas.base import DatabaseHealthResponse, CacheHealthResponse
 
 router = APIRouter()
 
@@ -52,42 +59,91 @@ async def liveness_check():
     }
 
 
-@router.get("/database")
-async def database_health():
-    """Detailed database health check"""
+def _probe_database(tables, estimate_rows: bool):
+    """Check connectivity (and estimate row counts) on the primary engine"""
+    if estimate_rows:
+        return estimate_row_counts(engine, tables)
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    return {}
+
+
+@router.get("/database", response_model=DatabaseHealthResponse)
+async def database_health(
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of statement fingerprints"),
+    estimate_rows: bool = Query(True, description="Include planner row-count estimates")
+):
+    """
+    Detailed database health check.
+
+    Reports pool state, checkout wait times, per-statement latency
+    percentiles and slow-query samples collected from SQLAlchemy events,
+    plus row-count estimates from planner statistics (no full counts).
+    """
+    tables = sorted(Base.metadata.tables)
+    status, error, row_estimates = "healthy", None, {}
     try:
-        conn = sqlite3.connect("valeo_neuro_erp.db")
-        cursor = conn.cursor()
-
-        # Get database statistics
-        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='table'")
-        table_count = cursor.fetchone()[0]
-
-        # Get record counts for main tables
-        stats = {}
-        tables = ['shared_tenants', 'shared_users', 'crm_customers',
-                 'erp_chart_of_accounts', 'inventory_articles', 'inventory_warehouses']
-
-        for table in tables:
-            try:
-                cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                stats[table] = cursor.fetchone()[0]
-            except:
-                stats[table] = 0
-
-        conn.close()
-
-        return {
-            "status": "healthy",
-            "database_type": "SQLite",
-            "total_tables": table_count,
-            "record_counts": stats,
-            "timestamp": time.time()
-        }
-
+        row_estimates = await asyncio.to_thread(_probe_database, tables, estimate_rows)
     except Exception as e:
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-            "timestamp": time.time()
-        }
\ No newline at end of file
+        status, error = "unhealthy", str(e)
+
+    return DatabaseHealthResponse(
+        status=status,
+        database_type=engine.dialect.name,
+        error=error,
+        total_tables=len(tables),
+        row_estimates=row_estimates,
+        leaked_connections=unit_of_work.leaked_checkouts_total,
+        timestamp=time.time(),
+        **telemetry.snapshot(limit),
+    )
+
+
+@router.get("/database/metrics", response_class=PlainTextResponse)
+async def database_metrics():
+    """Database pool and query telemetry in the Prometheus text format"""
+    return PlainTextResponse(
+        telemetry.prometheus({"db_leaked_connections": unit_of_work.leaked_checkouts_total}),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@router.get("/cache", response_model=CacheHealthResponse)
+async def cache_health(
+    limit: int = Query(20, ge=1, le=500, description="Maximum number of lookup keys")
+):
+    """
+    Entity cache health check.
+
+    Pings Redis and reports L1/L2 hit, miss, fill and invalidation
+    counters per entity type for this process, plus the coalescing
+    counters of the most frequent lookup keys.
+    """
+    status, error, redis_ok = "disabled", None, False
+    if entity_cache.enabled:
+        try:
+            redis_ok = bool(await entity_cache.redis.ping())
+            status = "healthy"
+        except Exception as e:
+            status, error = "degraded", str(e)
+
+    return CacheHealthResponse(
+        status=status,
+        redis=redis_ok,
+        error=error,
+        l1_entries=len(entity_cache.l1),
+        entities=entity_cache.metrics.snapshot(),
+        lookups_in_flight=single_flight.in_flight(),
+        lookup_totals=single_flight.metrics.totals(),
+        hot_keys=single_flight.metrics.snapshot(limit),
+        timestamp=time.time(),
+    )
+
+
+@router.get("/cache/metrics", response_class=PlainTextResponse)
+async def cache_metrics():
+    """Entity cache and lookup coalescing counters in the Prometheus text format"""
+    return PlainTextResponse(
+        entity_cache.metrics.prometheus() + single_flight.metrics.prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
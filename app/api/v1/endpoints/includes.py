@@ -0,0 +1,79 @@
+"""
+Related entity expansion
+Shared handling of the include= query parameter of list endpoints
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from pydantic import BaseModel
+
+from ....infrastructure.repositories.dataloader import data_loader
+
+INCLUDE_DESCRIPTION = "Comma-separated related entities to embed, e.g. include=customer,assigned_user"
+
+
+class InvalidIncludeError(ValueError):
+    """Raised for include= names the endpoint cannot expand."""
+
+
+class Relation:
+    """A related entity a list endpoint can embed."""
+
+    def __init__(self, foreign_key: str, repository: Callable[[], Any], schema: Type[BaseModel]):
+        self.foreign_key = foreign_key  # Column of the listed entity holding the related id
+        self.repository = repository  # Resolves the repository of the related entity
+        self.schema = schema  # Fields of the embedded entity
+
+
+def requested_includes(include: Optional[str], relations: Dict[str, Relation]) -> List[str]:
+    """Names of an include= parameter, restricted to the endpoint's relations."""
+    if not include:
+        return []
+    names = list(dict.fromkeys(name.strip() for name in include.split(",") if name.strip()))
+    unknown = [name for name in names if name not in relations]
+    if unknown:
+        raise InvalidIncludeError(
+            f"Unknown include(s): {', '.join(unknown)}; available: {', '.join(relations)}"
+        )
+    return names
+
+
+def included_fields(fields: Optional[List[str]], includes: List[str], relations: Dict[str, Relation],
+                    schema: Type[BaseModel], repository) -> Optional[List[str]]:
+    """
+    Fields to query when expanding: rows with includes are plain dicts, so
+    the requested fields (or every schema field backed by a column) plus
+    the foreign keys the includes resolve.
+    """
+    if not includes:
+        return fields
+    if fields is None:
+        columns = set(repository.stream_fields())
+        fields = [name for name in schema.model_fields if name in columns]
+    names = list(fields)
+    for name in includes:
+        if relations[name].foreign_key not in names:
+            names.append(relations[name].foreign_key)
+    return names
+
+
+def _embedded(entity: Any, schema: Type[BaseModel]) -> Optional[Dict[str, Any]]:
+    if entity is None:
+        return None
+    return {name: getattr(entity, name) for name in schema.model_fields if hasattr(entity, name)}
+
+
+async def expand(rows: List[Dict[str, Any]], includes: List[str], relations: Dict[str, Relation],
+                 tenant_id: Any) -> List[Dict[str, Any]]:
+    """
+    Embed the related entities under their include names. Each relation is
+    loaded through the request's DataLoader: one batched query per
+    relation, whatever the page size.
+    """
+    for name in includes:
+        relation = relations[name]
+        loader = data_loader(relation.repository(), tenant_id)
+        related = await loader.load_many(row[relation.foreign_key] for row in rows)
+        for row, entity in zip(rows, related):
+            row[name] = _embedded(entity, relation.schema)
+    return rows
@@ -3,39 +3,50 @@ Finance Journal Entry management endpoints
 RESTful API for journal entry management with clean architecture
 """
 
-from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from datetime import datetime
+from decimal import Decimal
+from typing import Optional, List, Union
+from uuid import UUID, uuid4
+from fastapi import APIRouter, HTTPException, Query, Request
+from datetime import date
 
-from ....core.database import get_db
 from ....infrastructure.repositories import JournalEntryRepository
+from ....infrastructure.repositories.journal_import import ImportConflictError, import_path
+from ....infrastructure.repositories.journal_query import JournalEntryQuery
+from ....infrastructure.repositories.money import from_cents, to_cents
+from ....infrastructure.repositories.pagination import InvalidCursorError
+from ....infrastructure.repositories.period_balances import PeriodClosedError
+from ....infrastructure.repositories.posting import UnbalancedEntryError
+from ....core.config import settings
 from ....core.dependency_container import container
+from ....core.services import JournalEntryService
 from ..schemas.finance import (
-    JournalEntryCreate, JournalEntryUpdate, JournalEntry, JournalEntryLine
+    JournalEntryCreate, JournalEntryUpdate, JournalEntry, JournalEntryLine, TrialBalance,
+    JournalPostingRequest, JournalPostingJob, JournalReversalRequest, JournalReversalResult,
+    JournalImport, JournalImportRowError
 )
-from ..schemas.base import PaginatedResponse
+from ..schemas.base import PaginatedResponse, CursorPaginatedResponse
 
 router = APIRouter()
 
 
 @router.post("/", response_model=JournalEntry, status_code=201)
 async def create_journal_entry(
-    entry_data: JournalEntryCreate,
-    db: Session = Depends(get_db)
+    entry_data: JournalEntryCreate
 ):
     """
     Create a new journal entry.
 
     This endpoint allows creating a new journal entry with multiple lines.
-    The entry must balance (total debit = total credit).
+    The entry must balance (total debit = total credit). Without an
+    entry_number it gets the next number of the journal number range.
     """
     try:
-        # Validate that the entry balances
-        total_debit = sum(line.debit_amount for line in entry_data.lines)
-        total_credit = sum(line.credit_amount for line in entry_data.lines)
+        # Validate that the entry balances, exactly (in cents)
+        total_debit = sum(to_cents(line.debit_amount) for line in entry_data.lines)
+        total_credit = sum(to_cents(line.credit_amount) for line in entry_data.lines)
+        total_debit, total_credit = from_cents(total_debit), from_cents(total_credit)
 
-        if abs(total_debit - total_credit) > 0.01:  # Allow for small rounding differences
+        if total_debit != total_credit:
             raise HTTPException(
                 status_code=400,
                 detail=f"Journal entry does not balance. Debit: {total_debit}, Credit: {total_credit}"
@@ -43,7 +54,7 @@ async def create_journal_entry(
 
         entry_repo = container.resolve(JournalEntryRepository)
 
-        # Create the entry data
+        # Create the entry data; the repository writes the entry and its lines in one transaction
         entry_dict = entry_data.model_dump()
         entry_dict['total_debit'] = total_debit
         entry_dict['total_credit'] = total_credit
@@ -52,24 +63,154 @@ async def create_journal_entry(
         return JournalEntry.model_validate(entry)
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create journal entry: {str(e)}")
 
 
-@router.get("/", response_model=PaginatedResponse[JournalEntry])
+@router.post(":post", response_model=JournalPostingJob, status_code=202)
+async def post_journal_entries(
+    request: JournalPostingRequest
+):
+    """
+    Post many draft journal entries.
+
+    Starts a posting job and returns it right away; poll
+    GET /journal-entries/posting-jobs/{job_id} for its progress.
+    Entries are posted in chunked transactions: each chunk locks its
+    drafts, rejects unbalanced entries and entries in closed periods, and
+    updates every account balance once. Entries that are no longer drafts
+    are skipped.
+    """
+    try:
+        journal_service = container.resolve(JournalEntryService)
+        job = await journal_service.post_entries(request.entry_ids, request.tenant_id, request.chunk_size)
+        return job.to_dict()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to start posting job: {str(e)}")
+
+
+@router.post(":reverse", response_model=JournalReversalResult)
+async def reverse_journal_entries(
+    request: JournalReversalRequest
+):
+    """
+    Reverse many posted journal entries.
+
+    Reverses the posted entries matching the filter (source, reference,
+    entry dates; at least one is required) in chunks, e.g. the accruals of
+    a period. Each chunk is a savepoint: a failing chunk only fails its
+    entries, and the reversals are committed together with the request.
+    Every entry gets a reversal entry dated
+    reversal_date with its lines' debit and credit swapped; the account
+    balances are updated once per account and chunk.
+    """
+    try:
+        query = JournalEntryQuery().dated(request.start_date, request.end_date)
+        if request.source:
+            query.from_source(*request.source)
+        if request.reference:
+            query.with_reference(request.reference.rstrip("*"), prefix=request.reference.endswith("*"))
+        journal_service = container.resolve(JournalEntryService)
+        progress = await journal_service.reverse_entries(
+            query, request.reason, request.tenant_id, request.reversal_date, request.chunk_size
+        )
+        return JournalReversalResult(
+            tenant_id=str(request.tenant_id),
+            total=progress.total,
+            reversed=progress.posted,
+            skipped=progress.skipped,
+            failed=progress.failed,
+            chunks=progress.chunks,
+            entries_per_second=round(progress.entries_per_second, 1),
+            duration_ms=round(progress.elapsed * 1000, 1),
+            errors=progress.errors
+        )
+    except PeriodClosedError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to reverse journal entries: {str(e)}")
+
+
+@router.post(":import", response_model=JournalImport, status_code=202)
+async def import_journal_entries(
+    request: Request,
+    tenant_id: UUID = Query(..., description="Tenant ID"),
+    post: bool = Query(False, description="Post the imported entries (default: import them as drafts)"),
+    file_name: Optional[str] = Query(None, max_length=255, description="Name of the file, for reference"),
+    chunk_size: Optional[int] = Query(None, ge=100, le=100000, description="Rows per transaction")
+):
+    """
+    Import a DATEV Buchungsstapel (EXTF CSV, the request body).
+
+    Starts the import and returns it right away; poll
+    GET /journal-entries/imports/{import_id} for its progress and
+    GET /journal-entries/imports/{import_id}/errors for the rejected rows.
+    The file is read as a stream in chunked transactions: accounts are
+    checked against the chart of accounts, every entry must balance, and
+    the entries of the rejected rows are left out. A failed import is
+    resumed after its last committed chunk.
+    """
+    import_id = uuid4()
+    path = import_path(import_id)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        size = 0
+        with open(path, 'wb') as file:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > settings.MAX_JOURNAL_IMPORT_SIZE:
+                    raise HTTPException(status_code=413, detail="The file is too large to import")
+                file.write(chunk)
+        if not size:
+            raise HTTPException(status_code=400, detail="The request body holds no file")
+
+        journal_service = container.resolve(JournalEntryService)
+        return await journal_service.import_entries(import_id, tenant_id, file_name, post, chunk_size)
+    except HTTPException:
+        path.unlink(missing_ok=True)
+        raise
+    except ImportConflictError as e:
+        path.unlink(missing_ok=True)
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        path.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        path.unlink(missing_ok=True)
+        raise HTTPException(status_code=500, detail=f"Failed to start journal import: {str(e)}")
+
+
+@router.get("/", response_model=Union[PaginatedResponse[JournalEntry], CursorPaginatedResponse[JournalEntry]])
 async def list_journal_entries(
     tenant_id: Optional[str] = Query(None, description="Filter by tenant ID"),
-    status: Optional[str] = Query(None, description="Filter by status"),
-    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    status: Optional[List[str]] = Query(None, description="Filter by status (repeatable: draft, posted, reversed)"),
+    source: Optional[List[str]] = Query(None, description="Filter by source (repeatable)"),
+    reference: Optional[str] = Query(None, description="Filter by reference (a trailing * matches a prefix)"),
+    min_amount: Optional[Decimal] = Query(None, ge=0, description="Minimum entry total"),
+    max_amount: Optional[Decimal] = Query(None, ge=0, description="Maximum entry total"),
+    start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[date] = Query(None, description="End date, included (YYYY-MM-DD)"),
     skip: int = Query(0, ge=0, description="Number of items to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of items to return"),
-    db: Session = Depends(get_db)
+    pagination: str = Query("offset", pattern="^(offset|cursor)$", description="offset (page/total) or cursor (keyset)"),
+    cursor: Optional[str] = Query(None, description="next_cursor/prev_cursor of a previous cursor page"),
+    total_mode: str = Query("exact", pattern="^(exact|estimate)$", description="exact count or planner estimate (large tenants)")
 ):
     """
     List journal entries with pagination and filtering.
 
-    Retrieve a paginated list of journal entries with optional filtering.
+    Retrieve a paginated list of journal entries in date order. All filters
+    and the pagination are evaluated by the database, so a page costs the
+    same however many entries match.
+
+    With pagination=cursor (or a cursor) pages are fetched by keyset and
+    cost the same at any depth.
     """
     try:
         entry_repo = container.resolve(JournalEntryRepository)
@@ -77,39 +218,158 @@ async def list_journal_entries(
         # Use provided tenant_id or default to system for now
         effective_tenant_id = tenant_id or "system"
 
-        # Convert date strings to datetime if provided
-        start_dt = datetime.fromisoformat(start_date) if start_date else None
-        end_dt = datetime.fromisoformat(end_date) if end_date else None
-
-        entries = await entry_repo.get_entries_by_date_range(
-            start_date, end_date, effective_tenant_id
-        ) if start_date and end_date else await entry_repo.get_all(effective_tenant_id, skip, limit)
-
-        # Apply status filter if provided
+        query = JournalEntryQuery().dated(start_date, end_date).amount_between(min_amount, max_amount)
         if status:
-            entries = [e for e in entries if e.status == status]
+            query.with_status(*status)
+        if source:
+            query.from_source(*source)
+        if reference:
+            query.with_reference(reference.rstrip("*"), prefix=reference.endswith("*"))
+
+        if pagination == "cursor" or cursor:
+            page = await entry_repo.find_entries_page(query, effective_tenant_id, limit, cursor)
+            return CursorPaginatedResponse[JournalEntry](
+                items=[JournalEntry.model_validate(entry) for entry in page.items],
+                size=limit,
+                next_cursor=page.next_cursor,
+                prev_cursor=page.prev_cursor,
+                has_next=page.has_next,
+                has_prev=page.has_prev
+            )
 
-        # Apply pagination
-        total = len(entries)
-        paginated_entries = entries[skip:skip + limit]
+        # Items and total in one round trip
+        result = await entry_repo.find_entries(query, effective_tenant_id, skip, limit, total_mode)
+        total = result.total
 
         return PaginatedResponse[JournalEntry](
-            items=[JournalEntry.model_validate(entry) for entry in paginated_entries],
+            items=[JournalEntry.model_validate(entry) for entry in result.items],
             total=total,
+            total_approximate=result.approximate,
             page=(skip // limit) + 1,
             size=limit,
             pages=(total + limit - 1) // limit,
             has_next=(skip + limit) < total,
             has_prev=skip > 0
         )
+    except (InvalidCursorError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list journal entries: {str(e)}")
 
 
+@router.get("/trial-balance", response_model=TrialBalance)
+async def get_trial_balance(
+    tenant_id: UUID = Query(..., description="Tenant ID"),
+    start_date: date = Query(..., description="First day (YYYY-MM-DD)"),
+    end_date: date = Query(..., description="Last day, included (YYYY-MM-DD)"),
+    period: str = Query("month", pattern="^(month|quarter|year|total)$", description="Period buckets per account")
+):
+    """
+    Trial balance.
+
+    Debit, credit and balance of the posted entries per account and period,
+    rolled up per category and account type, with the grand totals.
+    """
+    try:
+        journal_service = container.resolve(JournalEntryService)
+        return await journal_service.get_trial_balance(start_date, end_date, tenant_id, period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to build trial balance: {str(e)}")
+
+
+@router.get("/posting-jobs/{job_id}", response_model=JournalPostingJob)
+async def get_posting_job(
+    job_id: str
+):
+    """
+    Get the progress of a posting job.
+
+    Jobs are kept by the worker that runs them until well after they finished.
+    """
+    journal_service = container.resolve(JournalEntryService)
+    job = await journal_service.get_posting_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Posting job not found")
+    return job.to_dict()
+
+
+@router.get("/imports/{import_id}", response_model=JournalImport)
+async def get_journal_import(
+    import_id: UUID,
+    tenant_id: UUID = Query(..., description="Tenant ID")
+):
+    """
+    Get the progress of a journal import.
+
+    The progress is kept with the import, so any worker can report it.
+    """
+    journal_service = container.resolve(JournalEntryService)
+    record = await journal_service.get_import(import_id, tenant_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Journal import not found")
+    return JournalImport.model_validate(record)
+
+
+@router.get("/imports/{import_id}/errors", response_model=PaginatedResponse[JournalImportRowError])
+async def list_journal_import_errors(
+    import_id: UUID,
+    tenant_id: UUID = Query(..., description="Tenant ID"),
+    skip: int = Query(0, ge=0, description="Number of items to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of items to return")
+):
+    """
+    List the rows a journal import rejected, in file order.
+
+    Every row of a rejected entry is listed; the row that caused the
+    rejection carries its own error, the others point to it.
+    """
+    journal_service = container.resolve(JournalEntryService)
+    result = await journal_service.get_import_errors(import_id, tenant_id, skip, limit)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Journal import not found")
+    total = result.total
+    return PaginatedResponse[JournalImportRowError](
+        items=[JournalImportRowError.model_validate(error) for error in result.items],
+        total=total,
+        page=(skip // limit) + 1,
+        size=limit,
+        pages=(total + limit - 1) // limit,
+        has_next=(skip + limit) < total,
+        has_prev=skip > 0
+    )
+
+
+@router.post("/imports/{import_id}:resume", response_model=JournalImport, status_code=202)
+async def resume_journal_import(
+    import_id: UUID,
+    tenant_id: UUID = Query(..., description="Tenant ID"),
+    chunk_size: Optional[int] = Query(None, ge=100, le=100000, description="Rows per transaction")
+):
+    """
+    Resume a failed or interrupted journal import.
+
+    The import continues after its last committed chunk; nothing is
+    imported twice.
+    """
+    try:
+        journal_service = container.resolve(JournalEntryService)
+        record = await journal_service.resume_import(import_id, tenant_id, chunk_size)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Journal import not found")
+        return JournalImport.model_validate(record)
+    except HTTPException:
+        raise
+    except ImportConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to resume journal import: {str(e)}")
+
+
 @router.get("/{entry_id}", response_model=JournalEntry)
 async def get_journal_entry(
-    entry_id: str,
-    db: Session = Depends(get_db)
+    entry_id: str
 ):
     """
     Get journal entry by ID.
@@ -131,8 +391,7 @@ async def get_journal_entry(
 @router.put("/{entry_id}", response_model=JournalEntry)
 async def update_journal_entry(
     entry_id: str,
-    entry_data: JournalEntryUpdate,
-    db: Session = Depends(get_db)
+    entry_data: JournalEntryUpdate
 ):
     """
     Update journal entry information.
@@ -161,8 +420,7 @@ async def update_journal_entry(
 
 @router.post("/{entry_id}/post", response_model=JournalEntry)
 async def post_journal_entry(
-    entry_id: str,
-    db: Session = Depends(get_db)
+    entry_id: str
 ):
     """
     Post a journal entry.
@@ -181,42 +439,52 @@ async def post_journal_entry(
         return JournalEntry.model_validate(entry)
     except HTTPException:
         raise
+    except PeriodClosedError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except UnbalancedEntryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to post journal entry: {str(e)}")
 
 
 @router.post("/{entry_id}/reverse", response_model=dict)
 async def reverse_journal_entry(
-    entry_id: str,
+    entry_id: UUID,
     reason: str = Query(..., description="Reason for reversal"),
-    db: Session = Depends(get_db)
+    tenant_id: Optional[UUID] = Query(None, description="Tenant ID"),
+    reversal_date: Optional[date] = Query(None, description="Date of the reversal entry (default: today)")
 ):
     """
     Create a reversal entry.
 
-    Create a new journal entry that reverses the original entry.
+    Create a new journal entry that reverses the original entry: its lines
+    with debit and credit swapped, posted on reversal_date. The original
+    entry becomes reversed.
     """
     try:
-        entry_repo = container.resolve(JournalEntryRepository)
-        reversal_entry = await entry_repo.reverse_entry(entry_id, reason, "system")  # TODO: tenant context
+        journal_service = container.resolve(JournalEntryService)
+        effective_tenant_id = tenant_id or "system"  # TODO: tenant context
+        reversal_entry = await journal_service.reverse_entry(entry_id, reason, effective_tenant_id, reversal_date)
         if not reversal_entry:
-            raise HTTPException(status_code=400, detail="Failed to create reversal entry")
+            raise HTTPException(status_code=400, detail="Only posted journal entries can be reversed")
 
         return {
             "message": "Reversal entry created successfully",
-            "original_entry_id": entry_id,
-            "reversal_entry_id": reversal_entry.id
+            "original_entry_id": str(entry_id),
+            "reversal_entry_id": str(reversal_entry.id),
+            "reversal_entry_number": reversal_entry.entry_number
         }
     except HTTPException:
         raise
+    except PeriodClosedError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to reverse journal entry: {str(e)}")
 
 
 @router.delete("/{entry_id}", status_code=204)
 async def delete_journal_entry(
-    entry_id: str,
-    db: Session = Depends(get_db)
+    entry_id: str
 ):
     """
     Delete journal entry.
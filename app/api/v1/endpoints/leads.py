@@ -3,25 +3,36 @@ CRM Lead management endpoints
 RESTful API for lead management with clean architecture
 """
 
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from typing import List, Optional, Union
+from fastapi import APIRouter, HTTPException, Query
 
-from ....core.database import get_db
-from ....infrastructure.repositories import LeadRepository
+from ....infrastructure.repositories import CustomerRepository, LeadRepository
+from ....infrastructure.repositories.base_repository import BaseRepositoryImpl
+from ....infrastructure.repositories.pagination import InvalidCursorError
+from ....infrastructure.repositories.projection import InvalidFieldsError
 from ....core.dependency_container import container
+from ....core.models import User as UserModel
+from ....core.unit_of_work import get_session
 from ..schemas.crm import (
-    LeadCreate, LeadUpdate, Lead
+    LeadCreate, LeadUpdate, Lead, Customer
 )
-from ..schemas.base import PaginatedResponse
+from ..schemas.shared import User
+from ..schemas.base import PaginatedResponse, CursorPaginatedResponse, SearchSuggestion
+from .includes import INCLUDE_DESCRIPTION, InvalidIncludeError, Relation, expand, included_fields, requested_includes
+from .sparse import FIELDS_DESCRIPTION, item_schema, requested_fields, respond, response_items
 
 router = APIRouter()
 
+LEAD_INCLUDES = {
+    # No user repository is wired in the container yet; users are only read here
+    'assigned_user': Relation('assigned_to', lambda: BaseRepositoryImpl(get_session(), UserModel), User),
+    'customer': Relation('converted_to_customer_id', lambda: container.resolve(CustomerRepository), Customer),
+}
+
 
 @router.post("/", response_model=Lead, status_code=201)
 async def create_lead(
-    lead_data: LeadCreate,
-    db: Session = Depends(get_db)
+    lead_data: LeadCreate
 ):
     """
     Create a new lead.
@@ -36,38 +47,92 @@ async def create_lead(
         raise HTTPException(status_code=500, detail=f"Failed to create lead: {str(e)}")
 
 
-@router.get("/", response_model=PaginatedResponse[Lead])
+@router.get("/autocomplete", response_model=List[SearchSuggestion])
+async def autocomplete_leads(
+    q: str = Query(..., min_length=1, max_length=100, description="Prefix typed so far"),
+    tenant_id: Optional[str] = Query(None, description="Filter by tenant ID"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of suggestions")
+):
+    """
+    Suggest leads whose company name, contact person or email starts with the prefix.
+
+    Served from the text search index, best matches first.
+    """
+    try:
+        lead_repo = container.resolve(LeadRepository)
+        leads = await lead_repo.autocomplete(tenant_id or "system", q, limit)
+        return [SearchSuggestion(id=str(lead.id), label=f"{lead.company_name} ({lead.contact_person})") for lead in leads]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to autocomplete leads: {str(e)}")
+
+
+@router.get("/", response_model=Union[PaginatedResponse[Lead], CursorPaginatedResponse[Lead]])
 async def list_leads(
     tenant_id: Optional[str] = Query(None, description="Filter by tenant ID"),
     status: Optional[str] = Query(None, description="Filter by status"),
     assigned_to: Optional[str] = Query(None, description="Filter by assigned user"),
+    search: Optional[str] = Query(None, description="Search in company name, contact person or email (ranked by relevance)"),
     skip: int = Query(0, ge=0, description="Number of items to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of items to return"),
-    db: Session = Depends(get_db)
+    pagination: str = Query("offset", pattern="^(offset|cursor)$", description="offset (page/total) or cursor (keyset)"),
+    cursor: Optional[str] = Query(None, description="next_cursor/prev_cursor of a previous cursor page"),
+    total_mode: str = Query("exact", pattern="^(exact|estimate)$", description="exact count or planner estimate (large tenants)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION)
 ):
     """
     List leads with pagination and filtering.
 
     Retrieve a paginated list of leads with optional filtering.
+    A search uses the text search index; offset pages are ordered by relevance.
+
+    With pagination=cursor (or a cursor) pages are fetched by keyset over
+    a stable ordering and cost the same at any depth.
+
+    With fields (e.g. fields=id,name for a grid view) only those columns
+    are queried and returned.
+
+    With include=assigned_user,customer the assigned user and the customer
+    the lead was converted to are embedded; each costs one batched query
+    per page, whatever the page size.
     """
     try:
         lead_repo = container.resolve(LeadRepository)
+        includes = requested_includes(include, LEAD_INCLUDES)
+        names = included_fields(requested_fields(fields, Lead), includes, LEAD_INCLUDES, Lead, lead_repo)
 
         # Use provided tenant_id or default to system for now
         effective_tenant_id = tenant_id or "system"
 
-        leads = await lead_repo.get_all(effective_tenant_id, skip, limit, status, assigned_to)
-        total = await lead_repo.count(effective_tenant_id, status, assigned_to)
+        if pagination == "cursor" or cursor:
+            page = await lead_repo.get_page(effective_tenant_id, limit, cursor, status, assigned_to, search, fields=names)
+            return respond(CursorPaginatedResponse[item_schema(Lead, names)](
+                items=await expand(response_items(page.items, Lead, names), includes, LEAD_INCLUDES, effective_tenant_id),
+                size=limit,
+                next_cursor=page.next_cursor,
+                prev_cursor=page.prev_cursor,
+                has_next=page.has_next,
+                has_prev=page.has_prev
+            ), names)
+
+        # Items and total in one round trip
+        result = await lead_repo.get_all_with_total(
+            effective_tenant_id, skip, limit, status, assigned_to, total_mode=total_mode, search=search, fields=names
+        )
+        total = result.total
 
-        return PaginatedResponse[Lead](
-            items=[Lead.model_validate(lead) for lead in leads],
+        return respond(PaginatedResponse[item_schema(Lead, names)](
+            items=await expand(response_items(result.items, Lead, names), includes, LEAD_INCLUDES, effective_tenant_id),
             total=total,
+            total_approximate=result.approximate,
             page=(skip // limit) + 1,
             size=limit,
             pages=(total + limit - 1) // limit,
             has_next=(skip + limit) < total,
             has_prev=skip > 0
-        )
+        ), names)
+    except (InvalidCursorError, InvalidFieldsError, InvalidIncludeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list leads: {str(e)}")
 
@@ -75,21 +140,28 @@ async def list_leads(
 @router.get("/{lead_id}", response_model=Lead)
 async def get_lead(
     lead_id: str,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
     """
     Get lead by ID.
 
-    Retrieve detailed information about a specific lead.
+    Retrieve detailed information about a specific lead
+    (only the listed fields with fields=...).
     """
     try:
         lead_repo = container.resolve(LeadRepository)
-        lead = await lead_repo.get_by_id(lead_id, "system")  # TODO: tenant context
+        includes = requested_includes(include, LEAD_INCLUDES)
+        names = included_fields(requested_fields(fields, Lead), includes, LEAD_INCLUDES, Lead, lead_repo)
+        lead = await lead_repo.get_by_id(lead_id, "system", fields=names)  # TODO: tenant context
         if not lead:
             raise HTTPException(status_code=404, detail="Lead not found")
+        if names is not None:
+            return respond(lead, names)
         return Lead.model_validate(lead)
     except HTTPException:
         raise
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve lead: {str(e)}")
 
@@ -97,8 +169,7 @@ async def get_lead(
 @router.put("/{lead_id}", response_model=Lead)
 async def update_lead(
     lead_id: str,
-    lead_data: LeadUpdate,
-    db: Session = Depends(get_db)
+    lead_data: LeadUpdate
 ):
     """
     Update lead information.
@@ -120,8 +191,7 @@ async def update_lead(
 @router.post("/{lead_id}/convert", response_model=dict)
 async def convert_lead(
     lead_id: str,
-    customer_id: str,
-    db: Session = Depends(get_db)
+    customer_id: str
 ):
     """
     Convert lead to customer.
@@ -142,8 +212,7 @@ async def convert_lead(
 
 @router.delete("/{lead_id}", status_code=204)
 async def delete_lead(
-    lead_id: str,
-    db: Session = Depends(get_db)
+    lead_id: str
 ):
     """
     Delete lead (soft delete).
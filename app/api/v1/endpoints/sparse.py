@@ -0,0 +1,51 @@
+"""
+Sparse fieldset support
+Shared handling of the fields= query parameter of list and detail endpoints
+"""
+
+from typing import Any, Dict, List, Optional, Type
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+from ....infrastructure.repositories.projection import InvalidFieldsError, parse_fields
+
+FIELDS_DESCRIPTION = "Comma-separated fields to return, e.g. id,name (id is always included)"
+
+_json = TypeAdapter(Any)
+
+
+def requested_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[List[str]]:
+    """Field names of a fields= parameter, restricted to the response schema; None means all fields."""
+    names = parse_fields(fields)
+    if names is None:
+        return None
+    unknown = [name for name in names if name not in schema.model_fields]
+    if unknown:
+        raise InvalidFieldsError(
+            f"Unknown field(s): {', '.join(unknown)}; available: {', '.join(schema.model_fields)}"
+        )
+    return names
+
+
+def item_schema(schema: Type[BaseModel], fields: Optional[List[str]]) -> Any:
+    """Item type of a paginated response: the full schema, or plain dicts for a sparse fieldset."""
+    return schema if fields is None else Dict[str, Any]
+
+
+def response_items(items: List[Any], schema: Type[BaseModel], fields: Optional[List[str]]) -> List[Any]:
+    """Validate full entities against the schema; projected rows are already plain dicts."""
+    if fields is None:
+        return [schema.model_validate(item) for item in items]
+    return items
+
+
+def respond(content: Any, fields: Optional[List[str]]) -> Any:
+    """
+    Return full responses unchanged (validated against response_model).
+    Sparse responses are serialized directly: they do not match the full
+    schema, and re-validating every row is the cost they are meant to avoid.
+    """
+    if fields is None:
+        return content
+    return Response(content=_json.dump_json(content), media_type="application/json")
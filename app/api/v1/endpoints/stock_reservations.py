@@ -0,0 +1,162 @@
+"""
+Stock reservation endpoints
+Reserve, release and commit stock for orders; available-to-promise queries
+"""
+
+from typing import List
+from uuid import UUID
+from fastapi import APIRouter, HTTPException, Query
+
+from ....infrastructure.repositories import ArticleRepository, StockReservationRepository
+from ....infrastructure.repositories.reservations import InsufficientStockError, atp_snapshot
+from ....core.dependency_container import container
+from ..schemas.inventory import (
+    AvailableToPromise, OrderReservationCreate, StockReservation, StockReservationCreate
+)
+
+router = APIRouter()
+
+
+def _conflict(e: InsufficientStockError) -> HTTPException:
+    return HTTPException(status_code=409, detail={
+        "message": "Insufficient stock",
+        "shortages": [
+            {"article_id": str(id), "requested": str(s["requested"]), "available": str(s["available"])}
+            for id, s in e.shortages.items()
+        ],
+    })
+
+
+@router.get("/atp", response_model=List[AvailableToPromise])
+async def available_to_promise(
+    tenant_id: UUID = Query(..., description="Tenant ID"),
+    article_ids: str = Query(..., description="Comma-separated article IDs")
+):
+    """
+    Stock available to promise per article.
+
+    Answered from an in-memory snapshot that is at most
+    ATP_SNAPSHOT_MAX_AGE seconds old (refreshed incrementally with the
+    articles changed since). For quoting and display; reservations check
+    availability in the database.
+    """
+    # TODO: Get tenant from authenticated user context
+    try:
+        ids = [UUID(id.strip()) for id in article_ids.split(",") if id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="article_ids must be comma-separated UUIDs")
+    try:
+        article_repo = container.resolve(ArticleRepository)
+        levels = await atp_snapshot.available(article_repo, tenant_id, ids)
+        return [AvailableToPromise(article_id=id, available=available) for id, available in levels.items()]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to compute available to promise: {str(e)}")
+
+
+@router.post("/", response_model=StockReservation, status_code=201)
+async def reserve_stock(
+    reservation: StockReservationCreate,
+    tenant_id: UUID = Query(..., description="Tenant ID")
+):
+    """
+    Reserve stock of one article until ttl_minutes
+    (default STOCK_RESERVATION_TTL_MINUTES) have passed.
+
+    Fails with 409 if less than the quantity is available to promise.
+    """
+    try:
+        reservation_repo = container.resolve(StockReservationRepository)
+        return await reservation_repo.reserve(
+            reservation.article_id, reservation.quantity, tenant_id,
+            reservation.reference_number, reservation.ttl_minutes
+        )
+    except InsufficientStockError as e:
+        raise _conflict(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to reserve stock: {str(e)}")
+
+
+@router.post("/orders", response_model=List[StockReservation], status_code=201)
+async def reserve_order(
+    order: OrderReservationCreate,
+    tenant_id: UUID = Query(..., description="Tenant ID")
+):
+    """
+    Reserve all lines of an order in one transaction.
+
+    Either every line is reserved or none is: a 409 lists each article
+    with less stock available than requested. Lines for the same article
+    are combined.
+    """
+    try:
+        reservation_repo = container.resolve(StockReservationRepository)
+        return await reservation_repo.reserve_for_order(
+            [(line.article_id, line.quantity) for line in order.lines], tenant_id,
+            order.reference_number, order.ttl_minutes
+        )
+    except InsufficientStockError as e:
+        raise _conflict(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to reserve order: {str(e)}")
+
+
+@router.post("/orders/{reference_number}/release")
+async def release_order(
+    reference_number: str,
+    tenant_id: UUID = Query(..., description="Tenant ID")
+):
+    """Release all active reservations of an order (e.g. the order was cancelled)."""
+    try:
+        reservation_repo = container.resolve(StockReservationRepository)
+        return {"released": await reservation_repo.release_order(reference_number, tenant_id)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to release order: {str(e)}")
+
+
+@router.post("/orders/{reference_number}/commit")
+async def commit_order(
+    reference_number: str,
+    tenant_id: UUID = Query(..., description="Tenant ID")
+):
+    """Commit all active, unexpired reservations of an order (the goods ship)."""
+    try:
+        reservation_repo = container.resolve(StockReservationRepository)
+        return {"committed": await reservation_repo.commit_order(reference_number, tenant_id)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to commit order: {str(e)}")
+
+
+@router.post("/{reservation_id}/release")
+async def release_reservation(
+    reservation_id: UUID,
+    tenant_id: UUID = Query(..., description="Tenant ID")
+):
+    """Release an active reservation, returning its quantity to available stock."""
+    try:
+        reservation_repo = container.resolve(StockReservationRepository)
+        released = await reservation_repo.release(reservation_id, tenant_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to release reservation: {str(e)}")
+    if not released:
+        raise HTTPException(status_code=404, detail="Active reservation not found")
+    return {"id": str(reservation_id), "status": "released"}
+
+
+@router.post("/{reservation_id}/commit")
+async def commit_reservation(
+    reservation_id: UUID,
+    tenant_id: UUID = Query(..., description="Tenant ID")
+):
+    """Commit an active reservation; expired reservations can no longer be committed."""
+    try:
+        reservation_repo = container.resolve(StockReservationRepository)
+        committed = await reservation_repo.commit(reservation_id, tenant_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to commit reservation: {str(e)}")
+    if not committed:
+        raise HTTPException(status_code=404, detail="Active, unexpired reservation not found")
+    return {"id": str(reservation_id), "status": "committed"}
@@ -4,10 +4,8 @@ RESTful API for tenant management
 """
 
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Query
 
-from ....core.database import get_db
 from ....infrastructure.repositories import TenantRepository
 from ....core.dependency_container import container
 from ..schemas.shared import (
@@ -21,8 +19,7 @@ router = APIRouter(tags=["tenants"])
 
 @router.post("/", response_model=Tenant, status_code=201)
 async def create_tenant(
-    tenant_data: TenantCreate,
-    db: Session = Depends(get_db)
+    tenant_data: TenantCreate
 ):
     """
     Create a new tenant.
@@ -40,8 +37,7 @@ async def create_tenant(
 
 @router.get("/{tenant_id}", response_model=Tenant)
 async def get_tenant(
-    tenant_id: str,
-    db: Session = Depends(get_db)
+    tenant_id: str
 ):
     """
     Get tenant by ID.
@@ -63,8 +59,7 @@ async def get_tenant(
 @router.get("/", response_model=PaginatedResponse[Tenant])
 async def list_tenants(
     skip: int = Query(0, ge=0, description="Number of items to skip"),
-    limit: int = Query(100, ge=1, le=1000, description="Maximum number of items to return"),
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of items to return")
 ):
     """
     List tenants with pagination.
@@ -95,8 +90,7 @@ async def list_tenants(
 @router.put("/{tenant_id}", response_model=Tenant)
 async def update_tenant(
     tenant_id: str,
-    tenant_data: TenantUpdate,
-    db: Session = Depends(get_db)
+    tenant_data: TenantUpdate
 ):
     """
     Update tenant information.
@@ -117,8 +111,7 @@ async def update_tenant(
 
 @router.delete("/{tenant_id}", status_code=204)
 async def delete_tenant(
-    tenant_id: str,
-    db: Session = Depends(get_db)
+    tenant_id: str
 ):
     """
     Delete tenant (soft delete).
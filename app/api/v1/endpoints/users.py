@@ -4,10 +4,8 @@ RESTful API for user management and authentication
 """
 
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Query, status
 
-from ....core.database import get_db
 from ....infrastructure.repositories import UserRepository
 from ....core.dependency_container import container
 from ..schemas.shared import (
@@ -21,8 +19,7 @@ router = APIRouter(tags=["users"])
 
 @router.post("/", response_model=User, status_code=status.HTTP_201_CREATED)
 async def create_user(
-    user_data: UserCreate,
-    db: Session = Depends(get_db)
+    user_data: UserCreate
 ):
     """
     Create a new user.
@@ -53,7 +50,6 @@ async def create_user(
 @router.get("/me", response_model=User)
 async def get_current_user(
     # TODO: Add authentication dependency
-    db: Session = Depends(get_db)
 ):
     """
     Get current authenticated user information.
@@ -66,8 +62,7 @@ async def get_current_user(
 
 @router.get("/{user_id}", response_model=User)
 async def get_user(
-    user_id: str,
-    db: Session = Depends(get_db)
+    user_id: str
 ):
     """
     Get user by ID.
@@ -91,8 +86,7 @@ async def get_user(
 async def list_users(
     tenant_id: Optional[str] = Query(None, description="Filter by tenant ID"),
     skip: int = Query(0, ge=0, description="Number of items to skip"),
-    limit: int = Query(100, ge=1, le=1000, description="Maximum number of items to return"),
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of items to return")
 ):
     """
     List users with pagination.
@@ -125,8 +119,7 @@ async def list_users(
 @router.put("/{user_id}", response_model=User)
 async def update_user(
     user_id: str,
-    user_data: UserUpdate,
-    db: Session = Depends(get_db)
+    user_data: UserUpdate
 ):
     """
     Update user information.
@@ -154,8 +147,7 @@ async def update_user(
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
-    user_id: str,
-    db: Session = Depends(get_db)
+    user_id: str
 ):
     """
     Delete user (soft delete).
@@ -175,8 +167,7 @@ async def delete_user(
 
 @router.post("/login", response_model=TokenResponse)
 async def login(
-    login_data: UserLogin,
-    db: Session = Depends(get_db)
+    login_data: UserLogin
 ):
     """
     User login.
@@ -191,7 +182,6 @@ async def login(
 async def change_password(
     password_data: ChangePasswordRequest,
     # TODO: Add current user dependency
-    db: Session = Depends(get_db)
 ):
     """
     Change user password.
@@ -9,10 +9,18 @@ from .base import (
     SoftDeleteMixin,
     PaginationParams,
     PaginatedResponse,
+    CursorPaginatedResponse,
+    BatchRequest,
+    BatchRowError,
+    BatchResponse,
+    SearchSuggestion,
     APIResponse,
     ErrorResponse,
     HealthResponse,
-    DatabaseHealthResponse
+    DatabaseHealthResponse,
+    EntityCacheStats,
+    LookupKeyStats,
+    CacheHealthResponse
 )
 
 from .shared import (
@@ -50,6 +58,11 @@ from .inventory import (
     WarehouseUpdate,
     StockMovement,
     StockMovementCreate,
+    StockReservation,
+    StockReservationCreate,
+    OrderReservationCreate,
+    ReservationLine,
+    AvailableToPromise,
     InventoryCount,
     InventoryCountCreate
 )
@@ -62,14 +75,23 @@ from .finance import (
     JournalEntryCreate,
     JournalEntryUpdate,
     JournalEntryLine,
-    JournalEntryLineCreate
+    JournalEntryLineCreate,
+    JournalPostingRequest,
+    JournalPostingJob,
+    JournalReversalRequest,
+    JournalReversalResult,
+    JournalImport,
+    JournalImportRowError,
+    TrialBalance
 )
 
 __all__ = [
     # Base schemas
     "BaseSchema", "TimestampMixin", "SoftDeleteMixin",
-    "PaginationParams", "PaginatedResponse", "APIResponse",
-    "ErrorResponse", "HealthResponse", "DatabaseHealthResponse",
+    "PaginationParams", "PaginatedResponse", "CursorPaginatedResponse", "APIResponse",
+    "BatchRequest", "BatchRowError", "BatchResponse", "SearchSuggestion",
+    "ErrorResponse", "HealthResponse", "DatabaseHealthResponse", "EntityCacheStats", "LookupKeyStats",
+    "CacheHealthResponse",
 
     # Shared schemas
     "Tenant", "TenantCreate", "TenantUpdate",
@@ -85,10 +107,12 @@ __all__ = [
     "Article", "ArticleCreate", "ArticleUpdate",
     "Warehouse", "WarehouseCreate", "WarehouseUpdate",
     "StockMovement", "StockMovementCreate",
+    "StockReservation", "StockReservationCreate", "OrderReservationCreate", "ReservationLine", "AvailableToPromise",
     "InventoryCount", "InventoryCountCreate",
 
     # Finance schemas
     "Account", "AccountCreate", "AccountUpdate",
     "JournalEntry", "JournalEntryCreate", "JournalEntryUpdate",
-    "JournalEntryLine", "JournalEntryLineCreate"
+    "JournalEntryLine", "JournalEntryLineCreate", "JournalPostingRequest", "JournalPostingJob",
+    "JournalReversalRequest", "JournalReversalResult", "JournalImport", "JournalImportRowError", "TrialBalance"
 ]
\ No newline at end of file
@@ -4,7 +4,7 @@ Common Pydantic models used across all API endpoints
 """
 
 from datetime import datetime
-from typing import Optional, Any, Dict, TypeVar, Generic
+from typing import Optional, Any, Dict, List, TypeVar, Generic
 from pydantic import BaseModel, Field, ConfigDict
 from uuid import UUID
 
@@ -46,6 +46,9 @@ class PaginatedResponse(BaseSchema, Generic[T]):
     """Response wrapper for paginated results"""
     items: list[T] = Field(description="List of items")
     total: int = Field(description="Total number of items")
+    total_approximate: bool = Field(
+        default=False, description="Whether total is a planner estimate (total_mode=estimate)"
+    )
     page: int = Field(description="Current page")
     size: int = Field(description="Items per page")
     pages: int = Field(description="Total number of pages")
@@ -53,6 +56,48 @@ class PaginatedResponse(BaseSchema, Generic[T]):
     has_prev: bool = Field(description="Whether there is a previous page")
 
 
+class CursorPaginatedResponse(BaseSchema, Generic[T]):
+    """Response wrapper for keyset (cursor) paginated results"""
+    items: list[T] = Field(description="List of items")
+    size: int = Field(description="Items per page")
+    next_cursor: Optional[str] = Field(default=None, description="Cursor of the next page")
+    prev_cursor: Optional[str] = Field(default=None, description="Cursor of the previous page")
+    has_next: bool = Field(description="Whether there is a next page")
+    has_prev: bool = Field(description="Whether there is a previous page")
+
+
+class BatchRequest(BaseSchema):
+    """Bulk create/update/upsert request (POST /<resource>:batch)"""
+    tenant_id: str = Field(description="Tenant ID of all items")
+    mode: str = Field(default="create", pattern="^(create|update|upsert)$",
+                      description="create, update (by id) or upsert (by natural key)")
+    chunk_size: Optional[int] = Field(default=None, ge=1, le=10000, description="Rows per transaction")
+    items: List[Dict[str, Any]] = Field(max_length=100000, description="Rows, validated one by one")
+
+
+class BatchRowError(BaseSchema):
+    """A rejected row of a batch"""
+    index: int = Field(description="Position of the row in items")
+    error: str = Field(description="Validation or database error")
+
+
+class BatchResponse(BaseSchema):
+    """Outcome of a batch request; valid rows are written even if others fail"""
+    mode: str = Field(description="Batch mode")
+    total: int = Field(description="Number of submitted rows")
+    succeeded: int = Field(description="Rows written")
+    failed: int = Field(description="Rows rejected")
+    chunks: int = Field(description="Transactions used")
+    duration_ms: float = Field(description="Processing time in milliseconds")
+    errors: List[BatchRowError] = Field(description="Rejected rows")
+
+
+class SearchSuggestion(BaseSchema):
+    """Autocomplete suggestion"""
+    id: str = Field(description="Entity ID")
+    label: str = Field(description="Display text")
+
+
 class APIResponse(BaseSchema):
     """Standard API response wrapper"""
     success: bool = Field(description="Whether the operation was successful")
@@ -78,10 +123,95 @@ class HealthResponse(BaseSchema):
     timestamp: float = Field(description="Unix timestamp")
 
 
+class CheckoutWaitHistogram(BaseSchema):
+    """Pool checkout wait times (cumulative buckets in seconds)"""
+    count: int = Field(description="Number of checkouts")
+    sum: float = Field(description="Total wait time in seconds")
+    buckets: Dict[str, int] = Field(description="Checkouts waiting at most <bucket> seconds")
+
+
+class PoolTelemetry(BaseSchema):
+    """Connection pool state and counters of one engine"""
+    pool_class: str = Field(description="SQLAlchemy pool class")
+    size: Optional[int] = Field(default=None, description="Configured pool size")
+    checked_out: Optional[int] = Field(default=None, description="Connections currently checked out")
+    overflow: Optional[int] = Field(default=None, description="Overflow connections currently open")
+    idle: Optional[int] = Field(default=None, description="Idle connections in the pool")
+    checkouts_total: int = Field(description="Pool checkouts")
+    connects_total: int = Field(description="New DBAPI connections")
+    invalidations_total: int = Field(description="Invalidated connections")
+    checkout_timeouts_total: int = Field(description="Checkouts that timed out")
+    checkout_wait_seconds: CheckoutWaitHistogram = Field(description="Checkout wait histogram")
+
+
+class QueryTelemetry(BaseSchema):
+    """Latency statistics of one statement fingerprint"""
+    fingerprint: str = Field(description="Normalized SQL statement")
+    count: int = Field(description="Executions")
+    errors: int = Field(description="Failed executions")
+    total_ms: float = Field(description="Total time in milliseconds")
+    mean_ms: float = Field(description="Mean latency in milliseconds")
+    p50_ms: float = Field(description="Median latency of recent executions")
+    p95_ms: float = Field(description="95th percentile latency of recent executions")
+    p99_ms: float = Field(description="99th percentile latency of recent executions")
+    max_ms: float = Field(description="Maximum latency in milliseconds")
+
+
+class SlowQuerySample(BaseSchema):
+    """A statement slower than DATABASE_SLOW_QUERY_MS"""
+    engine: str = Field(description="Engine name")
+    fingerprint: str = Field(description="Normalized SQL statement")
+    duration_ms: float = Field(description="Duration in milliseconds")
+    timestamp: float = Field(description="Unix timestamp")
+
+
 class DatabaseHealthResponse(BaseSchema):
-    """Database health check response"""
+    """Database health check response with pool and query telemetry"""
     status: str = Field(description="Database status")
     database_type: str = Field(description="Database type")
-    total_tables: int = Field(description="Total number of tables")
-    record_counts: Dict[str, int] = Field(description="Record counts per table")
-    timestamp: float = Field(description="Unix timestamp")
\ No newline at end of file
+    error: Optional[str] = Field(default=None, description="Connection error if unhealthy")
+    total_tables: int = Field(description="Total number of mapped tables")
+    row_estimates: Dict[str, Optional[int]] = Field(
+        description="Estimated rows per table from planner statistics (not exact counts)"
+    )
+    pools: Dict[str, PoolTelemetry] = Field(description="Pool telemetry per engine")
+    query_count: int = Field(description="Statements executed since start")
+    error_count: int = Field(description="Failed statements since start")
+    queries: list[QueryTelemetry] = Field(description="Statement fingerprints by total time")
+    slow_queries: list[SlowQuerySample] = Field(description="Most recent slow statements")
+    leaked_connections: int = Field(description="Connections still checked out when their request ended")
+    timestamp: float = Field(description="Unix timestamp")
+
+
+class EntityCacheStats(BaseSchema):
+    """Entity cache counters of one entity type"""
+    l1_hits: int = Field(description="Lookups served by the in-process cache")
+    l2_hits: int = Field(description="Lookups served by Redis")
+    misses: int = Field(description="Lookups served by the database")
+    fills: int = Field(description="Entities written to the cache")
+    invalidations: int = Field(description="Tags invalidated")
+    errors: int = Field(description="Redis errors (lookup fell back to the database)")
+    hit_ratio: float = Field(description="Share of lookups served from L1 or Redis")
+
+
+class LookupKeyStats(BaseSchema):
+    """Coalescing counters of one lookup key (entity, tenant, field and value)"""
+    key: str = Field(description="Lookup key")
+    calls: int = Field(description="Lookups not answered by the cache")
+    queries: int = Field(description="Database calls (one per flight)")
+    coalesced: int = Field(description="Lookups that joined an in-flight call")
+    negative_hits: int = Field(description="Lookups answered by a cached miss")
+    peak_waiters: int = Field(description="Most lookups waiting on one call")
+
+
+class CacheHealthResponse(BaseSchema):
+    """Entity cache state, hit/miss counters and lookup coalescing"""
+    status: str = Field(description="Cache status (healthy, degraded or disabled)")
+    redis: bool = Field(description="Whether Redis answered a ping")
+    error: Optional[str] = Field(default=None, description="Redis error if degraded")
+    l1_entries: int = Field(description="Entries in this process's in-memory cache")
+    entities: Dict[str, EntityCacheStats] = Field(description="Counters per entity table")
+    lookups_in_flight: int = Field(description="Database lookups currently shared by waiting callers")
+    lookup_totals: Dict[str, int] = Field(description="Coalescing counters over all keys")
+    hot_keys: list[LookupKeyStats] = Field(description="Most frequent lookup keys")
+    timestamp: float = Field(description="Unix timestamp")
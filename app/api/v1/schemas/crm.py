@@ -29,6 +29,8 @@ class CustomerBase(BaseSchema):
 
 class CustomerCreate(CustomerBase):
     """Schema for creating a customer"""
+    customer_number: Optional[str] = Field(None, min_length=1, max_length=50,
+                                           description="Unique customer number (next of the customer number range if omitted)")
     tenant_id: str = Field(..., description="Tenant ID")
 
 
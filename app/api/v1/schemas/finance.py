@@ -3,9 +3,9 @@ Finance Domain Pydantic Schemas
 Data validation and serialization schemas for finance domain
 """
 
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
-from typing import Optional, List
+from typing import Dict, Optional, List
 from pydantic import BaseModel, Field, field_validator
 from uuid import UUID
 
@@ -112,8 +112,10 @@ class JournalEntryLineCreate(JournalEntryLineBase):
 class JournalEntryLine(JournalEntryLineBase):
     """Full journal entry line schema"""
     id: UUID
-    tenant_id: str
-    journal_entry_id: str
+    tenant_id: UUID
+    journal_entry_id: UUID
+    account_id: UUID
+    entry_date: datetime
     created_at: datetime
     updated_at: datetime
 
@@ -152,6 +154,8 @@ class JournalEntryBase(BaseModel):
 
 class JournalEntryCreate(JournalEntryBase):
     """Schema for creating journal entries"""
+    entry_number: Optional[str] = Field(None, min_length=1, max_length=50,
+                                        description="Entry number (next of the journal number range if omitted)")
     tenant_id: str = Field(..., description="Tenant ID")
 
 
@@ -166,13 +170,13 @@ class JournalEntryUpdate(BaseModel):
 class JournalEntry(JournalEntryBase):
     """Full journal entry schema"""
     id: UUID
-    tenant_id: str
+    tenant_id: UUID
     status: str = Field(default="draft", description="Entry status")
     total_debit: Decimal = Field(default=Decimal('0.00'), description="Total debit amount")
     total_credit: Decimal = Field(default=Decimal('0.00'), description="Total credit amount")
-    posted_by: Optional[str] = None
+    posted_by: Optional[UUID] = None
     posted_at: Optional[datetime] = None
-    reversal_of: Optional[str] = None
+    reversal_of: Optional[UUID] = None
     reversal_date: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
@@ -193,17 +197,132 @@ class AccountBalance(BaseModel):
     as_of_date: datetime
 
 
+class TrialBalanceAmounts(BaseModel):
+    """Debit, credit and balance (debit minus credit) of a trial balance line"""
+    debit: Decimal
+    credit: Decimal
+    balance: Decimal
+
+
+class TrialBalanceAccount(TrialBalanceAmounts):
+    """Trial balance of one account, in total and per period"""
+    account_id: UUID
+    account_number: str
+    account_name: str
+    account_type: str
+    category: str
+    periods: Dict[str, TrialBalanceAmounts] = Field(default_factory=dict, description="Amounts per period label")
+
+
+class TrialBalanceGroup(TrialBalanceAmounts):
+    """Trial balance rolled up per account type (and category)"""
+    account_type: str
+    category: Optional[str] = None
+
+
 class TrialBalance(BaseModel):
     """Trial balance report"""
     tenant_id: str
-    period_start: datetime
-    period_end: datetime
-    accounts: List[AccountBalance]
+    period_start: date
+    period_end: date
+    period: str = Field(..., description="Period granularity: month, quarter, year or total")
+    periods: List[str] = Field(default_factory=list, description="Period labels with movements, e.g. 2026-03, 2026-Q1")
+    accounts: List[TrialBalanceAccount]
+    categories: List[TrialBalanceGroup]
+    account_types: List[TrialBalanceGroup]
     total_debit: Decimal
     total_credit: Decimal
     in_balance: bool
 
 
+class JournalPostingRequest(BaseModel):
+    """Batch posting of draft journal entries (POST /journal-entries:post)"""
+    tenant_id: UUID
+    entry_ids: List[UUID] = Field(..., min_length=1, max_length=100000, description="Draft entries to post")
+    chunk_size: Optional[int] = Field(None, ge=1, le=10000, description="Entries per transaction")
+
+
+class JournalPostingError(BaseModel):
+    """An entry a posting job could not post"""
+    entry_id: str
+    error: str
+
+
+class JournalPostingJob(BaseModel):
+    """Progress of a batch posting"""
+    id: str
+    tenant_id: str
+    status: str = Field(..., description="queued, running, completed or failed")
+    total: int = Field(..., description="Distinct entries submitted")
+    processed: int = Field(..., description="Entries posted, skipped or failed so far")
+    posted: int
+    skipped: int = Field(..., description="Not found, no draft or being posted by another job")
+    failed: int = Field(..., description="Unbalanced, in a closed period or in a failed chunk")
+    chunks: int = Field(..., description="Transactions committed or rolled back")
+    entries_per_second: float = Field(..., description="Posting throughput")
+    duration_ms: float
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = Field(None, description="Why the job failed")
+    errors: List[JournalPostingError] = Field(default_factory=list, description="Entries that failed (first 1000)")
+
+
+class JournalReversalRequest(BaseModel):
+    """Reversal of the posted journal entries matching a filter (POST /journal-entries:reverse)"""
+    tenant_id: UUID
+    reason: str = Field(..., min_length=1, max_length=200, description="Reason, part of the reversal entries' description")
+    source: Optional[List[str]] = Field(None, description="Entries of these sources")
+    reference: Optional[str] = Field(None, max_length=100, description="Entries with this reference (prefix with a trailing *)")
+    start_date: Optional[date] = Field(None, description="Entries dated from this day")
+    end_date: Optional[date] = Field(None, description="Entries dated up to this day, included")
+    reversal_date: Optional[date] = Field(None, description="Date of the reversal entries (default: today)")
+    chunk_size: Optional[int] = Field(None, ge=1, le=10000, description="Entries per transaction")
+
+
+class JournalReversalResult(BaseModel):
+    """Outcome of a bulk reversal"""
+    tenant_id: str
+    total: int = Field(..., description="Posted entries matching the filter")
+    reversed: int
+    skipped: int = Field(..., description="Reversed or locked by another transaction meanwhile")
+    failed: int = Field(..., description="Entries of failed chunks")
+    chunks: int = Field(..., description="Transactions committed or rolled back")
+    entries_per_second: float
+    duration_ms: float
+    errors: List[JournalPostingError] = Field(default_factory=list, description="Entries that failed (first 1000)")
+
+
+class JournalImport(BaseModel):
+    """Progress of a DATEV journal import (POST /journal-entries:import)"""
+    id: UUID
+    tenant_id: UUID
+    file_name: Optional[str] = None
+    post: bool = Field(..., description="Whether the imported entries are posted")
+    status: str = Field(..., description="queued, running, completed or failed")
+    last_row: int = Field(..., description="Last row of the file imported (a resumed import continues after it)")
+    rows: int = Field(..., description="Rows read so far")
+    entries: int = Field(..., description="Entries imported")
+    lines: int = Field(..., description="Lines imported")
+    failed_rows: int = Field(..., description="Rows rejected (see the import's errors)")
+    error: Optional[str] = Field(None, description="Why the import failed")
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class JournalImportRowError(BaseModel):
+    """A row a journal import rejected"""
+    row_number: int = Field(..., description="Row of the file (the header and headings are rows 1 and 2)")
+    error: str
+
+    class Config:
+        from_attributes = True
+
+
 class GeneralLedgerEntry(BaseModel):
     """General ledger entry for reporting"""
     entry_id: str
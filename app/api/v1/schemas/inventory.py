@@ -4,7 +4,8 @@ Schemas for articles, warehouses, stock movements, and inventory management
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+from uuid import UUID
 from pydantic import Field
 from decimal import Decimal
 
@@ -134,6 +135,45 @@ class StockMovement(StockMovementBase, TimestampMixin):
     total_cost: Optional[Decimal] = Field(None, ge=0, description="Total movement cost")
 
 
+
+# Stock Reservation Schemas
+class StockReservationCreate(BaseSchema):
+    """Schema for reserving stock of one article"""
+    article_id: UUID = Field(..., description="Article ID")
+    quantity: Decimal = Field(..., gt=0, description="Quantity to reserve")
+    reference_number: Optional[str] = Field(None, max_length=50, description="Order number")
+    ttl_minutes: Optional[int] = Field(None, ge=1, le=10080, description="Minutes until the reservation expires")
+
+
+class ReservationLine(BaseSchema):
+    """One order line to reserve"""
+    article_id: UUID = Field(..., description="Article ID")
+    quantity: Decimal = Field(..., gt=0, description="Quantity to reserve")
+
+
+class OrderReservationCreate(BaseSchema):
+    """Schema for reserving all lines of an order at once"""
+    reference_number: str = Field(..., min_length=1, max_length=50, description="Order number")
+    lines: List[ReservationLine] = Field(..., min_length=1, max_length=1000, description="Order lines")
+    ttl_minutes: Optional[int] = Field(None, ge=1, le=10080, description="Minutes until the reservations expire")
+
+
+class StockReservation(TimestampMixin):
+    """Full stock reservation schema"""
+    id: UUID = Field(..., description="Reservation ID")
+    tenant_id: UUID = Field(..., description="Tenant ID")
+    article_id: UUID = Field(..., description="Article ID")
+    quantity: Decimal = Field(..., description="Reserved quantity")
+    status: str = Field(..., pattern="^(active|committed|released|expired)$", description="Reservation status")
+    reference_number: Optional[str] = Field(None, description="Order number")
+    expires_at: datetime = Field(..., description="When an active reservation expires")
+
+
+class AvailableToPromise(BaseSchema):
+    """Stock available to promise for an article"""
+    article_id: UUID = Field(..., description="Article ID")
+    available: Optional[Decimal] = Field(None, description="Available stock (null for unknown or inactive articles)")
+
 # Inventory Count Schemas
 class InventoryCountBase(BaseSchema):
     """Base inventory count schema"""
@@ -6,17 +6,22 @@ Wires up all services, repositories, and dependencies for VALEO-NeuroERP
 import logging
 from .dependency_container import container
 from .database import get_db, SessionLocal
+from .unit_of_work import get_session
 from ..infrastructure.repositories import (
     TenantRepository, UserRepository, CustomerRepository,
     LeadRepository, ContactRepository, ArticleRepository,
-    WarehouseRepository, StockMovementRepository, InventoryCountRepository,
-    AccountRepository, JournalEntryRepository
+    WarehouseRepository, StockMovementRepository, StockReservationRepository, InventoryCountRepository,
+    AccountRepository, AccountPeriodBalanceRepository, JournalEntryRepository, NumberRangeRepository,
+    JournalImportRepository
 )
+from ..infrastructure.repositories.cached_repository import cached
 from ..infrastructure.repositories.implementations import (
-    # TenantRepositoryImpl, UserRepositoryImpl, CustomerRepositoryImpl,
-    LeadRepositoryImpl, ContactRepositoryImpl, AccountRepositoryImpl,
-    # ArticleRepositoryImpl, WarehouseRepositoryImpl, StockMovementRepositoryImpl,
-    # InventoryCountRepositoryImpl, JournalEntryRepositoryImpl
+    # TenantRepositoryImpl, UserRepositoryImpl,
+    CustomerRepositoryImpl, LeadRepositoryImpl, ContactRepositoryImpl, AccountRepositoryImpl,
+    ArticleRepositoryImpl, StockReservationRepositoryImpl, AccountPeriodBalanceRepositoryImpl,
+    JournalEntryRepositoryImpl, JournalImportRepositoryImpl, NumberRangeRepositoryImpl,
+    # WarehouseRepositoryImpl, StockMovementRepositoryImpl,
+    # InventoryCountRepositoryImpl
 )
 from .services import (
     TenantService, UserService, CustomerService, LeadService, ContactService,
@@ -24,7 +29,8 @@ from .services import (
     AccountService, JournalEntryService, EmailService, NotificationService, AuditService
 )
 from .production_service_implementations import (
-    ProductionTenantService, ProductionUserService, ProductionCustomerService
+    ProductionTenantService, ProductionUserService, ProductionCustomerService,
+    ProductionJournalEntryService
 )
 from .production_enhanced_services import (
     ProductionEmailService, ProductionNotificationService, ProductionAuditService
@@ -41,64 +47,92 @@ def configure_container():
 
     # Database session factory
     def get_db_session_factory():
-        """Factory for database sessions with improved error handling."""
+        """Factory for the request-scoped database session with improved error handling."""
         try:
-            from sqlalchemy.orm import sessionmaker
-            from .database import SessionLocal
-            logger.debug("Creating database session factory")
-            return SessionLocal()
+            logger.debug("Resolving request database session")
+            return get_session()
         except Exception as e:
             logger.error(f"Failed to create database session: {e}")
             raise
 
-    container.register_factory(type(SessionLocal()), get_db_session_factory)
+    container.register_factory(SessionLocal.class_, get_db_session_factory)
 
     # Register repository implementations
+    # get_session() returns the session of the current request's unit of work,
+    # so all repositories resolved within one request share one session.
+    # cached() adds the Redis entity cache when ENABLE_CACHE is set
     def create_tenant_repository():
-        return TenantRepositoryImpl(SessionLocal())
+        return TenantRepositoryImpl(get_session())
 
     def create_user_repository():
-        return UserRepositoryImpl(SessionLocal())
+        return UserRepositoryImpl(get_session())
+
+    def create_number_range_repository():
+        return NumberRangeRepositoryImpl(get_session())
 
     def create_customer_repository():
-        return CustomerRepositoryImpl(SessionLocal())
+        return cached(CustomerRepositoryImpl(get_session()))
 
     def create_lead_repository():
-        return LeadRepositoryImpl(SessionLocal())
+        return cached(LeadRepositoryImpl(get_session()))
 
     def create_contact_repository():
-        return ContactRepositoryImpl(SessionLocal())
+        return cached(ContactRepositoryImpl(get_session()))
 
     def create_article_repository():
-        return ArticleRepositoryImpl(SessionLocal())
+        return cached(ArticleRepositoryImpl(get_session()))
 
     def create_warehouse_repository():
-        return WarehouseRepositoryImpl(SessionLocal())
+        return WarehouseRepositoryImpl(get_session())
 
     def create_stock_movement_repository():
-        return StockMovementRepositoryImpl(SessionLocal())
+        return StockMovementRepositoryImpl(get_session())
+
+    def create_stock_reservation_repository():
+        # Reservations change article stock levels; the cached article repository invalidates them
+        session = get_session()
+        return StockReservationRepositoryImpl(session, cached(ArticleRepositoryImpl(session)))
 
     def create_inventory_count_repository():
-        return InventoryCountRepositoryImpl(SessionLocal())
+        return InventoryCountRepositoryImpl(get_session())
 
     def create_account_repository():
-        return AccountRepositoryImpl(SessionLocal())
+        return cached(AccountRepositoryImpl(get_session()))
+
+    def create_account_period_balance_repository():
+        return AccountPeriodBalanceRepositoryImpl(get_session())
 
     def create_journal_entry_repository():
-        return JournalEntryRepositoryImpl(SessionLocal())
+        # Posting writes the period and account balances in the same session;
+        # the cached account repository invalidates the accounts it changes
+        session = get_session()
+        return JournalEntryRepositoryImpl(
+            session, AccountPeriodBalanceRepositoryImpl(session), cached(AccountRepositoryImpl(session))
+        )
+
+    def create_journal_import_repository():
+        # Imported entries are posted like those of the journal entry repository
+        session = get_session()
+        accounts = cached(AccountRepositoryImpl(session))
+        journal_entries = JournalEntryRepositoryImpl(session, AccountPeriodBalanceRepositoryImpl(session), accounts)
+        return JournalImportRepositoryImpl(session, journal_entries, accounts)
 
     # Register repositories
     container.register_factory(TenantRepository, create_tenant_repository)
     container.register_factory(UserRepository, create_user_repository)
+    container.register_factory(NumberRangeRepository, create_number_range_repository)
     container.register_factory(CustomerRepository, create_customer_repository)
     container.register_factory(LeadRepository, create_lead_repository)
     container.register_factory(ContactRepository, create_contact_repository)
     container.register_factory(ArticleRepository, create_article_repository)
     container.register_factory(WarehouseRepository, create_warehouse_repository)
     container.register_factory(StockMovementRepository, create_stock_movement_repository)
+    container.register_factory(StockReservationRepository, create_stock_reservation_repository)
     container.register_factory(InventoryCountRepository, create_inventory_count_repository)
     container.register_factory(AccountRepository, create_account_repository)
+    container.register_factory(AccountPeriodBalanceRepository, create_account_period_balance_repository)
     container.register_factory(JournalEntryRepository, create_journal_entry_repository)
+    container.register_factory(JournalImportRepository, create_journal_import_repository)
 
     # Infrastructure Services (Singletons)
     # These would be implemented as concrete classes in the infrastructure layer
@@ -193,7 +227,6 @@ def configure_container():
     PlaceholderStockMovementService = type('PlaceholderStockMovementService', (PlaceholderService, StockMovementService), {})
     PlaceholderInventoryCountService = type('PlaceholderInventoryCountService', (PlaceholderService, InventoryCountService), {})
     PlaceholderAccountService = type('PlaceholderAccountService', (PlaceholderService, AccountService), {})
-    PlaceholderJournalEntryService = type('PlaceholderJournalEntryService', (PlaceholderService, JournalEntryService), {})
 
     # Register all placeholder services
     # CustomerService now uses ProductionCustomerService (already registered above)
@@ -205,7 +238,15 @@ def configure_container():
     container.register(StockMovementService, PlaceholderStockMovementService)
     container.register(InventoryCountService, PlaceholderInventoryCountService)
     container.register(AccountService, PlaceholderAccountService)
-    container.register(JournalEntryService, PlaceholderJournalEntryService)
+
+    def create_journal_entry_service():
+        # Request-scoped like its repository (one session per request)
+        return ProductionJournalEntryService(
+            container.resolve(JournalEntryRepository), lambda: container.resolve(JournalEntryRepository),
+            lambda: container.resolve(JournalImportRepository)
+        )
+
+    container.register_factory(JournalEntryService, create_journal_entry_service)
 
     # Infrastructure services (email, notifications, audit)
     class PlaceholderEmailService(EmailService):
@@ -4,19 +4,23 @@ PostgreSQL database connection with SQLAlchemy
 """
 
 import logging
+from typing import AsyncGenerator, Optional, Union
 from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import QueuePool
-
 from app.core.config import settings
+from app.core.db_telemetry import telemetry, TimedQueuePool, TimedAsyncAdaptedQueuePool
+from app.core.replica_routing import (
+    RoutingSession, AsyncRoutingSession, create_replica_router, ReplicaRouter
+)
 
 logger = logging.getLogger(__name__)
 
 # SQLAlchemy setup for PostgreSQL
 engine = create_engine(
     settings.DATABASE_URL,
-    poolclass=QueuePool,  # Better for PostgreSQL
+    poolclass=TimedQueuePool,  # QueuePool (better for PostgreSQL) recording checkout wait times
     pool_size=10,
     max_overflow=20,
     pool_timeout=30,
@@ -24,10 +28,135 @@ engine = create_engine(
     echo=settings.DEBUG,  # SQL query logging in debug mode
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=RoutingSession)
+
+
+def enable_sqlite_savepoints(sync_engine) -> None:
+    """
+    Let SQLAlchemy begin SQLite transactions itself. pysqlite (and
+    aiosqlite on top of it) only emits BEGIN before DML and commits on
+    RELEASE SAVEPOINT, so savepoints (session.begin_nested()) would commit
+    their writes outright. No-op for other databases.
+    """
+    if sync_engine.dialect.name != "sqlite" or event.contains(sync_engine, "begin", _sqlite_begin):
+        return
+    event.listen(sync_engine, "connect", _sqlite_connect)
+    event.listen(sync_engine, "begin", _sqlite_begin)
+
+
+def _sqlite_connect(dbapi_connection, connection_record):
+    # Disable the driver's own transaction handling
+    dbapi_connection.isolation_level = None
+
+
+def _sqlite_begin(connection):
+    connection.exec_driver_sql("BEGIN")
+
+
+enable_sqlite_savepoints(engine)
+
+
+def get_async_database_url(url: str) -> str:
+    """
+    Map a synchronous database URL onto its asyncio driver
+    (asyncpg for PostgreSQL, aiosqlite for SQLite).
+    """
+    scheme, separator, rest = url.partition("://")
+    if not separator or "+asyncpg" in scheme or "+aiosqlite" in scheme:
+        return url
+    if scheme.startswith("postgresql"):
+        return f"postgresql+asyncpg://{rest}"
+    if scheme.startswith("sqlite"):
+        return f"sqlite+aiosqlite://{rest}"
+    return url
+
+
+def _create_async_engine() -> Optional[AsyncEngine]:
+    """
+    Create the asyncio engine used by the repositories.
+    Returns None if async access is disabled or the driver is not installed,
+    in which case the synchronous engine is used as fallback.
+    """
+    if not settings.DATABASE_ASYNC_ENABLED:
+        return None
+
+    async_url = settings.DATABASE_ASYNC_URL or get_async_database_url(settings.DATABASE_URL)
+    try:
+        return create_async_engine(
+            async_url,
+            poolclass=TimedAsyncAdaptedQueuePool,
+            pool_size=10,
+            max_overflow=20,
+            pool_timeout=30,
+            pool_recycle=3600,
+            echo=settings.DEBUG,
+        )
+    except ImportError as e:
+        logger.warning(f"Async database driver not available, falling back to synchronous engine: {e}")
+        return None
+
+
+# SQLAlchemy asyncio setup (preferred for request handling)
+async_engine = _create_async_engine()
+if async_engine is not None:
+    enable_sqlite_savepoints(async_engine.sync_engine)
+
+AsyncSessionLocal = (
+    async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False,
+        sync_session_class=AsyncRoutingSession,
+    )
+    if async_engine is not None else None
+)
+
+# Optional read replicas (DATABASE_REPLICA_URLS); reads fall back to the primary
+replica_router: ReplicaRouter = create_replica_router(
+    settings.DATABASE_REPLICA_URLS,
+    async_urls=(
+        [get_async_database_url(url) for url in settings.DATABASE_REPLICA_URLS]
+        if async_engine is not None else None
+    ),
+    health_interval=settings.DATABASE_REPLICA_HEALTH_INTERVAL,
+    read_your_writes_window=settings.DATABASE_READ_YOUR_WRITES_SECONDS,
+    redis_url=settings.REDIS_URL if settings.DATABASE_READ_YOUR_WRITES_SHARED else None,
+    redis_timeout=settings.CACHE_REDIS_TIMEOUT,
+    redis_retry_seconds=settings.CACHE_REDIS_RETRY_SECONDS,
+    poolclass=TimedQueuePool,
+    async_poolclass=TimedAsyncAdaptedQueuePool,
+    pool_size=10,
+    max_overflow=20,
+    pool_timeout=30,
+    pool_recycle=3600,
+)
+RoutingSession.replica_router = replica_router
+
+# Pool and query telemetry (/health/database)
+telemetry.instrument(engine, "primary")
+if async_engine is not None:
+    telemetry.instrument(async_engine.sync_engine, "primary_async")
+for index, replica in enumerate(replica_router.replicas):
+    telemetry.instrument(replica.engine, f"replica_{index}")
+    if replica.async_engine is not None:
+        telemetry.instrument(replica.async_engine.sync_engine, f"replica_{index}_async")
+
+
+def is_async_enabled() -> bool:
+    """Whether repositories run on the asyncio engine."""
+    return AsyncSessionLocal is not None
+
+
+def create_session() -> Union[AsyncSession, Session]:
+    """
+    Create a new repository session.
+    Uses AsyncSession when the async engine is available, otherwise a synchronous Session.
+    """
+    if AsyncSessionLocal is not None:
+        return AsyncSessionLocal()
+    return SessionLocal()
 
 # Import Base from models.py to ensure all models are registered
 from .models import Base
+from .search_index import ensure_search_indexes
 
 def get_db() -> Session:
     """
@@ -39,6 +168,30 @@ def get_db() -> Session:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get an asyncio database session
+    """
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database access is not available")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_engines():
+    """
+    Release pooled connections of all engines (called on shutdown)
+    """
+    if async_engine is not None:
+        await async_engine.dispose()
+    for replica in replica_router.replicas:
+        if replica.async_engine is not None:
+            await replica.async_engine.dispose()
+    replica_router.dispose()
+    await replica_router.close()
+    engine.dispose()
+
+
 def create_tables():
     """
     Create all database tables
@@ -46,6 +199,7 @@ def create_tables():
     try:
         logger.info("Creating database tables...")
         Base.metadata.create_all(bind=engine)
+        ensure_search_indexes(engine)
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Failed to create database tables: {e}")
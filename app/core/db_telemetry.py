@@ -0,0 +1,449 @@
+"""
+VALEO-NeuroERP Database Telemetry
+Connection-pool and query metrics collected from SQLAlchemy pool and cursor events
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Checkout wait histogram buckets (seconds, Prometheus "le" semantics)
+CHECKOUT_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Bounds for the in-memory state
+MAX_FINGERPRINTS = 500
+LATENCY_SAMPLES = 1024
+SLOW_QUERY_SAMPLES = 50
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)\s*,?)+\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normalize a SQL statement into a fingerprint: literals and placeholder
+    lists are replaced by '?', whitespace is collapsed.
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(?)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()[:500]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets."""
+
+    def __init__(self, buckets: Iterable[float] = CHECKOUT_WAIT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "buckets": {str(bound): count for bound, count in zip(self.buckets, self.counts)},
+        }
+
+
+class QueryStats:
+    """Count, errors and recent latencies of one statement fingerprint."""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.samples: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def observe(self, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.samples.append(duration_ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        samples = list(self.samples)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(percentile(samples, 50), 3),
+            "p95_ms": round(percentile(samples, 95), 3),
+            "p99_ms": round(percentile(samples, 99), 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class PoolStats:
+    """Checkout counters of one engine pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.checkout_wait = Histogram()
+
+
+class DatabaseTelemetry:
+    """
+    Collects pool and query metrics for instrumented engines.
+
+    Listeners only update in-memory counters; fingerprints and samples are
+    bounded so the overhead per statement stays constant.
+    """
+
+    def __init__(self, slow_query_ms: float = 200.0):
+        self.slow_query_ms = slow_query_ms
+        self.engines: Dict[str, Engine] = {}
+        self.pools: Dict[str, PoolStats] = {}
+        self.queries: Dict[str, QueryStats] = {}
+        self.slow_queries: Deque[Dict[str, Any]] = deque(maxlen=SLOW_QUERY_SAMPLES)
+        self.query_count = 0
+        self.error_count = 0
+        self._lock = threading.Lock()
+
+    # Instrumentation
+
+    def instrument(self, engine: Engine, name: str) -> None:
+        """Attach pool and cursor listeners to a (sync) engine."""
+        if name in self.engines:
+            return
+        self.engines[name] = engine
+        self.pools[name] = PoolStats()
+        if isinstance(engine.pool, _TimedCheckoutMixin):
+            engine.pool.telemetry_name = name
+
+        event.listen(engine, "checkout", self._on_checkout(name))
+        event.listen(engine, "connect", self._on_connect(name))
+        event.listen(engine, "invalidate", self._on_invalidate(name))
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute(name))
+        event.listen(engine, "handle_error", self._on_error)
+
+    def _on_checkout(self, name: str):
+        def listener(dbapi_connection, connection_record, connection_proxy):
+            self.pools[name].checkouts += 1
+        return listener
+
+    def _on_connect(self, name: str):
+        def listener(dbapi_connection, connection_record):
+            self.pools[name].connects += 1
+        return listener
+
+    def _on_invalidate(self, name: str):
+        def listener(dbapi_connection, connection_record, exception):
+            self.pools[name].invalidations += 1
+        return listener
+
+    def record_checkout_wait(self, name: Optional[str], seconds: float, timed_out: bool = False) -> None:
+        pool_stats = self.pools.get(name)
+        if pool_stats is None:
+            return
+        with self._lock:
+            pool_stats.checkout_wait.observe(seconds)
+            if timed_out:
+                pool_stats.timeouts += 1
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, name: str):
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info["query_start_time"].pop()
+            self.record_query(name, statement, (time.perf_counter() - started) * 1000)
+        return listener
+
+    def _on_error(self, exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start_time"):
+            connection.info["query_start_time"].pop()
+        statement = exception_context.statement
+        with self._lock:
+            self.error_count += 1
+            if statement is not None:
+                self._stats_for(fingerprint(statement)).errors += 1
+
+    def _stats_for(self, key: str) -> QueryStats:
+        stats = self.queries.get(key)
+        if stats is None:
+            if len(self.queries) >= MAX_FINGERPRINTS:
+                key = "<other>"
+                stats = self.queries.get(key)
+            if stats is None:
+                stats = self.queries[key] = QueryStats()
+        return stats
+
+    def record_query(self, name: str, statement: str, duration_ms: float) -> None:
+        key = fingerprint(statement)
+        with self._lock:
+            self.query_count += 1
+            self._stats_for(key).observe(duration_ms)
+            if duration_ms >= self.slow_query_ms:
+                self.slow_queries.append({
+                    "engine": name,
+                    "fingerprint": key,
+                    "duration_ms": round(duration_ms, 3),
+                    "timestamp": time.time(),
+                })
+        if duration_ms >= self.slow_query_ms:
+            logger.warning(f"Slow query on {name} ({duration_ms:.1f} ms): {key}")
+
+    def reset(self) -> None:
+        with self._lock:
+            self.queries.clear()
+            self.slow_queries.clear()
+            self.query_count = 0
+            self.error_count = 0
+            for name in self.pools:
+                self.pools[name] = PoolStats()
+
+    # Snapshots
+
+    def pool_snapshot(self, name: str) -> Dict[str, Any]:
+        pool = self.engines[name].pool
+        pool_stats = self.pools[name]
+        snapshot: Dict[str, Any] = {
+            "pool_class": type(pool).__name__,
+            "checkouts_total": pool_stats.checkouts,
+            "connects_total": pool_stats.connects,
+            "invalidations_total": pool_stats.invalidations,
+            "checkout_timeouts_total": pool_stats.timeouts,
+            "checkout_wait_seconds": pool_stats.checkout_wait.to_dict(),
+        }
+        if isinstance(pool, QueuePool):
+            snapshot.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "idle": pool.checkedin(),
+            })
+        return snapshot
+
+    def query_snapshot(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Fingerprints ordered by total time spent."""
+        with self._lock:
+            items = [(key, stats.to_dict()) for key, stats in self.queries.items()]
+        items.sort(key=lambda item: item[1]["total_ms"], reverse=True)
+        return [dict(fingerprint=key, **stats) for key, stats in items[:limit]]
+
+    def snapshot(self, limit: int = 50) -> Dict[str, Any]:
+        return {
+            "pools": {name: self.pool_snapshot(name) for name in self.engines},
+            "query_count": self.query_count,
+            "error_count": self.error_count,
+            "queries": self.query_snapshot(limit),
+            "slow_queries": list(self.slow_queries),
+        }
+
+    def prometheus(self, extra: Optional[Dict[str, float]] = None) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[tuple]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        pools = {name: self.pool_snapshot(name) for name in self.engines}
+        for key, kind, help_text in (
+            ("size", "gauge", "Configured pool size"),
+            ("checked_out", "gauge", "Connections currently checked out"),
+            ("overflow", "gauge", "Overflow connections currently open"),
+            ("idle", "gauge", "Idle connections in the pool"),
+            ("checkouts_total", "counter", "Pool checkouts"),
+            ("checkout_timeouts_total", "counter", "Checkouts that timed out waiting for a connection"),
+            ("invalidations_total", "counter", "Invalidated connections"),
+        ):
+            metric(f"db_pool_{key}", kind, help_text,
+                   [({"engine": name}, pool[key]) for name, pool in pools.items() if key in pool])
+
+        lines.append("# HELP db_pool_checkout_wait_seconds Time spent waiting for a pooled connection")
+        lines.append("# TYPE db_pool_checkout_wait_seconds histogram")
+        for name, pool_stats in self.pools.items():
+            histogram = pool_stats.checkout_wait
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                lines.append(f'db_pool_checkout_wait_seconds_bucket{{engine="{name}",le="{bound}"}} {count}')
+            lines.append(f'db_pool_checkout_wait_seconds_bucket{{engine="{name}",le="+Inf"}} {histogram.count}')
+            lines.append(f'db_pool_checkout_wait_seconds_sum{{engine="{name}"}} {histogram.sum:.6f}')
+            lines.append(f'db_pool_checkout_wait_seconds_count{{engine="{name}"}} {histogram.count}')
+
+        queries = self.query_snapshot(limit=MAX_FINGERPRINTS)
+        metric("db_queries_total", "counter", "Executed statements per fingerprint",
+               [({"fingerprint": q["fingerprint"]}, q["count"]) for q in queries])
+        metric("db_query_errors_total", "counter", "Failed statements per fingerprint",
+               [({"fingerprint": q["fingerprint"]}, q["errors"]) for q in queries])
+        lines.append("# HELP db_query_duration_ms Statement latency per fingerprint (recent samples)")
+        lines.append("# TYPE db_query_duration_ms summary")
+        for q in queries:
+            label = _escape(q["fingerprint"])
+            for quantile, key in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms")):
+                lines.append(f'db_query_duration_ms{{fingerprint="{label}",quantile="{quantile}"}} {q[key]}')
+            lines.append(f'db_query_duration_ms_sum{{fingerprint="{label}"}} {q["total_ms"]}')
+            lines.append(f'db_query_duration_ms_count{{fingerprint="{label}"}} {q["count"]}')
+
+        for name, value in (extra or {}).items():
+            metric(name, "gauge", name.replace("_", " "), [({}, value)])
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# Pools that time how long callers wait for a connection
+
+class _TimedCheckoutMixin:
+    # The engine's name, set by DatabaseTelemetry.instrument
+    telemetry_name: Optional[str] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            telemetry.record_checkout_wait(self.telemetry_name, time.perf_counter() - started, timed_out=True)
+            raise
+        telemetry.record_checkout_wait(self.telemetry_name, time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() replaces the pool; the new one reports under the same engine
+        pool = super().recreate()
+        pool.telemetry_name = self.telemetry_name
+        return pool
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    """QueuePool recording checkout wait times of the engine it is instrumented for."""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool recording checkout wait times of the engine it is instrumented for."""
+
+
+# Planner row-count estimates
+
+def estimate_row_counts(engine: Engine, tables: Iterable[str]) -> Dict[str, Optional[int]]:
+    """
+    Cheap row-count estimates from planner statistics instead of COUNT(*).
+    PostgreSQL: pg_class.reltuples (maintained by ANALYZE/autovacuum).
+    SQLite: sqlite_stat1 if ANALYZE ran, else max(rowid).
+    None means no estimate is available (table missing).
+    """
+    tables = list(tables)
+    estimates: Dict[str, Optional[int]] = {table: None for table in tables}
+
+    with engine.connect() as connection:
+        if engine.dialect.name == "postgresql":
+            rows = connection.execute(
+                text("SELECT relname, reltuples::bigint FROM pg_class "
+                     "WHERE relkind = 'r' AND relname = ANY(:tables)"),
+                {"tables": tables},
+            )
+            for relname, reltuples in rows:
+                # reltuples is -1 for tables that were never analyzed
+                estimates[relname] = max(int(reltuples), 0)
+        elif engine.dialect.name == "sqlite":
+            existing = set(connection.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'table'")
+            ).scalars())
+            stats = {}
+            if "sqlite_stat1" in existing:
+                for tbl, stat in connection.execute(text("SELECT tbl, stat FROM sqlite_stat1")):
+                    stats.setdefault(tbl, int(stat.split()[0]))
+            for table in tables:
+                if table not in existing:
+                    continue
+                if table in stats:
+                    estimates[table] = stats[table]
+                else:
+                    estimates[table] = connection.execute(text(f'SELECT max(rowid) FROM "{table}"')).scalar() or 0
+    return estimates
+
+
+class Explain(Executable, ClauseElement):
+    """
+    EXPLAIN for a statement; bind parameters stay parameters.
+    PostgreSQL returns the JSON plan, SQLite its query plan rows.
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement, analyze: bool = False):
+        self.statement = statement
+        self.analyze = analyze
+
+
+def _compile_explained(element, compiler, **kw) -> str:
+    sql = compiler.process(element.statement, **kw)
+    # Plan rows are not rows of the explained statement: drop its result
+    # columns so no type processors are applied, and don't treat an
+    # explained INSERT/UPDATE/DELETE as DML
+    compiler._result_columns = []
+    compiler.isinsert = compiler.isupdate = compiler.isdelete = False
+    return sql
+
+
+@compiles(Explain, "postgresql")
+def _explain_postgresql(element, compiler, **kw):
+    options = "ANALYZE, BUFFERS, " if element.analyze else ""
+    return f"EXPLAIN ({options}FORMAT JSON) " + _compile_explained(element, compiler, **kw)
+
+
+@compiles(Explain)
+def _explain_default(element, compiler, **kw):
+    return "EXPLAIN QUERY PLAN " + _compile_explained(element, compiler, **kw)
+
+
+def plan_rows(plan: Any) -> Optional[int]:
+    """Planner row estimate of the top plan node of a PostgreSQL JSON plan."""
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    if isinstance(plan, list) and plan:
+        plan = plan[0]
+    try:
+        return int(plan["Plan"]["Plan Rows"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+telemetry = DatabaseTelemetry(slow_query_ms=settings.DATABASE_SLOW_QUERY_MS)
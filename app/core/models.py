@@ -5,11 +5,13 @@ SQLAlchemy models for all domain entities
 
 from datetime import datetime
 from decimal import Decimal
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, Numeric, ForeignKey, Index
+from sqlalchemy import Column, String, Integer, BigInteger, Boolean, Date, DateTime, Text, Numeric, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import declarative_base, relationship
 import uuid
 
+from .search_index import install_search_extensions, register_search_index
+
 Base = declarative_base()
 
 
@@ -24,6 +26,10 @@ class SoftDeleteMixin:
     is_active = Column(Boolean, default=True, nullable=False)
 
 
+# Partial index predicate: repository queries only read active rows
+ACTIVE_ROWS = {'postgresql_where': text('is_active = true'), 'sqlite_where': text('is_active = 1')}
+
+
 # CRM Domain Models
 class Lead(Base, TimestampMixin, SoftDeleteMixin):
     """Lead model for CRM"""
@@ -56,6 +62,11 @@ class Lead(Base, TimestampMixin, SoftDeleteMixin):
         Index('ix_crm_leads_tenant_status', 'tenant_id', 'status'),
         Index('ix_crm_leads_assigned_to', 'assigned_to'),
         Index('ix_crm_leads_email', 'email'),
+        Index('ix_crm_leads_tenant_created_id', 'tenant_id', 'created_at', 'id'),  # Keyset pagination
+        Index('ix_crm_leads_tenant_updated_id', 'tenant_id', 'updated_at', 'id'),  # Export (since=)
+        Index('ix_crm_leads_tenant_status_active', 'tenant_id', 'status', **ACTIVE_ROWS),
+        Index('ix_crm_leads_tenant_assigned_to_active', 'tenant_id', 'assigned_to', **ACTIVE_ROWS),
+        Index('ix_crm_leads_tenant_created_id_active', 'tenant_id', 'created_at', 'id', **ACTIVE_ROWS),
     )
 
 
@@ -84,6 +95,8 @@ class Contact(Base, TimestampMixin, SoftDeleteMixin):
     __table_args__ = (
         Index('ix_crm_contacts_tenant_customer', 'tenant_id', 'customer_id'),
         Index('ix_crm_contacts_email', 'email'),
+        Index('ix_crm_contacts_tenant_created_id', 'tenant_id', 'created_at', 'id'),  # Keyset pagination
+        Index('ix_crm_contacts_tenant_created_id_active', 'tenant_id', 'created_at', 'id', **ACTIVE_ROWS),
     )
 
 
@@ -95,7 +108,7 @@ class Customer(Base, TimestampMixin, SoftDeleteMixin):
     tenant_id = Column(UUID(as_uuid=True), nullable=False, index=True)
 
     # Customer identification
-    customer_number = Column(String(50), nullable=False, unique=True, index=True)
+    customer_number = Column(String(50), nullable=False)  # Unique per tenant (customer number range)
     company_name = Column(String(100), nullable=False)
 
     # Contact information
@@ -123,9 +136,12 @@ class Customer(Base, TimestampMixin, SoftDeleteMixin):
 
     # Indexes
     __table_args__ = (
-        Index('ix_crm_customers_tenant_number', 'tenant_id', 'customer_number'),
+        Index('ix_crm_customers_tenant_number', 'tenant_id', 'customer_number', unique=True),
         Index('ix_crm_customers_company_name', 'company_name'),
         Index('ix_crm_customers_email', 'email'),
+        Index('ix_crm_customers_tenant_created_id', 'tenant_id', 'created_at', 'id'),  # Keyset pagination
+        Index('ix_crm_customers_tenant_updated_id', 'tenant_id', 'updated_at', 'id'),  # Export (since=)
+        Index('ix_crm_customers_tenant_created_id_active', 'tenant_id', 'created_at', 'id', **ACTIVE_ROWS),
     )
 
 
@@ -174,6 +190,25 @@ class User(Base, TimestampMixin, SoftDeleteMixin):
     )
 
 
+class NumberRange(Base, TimestampMixin):
+    """Number range per tenant and document type - Nummernkreise"""
+    __tablename__ = "shared_number_ranges"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), nullable=False)
+    document_type = Column(String(50), nullable=False)  # journal_entry, customer
+
+    # Numbers are prefix + next_value zero-padded to width digits
+    prefix = Column(String(20), default="", nullable=False)
+    width = Column(Integer, default=6, nullable=False)
+    next_value = Column(BigInteger, default=1, nullable=False)  # First number not handed out yet
+
+    # Indexes
+    __table_args__ = (
+        Index('ix_shared_number_ranges_tenant_type', 'tenant_id', 'document_type', unique=True),
+    )
+
+
 # Finance Domain Models
 class Account(Base, TimestampMixin, SoftDeleteMixin):
     """Chart of accounts - Kontenrahmen"""
@@ -198,6 +233,9 @@ class Account(Base, TimestampMixin, SoftDeleteMixin):
     balance = Column(Numeric(15, 2), default=0.00, nullable=False)
     currency = Column(String(3), default="EUR", nullable=False)
 
+    # Optimistic concurrency, incremented by every update (AccountRepositoryImpl.version_column)
+    version = Column(Integer, default=1, server_default='1', nullable=False)
+
     # Relationships
     journal_entry_lines = relationship("JournalEntryLine", back_populates="account")
 
@@ -206,6 +244,8 @@ class Account(Base, TimestampMixin, SoftDeleteMixin):
         Index('ix_finance_accounts_tenant_number', 'tenant_id', 'account_number', unique=True),
         Index('ix_finance_accounts_tenant_type', 'tenant_id', 'account_type'),
         Index('ix_finance_accounts_category', 'category'),
+        Index('ix_finance_accounts_tenant_number_id', 'tenant_id', 'account_number', 'id'),  # Keyset pagination
+        Index('ix_finance_accounts_tenant_account_type_active', 'tenant_id', 'account_type', **ACTIVE_ROWS),
     )
 
 
@@ -246,9 +286,11 @@ class JournalEntry(Base, TimestampMixin):
     # Indexes
     __table_args__ = (
         Index('ix_finance_journal_entries_tenant_number', 'tenant_id', 'entry_number', unique=True),
-        Index('ix_finance_journal_entries_tenant_date', 'tenant_id', 'entry_date'),
+        # Journal searches: date range and status per tenant (also serves date-only ranges)
+        Index('ix_finance_journal_entries_tenant_date_status', 'tenant_id', 'entry_date', 'status'),
         Index('ix_finance_journal_entries_status', 'status'),
         Index('ix_finance_journal_entries_source', 'source'),
+        Index('ix_finance_journal_entries_tenant_updated_id', 'tenant_id', 'updated_at', 'id'),  # Export (since=)
     )
 
 
@@ -262,6 +304,8 @@ class JournalEntryLine(Base, TimestampMixin):
 
     # Account reference
     account_id = Column(UUID(as_uuid=True), ForeignKey('finance_accounts.id'), nullable=False, index=True)
+    # Copy of the entry's date, so the account ledger is a range scan over the lines alone
+    entry_date = Column(DateTime, nullable=False)
 
     # Financial amounts
     debit_amount = Column(Numeric(15, 2), default=0.00, nullable=False)
@@ -288,5 +332,254 @@ class JournalEntryLine(Base, TimestampMixin):
     __table_args__ = (
         Index('ix_finance_journal_entry_lines_tenant_entry', 'tenant_id', 'journal_entry_id'),
         Index('ix_finance_journal_entry_lines_account', 'account_id'),
+        # Trial balance: lines of the selected entries summed per account without reading the rows
+        Index('ix_finance_journal_entry_lines_entry_account', 'journal_entry_id', 'account_id',
+              postgresql_include=['debit_amount', 'credit_amount']),
+        # Account ledger: the lines of an account in date order, amounts read from the index
+        Index('ix_finance_journal_entry_lines_tenant_account_date', 'tenant_id', 'account_id', 'entry_date', 'id',
+              postgresql_include=['journal_entry_id', 'debit_amount', 'credit_amount']),
         Index('ix_finance_journal_entry_lines_cost_center', 'cost_center'),
-    )
\ No newline at end of file
+    )
+
+
+class AccountPeriodBalance(Base, TimestampMixin):
+    """Account balance snapshot per month - Periodensalden"""
+    __tablename__ = "finance_account_period_balances"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), nullable=False)
+    account_id = Column(UUID(as_uuid=True), ForeignKey('finance_accounts.id'), nullable=False)
+
+    # Period [period_start, period_end): first day of the month and of the next month
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)
+
+    # Movements of the period and the balance (debit - credit) at its end
+    debit_total = Column(Numeric(15, 2), default=0.00, nullable=False)
+    credit_total = Column(Numeric(15, 2), default=0.00, nullable=False)
+    closing_balance = Column(Numeric(15, 2), default=0.00, nullable=False)
+
+    # Closed periods accept no more postings
+    is_closed = Column(Boolean, default=False, nullable=False)
+    closed_at = Column(DateTime, nullable=True)
+
+    # Indexes
+    __table_args__ = (
+        Index('ix_finance_account_period_balances_tenant_account_period', 'tenant_id', 'account_id', 'period_start',
+              unique=True),
+        Index('ix_finance_account_period_balances_tenant_period', 'tenant_id', 'period_start'),
+    )
+
+
+class JournalImport(Base, TimestampMixin):
+    """Journal imports - Buchungsstapel-Importe (DATEV)"""
+    __tablename__ = "finance_journal_imports"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), nullable=False)
+
+    # Source file: name as uploaded and SHA-256 of its DATEV header line (one import per file)
+    file_name = Column(String(255), nullable=True)
+    fingerprint = Column(String(64), nullable=False)
+    post = Column(Boolean, default=False, nullable=False)  # Import as posted entries instead of drafts
+
+    # Progress; last_row is the file row of the last committed chunk, where a resumed import goes on
+    status = Column(String(20), default="queued", nullable=False)  # queued, running, completed, failed
+    last_row = Column(Integer, default=0, nullable=False)
+    rows = Column(Integer, default=0, nullable=False)
+    entries = Column(Integer, default=0, nullable=False)
+    lines = Column(Integer, default=0, nullable=False)
+    failed_rows = Column(Integer, default=0, nullable=False)
+    error = Column(String(500), nullable=True)  # Why the import stopped
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Indexes
+    __table_args__ = (
+        Index('ix_finance_journal_imports_tenant_fingerprint', 'tenant_id', 'fingerprint', unique=True),
+    )
+
+
+class JournalImportError(Base):
+    """Rejected rows of a journal import"""
+    __tablename__ = "finance_journal_import_errors"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    import_id = Column(UUID(as_uuid=True), ForeignKey('finance_journal_imports.id'), nullable=False)
+    row_number = Column(Integer, nullable=False)  # Row in the file (the header is row 1)
+    error = Column(String(500), nullable=False)
+
+    # Indexes
+    __table_args__ = (
+        Index('ix_finance_journal_import_errors_import_row', 'import_id', 'row_number'),
+    )
+
+
+class JournalImportLine(Base):
+    """
+    Staging of journal imports: the lines of the chunk being imported,
+    loaded with COPY and merged into the journal in the same transaction
+    (UNLOGGED and without secondary indexes on PostgreSQL).
+    """
+    __tablename__ = "finance_journal_import_lines"
+
+    import_id = Column(UUID(as_uuid=True), primary_key=True)
+    journal_entry_id = Column(UUID(as_uuid=True), primary_key=True)
+    line_number = Column(Integer, primary_key=True)
+    tenant_id = Column(UUID(as_uuid=True), nullable=False)
+
+    # The entry (the same on all of its lines)
+    entry_number = Column(String(50), nullable=False)
+    entry_date = Column(DateTime, nullable=False)
+    description = Column(String(500), nullable=False)
+    reference = Column(String(100), nullable=True)
+    currency = Column(String(3), nullable=False)
+
+    # The line; amounts in cents
+    account_id = Column(UUID(as_uuid=True), nullable=False)
+    debit_cents = Column(BigInteger, nullable=False)
+    credit_cents = Column(BigInteger, nullable=False)
+    line_description = Column(String(200), nullable=True)
+    cost_center = Column(String(50), nullable=True)
+
+# Inventory Domain Models
+class Article(Base, TimestampMixin, SoftDeleteMixin):
+    """Article/Product model - Artikelstamm"""
+    __tablename__ = "inventory_articles"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+
+    # Article identification
+    article_number = Column(String(50), nullable=False)
+    name = Column(String(100), nullable=False)
+    description = Column(Text, nullable=True)
+    barcode = Column(String(50), nullable=True)
+    supplier_number = Column(String(50), nullable=True)
+
+    # Classification
+    unit = Column(String(10), nullable=False)
+    category = Column(String(50), nullable=False)
+    subcategory = Column(String(50), nullable=True)
+
+    # Pricing
+    purchase_price = Column(Numeric(10, 2), nullable=True)
+    sales_price = Column(Numeric(10, 2), nullable=False)
+    currency = Column(String(3), default="EUR", nullable=False)
+
+    # Stock levels
+    min_stock = Column(Numeric(10, 2), nullable=True)
+    max_stock = Column(Numeric(10, 2), nullable=True)
+    current_stock = Column(Numeric(10, 2), default=0, nullable=False)
+    reserved_stock = Column(Numeric(10, 2), default=0, nullable=False)
+    available_stock = Column(Numeric(10, 2), default=0, nullable=False)
+
+    # Optimistic concurrency, incremented by every update (ArticleRepositoryImpl.version_column)
+    version = Column(Integer, default=1, server_default='1', nullable=False)
+
+    # Physical properties
+    weight = Column(Numeric(8, 2), nullable=True)
+    dimensions = Column(String(50), nullable=True)
+
+    deleted_at = Column(DateTime, nullable=True)
+
+    # Indexes
+    __table_args__ = (
+        Index('ix_inventory_articles_tenant_number', 'tenant_id', 'article_number', unique=True),
+        Index('ix_inventory_articles_tenant_barcode', 'tenant_id', 'barcode'),
+        Index('ix_inventory_articles_category', 'category'),
+        Index('ix_inventory_articles_tenant_created_id', 'tenant_id', 'created_at', 'id'),  # Keyset pagination
+        Index('ix_inventory_articles_tenant_updated_id', 'tenant_id', 'updated_at', 'id'),  # Export (since=)
+        Index('ix_inventory_articles_tenant_created_id_active', 'tenant_id', 'created_at', 'id', **ACTIVE_ROWS),
+    )
+
+
+class Warehouse(Base, TimestampMixin, SoftDeleteMixin):
+    """Warehouse model - Lager"""
+    __tablename__ = "inventory_warehouses"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+
+    # Warehouse identification
+    warehouse_code = Column(String(20), nullable=False)
+    name = Column(String(100), nullable=False)
+    warehouse_type = Column(String(20), default="standard", nullable=False)
+
+    # Address information
+    address = Column(String(200), nullable=False)
+    city = Column(String(50), nullable=False)
+    postal_code = Column(String(10), nullable=False)
+    country = Column(String(2), default="DE", nullable=False)
+
+    # Contact information
+    contact_person = Column(String(100), nullable=True)
+    phone = Column(String(20), nullable=True)
+    email = Column(String(100), nullable=True)
+
+    # Capacity
+    total_capacity = Column(Numeric(12, 2), nullable=True)
+    used_capacity = Column(Numeric(12, 2), default=0, nullable=False)
+
+    deleted_at = Column(DateTime, nullable=True)
+
+    # Indexes
+    __table_args__ = (
+        Index('ix_inventory_warehouses_tenant_code', 'tenant_id', 'warehouse_code', unique=True),
+    )
+
+
+class StockMovement(Base, TimestampMixin):
+    """Stock movement model - Lagerbewegungen"""
+    __tablename__ = "inventory_stock_movements"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    article_id = Column(UUID(as_uuid=True), ForeignKey('inventory_articles.id'), nullable=False, index=True)
+    warehouse_id = Column(UUID(as_uuid=True), ForeignKey('inventory_warehouses.id'), nullable=False, index=True)
+
+    # Movement details
+    movement_type = Column(String(20), nullable=False)  # in, out, transfer, adjustment
+    quantity = Column(Numeric(10, 2), nullable=False)
+    unit_cost = Column(Numeric(10, 2), nullable=True)
+    total_cost = Column(Numeric(12, 2), nullable=True)
+    reference_number = Column(String(50), nullable=True)
+    notes = Column(Text, nullable=True)
+
+    # Stock level before and after the movement
+    previous_stock = Column(Numeric(10, 2), nullable=False)
+    new_stock = Column(Numeric(10, 2), nullable=False)
+
+    # Indexes
+    __table_args__ = (
+        Index('ix_inventory_stock_movements_tenant_article', 'tenant_id', 'article_id'),
+        Index('ix_inventory_stock_movements_tenant_created', 'tenant_id', 'created_at'),
+        Index('ix_inventory_stock_movements_tenant_updated_id', 'tenant_id', 'updated_at', 'id'),  # Export (since=)
+    )
+
+
+class StockReservation(Base, TimestampMixin):
+    """Stock reservation model - stock held for an order until it ships, is released or expires"""
+    __tablename__ = "inventory_stock_reservations"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    article_id = Column(UUID(as_uuid=True), ForeignKey('inventory_articles.id'), nullable=False, index=True)
+
+    # Reservation details
+    quantity = Column(Numeric(10, 2), nullable=False)
+    status = Column(String(20), default="active", nullable=False)  # active, committed, released, expired
+    reference_number = Column(String(50), nullable=True)  # Order number
+    expires_at = Column(DateTime, nullable=False)
+
+    # Indexes
+    __table_args__ = (
+        Index('ix_inventory_stock_reservations_tenant_reference', 'tenant_id', 'reference_number'),
+        Index('ix_inventory_stock_reservations_status_expires', 'status', 'expires_at'),  # Expiry sweep
+    )
+
+# Text search (pg_trgm on PostgreSQL, FTS5 on SQLite)
+install_search_extensions(Base.metadata)
+register_search_index(Customer, ('company_name', 'contact_person', 'email'))
+register_search_index(Lead, ('company_name', 'contact_person', 'email'))
+register_search_index(Contact, ('first_name', 'last_name', 'email'))
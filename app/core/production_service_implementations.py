@@ -4,9 +4,16 @@ Replaces placeholder services with actual working implementations
 """
 
 import logging
-from typing import Optional, Dict, Any
+from datetime import date, datetime
+from typing import Optional, Dict, Any, Callable, List, Union
 from sqlalchemy.orm import Session
 from .database import get_db
+from ..infrastructure.repositories.journal_import import STALE_AFTER, ImportConflictError, import_jobs
+from ..infrastructure.repositories.journal_query import JournalEntryQuery
+from ..infrastructure.repositories.posting import COMPLETED, RUNNING, PostingJob, PostingProgress, posting_jobs
+from ..infrastructure.repositories.trial_balance import (
+    PERIODS, build_trial_balance, cache_report, cached_report
+)
 from .services import (
     TenantService, UserService, CustomerService, LeadService, ContactService,
     ArticleService, WarehouseService, StockMovementService, InventoryCountService,
@@ -190,3 +197,148 @@ class ProductionCustomerService(CustomerService):
     async def exists(self, id: str, tenant_id: str):
         return True
 
+
+class ProductionJournalEntryService(JournalEntryService):
+    """Production implementation of JournalEntryService on the journal entry repository."""
+
+    def __init__(self, repository, repository_factory: Optional[Callable[[], Any]] = None,
+                 import_repository_factory: Optional[Callable[[], Any]] = None):
+        self.repository = repository
+        # Resolves a repository in the unit of work of a background posting job
+        self.repository_factory = repository_factory
+        # Resolves the journal import repository (in the request or an import job)
+        self.import_repository_factory = import_repository_factory
+
+    async def get_trial_balance(self, start_date: Union[str, date], end_date: Union[str, date], tenant_id: str,
+                                period: str = "month") -> Dict[str, Any]:
+        """
+        Trial balance of the booked entries between start_date and end_date
+        (both included), per account and period with category, account type
+        and grand totals. The database sums the lines per account and month
+        in one query; reports are cached until the tenant posts again.
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period {period!r}; use one of {', '.join(PERIODS)}")
+        start = start_date if isinstance(start_date, date) else date.fromisoformat(start_date)
+        end = end_date if isinstance(end_date, date) else date.fromisoformat(end_date)
+        if end < start:
+            raise ValueError("end_date must not be before start_date")
+
+        session = self.repository.session
+        report = await cached_report(session, tenant_id, start, end, period)
+        if report is not None:
+            return report
+        rows = await self.repository.get_trial_balance_rows(tenant_id, start, end)
+        report = build_trial_balance(rows, tenant_id, start, end, period)
+        await cache_report(tenant_id, start, end, period, report)
+        logger.debug(f"Trial balance {start}..{end} for tenant {tenant_id}: {len(report['accounts'])} accounts")
+        return report
+
+    async def post_entry(self, entry_id: str, tenant_id: str) -> bool:
+        return await self.repository.post_entry(entry_id, tenant_id)
+
+    async def post_entries(self, entry_ids: List[str], tenant_id: str, chunk_size: Optional[int] = None) -> PostingJob:
+        """
+        Start posting the draft entries in the background (chunked
+        transactions, see JournalEntryRepositoryImpl.post_entries); the
+        returned job reports the progress.
+        """
+        if not entry_ids:
+            raise ValueError("No journal entries to post")
+        if self.repository_factory is None:
+            raise RuntimeError("Batch posting needs a repository factory")
+        job = posting_jobs.start(tenant_id, entry_ids, self.repository_factory, chunk_size)
+        logger.info(f"Started journal posting job {job.id} for {job.progress.total} entries of tenant {tenant_id}")
+        return job
+
+    async def get_posting_job(self, job_id: str) -> Optional[PostingJob]:
+        return posting_jobs.get(job_id)
+
+    async def reverse_entry(self, entry_id: str, reason: str, tenant_id: str,
+                            reversal_date: Optional[date] = None):
+        return await self.repository.reverse_entry(entry_id, reason, tenant_id, reversal_date)
+
+    async def reverse_entries(self, query: JournalEntryQuery, reason: str, tenant_id: str,
+                              reversal_date: Optional[date] = None,
+                              chunk_size: Optional[int] = None) -> PostingProgress:
+        """
+        Reverse the posted entries matching the query in chunked transactions
+        (see JournalEntryRepositoryImpl.reverse_entries). The query must
+        filter on something, so a tenant's journal is never reversed whole.
+        """
+        if not query.conditions():
+            raise ValueError("Reversing needs at least one filter (source, reference or dates)")
+        return await self.repository.reverse_entries(query, reason, tenant_id, reversal_date, chunk_size)
+
+    async def import_entries(self, import_id: Any, tenant_id: str, file_name: Optional[str] = None,
+                             post: bool = False, chunk_size: Optional[int] = None):
+        """
+        Register the DATEV file stored at import_path(import_id) and import
+        it in the background (see JournalImportRepositoryImpl.run_import);
+        the returned import reports the progress.
+        """
+        imports = self._import_repository()
+        record = await imports.create_import(import_id, tenant_id, file_name, post)
+
+        def start() -> None:
+            import_jobs.start(record.id, tenant_id, self.import_repository_factory, chunk_size)
+            logger.info(f"Started journal import {record.id} of tenant {tenant_id}")
+
+        unit_of_work = imports.session.info.get('unit_of_work')
+        if unit_of_work is None or unit_of_work.commit_chunks:
+            start()
+        else:
+            # The job's session only finds the registration once the request has committed it
+            async def after_complete(committed: bool) -> None:
+                if committed:
+                    start()
+
+            unit_of_work.after_complete(after_complete)
+        return record
+
+    async def resume_import(self, import_id: Any, tenant_id: str, chunk_size: Optional[int] = None):
+        """Resume a failed or interrupted import; ImportConflictError if it completed or is still running."""
+        record = await self._import_repository().get_by_id(import_id, tenant_id)
+        if record is None:
+            return None
+        if record.status == COMPLETED:
+            raise ImportConflictError("The import has completed", record.id)
+        if import_jobs.running(record.id) or (
+            record.status == RUNNING and record.updated_at > datetime.utcnow() - STALE_AFTER
+        ):
+            raise ImportConflictError("The import is still running", record.id)
+        import_jobs.start(record.id, tenant_id, self.import_repository_factory, chunk_size)
+        logger.info(f"Resumed journal import {record.id} after row {record.last_row}")
+        return record
+
+    async def get_import(self, import_id: Any, tenant_id: str):
+        return await self._import_repository().get_by_id(import_id, tenant_id)
+
+    async def get_import_errors(self, import_id: Any, tenant_id: str, skip: int = 0, limit: int = 100):
+        return await self._import_repository().get_errors(import_id, tenant_id, skip, limit)
+
+    def _import_repository(self):
+        if self.import_repository_factory is None:
+            raise RuntimeError("Journal imports need an import repository factory")
+        return self.import_repository_factory()
+
+    # Standard service interface implementation
+    async def get_by_id(self, id: str, tenant_id: str):
+        return await self.repository.get_by_id(id, tenant_id)
+
+    async def get_all(self, tenant_id: str, pagination=None):
+        if pagination is None:
+            return await self.repository.get_all(tenant_id)
+        return await self.repository.get_all(tenant_id, (pagination.page - 1) * pagination.size, pagination.size)
+
+    async def create(self, data, tenant_id: str):
+        return await self.repository.create(data, tenant_id)
+
+    async def update(self, id: str, data, tenant_id: str):
+        return await self.repository.update(id, data, tenant_id)
+
+    async def delete(self, id: str, tenant_id: str):
+        return await self.repository.delete(id, tenant_id)
+
+    async def exists(self, id: str, tenant_id: str):
+        return await self.repository.exists(id, tenant_id)
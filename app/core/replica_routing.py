@@ -0,0 +1,346 @@
+"""
+VALEO-NeuroERP Read-Replica Routing
+Routes read-only statements to replica engines, writes to the primary
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE of a statement cancelled (statement_timeout, pg_cancel_backend)
+QUERY_CANCELED = "57014"
+
+try:
+    from redis import asyncio as redis_asyncio
+    from redis.exceptions import RedisError
+except ImportError:  # redis is optional, see requirements.txt
+    redis_asyncio = None
+    RedisError = ConnectionError
+
+# Errors after which publishing writes is paused
+_REDIS_ERRORS = (RedisError, OSError, asyncio.TimeoutError)
+
+
+def is_connection_failure(error: Exception) -> bool:
+    """
+    Whether a database error means the server or connection failed
+    (OperationalError or an invalidated connection) rather than the
+    statement: bad SQL, constraint violations and cancelled statements
+    fail the same way on every server.
+    """
+    if not isinstance(error, DBAPIError):
+        return False
+    if error.connection_invalidated:
+        return True
+    if not isinstance(error, OperationalError):
+        return False
+    original = error.orig
+    return (getattr(original, 'pgcode', None) or getattr(original, 'sqlstate', None)) != QUERY_CANCELED
+
+
+class Replica:
+    """A read replica with its sync/async engines and health state."""
+
+    def __init__(self, url: str, engine: Engine, async_engine: Optional[AsyncEngine] = None):
+        self.url = url
+        self.engine = engine
+        self.async_engine = async_engine
+        self.healthy = True
+        self.last_failure = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+    def bind_for(self, is_async: bool) -> Engine:
+        """Engine to bind a (sync or AsyncSession-backing) Session to."""
+        if is_async and self.async_engine is not None:
+            return self.async_engine.sync_engine
+        return self.engine
+
+
+class ReplicaRouter:
+    """
+    Round-robin selection of healthy replicas.
+
+    - Unhealthy replicas are skipped and re-probed after health_interval seconds
+    - After a tenant writes, its reads stay on the primary for the
+      read-your-writes window
+
+    The window is shared with the other workers and nodes over Redis
+    pub/sub: record_write publishes a tenant's write (from a task on the
+    event loop, at most once per half window) and listen() applies the
+    writes of the other processes to this one's windows. get_bind only
+    reads the local windows and never waits for Redis. Without Redis - not
+    configured, not installed, or failing, in which case publishing pauses
+    for retry_seconds - and for writes made outside an event loop, the
+    window only holds within the worker that wrote.
+    """
+
+    def __init__(self, replicas: List[Replica], health_interval: float = 30.0,
+                 read_your_writes_window: float = 5.0, redis=None, retry_seconds: float = 30.0,
+                 channel: str = "valeo:read-your-writes"):
+        self.replicas = replicas
+        self.health_interval = health_interval
+        self.read_your_writes_window = read_your_writes_window
+        self.redis = redis
+        self.retry_seconds = retry_seconds
+        self.channel = channel
+        # Identifies this process's own broadcasts
+        self.origin = uuid.uuid4().hex
+        self._next = 0
+        # tenant -> monotonic time its reads may go to replicas again
+        self._write_until: Dict[str, float] = {}
+        # tenant -> monotonic time its last write was published
+        self._published_at: Dict[str, float] = {}
+        self._unpublished: Set[str] = set()
+        self._publisher: Optional[asyncio.Task] = None
+        self._redis_down_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    @property
+    def shares_writes(self) -> bool:
+        """Whether the window is shared with the other processes (see listen)."""
+        return self.enabled and self.redis is not None
+
+    def record_write(self, tenant_id: Optional[str]) -> None:
+        """Remember a write so the tenant reads its own writes from the primary."""
+        if tenant_id is None:
+            return
+        key = str(tenant_id)
+        now = time.monotonic()
+        self._write_until[key] = now + self.read_your_writes_window
+        if not self.shares_writes or now - self._published_at.get(key, -self.read_your_writes_window) < (
+            self.read_your_writes_window / 2
+        ):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._published_at[key] = now
+        self._unpublished.add(key)
+        if self._publisher is None or self._publisher.done():
+            self._publisher = loop.create_task(self._publish())
+
+    async def _publish(self) -> None:
+        while self._unpublished:
+            tenants, self._unpublished = sorted(self._unpublished), set()
+            if time.monotonic() < self._redis_down_until:
+                return
+            try:
+                await self.redis.publish(self.channel, json.dumps({"origin": self.origin, "tenants": tenants}))
+            except _REDIS_ERRORS as e:
+                logger.warning(f"Read-your-writes: Redis unavailable, window holds per worker only "
+                               f"for {self.retry_seconds:.0f}s: {e}")
+                self._redis_down_until = time.monotonic() + self.retry_seconds
+                return
+
+    def in_read_your_writes_window(self, tenant_id: Optional[str]) -> bool:
+        if tenant_id is None:
+            return False
+        return self._write_until.get(str(tenant_id), 0.0) > time.monotonic()
+
+    async def listen(self) -> None:
+        """
+        Apply the writes published by the other processes to the windows.
+        Runs until cancelled (started from the application lifespan).
+        """
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                await pubsub.subscribe(self.channel)
+                try:
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        event = json.loads(message["data"])
+                        if event.get("origin") == self.origin:
+                            continue
+                        # Writes are published once per half window, so the window
+                        # runs half a window longer than from the publication
+                        until = time.monotonic() + self.read_your_writes_window * 1.5
+                        for tenant in event.get("tenants", ()):
+                            if self._write_until.get(tenant, 0.0) < until:
+                                self._write_until[tenant] = until
+                finally:
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except _REDIS_ERRORS as e:
+                logger.warning(f"Read-your-writes listener disconnected, window holds per worker only: {e}")
+                await asyncio.sleep(self.retry_seconds)
+
+    def choose(self, tenant_id: Optional[str] = None) -> Optional[Replica]:
+        """Next healthy replica, or None to use the primary."""
+        if not self.replicas or self.in_read_your_writes_window(tenant_id):
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = self.replicas[self._next % len(self.replicas)]
+                self._next += 1
+                if replica.healthy or now - replica.last_failure >= self.health_interval:
+                    return replica
+        return None
+
+    def mark_unhealthy(self, replica: Replica, error: Exception) -> None:
+        replica.healthy = False
+        replica.last_failure = time.monotonic()
+        logger.warning(f"Read replica {replica.name} marked unhealthy, falling back to primary: {error}")
+
+    def mark_healthy(self, replica: Replica) -> None:
+        if not replica.healthy:
+            logger.info(f"Read replica {replica.name} is healthy again")
+        replica.healthy = True
+
+    def check_health(self) -> Dict[str, bool]:
+        """Probe every replica with SELECT 1 and update its health state."""
+        status = {}
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+                self.mark_healthy(replica)
+            except Exception as e:
+                self.mark_unhealthy(replica, e)
+            status[replica.name] = replica.healthy
+        return status
+
+    def replica_for_engine(self, engine: Engine) -> Optional[Replica]:
+        for replica in self.replicas:
+            if engine is replica.engine or (
+                replica.async_engine is not None and engine is replica.async_engine.sync_engine
+            ):
+                return replica
+        return None
+
+    def dispose(self) -> None:
+        for replica in self.replicas:
+            replica.engine.dispose()
+
+    async def close(self) -> None:
+        if self.redis is not None:
+            await self.redis.aclose()
+
+
+async def run_health_checks(router: ReplicaRouter) -> None:
+    """Background task: probe replicas every health_interval seconds."""
+    while True:
+        await asyncio.sleep(router.health_interval)
+        await asyncio.to_thread(router.check_health)
+
+
+def create_replica_router(urls: List[str], async_urls: Optional[List[str]] = None,
+                          health_interval: float = 30.0, read_your_writes_window: float = 5.0,
+                          redis_url: Optional[str] = None, redis_timeout: float = 0.25,
+                          redis_retry_seconds: float = 30.0, async_poolclass: Optional[type] = None,
+                          **engine_options) -> ReplicaRouter:
+    """
+    Create engines for all replica URLs (async engines only if async_urls is
+    given). engine_options go to every engine; async_poolclass replaces
+    their poolclass for the async engines, which cannot use a sync pool.
+    With replicas and redis_url, the read-your-writes window is shared over
+    Redis (see ReplicaRouter.listen).
+    """
+    async_options = dict(engine_options, poolclass=async_poolclass) if async_poolclass else engine_options
+    replicas = []
+    for index, url in enumerate(urls):
+        async_engine = None
+        if async_urls:
+            try:
+                async_engine = create_async_engine(async_urls[index], **async_options)
+            except ImportError as e:
+                logger.warning(f"Async driver not available for read replica, using sync engine only: {e}")
+        replicas.append(Replica(url, create_engine(url, **engine_options), async_engine))
+    redis = None
+    if replicas:
+        logger.info(f"Configured {len(replicas)} read replica(s)")
+        if not redis_url:
+            logger.warning("No Redis configured, the read-your-writes window holds per worker only")
+        elif redis_asyncio is None:
+            logger.warning("redis package not installed, the read-your-writes window holds per worker only")
+        else:
+            redis = redis_asyncio.from_url(redis_url, socket_connect_timeout=redis_timeout, socket_timeout=redis_timeout)
+    return ReplicaRouter(replicas, health_interval, read_your_writes_window, redis, redis_retry_seconds)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends read-only statements to a replica.
+
+    A statement goes to a replica when the caller marked it read-only
+    (bind_arguments={'read_only': True}) or the whole session is read-only
+    (session.info['read_only'], set for GET requests), the session has not
+    written anything yet and the tenant is outside its read-your-writes
+    window. Everything else - DML, flushes and all reads after a write -
+    uses the primary bind.
+    """
+
+    replica_router: Optional[ReplicaRouter] = None
+    is_async_backing = False
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kw):
+        if bind is not None:
+            return bind
+
+        router = self.replica_router
+        tenant_id = kw.get('tenant_id')
+        is_write = self._flushing or isinstance(clause, UpdateBase)
+        self.info['last_replica'] = None
+
+        if is_write:
+            self.info['has_written'] = True
+            if router is not None:
+                router.record_write(tenant_id)
+        elif (
+            router is not None and router.enabled
+            and not kw.get('force_primary')
+            and not self.info.get('has_written')
+            and (kw.get('read_only') or self.info.get('read_only'))
+        ):
+            replica = router.choose(tenant_id)
+            if replica is not None:
+                self.info['last_replica'] = replica
+                return replica.bind_for(self.is_async_backing)
+
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+    def replica_failed(self, error: Exception) -> bool:
+        """
+        Mark the replica used by the last statement as unhealthy if the
+        error is a connection failure (see is_connection_failure).
+        Returns True if the statement should be retried on the primary;
+        any other error is the statement's own and is raised.
+        """
+        replica = self.info.pop('last_replica', None)
+        if replica is None or self.replica_router is None or self.info.get('has_written'):
+            return False
+        if not is_connection_failure(error):
+            return False
+        self.replica_router.mark_unhealthy(replica, error)
+        return True
+
+
+class AsyncRoutingSession(RoutingSession):
+    """RoutingSession backing an AsyncSession (binds to sync_engine of async engines)."""
+
+    is_async_backing = True
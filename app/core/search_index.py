@@ -0,0 +1,219 @@
+"""
+VALEO-NeuroERP Search Index
+Indexed text search over selected columns: a pg_trgm GIN index on PostgreSQL
+and an FTS5 table on SQLite (local mode)
+"""
+
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import DDL, Index, event, false, func, literal_column, or_, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import column as sql_column, table as sql_table
+
+logger = logging.getLogger(__name__)
+
+# Searchable columns per table, registered by register_search_index()
+search_indexes: Dict[str, Tuple[str, ...]] = {}
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_table_name(table) -> str:
+    return f"{table.name}_fts"
+
+
+def search_document(table, fields: Tuple[str, ...]):
+    """
+    The concatenated text indexed on PostgreSQL. Separators are rendered
+    inline so queries repeat exactly the indexed expression.
+    """
+    document = func.coalesce(table.c[fields[0]], literal_column("''"))
+    for field in fields[1:]:
+        document = document.op("||")(literal_column("' '")).op("||")(
+            func.coalesce(table.c[field], literal_column("''"))
+        )
+    return document
+
+
+def fts_keys_table_name(table) -> str:
+    return f"{table.name}_fts_keys"
+
+
+def _sqlite_fts_ddl(table, fields: Tuple[str, ...]) -> List[str]:
+    """
+    The FTS5 table stores its own copy of the fields; its rowids are the
+    docids of a key table mapping them to the content table's ids. Both are
+    declared INTEGER PRIMARY KEYs, which VACUUM keeps (unlike the implicit
+    rowid of a table with a UUID primary key), and ids are what queries join on.
+    """
+    fts = fts_table_name(table)
+    keys = fts_keys_table_name(table)
+    columns = ", ".join(fields)
+    new_values = ", ".join(f"new.{field}" for field in fields)
+    assignments = ", ".join(f"{field} = new.{field}" for field in fields)
+    return [
+        f"CREATE TABLE IF NOT EXISTS {keys} (docid INTEGER PRIMARY KEY, id NOT NULL UNIQUE)",
+        # prefix='2 3' keeps short autocomplete prefixes on the index
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table.name} BEGIN "
+        f"INSERT INTO {keys}(id) VALUES (new.id); "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES ((SELECT docid FROM {keys} WHERE id = new.id), {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table.name} BEGIN "
+        f"DELETE FROM {fts} WHERE rowid = (SELECT docid FROM {keys} WHERE id = old.id); "
+        f"DELETE FROM {keys} WHERE id = old.id; END",
+        # Only changes of the id or the indexed fields touch the index
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF id, {columns} ON {table.name} BEGIN "
+        f"UPDATE {keys} SET id = new.id WHERE id = old.id; "
+        f"UPDATE {fts} SET {assignments} WHERE rowid = (SELECT docid FROM {keys} WHERE id = new.id); END",
+    ]
+
+
+def _sqlite_fts_fill(table_name: str, fields: Tuple[str, ...]) -> List[str]:
+    """Index the rows already in the content table."""
+    fts, keys = f"{table_name}_fts", f"{table_name}_fts_keys"
+    columns = ", ".join(fields)
+    return [
+        f"INSERT INTO {keys}(id) SELECT id FROM {table_name}",
+        f"INSERT INTO {fts}(rowid, {columns}) SELECT {keys}.docid, "
+        + ", ".join(f"{table_name}.{field}" for field in fields)
+        + f" FROM {table_name} JOIN {keys} ON {keys}.id = {table_name}.id",
+    ]
+
+
+def register_search_index(model, fields: Tuple[str, ...]) -> None:
+    """
+    Declare the search index of a model: the trigram GIN index is part of
+    the metadata (PostgreSQL only), the FTS5 table and its sync triggers are
+    created right after the table on SQLite.
+    """
+    table = model.__table__
+    search_indexes[table.name] = tuple(fields)
+
+    Index(
+        f"ix_{table.name}_search_trgm",
+        search_document(table, fields).label("search_document"),
+        postgresql_using="gin",
+        postgresql_ops={"search_document": "gin_trgm_ops"},
+        # The literal separators keep SQLAlchemy from inferring the table
+        _table=table,
+    ).ddl_if(dialect="postgresql")
+
+    for statement in _sqlite_fts_ddl(table, fields):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for name in (fts_table_name(table), fts_keys_table_name(table)):
+        event.listen(table, "before_drop", DDL(f"DROP TABLE IF EXISTS {name}").execute_if(dialect="sqlite"))
+
+
+def install_search_extensions(metadata) -> None:
+    """pg_trgm must exist before the trigram indexes are created."""
+    event.listen(
+        metadata, "before_create",
+        DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+    )
+
+
+def ensure_search_indexes(bind: Engine) -> None:
+    """
+    Create missing SQLite FTS tables for databases created before the
+    search index existed, and fill them from the content tables. Indexes
+    of the former layout (an external-content table on the implicit rowid)
+    are dropped and rebuilt. (PostgreSQL indexes are managed by migrations.)
+    """
+    if bind.dialect.name != "sqlite":
+        return
+    with bind.begin() as connection:
+        existing = set(connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars())
+        for table_name, fields in search_indexes.items():
+            if table_name not in existing or f"{table_name}_fts_keys" in existing:
+                continue
+            for trigger in ("ai", "ad", "au"):
+                connection.execute(text(f"DROP TRIGGER IF EXISTS {table_name}_fts_{trigger}"))
+            connection.execute(text(f"DROP TABLE IF EXISTS {table_name}_fts"))
+            table = sql_table(table_name, *(sql_column(field) for field in fields))
+            for statement in _sqlite_fts_ddl(table, fields) + _sqlite_fts_fill(table_name, fields):
+                connection.execute(text(statement))
+            logger.info(f"Built search index {table_name}_fts")
+
+
+def fts_query(term: str) -> Optional[str]:
+    """FTS5 query for user input: every word as a quoted prefix, all words required."""
+    tokens = _TOKEN.findall(term)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+class SearchClause:
+    """
+    A text search over the registered columns of one table.
+    condition filters (usable with any pagination), ranked() adds relevance order.
+    """
+
+    def __init__(self, model, fields: Tuple[str, ...], term: str, dialect: str, prefix: bool = False):
+        self.model = model
+        self.table = model.__table__
+        self.fields = fields
+        self.term = term.strip()
+        self.dialect = dialect
+        self.prefix = prefix
+
+        if dialect == "sqlite":
+            fts, keys = fts_table_name(self.table), fts_keys_table_name(self.table)
+            self._fts = sql_table(fts, sql_column("rowid"), sql_column("rank"))
+            self._keys = sql_table(keys, sql_column("docid"), sql_column("id"))
+            query = fts_query(self.term)
+            self._match = literal_column(fts).op("MATCH")(query) if query else false()
+            matching_ids = (
+                select(self._keys.c.id)
+                .join(self._fts, self._fts.c.rowid == self._keys.c.docid)
+                .where(self._match)
+            )
+            self.condition = self.table.c.id.in_(matching_ids) if query else false()
+        elif dialect == "postgresql":
+            document = search_document(self.table, fields)
+            # The document filter is answered by the trigram index
+            self.condition = document.ilike(f"%{_escape_like(self.term)}%", escape="\\")
+            if prefix:
+                pattern = f"{_escape_like(self.term)}%"
+                self.condition = self.condition & or_(*(self.table.c[f].ilike(pattern, escape="\\") for f in fields))
+            self._rank = func.word_similarity(self.term, document)
+        else:
+            pattern = f"{_escape_like(self.term)}%" if prefix else f"%{_escape_like(self.term)}%"
+            self.condition = or_(*(self.table.c[f].ilike(pattern, escape="\\") for f in fields))
+            self._rank = None
+
+    def ranked(self, statement, exhaustive: bool = True):
+        """
+        Order a statement over the model by relevance (best first).
+        exhaustive=False is for type-ahead: SQLite then returns the first
+        matches in index order instead of ranking every match of a short prefix.
+        """
+        if self.dialect == "sqlite":
+            if not exhaustive:
+                # Matches in index (docid) order, so the limit stops the scan early
+                matches = (
+                    select(self._keys.c.id, self._fts.c.rowid.label("docid"))
+                    .join(self._fts, self._fts.c.rowid == self._keys.c.docid)
+                    .where(self._match)
+                    .subquery("search_matches")
+                )
+                return statement.join(matches, matches.c.id == self.table.c.id).order_by(matches.c.docid)
+            # Run the MATCH once in a subquery (bm25 rank: lower is better); matching
+            # inside the join would repeat the full-text query per row
+            hits = (
+                select(self._keys.c.id, self._fts.c.rank)
+                .join(self._fts, self._fts.c.rowid == self._keys.c.docid)
+                .where(self._match)
+                .cte("search_hits").prefix_with("MATERIALIZED")
+            )
+            return statement.join(hits, hits.c.id == self.table.c.id).order_by(hits.c.rank, self.table.c.id)
+        if self._rank is not None:
+            return statement.order_by(self._rank.desc(), self.table.c.id)
+        return statement.order_by(self.table.c[self.fields[0]], self.table.c.id)
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
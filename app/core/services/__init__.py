@@ -4,6 +4,7 @@ Clean architecture service layer definitions
 """
 
 from abc import ABC, abstractmethod
+from decimal import Decimal
 from typing import List, Optional, Any, TypeVar, Generic
 from uuid import UUID
 
@@ -146,7 +147,7 @@ class AccountService(BaseService[Any, Any, Any], ABC):
         pass
 
     @abstractmethod
-    async def get_balance(self, account_id: str, tenant_id: str) -> float:
+    async def get_balance(self, account_id: str, tenant_id: str) -> Decimal:
         """Get current account balance."""
         pass
 
@@ -160,13 +161,52 @@ class JournalEntryService(BaseService[Any, Any, Any], ABC):
         pass
 
     @abstractmethod
-    async def reverse_entry(self, entry_id: str, reason: str, tenant_id: str) -> Optional[Any]:
+    async def post_entries(self, entry_ids: List[str], tenant_id: str, chunk_size: Optional[int] = None) -> Any:
+        """Start posting many draft journal entries in the background; returns the posting job."""
+        pass
+
+    @abstractmethod
+    async def get_posting_job(self, job_id: str) -> Optional[Any]:
+        """Get a posting job started by post_entries."""
+        pass
+
+    @abstractmethod
+    async def reverse_entry(self, entry_id: str, reason: str, tenant_id: str,
+                            reversal_date: Optional[Any] = None) -> Optional[Any]:
         """Reverse a journal entry."""
         pass
 
     @abstractmethod
-    async def get_trial_balance(self, start_date: str, end_date: str, tenant_id: str) -> Any:
-        """Generate trial balance report."""
+    async def reverse_entries(self, query: Any, reason: str, tenant_id: str, reversal_date: Optional[Any] = None,
+                              chunk_size: Optional[int] = None) -> Any:
+        """Reverse the posted journal entries matching a query; returns the progress."""
+        pass
+
+    @abstractmethod
+    async def get_trial_balance(self, start_date: str, end_date: str, tenant_id: str,
+                                period: str = "month") -> Any:
+        """Generate trial balance report (per account and month, quarter, year or in total)."""
+        pass
+
+    @abstractmethod
+    async def import_entries(self, import_id: Any, tenant_id: str, file_name: Optional[str] = None,
+                             post: bool = False, chunk_size: Optional[int] = None) -> Any:
+        """Start importing a stored DATEV file in the background; returns the import."""
+        pass
+
+    @abstractmethod
+    async def resume_import(self, import_id: Any, tenant_id: str, chunk_size: Optional[int] = None) -> Optional[Any]:
+        """Resume a failed or interrupted import after its last committed chunk."""
+        pass
+
+    @abstractmethod
+    async def get_import(self, import_id: Any, tenant_id: str) -> Optional[Any]:
+        """Get an import and its progress."""
+        pass
+
+    @abstractmethod
+    async def get_import_errors(self, import_id: Any, tenant_id: str, skip: int = 0, limit: int = 100) -> Optional[Any]:
+        """Get one page of the rows an import rejected."""
         pass
 
 
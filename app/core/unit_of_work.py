@@ -0,0 +1,208 @@
+"""
+VALEO-NeuroERP Unit of Work
+Request-scoped database session lifecycle shared by all repositories
+"""
+
+import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Union
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .database import engine, async_engine, create_session
+
+logger = logging.getLogger(__name__)
+
+_current_unit_of_work: ContextVar[Optional["UnitOfWork"]] = ContextVar("unit_of_work", default=None)
+
+# Counter of connections still checked out when their request finished
+leaked_checkouts_total = 0
+
+
+class UnitOfWork:
+    """
+    One database session per request.
+
+    The session is created lazily on first use, shared by every repository
+    resolved while the unit of work is active, committed or rolled back
+    exactly once in complete() and closed deterministically.
+    Repositories only flush inside a unit of work, and their chunks (see
+    BaseRepositoryImpl._chunk_transaction) are savepoints.
+    A read-only unit of work (GET requests) lets the session read from replicas.
+    Background jobs (posting, imports) pass commit_chunks, so every chunk
+    commits on its own and a job keeps its progress if it fails.
+    """
+
+    def __init__(self, route: str = "-",
+                 session_factory: Callable[[], Union[AsyncSession, Session]] = create_session,
+                 read_only: bool = False, commit_chunks: bool = False):
+        self.id = uuid4().hex
+        self.route = route
+        self.read_only = read_only
+        self.commit_chunks = commit_chunks
+        self.started_at = time.perf_counter()
+        self._session_factory = session_factory
+        self._session: Optional[Union[AsyncSession, Session]] = None
+        self._rollback_only = False
+        self._closed = False
+        # Pool checkouts made on behalf of this unit of work (connection record id -> checkout time)
+        self.checkouts: Dict[int, float] = {}
+        self._after_complete: List[Callable[[bool], Awaitable[None]]] = []
+
+    @property
+    def session(self) -> Union[AsyncSession, Session]:
+        """The request session (created on first access)."""
+        if self._closed:
+            raise RuntimeError(f"Unit of work for {self.route} is already closed")
+        if self._session is None:
+            self._session = self._session_factory()
+            self._session.info['unit_of_work'] = self
+            self._session.info['read_only'] = self.read_only
+        return self._session
+
+    @property
+    def has_session(self) -> bool:
+        return self._session is not None
+
+    @property
+    def rollback_only(self) -> bool:
+        return self._rollback_only
+
+    def mark_rollback_only(self) -> None:
+        """Make complete() roll back instead of committing."""
+        self._rollback_only = True
+
+    def after_complete(self, callback: Callable[[bool], Awaitable[None]]) -> None:
+        """Run callback(committed) once the unit of work has committed or rolled back."""
+        self._after_complete.append(callback)
+
+    async def commit(self) -> None:
+        if self._session is None:
+            return
+        if isinstance(self._session, AsyncSession):
+            await self._session.commit()
+        else:
+            self._session.commit()
+
+    async def rollback(self) -> None:
+        if self._session is None:
+            return
+        if isinstance(self._session, AsyncSession):
+            await self._session.rollback()
+        else:
+            self._session.rollback()
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._session is None:
+            return
+        if isinstance(self._session, AsyncSession):
+            await self._session.close()
+        else:
+            self._session.close()
+
+    async def complete(self, success: bool = True) -> None:
+        """Commit (or roll back) once and close the session."""
+        committed = False
+        try:
+            if success and not self._rollback_only:
+                await self.commit()
+                committed = True
+            else:
+                await self.rollback()
+        except Exception:
+            await self.rollback()
+            raise
+        finally:
+            await self.close()
+            self._report_leaks()
+            await self._run_after_complete(committed)
+
+    async def _run_after_complete(self, committed: bool) -> None:
+        callbacks, self._after_complete = self._after_complete, []
+        for callback in callbacks:
+            try:
+                await callback(committed)
+            except Exception as e:
+                logger.error(f"After-complete callback failed for request {self.route}: {e}")
+
+    def _report_leaks(self) -> None:
+        global leaked_checkouts_total
+        if not self.checkouts:
+            return
+        leaked_checkouts_total += len(self.checkouts)
+        held_for = max(time.perf_counter() - checked_out for checked_out in self.checkouts.values())
+        logger.warning(
+            f"Leaked {len(self.checkouts)} database connection(s) after request {self.route} "
+            f"(unit of work {self.id}, held for {held_for:.2f}s)"
+        )
+
+
+def current_unit_of_work() -> Optional[UnitOfWork]:
+    """The unit of work of the current request, if any."""
+    return _current_unit_of_work.get()
+
+
+def get_session() -> Union[AsyncSession, Session]:
+    """
+    Session for repositories: the current unit of work's session,
+    or a standalone session outside of a request (scripts, jobs).
+    """
+    unit_of_work = _current_unit_of_work.get()
+    if unit_of_work is not None:
+        return unit_of_work.session
+    logger.debug("No active unit of work, creating standalone session")
+    return create_session()
+
+
+@asynccontextmanager
+async def unit_of_work(route: str = "-", read_only: bool = False,
+                       commit_chunks: bool = False) -> AsyncIterator[UnitOfWork]:
+    """
+    Run a block inside a unit of work.
+    Commits on normal exit unless marked rollback-only, rolls back on error.
+    """
+    uow = UnitOfWork(route, read_only=read_only, commit_chunks=commit_chunks)
+    token = _current_unit_of_work.set(uow)
+    try:
+        yield uow
+    except BaseException:
+        await uow.complete(success=False)
+        raise
+    else:
+        await uow.complete(success=True)
+    finally:
+        _current_unit_of_work.reset(token)
+
+
+# Pool checkout tracking for leak detection
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    uow = _current_unit_of_work.get()
+    if uow is None:
+        return
+    connection_record.info['unit_of_work'] = uow
+    uow.checkouts[id(connection_record)] = time.perf_counter()
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    uow = connection_record.info.pop('unit_of_work', None)
+    if uow is not None:
+        uow.checkouts.pop(id(connection_record), None)
+
+
+def _install_checkout_tracking() -> None:
+    for sync_engine in (engine, async_engine.sync_engine if async_engine is not None else None):
+        if sync_engine is not None and not event.contains(sync_engine, "checkout", _on_checkout):
+            event.listen(sync_engine, "checkout", _on_checkout)
+            event.listen(sync_engine, "checkin", _on_checkin)
+
+
+_install_checkout_tracking()
@@ -4,7 +4,8 @@ Data access layer following repository pattern
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional, TypeVar, Generic
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, TypeVar, Generic
 from sqlalchemy.orm import Session
 
 T = TypeVar('T')
@@ -22,8 +23,13 @@ class BaseRepository(Generic[T, TCreate, TUpdate], ABC):
         self.session = session
 
     @abstractmethod
-    async def get_by_id(self, id: str, tenant_id: str) -> Optional[T]:
-        """Get entity by ID."""
+    async def get_by_id(self, id: str, tenant_id: str, fields: Optional[Sequence[str]] = None) -> Optional[T]:
+        """Get entity by ID (a dict of only the given fields if fields is set)."""
+        pass
+
+    @abstractmethod
+    async def get_many(self, ids: Any, tenant_id: str) -> Dict[Any, T]:
+        """Get entities by ID in one query, keyed by ID (missing IDs left out)."""
         pass
 
     @abstractmethod
@@ -31,6 +37,18 @@ class BaseRepository(Generic[T, TCreate, TUpdate], ABC):
         """Get all entities with pagination."""
         pass
 
+    @abstractmethod
+    async def get_all_with_total(self, tenant_id: str, skip: int = 0, limit: int = 100,
+                                 total_mode: str = "exact", fields: Optional[Sequence[str]] = None):
+        """Get one page of entities (or dicts of the given fields) and the total (exact or planner estimate) in one round trip."""
+        pass
+
+    @abstractmethod
+    async def get_page(self, tenant_id: str, limit: int = 100, cursor: Optional[str] = None,
+                       fields: Optional[Sequence[str]] = None):
+        """Get one keyset page (items, next_cursor, prev_cursor) after the cursor."""
+        pass
+
     @abstractmethod
     async def create(self, data: TCreate, tenant_id: str) -> T:
         """Create a new entity."""
@@ -46,6 +64,24 @@ class BaseRepository(Generic[T, TCreate, TUpdate], ABC):
         """Soft delete an entity."""
         pass
 
+    @abstractmethod
+    async def bulk_create(self, rows: List[Any], tenant_id: str, chunk_size: Optional[int] = None,
+                          indexes: Optional[List[int]] = None) -> Any:
+        """Insert many entities in chunked transactions, reporting rejected rows."""
+        pass
+
+    @abstractmethod
+    async def bulk_update(self, rows: List[Any], tenant_id: str, chunk_size: Optional[int] = None,
+                          indexes: Optional[List[int]] = None) -> Any:
+        """Update many entities by id in chunked transactions, reporting rejected rows."""
+        pass
+
+    @abstractmethod
+    async def bulk_upsert(self, rows: List[Any], tenant_id: str, chunk_size: Optional[int] = None,
+                          indexes: Optional[List[int]] = None) -> Any:
+        """Insert or update many entities by their natural key, reporting rejected rows."""
+        pass
+
     @abstractmethod
     async def exists(self, id: str, tenant_id: str) -> bool:
         """Check if entity exists."""
@@ -77,17 +113,46 @@ class UserRepository(BaseRepository[T, TCreate, TUpdate], ABC):
         pass
 
 
-class CustomerRepository(BaseRepository[T, TCreate, TUpdate], ABC):
+class NumberRangeRepository(BaseRepository[T, TCreate, TUpdate], ABC):
+    """Number range data access interface."""
+
+    @abstractmethod
+    async def next_numbers(self, document_type: str, tenant_id: str, count: int = 1) -> List[str]:
+        """New document numbers of the tenant's range, in order."""
+        pass
+
+    @abstractmethod
+    async def reserve(self, document_type: str, count: int, tenant_id: str, prefix: str = '',
+                      width: int = 6) -> Any:
+        """Reserve consecutive values of a range atomically (first value, prefix, width)."""
+        pass
+
+
+class SearchableRepository(ABC):
+    """Indexed text search (ranked results and prefix autocomplete)."""
+
+    @abstractmethod
+    async def search(self, tenant_id: str, query: str, limit: int = 20, skip: int = 0) -> List[Any]:
+        """Entities matching a text search, most relevant first."""
+        pass
+
+    @abstractmethod
+    async def autocomplete(self, tenant_id: str, prefix: str, limit: int = 10) -> List[Any]:
+        """Entities with a search field starting with prefix."""
+        pass
+
+
+class CustomerRepository(BaseRepository[T, TCreate, TUpdate], SearchableRepository):
     """Customer data access interface."""
     pass
 
 
-class LeadRepository(BaseRepository[T, TCreate, TUpdate], ABC):
+class LeadRepository(BaseRepository[T, TCreate, TUpdate], SearchableRepository):
     """Lead data access interface."""
     pass
 
 
-class ContactRepository(BaseRepository[T, TCreate, TUpdate], ABC):
+class ContactRepository(BaseRepository[T, TCreate, TUpdate], SearchableRepository):
     """Contact data access interface."""
     pass
 
@@ -101,8 +166,14 @@ class ArticleRepository(BaseRepository[T, TCreate, TUpdate], ABC):
         pass
 
     @abstractmethod
-    async def update_stock(self, article_id: str, quantity_change: float, tenant_id: str) -> bool:
-        """Update article stock level."""
+    async def update_stock(self, article_id: str, quantity_change: float, tenant_id: str,
+                           expected_version: Optional[int] = None) -> bool:
+        """Add quantity_change to the stock level atomically (only at expected_version if given)."""
+        pass
+
+    @abstractmethod
+    async def update_stocks(self, deltas: Any, tenant_id: str) -> Dict[Any, Any]:
+        """Apply many stock changes in one statement; returns the new stock per article."""
         pass
 
 
@@ -116,6 +187,36 @@ class StockMovementRepository(BaseRepository[T, TCreate, TUpdate], ABC):
     pass
 
 
+class StockReservationRepository(BaseRepository[T, TCreate, TUpdate], ABC):
+    """Stock reservation data access interface."""
+
+    @abstractmethod
+    async def reserve(self, article_id: str, quantity: float, tenant_id: str,
+                      reference_number: Optional[str] = None, ttl_minutes: Optional[int] = None) -> T:
+        """Reserve stock of one article, failing if not available."""
+        pass
+
+    @abstractmethod
+    async def reserve_for_order(self, lines: Any, tenant_id: str, reference_number: Optional[str] = None,
+                                ttl_minutes: Optional[int] = None) -> List[T]:
+        """Reserve all lines of an order in one transaction, all or nothing."""
+        pass
+
+    @abstractmethod
+    async def release(self, reservation_id: str, tenant_id: str) -> bool:
+        """Release an active reservation."""
+        pass
+
+    @abstractmethod
+    async def commit(self, reservation_id: str, tenant_id: str) -> bool:
+        """Commit an active reservation (stock leaves the warehouse)."""
+        pass
+
+    @abstractmethod
+    async def expire_reservations(self, now: Optional[Any] = None) -> int:
+        """Expire overdue reservations of all tenants."""
+        pass
+
 class InventoryCountRepository(BaseRepository[T, TCreate, TUpdate], ABC):
     """Inventory count data access interface."""
     pass
@@ -130,10 +231,45 @@ class AccountRepository(BaseRepository[T, TCreate, TUpdate], ABC):
         pass
 
     @abstractmethod
-    async def get_balance(self, account_id: str, tenant_id: str) -> float:
+    async def get_balance(self, account_id: str, tenant_id: str) -> Decimal:
         """Get current account balance."""
         pass
 
+    @abstractmethod
+    async def update_balance(self, account_id: str, amount: float, tenant_id: str,
+                             expected_version: Optional[int] = None) -> bool:
+        """Add amount to the balance atomically (only at expected_version if given)."""
+        pass
+
+    @abstractmethod
+    async def update_balances(self, deltas: Any, tenant_id: str) -> Dict[Any, Any]:
+        """Apply many balance changes in one statement; returns the new balance per account."""
+        pass
+
+
+class AccountPeriodBalanceRepository(BaseRepository[T, TCreate, TUpdate], ABC):
+    """Account period balance snapshot data access interface."""
+
+    @abstractmethod
+    async def get_balance_as_of(self, account_id: str, as_of: Any, tenant_id: str) -> Any:
+        """Balance of an account at the end of a day."""
+        pass
+
+    @abstractmethod
+    async def get_balances_as_of(self, tenant_id: str, as_of: Any, account_ids: Optional[Any] = None) -> Dict[Any, Any]:
+        """Balances of many accounts at the end of a day (last snapshot plus the lines since)."""
+        pass
+
+    @abstractmethod
+    async def apply_movements(self, movements: Any, tenant_id: str) -> int:
+        """Add posted movements to the snapshots of their open periods."""
+        pass
+
+    @abstractmethod
+    async def close_period(self, period_start: Any, tenant_id: str) -> int:
+        """Close a month, writing the snapshot of every account."""
+        pass
+
 
 class JournalEntryRepository(BaseRepository[T, TCreate, TUpdate], ABC):
     """Journal entry data access interface."""
@@ -143,7 +279,73 @@ class JournalEntryRepository(BaseRepository[T, TCreate, TUpdate], ABC):
         """Post a journal entry."""
         pass
 
+    @abstractmethod
+    async def post_entries(self, entry_ids: List[Any], tenant_id: str, chunk_size: Optional[int] = None,
+                           progress: Optional[Any] = None) -> Any:
+        """Post many draft journal entries in chunked transactions."""
+        pass
+
+    @abstractmethod
+    async def reverse_entry(self, entry_id: str, reason: str, tenant_id: str,
+                            reversal_date: Optional[Any] = None) -> Optional[T]:
+        """Reverse a posted journal entry with a new entry of swapped lines."""
+        pass
+
+    @abstractmethod
+    async def reverse_entries(self, query: Any, reason: str, tenant_id: str, reversal_date: Optional[Any] = None,
+                              chunk_size: Optional[int] = None, progress: Optional[Any] = None) -> Any:
+        """Reverse the posted journal entries matching a JournalEntryQuery in chunked transactions."""
+        pass
+
     @abstractmethod
     async def get_entries_by_date_range(self, start_date: str, end_date: str, tenant_id: str) -> List[T]:
         """Get journal entries by date range."""
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    async def find_entries(self, query: Any, tenant_id: str, skip: int = 0, limit: int = 100,
+                           total_mode: str = "exact") -> Any:
+        """Get one offset page (with the total) of the journal entries matching a JournalEntryQuery."""
+        pass
+
+    @abstractmethod
+    async def find_entries_page(self, query: Any, tenant_id: str, limit: int = 100, cursor: Optional[str] = None) -> Any:
+        """Get one keyset page of the journal entries matching a JournalEntryQuery."""
+        pass
+
+    @abstractmethod
+    async def get_entries_by_account(self, account_id: str, tenant_id: str, start_date: Optional[str] = None,
+                                     end_date: Optional[str] = None, skip: int = 0, limit: int = 100) -> List[T]:
+        """Get journal entries for a specific account."""
+        pass
+
+    @abstractmethod
+    async def get_account_ledger(self, account_id: str, tenant_id: str, start_date: Optional[Any] = None,
+                                 end_date: Optional[Any] = None, limit: int = 100, cursor: Optional[str] = None) -> Any:
+        """Get one page of an account's booked lines with the running balance."""
+        pass
+
+    @abstractmethod
+    async def get_trial_balance_rows(self, tenant_id: str, start_date: Any, end_date: Any) -> List[Any]:
+        """Debit and credit per account and month of the booked entries in a date range."""
+        pass
+
+
+class JournalImportRepository(BaseRepository[T, TCreate, TUpdate], ABC):
+    """Journal import repository interface"""
+
+    @abstractmethod
+    async def create_import(self, import_id: Any, tenant_id: str, file_name: Optional[str] = None,
+                            post: bool = False) -> T:
+        """Register the import of a stored DATEV file."""
+        pass
+
+    @abstractmethod
+    async def run_import(self, import_id: Any, tenant_id: str, chunk_size: Optional[int] = None) -> Optional[T]:
+        """Run or resume an import in chunked transactions."""
+        pass
+
+    @abstractmethod
+    async def get_errors(self, import_id: Any, tenant_id: str, skip: int = 0, limit: int = 100) -> Any:
+        """Get one offset page of the rows an import rejected."""
+        pass
@@ -3,14 +3,31 @@ Base repository implementation for VALEO-NeuroERP
 SQLAlchemy-based repository following repository pattern
 """
 
+import csv
+import io
 import logging
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Optional, Type, TypeVar, Generic
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, asc
-from sqlalchemy.exc import SQLAlchemyError
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Type, TypeVar, Generic, Union
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, desc, asc, select, update, insert, func, exists, tuple_, bindparam
+from sqlalchemy import inspect as sqlalchemy_inspect
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError, DBAPIError
 
 from ...core.database import Base
+from ...core.replica_routing import RoutingSession
+from ...core.db_telemetry import Explain, plan_rows
+from ...core.search_index import SearchClause, search_indexes
+from .pagination import Page, OffsetPage, NEXT, PREV, encode_cursor, decode_cursor, cursor_value
+from .projection import column_keys, projected_columns, row_dicts
+from .bulk import (
+    BulkResult, CREATE, UPDATE, UPSERT, chunked, coerce_value, error_message, group_by_keys, prepare_row
+)
+from .increments import StaleVersionError
 
 logger = logging.getLogger(__name__)
 
@@ -23,64 +40,444 @@ class BaseRepositoryImpl(Generic[T, TCreate, TUpdate]):
     """
     Base repository implementation using SQLAlchemy.
     Provides common CRUD operations for all entities.
+
+    Works with both an AsyncSession (non-blocking, preferred) and a
+    synchronous Session (fallback). All statements are built with
+    2.0-style select()/update() so they run unchanged on either.
+    When the session belongs to a unit of work, writes are flushed and
+    the unit of work commits once at the end of the request.
+    Reads go through _read() so they can be served by a read replica.
     """
 
-    def __init__(self, session: Session, model_class: Type[T]):
+    # Keyset pagination orders by (cursor_sort_key, id); keep a matching
+    # (tenant_id, cursor_sort_key, id) index on the table
+    cursor_sort_key = 'created_at'
+
+    # Rows per transaction for bulk writes
+    bulk_chunk_size = 1000
+    # Rows per fetch when streaming (export); also the size of the yielded batches
+    stream_batch_size = 2000
+    # Unique column(s) identifying an existing row for bulk_upsert (ON CONFLICT target)
+    upsert_keys: tuple = ()
+    # Integer column incremented by every update() and atomic increment, for
+    # optimistic concurrency (expected_version); None if the table has none
+    version_column: Optional[str] = None
+
+    # Entity cache (see cached_repository.py): lookup method -> column it looks up by,
+    # and write method -> name of its entity id parameter (get_by_id, update and
+    # delete are always covered)
+    cached_lookups: dict = {}
+    cache_invalidating_writes: dict = {}
+
+    def __init__(self, session: Union[AsyncSession, Session], model_class: Type[T]):
         self.session = session
         self.model_class = model_class
 
-    async def get_by_id(self, id: str, tenant_id: str) -> Optional[T]:
-        """Get entity by ID."""
+    # Session helpers (async / sync)
+
+    @property
+    def is_async(self) -> bool:
+        """Whether this repository runs on an AsyncSession."""
+        return isinstance(self.session, AsyncSession)
+
+    async def _execute(self, statement, params: Optional[Any] = None,
+                       read_only: bool = False, tenant_id: Optional[str] = None):
+        """
+        Execute a statement on the underlying session.
+        read_only statements may be routed to a read replica; if the
+        replica fails (connection or operational errors, not errors of the
+        statement itself), the replica is marked unhealthy and the
+        statement is retried on the primary.
+        """
+        bind_arguments = {'read_only': read_only, 'tenant_id': tenant_id}
         try:
-            # Check if model has tenant_id field
-            if hasattr(self.model_class, 'tenant_id'):
-                return self.session.query(self.model_class).filter(
-                    and_(
-                        self.model_class.id == id,
-                        self.model_class.tenant_id == tenant_id,
-                        self.model_class.is_active == True
-                    )
-                ).first()
+            return await self._run(statement, params, bind_arguments)
+        except DBAPIError as e:
+            routing_session = self._routing_session
+            if not (read_only and routing_session is not None and routing_session.replica_failed(e)):
+                raise
+            # Nothing was written yet, so discarding the failed transaction is safe
+            if self.is_async:
+                await self.session.rollback()
             else:
-                return self.session.query(self.model_class).filter(
-                    and_(
-                        self.model_class.id == id,
-                        self.model_class.is_active == True
-                    )
-                ).first()
+                self.session.rollback()
+            return await self._run(statement, params, dict(bind_arguments, force_primary=True))
+
+    async def _run(self, statement, params: Optional[Any], bind_arguments: dict):
+        if self.is_async:
+            return await self.session.execute(statement, params, bind_arguments=bind_arguments)
+        return self.session.execute(statement, params, bind_arguments=bind_arguments)
+
+    @property
+    def _routing_session(self) -> Optional[RoutingSession]:
+        session = self.session.sync_session if self.is_async else self.session
+        return session if isinstance(session, RoutingSession) else None
+
+    def _record_write(self, tenant_id: Optional[str]) -> None:
+        """Keep the tenant's following reads on the primary (ORM flushes carry no tenant)."""
+        routing_session = self._routing_session
+        if routing_session is not None and routing_session.replica_router is not None:
+            routing_session.replica_router.record_write(tenant_id)
+
+    async def _read(self, statement, tenant_id: Optional[str] = None, params: Optional[Any] = None):
+        """Execute a read-only statement (replica eligible)."""
+        return await self._execute(statement, params, read_only=True, tenant_id=tenant_id)
+
+    @property
+    def dialect_name(self) -> str:
+        session = self.session.sync_session if self.is_async else self.session
+        return session.get_bind().dialect.name
+
+    @property
+    def in_unit_of_work(self) -> bool:
+        """Whether the session is owned by a request-scoped unit of work."""
+        return self.session.info.get('unit_of_work') is not None
+
+    @property
+    def in_chunk(self) -> bool:
+        """Whether a chunk transaction (see _chunk_transaction) is open on the session."""
+        return bool(self.session.info.get('chunk'))
+
+    @property
+    def commits_chunks(self) -> bool:
+        """Whether chunks commit on their own: on a standalone session or in a job's unit of work."""
+        unit_of_work = self.session.info.get('unit_of_work')
+        return unit_of_work is None or unit_of_work.commit_chunks
+
+    async def _commit(self) -> None:
+        # Inside a unit of work the request commits once, inside a chunk the
+        # chunk does; repositories only flush
+        if self.in_unit_of_work or self.in_chunk:
+            await self._flush()
+            return
+        if self.is_async:
+            await self.session.commit()
+        else:
+            self.session.commit()
+
+    async def _rollback(self) -> None:
+        # A failed chunk only discards itself, when the error leaves it
+        if self.in_chunk:
+            return
+        if self.in_unit_of_work:
+            self.session.info['unit_of_work'].mark_rollback_only()
+        if self.is_async:
+            await self.session.rollback()
+        else:
+            self.session.rollback()
+
+    async def _flush(self) -> None:
+        if self.is_async:
+            await self.session.flush()
+        else:
+            self.session.flush()
+
+    async def _refresh(self, instance: T) -> None:
+        if self.is_async:
+            await self.session.refresh(instance)
+        else:
+            self.session.refresh(instance)
+
+    @property
+    def search_fields(self) -> tuple:
+        """Columns covered by the model's text search index (app/core/models.py)."""
+        return search_indexes.get(self.model_class.__tablename__, ())
+
+    def _search_clause(self, term: str, prefix: bool = False) -> SearchClause:
+        """Indexed text search (pg_trgm / FTS5) over search_fields."""
+        if not self.search_fields:
+            raise NotImplementedError(f"{self.model_class.__name__} has no search index")
+        return SearchClause(self.model_class, self.search_fields, term, self.dialect_name, prefix)
+
+    def _projection(self, fields: Optional[Sequence[str]], *required: str) -> Optional[list]:
+        """Columns of a sparse fieldset (id and required always included); None selects the entity."""
+        if fields is None:
+            return None
+        return projected_columns(self.model_class, fields, ('id', *required))
+
+    def _scope_conditions(self, tenant_id: Optional[str]) -> list:
+        """Active-record and tenant conditions applied to every query."""
+        conditions = []
+        if hasattr(self.model_class, 'is_active'):
+            conditions.append(self.model_class.is_active == True)
+        # Add tenant filter if model supports it
+        if hasattr(self.model_class, 'tenant_id'):
+            conditions.append(self.model_class.tenant_id == tenant_id)
+        return conditions
+
+    async def _offset_page(self, conditions: list, tenant_id: Optional[str], skip: int, limit: int,
+                           total_mode: str = "exact", ranking: Optional[SearchClause] = None,
+                           fields: Optional[Sequence[str]] = None, order_by: Sequence = (),
+                           options: Sequence = ()) -> OffsetPage[T]:
+        """
+        Fetch one offset page together with the total in a single statement
+        (count(*) OVER() is evaluated before LIMIT/OFFSET).
+        total_mode="estimate" takes the total from the planner instead
+        (PostgreSQL only) and marks it approximate.
+        With a ranking the page is ordered by search relevance, otherwise by order_by.
+        With fields only those columns are selected and the items are dicts;
+        options (loader options) apply to entity pages only.
+        """
+        columns = self._projection(fields)
+        entities = [self.model_class] if columns is None else columns
+
+        def ordered(statement):
+            if columns is None and options:
+                statement = statement.options(*options)
+            if ranking is not None:
+                return ranking.ranked(statement)
+            return statement.order_by(*order_by) if order_by else statement
+
+        def items_of(rows):
+            return [row[0] for row in rows] if columns is None else row_dicts(rows, column_keys(columns))
+
+        if total_mode == "estimate" and self.dialect_name == "postgresql":
+            statement = ordered(select(*entities).where(*conditions)).offset(skip).limit(limit)
+            result = await self._read(statement, tenant_id)
+            items = items_of(result.all())
+            if len(items) < limit and (items or skip == 0):
+                # Last page: the exact total is known without counting
+                return OffsetPage(items, skip + len(items))
+            plan = await self._read(Explain(select(self.model_class.id).where(*conditions)), tenant_id)
+            estimate = plan_rows(plan.scalar())
+            if estimate is not None:
+                return OffsetPage(items, max(estimate, skip + len(items)), approximate=True)
+            return OffsetPage(items, await self._count_where(conditions, tenant_id))
+
+        statement = (
+            ordered(select(*entities, func.count().over().label('total_count')).where(*conditions))
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await self._read(statement, tenant_id)
+        rows = result.all()
+        if rows:
+            return OffsetPage(items_of(rows), rows[0].total_count)
+        # Past the last page the window has no rows to report the total on
+        total = await self._count_where(conditions, tenant_id) if skip > 0 else 0
+        return OffsetPage([], total)
+
+    async def _count_where(self, conditions: list, tenant_id: Optional[str]) -> int:
+        statement = select(func.count()).select_from(self.model_class).where(*conditions)
+        result = await self._read(statement, tenant_id)
+        return result.scalar() or 0
+
+    async def _keyset_page(self, conditions: list, tenant_id: Optional[str],
+                           limit: int, cursor: Optional[str] = None,
+                           fields: Optional[Sequence[str]] = None, options: Sequence = ()) -> Page[T]:
+        """
+        Fetch one page after (or before) the cursor position.
+        Seeks on the (sort key, id) index instead of skipping rows, so the
+        cost per page is independent of how deep the page is.
+        With fields only those columns (plus the sort key) are selected
+        and the items are dicts; options (loader options) apply to entity pages only.
+        """
+        sort_column = getattr(self.model_class, self.cursor_sort_key)
+        id_column = self.model_class.id
+        position = tuple_(sort_column, id_column)
+        columns = self._projection(fields, self.cursor_sort_key)
+
+        entities = [self.model_class] if columns is None else columns
+        statement = select(*entities).where(*conditions)
+        if columns is None and options:
+            statement = statement.options(*options)
+        direction = NEXT
+        if cursor:
+            sort_raw, id_raw, direction = decode_cursor(cursor)
+            boundary = (cursor_value(sort_column, sort_raw), cursor_value(id_column, id_raw))
+            statement = statement.where(position > boundary if direction == NEXT else position < boundary)
+
+        if direction == NEXT:
+            statement = statement.order_by(sort_column.asc(), id_column.asc())
+        else:
+            statement = statement.order_by(sort_column.desc(), id_column.desc())
+
+        # One extra row tells whether there is a page beyond this one
+        result = await self._read(statement.limit(limit + 1), tenant_id)
+        if columns is None:
+            items = list(result.scalars().all())
+        else:
+            items = row_dicts(result.all(), column_keys(columns))
+        has_more = len(items) > limit
+        items = items[:limit]
+        if direction == PREV:
+            items.reverse()
+
+        has_next = has_more if direction == NEXT else True
+        has_prev = bool(cursor) if direction == NEXT else has_more
+        if not items:
+            return Page([], None, None)
+        return Page(
+            items,
+            next_cursor=self._cursor_for(items[-1], NEXT) if has_next else None,
+            prev_cursor=self._cursor_for(items[0], PREV) if has_prev else None,
+        )
+
+    def _cursor_for(self, instance: Union[T, dict], direction: str) -> str:
+        if isinstance(instance, dict):
+            return encode_cursor(instance[self.cursor_sort_key], instance['id'], direction)
+        return encode_cursor(getattr(instance, self.cursor_sort_key), instance.id, direction)
+
+    @staticmethod
+    def _to_dict(data: Any, exclude_unset: bool = False) -> dict:
+        """Convert a Pydantic model or mapping to a plain dict."""
+        if hasattr(data, 'model_dump'):
+            return data.model_dump(exclude_unset=exclude_unset)
+        return dict(data) if hasattr(data, '__dict__') else data
+
+    # CRUD operations
+
+    async def get_by_id(self, id: str, tenant_id: str,
+                        fields: Optional[Sequence[str]] = None) -> Optional[Union[T, dict]]:
+        """Get entity by ID (only the given fields as a dict if fields is set)."""
+        columns = self._projection(fields)
+        try:
+            entities = [self.model_class] if columns is None else columns
+            statement = select(*entities).where(
+                and_(self.model_class.id == id, *self._scope_conditions(tenant_id))
+            )
+            result = await self._read(statement, tenant_id)
+            if columns is not None:
+                row = result.first()
+                return None if row is None else dict(zip(column_keys(columns), row))
+            return result.scalars().first()
         except SQLAlchemyError as e:
             logger.error(f"Error getting {self.model_class.__name__} by ID {id}: {e}")
             return None
 
+    async def get_many(self, ids: Iterable[Any], tenant_id: str) -> Dict[Any, T]:
+        """
+        Entities by id with one query per bulk_chunk_size ids, keyed by id.
+        Duplicate and None ids are ignored; ids not found are left out.
+        """
+        id_column = self.model_class.__table__.c.id
+        keys = list(dict.fromkeys(coerce_value(id_column, id) for id in ids if id is not None))
+        found: Dict[Any, T] = {}
+        try:
+            for _, chunk in chunked(keys, self.bulk_chunk_size):
+                statement = select(self.model_class).where(
+                    self.model_class.id.in_(chunk), *self._scope_conditions(tenant_id)
+                )
+                result = await self._read(statement, tenant_id)
+                found.update((instance.id, instance) for instance in result.scalars().all())
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting {len(keys)} {self.model_class.__name__} entities by ID: {e}")
+            raise
+        return found
+
     async def get_all(self, tenant_id: str, skip: int = 0, limit: int = 100, **kwargs) -> List[T]:
         """Get all entities with pagination and optional filtering."""
         try:
-            query = self.session.query(self.model_class).filter(
-                self.model_class.is_active == True
-            )
-
-            # Add tenant filter if model supports it
-            if hasattr(self.model_class, 'tenant_id'):
-                query = query.filter(self.model_class.tenant_id == tenant_id)
+            statement = select(self.model_class).where(*self._scope_conditions(tenant_id))
 
             # Apply additional filters from kwargs
             for key, value in kwargs.items():
                 if value is not None and hasattr(self.model_class, key):
-                    query = query.filter(getattr(self.model_class, key).ilike(f"%{value}%"))
+                    statement = statement.where(getattr(self.model_class, key).ilike(f"%{value}%"))
 
-            return query.offset(skip).limit(limit).all()
+            result = await self._read(statement.offset(skip).limit(limit), tenant_id)
+            return list(result.scalars().all())
         except SQLAlchemyError as e:
             logger.error(f"Error getting all {self.model_class.__name__}: {e}")
             return []
 
+    async def get_all_with_total(self, tenant_id: str, skip: int = 0, limit: int = 100,
+                                 total_mode: str = "exact", fields: Optional[Sequence[str]] = None,
+                                 **kwargs) -> OffsetPage[T]:
+        """Get one page of entities and the total in a single round trip."""
+        conditions = self._scope_conditions(tenant_id)
+        for key, value in kwargs.items():
+            if value is not None and hasattr(self.model_class, key):
+                conditions.append(getattr(self.model_class, key).ilike(f"%{value}%"))
+        return await self._offset_page(conditions, tenant_id, skip, limit, total_mode, fields=fields)
+
+    async def get_page(self, tenant_id: str, limit: int = 100, cursor: Optional[str] = None,
+                       fields: Optional[Sequence[str]] = None, **kwargs) -> Page[T]:
+        """Get one keyset page (cursor pagination) with optional filtering."""
+        conditions = self._scope_conditions(tenant_id)
+        for key, value in kwargs.items():
+            if value is not None and hasattr(self.model_class, key):
+                conditions.append(getattr(self.model_class, key).ilike(f"%{value}%"))
+        return await self._keyset_page(conditions, tenant_id, limit, cursor, fields)
+
+    async def search(self, tenant_id: str, query: str, limit: int = 20, skip: int = 0) -> List[T]:
+        """Entities matching a text search, most relevant first."""
+        clause = self._search_clause(query)
+        statement = clause.ranked(
+            select(self.model_class).where(*self._scope_conditions(tenant_id), clause.condition)
+        )
+        result = await self._read(statement.offset(skip).limit(limit), tenant_id)
+        return list(result.scalars().all())
+
+    async def autocomplete(self, tenant_id: str, prefix: str, limit: int = 10) -> List[T]:
+        """
+        Entities with a search field starting with prefix (type-ahead).
+        Only id and the search fields are loaded.
+        """
+        clause = self._search_clause(prefix, prefix=True)
+        columns = [getattr(self.model_class, field) for field in self.search_fields]
+        statement = clause.ranked(
+            select(self.model_class)
+            .options(load_only(self.model_class.id, *columns))
+            .where(*self._scope_conditions(tenant_id), clause.condition),
+            exhaustive=False,
+        )
+        result = await self._read(statement.limit(limit), tenant_id)
+        return list(result.scalars().all())
+
+    async def stream(self, tenant_id: str, since: Optional[datetime] = None,
+                     fields: Optional[Sequence[str]] = None,
+                     batch_size: Optional[int] = None) -> AsyncIterator[List[dict]]:
+        """
+        All rows of the tenant as batches of dicts, in (updated_at, id) order.
+
+        Rows are fetched through a server-side cursor (yield_per /
+        stream_results), so memory stays bounded by one batch whatever the
+        size of the tenant. Soft-deleted rows are included (is_active and
+        deleted_at tell), so incremental pulls see deletions: pass the
+        updated_at of the last row received as since to get every row
+        changed at or after it (rows at exactly that instant come again).
+        """
+        columns = self._stream_columns(fields)
+        keys = column_keys(columns)
+        batch_size = batch_size or self.stream_batch_size
+        updated_at = self.model_class.updated_at
+
+        statement = select(*columns).where(self.model_class.tenant_id == tenant_id)
+        if since is not None:
+            statement = statement.where(updated_at >= since)
+        statement = statement.order_by(updated_at.asc(), self.model_class.id.asc())
+        async for partition in self._stream_partitions(statement, tenant_id, batch_size):
+            yield row_dicts(partition, keys)
+
+    async def _stream_partitions(self, statement, tenant_id: str, batch_size: int) -> AsyncIterator[list]:
+        """The rows of a statement in batches of batch_size, through a server-side cursor."""
+        statement = statement.execution_options(yield_per=batch_size)
+        bind_arguments = {'read_only': True, 'tenant_id': tenant_id}
+        if self.is_async:
+            result = await self.session.stream(statement, bind_arguments=bind_arguments)
+            async for partition in result.partitions():
+                yield partition
+        else:
+            result = self.session.execute(statement, bind_arguments=bind_arguments)
+            for partition in result.partitions():
+                yield partition
+
+    def _stream_columns(self, fields: Optional[Sequence[str]]) -> list:
+        if fields is None:
+            return [getattr(self.model_class, attribute.key)
+                    for attribute in sqlalchemy_inspect(self.model_class).column_attrs]
+        # updated_at is the position of an incremental pull
+        return self._projection(fields, 'updated_at')
+
+    def stream_fields(self, fields: Optional[Sequence[str]] = None) -> List[str]:
+        """Keys of the rows stream() yields for fields (raises InvalidFieldsError for unknown ones)."""
+        return column_keys(self._stream_columns(fields))
+
     async def create(self, data: TCreate, tenant_id: str) -> T:
         """Create a new entity."""
         try:
-            # Convert data to dict if it's a Pydantic model
-            if hasattr(data, 'model_dump'):
-                data_dict = data.model_dump()
-            else:
-                data_dict = dict(data) if hasattr(data, '__dict__') else data
+            data_dict = self._to_dict(data)
 
             # Add tenant_id if model supports it
             if hasattr(self.model_class, 'tenant_id'):
@@ -89,92 +486,397 @@ class BaseRepositoryImpl(Generic[T, TCreate, TUpdate]):
             # Create instance
             instance = self.model_class(**data_dict)
             self.session.add(instance)
-            self.session.commit()
-            self.session.refresh(instance)
+            self._record_write(tenant_id)
+            await self._commit()
+            await self._refresh(instance)
 
             logger.info(f"Created {self.model_class.__name__} with ID {instance.id}")
             return instance
         except SQLAlchemyError as e:
-            self.session.rollback()
+            await self._rollback()
             logger.error(f"Error creating {self.model_class.__name__}: {e}")
             raise
 
     async def update(self, id: str, data: TUpdate, tenant_id: str) -> Optional[T]:
         """Update an existing entity."""
         try:
-            # Convert data to dict if it's a Pydantic model
-            if hasattr(data, 'model_dump'):
-                data_dict = data.model_dump(exclude_unset=True)
-            else:
-                data_dict = dict(data) if hasattr(data, '__dict__') else data
+            data_dict = self._to_dict(data, exclude_unset=True)
 
-            # Build query
-            query = self.session.query(self.model_class).filter(
-                self.model_class.id == id,
-                self.model_class.is_active == True
+            statement = (
+                update(self.model_class)
+                .where(self.model_class.id == id, *self._scope_conditions(tenant_id))
+                .values(**data_dict, **self._version_bump())
             )
+            result = await self._execute(statement, tenant_id=tenant_id)
+            await self._commit()
 
-            # Add tenant filter if model supports it
-            if hasattr(self.model_class, 'tenant_id'):
-                query = query.filter(self.model_class.tenant_id == tenant_id)
-
-            # Update
-            result = query.update(data_dict)
-            self.session.commit()
-
-            if result > 0:
+            if result.rowcount > 0:
                 # Return updated instance
                 return await self.get_by_id(id, tenant_id)
             else:
                 return None
         except SQLAlchemyError as e:
-            self.session.rollback()
+            await self._rollback()
             logger.error(f"Error updating {self.model_class.__name__} {id}: {e}")
             raise
 
     async def delete(self, id: str, tenant_id: str) -> bool:
         """Soft delete an entity."""
         try:
-            # Build query
-            query = self.session.query(self.model_class).filter(
-                self.model_class.id == id,
-                self.model_class.is_active == True
-            )
-
-            # Add tenant filter if model supports it
-            if hasattr(self.model_class, 'tenant_id'):
-                query = query.filter(self.model_class.tenant_id == tenant_id)
+            values = {'is_active': False}
+            if hasattr(self.model_class, 'deleted_at'):
+                values['deleted_at'] = datetime.utcnow()
 
             # Soft delete
-            result = query.update({
-                'is_active': False,
-                'deleted_at': datetime.utcnow()
-            })
-            self.session.commit()
+            statement = (
+                update(self.model_class)
+                .where(self.model_class.id == id, *self._scope_conditions(tenant_id))
+                .values(**values)
+            )
+            result = await self._execute(statement, tenant_id=tenant_id)
+            await self._commit()
 
-            success = result > 0
+            success = result.rowcount > 0
             if success:
                 logger.info(f"Soft deleted {self.model_class.__name__} {id}")
             return success
         except SQLAlchemyError as e:
-            self.session.rollback()
+            await self._rollback()
             logger.error(f"Error deleting {self.model_class.__name__} {id}: {e}")
             raise
 
-    async def exists(self, id: str, tenant_id: str) -> bool:
-        """Check if entity exists."""
+    # Atomic increments
+    #
+    # Deltas are applied by the database in one UPDATE ... SET x = x + :delta
+    # RETURNING statement, so concurrent writers never overwrite each other
+    # and the row lock is held for that statement only, not across a
+    # read-modify-write round trip.
+
+    def _version_bump(self) -> dict:
+        if self.version_column is None:
+            return {}
+        return {self.version_column: getattr(self.model_class, self.version_column) + 1}
+
+    async def _increment(self, id: str, tenant_id: str, values: dict, returning: Sequence = (),
+                         expected_version: Optional[int] = None):
+        """
+        Apply the column expressions in values to one entity. Returns the
+        RETURNING row (id, *returning) or None if the entity does not exist.
+        With expected_version the update only applies at that version and
+        raises StaleVersionError if the entity has moved on.
+        """
+        conditions = [self.model_class.id == id, *self._scope_conditions(tenant_id)]
+        if expected_version is not None:
+            if self.version_column is None:
+                raise ValueError(f"{self.model_class.__name__} has no version column")
+            conditions.append(getattr(self.model_class, self.version_column) == expected_version)
+        try:
+            rows = await self._update_returning(conditions, values, tenant_id, returning)
+            await self._commit()
+        except SQLAlchemyError as e:
+            await self._rollback()
+            logger.error(f"Error incrementing {self.model_class.__name__} {id}: {e}")
+            raise
+
+        if rows:
+            return rows[0]
+        if expected_version is not None and await self.exists(id, tenant_id):
+            raise StaleVersionError(self.model_class.__name__, id, expected_version)
+        return None
+
+    async def _increment_many(self, deltas: dict, tenant_id: str, values_for, returning: Sequence = (),
+                              chunk_size: Optional[int] = None) -> dict:
+        """
+        Apply aggregated deltas ({id: delta}) with one UPDATE per chunk of
+        ids; values_for(delta) builds the column expressions from the
+        per-row CASE delta. Returns {id: RETURNING row} for the entities
+        found. All chunks share one transaction.
+        """
+        rows = []
+        try:
+            for _, items in chunked(list(deltas.items()), chunk_size or self.bulk_chunk_size):
+                chunk = dict(items)
+                conditions = [self.model_class.id.in_(list(chunk)), *self._scope_conditions(tenant_id)]
+                rows.extend(await self._update_returning(conditions, values_for(chunk), tenant_id, returning))
+            await self._commit()
+        except SQLAlchemyError as e:
+            await self._rollback()
+            logger.error(f"Error incrementing {len(deltas)} {self.model_class.__name__} rows: {e}")
+            raise
+        return {row.id: row for row in rows}
+
+    async def _update_returning(self, conditions: list, values: dict, tenant_id: str,
+                                returning: Sequence) -> list:
+        columns = [self.model_class.id, *returning]
+        if self.version_column is not None:
+            columns.append(getattr(self.model_class, self.version_column))
+        statement = (
+            update(self.model_class)
+            .where(*conditions)
+            .values(**values, **self._version_bump())
+            .returning(*columns)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self._execute(statement, tenant_id=tenant_id)
+        rows = result.all()
+        self._synchronize_loaded(rows)
+        return rows
+
+    def _synchronize_loaded(self, rows: list) -> None:
+        """Copy RETURNING values onto instances already loaded in the session."""
+        session = self.session.sync_session if self.is_async else self.session
+        for row in rows:
+            instance = session.identity_map.get(session.identity_key(self.model_class, row.id))
+            if instance is not None:
+                for key, value in row._mapping.items():
+                    set_committed_value(instance, key, value)
+
+    # Bulk operations
+    #
+    # Rows are written in chunks of bulk_chunk_size, each chunk in its own
+    # chunk transaction (see _chunk_transaction), so a failing chunk never
+    # discards the chunks written before it or the request's other writes.
+    # A failing chunk is retried row by row to report exactly which rows
+    # were rejected.
+
+    async def bulk_create(self, rows: List[Any], tenant_id: str, chunk_size: Optional[int] = None,
+                          indexes: Optional[List[int]] = None) -> BulkResult:
+        """
+        Insert many entities. Uses COPY on PostgreSQL (psycopg2/asyncpg)
+        and a single executemany INSERT per chunk elsewhere.
+        indexes are the rows' positions in the client's batch (default 0..n-1).
+        """
+        return await self._bulk(CREATE, rows, tenant_id, chunk_size, indexes)
+
+    async def bulk_update(self, rows: List[Any], tenant_id: str, chunk_size: Optional[int] = None,
+                          indexes: Optional[List[int]] = None) -> BulkResult:
+        """Update many entities by id; each row holds the id and the fields to change."""
+        return await self._bulk(UPDATE, rows, tenant_id, chunk_size, indexes)
+
+    async def bulk_upsert(self, rows: List[Any], tenant_id: str, chunk_size: Optional[int] = None,
+                          indexes: Optional[List[int]] = None) -> BulkResult:
+        """
+        Insert many entities or update the existing ones matched by upsert_keys
+        (INSERT ... ON CONFLICT DO UPDATE). Only the fields present in a row
+        are updated; rows whose key belongs to another tenant are left untouched.
+        """
+        if not self.upsert_keys:
+            raise NotImplementedError(f"{self.model_class.__name__} has no upsert key")
+        return await self._bulk(UPSERT, rows, tenant_id, chunk_size, indexes)
+
+    async def _bulk(self, operation: str, rows: List[Any], tenant_id: str,
+                    chunk_size: Optional[int], indexes: Optional[List[int]]) -> BulkResult:
+        table = self.model_class.__table__
+        indexes = list(indexes) if indexes is not None else list(range(len(rows)))
+        result = BulkResult(operation, len(rows))
+
+        for offset, chunk in chunked(rows, chunk_size or self.bulk_chunk_size):
+            prepared, prepared_indexes, provided = [], [], []
+            for index, data in zip(indexes[offset:offset + len(chunk)], chunk):
+                try:
+                    data = dict(self._to_dict(data, exclude_unset=operation == UPDATE))
+                    if operation == UPDATE:
+                        if data.get('id') is None:
+                            raise ValueError("Missing id")
+                        data.pop('tenant_id', None)
+                    elif 'tenant_id' in table.c:
+                        data['tenant_id'] = tenant_id
+                    prepared.append(prepare_row(table, data, apply_defaults=operation != UPDATE))
+                    provided.append(frozenset(data))
+                    prepared_indexes.append(index)
+                except ValueError as e:
+                    result.add_error(index, e)
+            if prepared:
+                result.merge(await self._bulk_chunk(operation, prepared, prepared_indexes, provided, tenant_id))
+
+        self._record_write(tenant_id)
+        logger.info(
+            f"Bulk {operation} of {result.total} {self.model_class.__name__} rows: "
+            f"{result.succeeded} succeeded, {result.failed} failed in {result.chunks} chunk(s)"
+        )
+        return result
+
+    async def _bulk_chunk(self, operation: str, rows: List[dict], indexes: List[int],
+                          provided: List[frozenset], tenant_id: str) -> BulkResult:
+        result = BulkResult(operation, len(rows))
+        result.chunks = 1
         try:
-            # Build query
-            query = self.session.query(self.model_class).filter(
-                self.model_class.id == id,
-                self.model_class.is_active == True
+            async with self._chunk_transaction():
+                result.succeeded = await self._bulk_write(operation, rows, indexes, provided, tenant_id, result)
+            return result
+        except SQLAlchemyError as e:
+            logger.warning(
+                f"Bulk {operation} chunk of {len(rows)} {self.model_class.__name__} rows failed, "
+                f"retrying row by row: {error_message(e)}"
             )
 
-            # Add tenant filter if model supports it
-            if hasattr(self.model_class, 'tenant_id'):
-                query = query.filter(self.model_class.tenant_id == tenant_id)
+        # Pinpoint the rejected rows; the others are written one by one
+        result = BulkResult(operation, len(rows))
+        result.chunks = 1
+        for row, index, keys in zip(rows, indexes, provided):
+            try:
+                async with self._chunk_transaction():
+                    result.succeeded += await self._bulk_write(operation, [row], [index], [keys], tenant_id, result)
+            except SQLAlchemyError as e:
+                result.add_error(index, e)
+        return result
+
+    async def _bulk_write(self, operation: str, rows: List[dict], indexes: List[int],
+                          provided: List[frozenset], tenant_id: str, result: BulkResult) -> int:
+        """Write one chunk inside the current transaction; returns the rows written."""
+        table = self.model_class.__table__
+
+        if operation == CREATE:
+            if self._copy_supported:
+                await self._copy_rows(rows, tenant_id)
+            else:
+                await self._execute(insert(table), rows, tenant_id=tenant_id)
+            return len(rows)
+
+        if operation == UPSERT:
+            for keys, (group_rows, _) in group_by_keys(rows, indexes, provided).items():
+                await self._execute(self._upsert_statement(keys), group_rows, tenant_id=tenant_id)
+            return len(rows)
+
+        # UPDATE: ids that do not exist (for this tenant) are reported, not silently skipped
+        id_column = table.c.id
+        tenant = coerce_value(table.c.tenant_id, tenant_id) if 'tenant_id' in table.c else tenant_id
+        conditions = self._scope_conditions(tenant)
+        found = await self._execute(
+            select(id_column).where(id_column.in_([row['id'] for row in rows]), *conditions),
+            tenant_id=tenant_id,
+        )
+        existing = set(found.scalars().all())
+
+        written = 0
+        for keys, (group_rows, group_indexes) in group_by_keys(rows, indexes).items():
+            columns = sorted(keys - {'id', 'tenant_id'})
+            params = []
+            for row, index in zip(group_rows, group_indexes):
+                if row['id'] not in existing:
+                    result.add_error(index, f"{self.model_class.__name__} {row['id']} not found")
+                elif not columns:
+                    result.add_error(index, "No fields to update")
+                else:
+                    params.append({'b_id': row['id'], **{f"b_{c}": row[c] for c in columns}})
+            if not params:
+                continue
+            statement = (
+                update(table)
+                .where(id_column == bindparam('b_id'), *conditions)
+                .values({c: bindparam(f"b_{c}") for c in columns})
+            )
+            await self._execute(statement, params, tenant_id=tenant_id)
+            written += len(params)
+        return written
+
+    def _insert_statement(self):
+        """Dialect INSERT of the table, supporting ON CONFLICT."""
+        table = self.model_class.__table__
+        if self.dialect_name == 'postgresql':
+            return postgresql_insert(table)
+        if self.dialect_name == 'sqlite':
+            return sqlite_insert(table)
+        raise NotImplementedError(f"Upsert is not supported on {self.dialect_name}")
+
+    def _generated_id(self):
+        """A new random UUID per row, generated by the database (for INSERT ... SELECT)."""
+        if self.dialect_name == 'postgresql':
+            return func.gen_random_uuid()
+        if self.dialect_name == 'sqlite':
+            # UUIDs are stored as 32 hex digits
+            return func.lower(func.hex(func.randomblob(16)))
+        raise NotImplementedError(f"Generated ids are not supported on {self.dialect_name}")
+
+    def _upsert_statement(self, keys: frozenset):
+        """INSERT ... ON CONFLICT (upsert_keys) DO UPDATE of the provided columns."""
+        table = self.model_class.__table__
+        statement = self._insert_statement()
+        excluded = statement.excluded
+        fixed = set(self.upsert_keys) | {'id', 'tenant_id', 'created_at'}
+        values = {c: excluded[c] for c in sorted(keys) if c not in fixed}
+        if 'updated_at' in table.c:
+            values['updated_at'] = excluded.updated_at
+        return statement.on_conflict_do_update(
+            index_elements=list(self.upsert_keys),
+            set_=values,
+            where=(table.c.tenant_id == excluded.tenant_id) if 'tenant_id' in table.c else None,
+        )
+
+    @property
+    def _copy_supported(self) -> bool:
+        session = self.session.sync_session if self.is_async else self.session
+        dialect = session.get_bind().dialect
+        return dialect.name == 'postgresql' and dialect.driver in ('psycopg2', 'asyncpg')
 
-            return self.session.query(query.exists()).scalar()
+    async def _copy_rows(self, rows: List[dict], tenant_id: str) -> None:
+        """Stream a prepared chunk with COPY ... FROM STDIN (COPY is atomic per chunk)."""
+        table = self.model_class.__table__
+        columns = [column.key for column in table.c]
+        bind_arguments = {'tenant_id': tenant_id, 'force_primary': True}
+
+        if self.is_async:
+            connection = await self.session.connection(bind_arguments=bind_arguments)
+            raw = await connection.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                table.name, schema_name=table.schema, columns=columns,
+                records=[tuple(row[c] for c in columns) for row in rows],
+            )
+            return
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(['\\N' if row[c] is None else row[c] for c in columns])
+        buffer.seek(0)
+        connection = self.session.connection(bind_arguments=bind_arguments)
+        with connection.connection.dbapi_connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {table.fullname} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer,
+            )
+
+    @asynccontextmanager
+    async def _chunk_transaction(self) -> AsyncIterator[None]:
+        """
+        Run a block as one chunk: the writes of every repository sharing the
+        session (their own commits only flush) are kept together, or rolled
+        back if the block raises. Inside a request's unit of work the chunk is
+        a savepoint, so the request still commits or rolls back once; on a
+        standalone session or in a job's unit of work (commit_chunks) it is a
+        transaction of its own.
+        """
+        savepoint = None
+        if not self.commits_chunks:
+            savepoint = await self.session.begin_nested() if self.is_async else self.session.begin_nested()
+        self.session.info['chunk'] = True
+        try:
+            yield
+        except BaseException:
+            self.session.info.pop('chunk', None)
+            await self._end_chunk(savepoint, commit=False)
+            raise
+        self.session.info.pop('chunk', None)
+        await self._end_chunk(savepoint, commit=True)
+
+    async def _end_chunk(self, savepoint, commit: bool) -> None:
+        # Only the savepoint inside a request's unit of work, the transaction otherwise
+        transaction = savepoint if savepoint is not None else self.session
+        if self.is_async:
+            await (transaction.commit() if commit else transaction.rollback())
+        elif commit:
+            transaction.commit()
+        else:
+            transaction.rollback()
+
+    async def exists(self, id: str, tenant_id: str) -> bool:
+        """Check if entity exists."""
+        try:
+            statement = select(
+                exists().where(self.model_class.id == id, *self._scope_conditions(tenant_id))
+            )
+            result = await self._read(statement, tenant_id)
+            return bool(result.scalar())
         except SQLAlchemyError as e:
             logger.error(f"Error checking existence of {self.model_class.__name__} {id}: {e}")
             return False
@@ -182,15 +884,11 @@ class BaseRepositoryImpl(Generic[T, TCreate, TUpdate]):
     async def count(self, tenant_id: str) -> int:
         """Count entities for tenant."""
         try:
-            query = self.session.query(self.model_class).filter(
-                self.model_class.is_active == True
+            statement = select(func.count()).select_from(self.model_class).where(
+                *self._scope_conditions(tenant_id)
             )
-
-            # Add tenant filter if model supports it
-            if hasattr(self.model_class, 'tenant_id'):
-                query = query.filter(self.model_class.tenant_id == tenant_id)
-
-            return query.count()
+            result = await self._read(statement, tenant_id)
+            return result.scalar() or 0
         except SQLAlchemyError as e:
             logger.error(f"Error counting {self.model_class.__name__}: {e}")
-            return 0
\ No newline at end of file
+            return 0
@@ -0,0 +1,138 @@
+"""
+Bulk write results for VALEO-NeuroERP repositories
+Row preparation (coercion, Python-side defaults) and per-row error
+reporting for bulk_create / bulk_update / bulk_upsert
+"""
+
+import uuid
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional
+
+CREATE = "create"
+UPDATE = "update"
+UPSERT = "upsert"
+
+
+class RowError:
+    """A row that was rejected, by its position in the submitted batch."""
+
+    def __init__(self, index: int, error: str):
+        self.index = index
+        self.error = error
+
+
+class BulkResult:
+    """Outcome of one bulk operation."""
+
+    def __init__(self, operation: str, total: int = 0):
+        self.operation = operation
+        self.total = total
+        self.succeeded = 0
+        self.errors: List[RowError] = []
+        self.chunks = 0
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+    def add_error(self, index: int, error: Any) -> None:
+        self.errors.append(RowError(index, error_message(error)))
+
+    def merge(self, other: "BulkResult") -> None:
+        self.succeeded += other.succeeded
+        self.errors.extend(other.errors)
+        self.chunks += other.chunks
+
+
+def error_message(error: Any) -> str:
+    """Short, client-facing message for a database or validation error."""
+    original = getattr(error, 'orig', None)
+    message = str(original if original is not None else error)
+    # Drop the driver's DETAIL/statement echo, the first line names the constraint
+    return message.strip().splitlines()[0] if message.strip() else error.__class__.__name__
+
+
+def _python_type(column) -> Optional[type]:
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return None
+
+
+def coerce_value(column, value: Any, python_type: Optional[type] = None) -> Any:
+    """Convert a JSON-ish value (str ids, str decimals) to the column's Python type."""
+    if value is None:
+        return None
+    python_type = python_type or _python_type(column)
+    if python_type is None or isinstance(value, python_type):
+        return value
+    try:
+        if python_type is uuid.UUID:
+            return uuid.UUID(str(value))
+        if python_type is Decimal:
+            return Decimal(str(value))
+        if python_type is datetime and isinstance(value, str):
+            return datetime.fromisoformat(value)
+        if python_type is date and isinstance(value, str):
+            return date.fromisoformat(value)
+    except (ValueError, TypeError, InvalidOperation) as e:
+        raise ValueError(f"Invalid value for {column.key}: {value!r}") from e
+    return value
+
+
+def column_default(column) -> Any:
+    """Evaluate a column's Python-side default (scalar or zero-argument callable)."""
+    default = column.default
+    if default is None:
+        return None
+    if default.is_callable:
+        return default.arg(None)
+    if default.is_scalar:
+        return default.arg
+    return None
+
+
+# table -> {column key: (column, python type)}; resolved once per table
+_column_types: Dict[Any, Dict[str, tuple]] = {}
+
+
+def prepare_row(table, data: Dict[str, Any], apply_defaults: bool = True) -> Dict[str, Any]:
+    """
+    Coerce a row to column types; unknown keys are rejected.
+    With apply_defaults every column gets a value (default or None) so all
+    rows of a chunk share one parameter set for executemany / COPY.
+    """
+    columns = _column_types.get(table)
+    if columns is None:
+        columns = _column_types[table] = {column.key: (column, _python_type(column)) for column in table.c}
+
+    row = {}
+    for key, value in data.items():
+        entry = columns.get(key)
+        if entry is None:
+            unknown = sorted(set(data) - set(columns))
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+        row[key] = coerce_value(entry[0], value, entry[1])
+    if apply_defaults and len(row) < len(columns):
+        for key, (column, _) in columns.items():
+            if key not in row:
+                row[key] = column_default(column)
+    return row
+
+
+def chunked(items: List[Any], size: int):
+    """Yield (offset, slice) pairs of at most size items."""
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
+
+
+def group_by_keys(rows: List[Dict[str, Any]], indexes: List[int], provided: Optional[List[frozenset]] = None):
+    """Group rows by their key set (executemany needs one parameter set per statement)."""
+    groups: Dict[frozenset, tuple] = {}
+    for position, row in enumerate(rows):
+        keys = provided[position] if provided is not None else frozenset(row)
+        group_rows, group_indexes = groups.setdefault(keys, ([], []))
+        group_rows.append(row)
+        group_indexes.append(indexes[position])
+    return groups
@@ -0,0 +1,261 @@
+"""
+Cached repositories for VALEO-NeuroERP
+Read-through entity caching and lookup coalescing around a repository implementation
+"""
+
+import inspect
+import logging
+import uuid
+from functools import wraps
+from typing import Any, Optional, Sequence
+
+from ...core.config import settings
+from .increments import ids_of, materialize
+from .entity_cache import (
+    EntityCache, dump_entity, entity_cache, entity_tag, load_entity, missing_tag, tenant_tag
+)
+from .projection import column_keys, projected_columns
+from .single_flight import SingleFlight, single_flight
+
+logger = logging.getLogger(__name__)
+
+# session.info key of the tags written by the session's open transaction
+PENDING_TAGS = 'entity_cache_pending'
+
+# Shared value of a coalesced lookup that found nothing
+_MISSING = ""
+
+
+def _normalize(value: Any) -> str:
+    """Key form of an id or tenant (UUID objects and their strings hit the same entry)."""
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return str(value)
+
+
+class CachedRepository:
+    """
+    Serves get_by_id and the repository's cached_lookups from the entity
+    cache and invalidates the entity's tags on every write.
+
+    Lookups that reach the database are coalesced: concurrent identical
+    lookups (same field, value and tenant) share one query, and a lookup
+    that found nothing is remembered for CACHE_NEGATIVE_TTL seconds
+    (dropped on create, update and bulk writes of the tenant).
+
+    Everything else is delegated to the wrapped repository unchanged.
+    Cached entities are returned detached (read-only use, as in the
+    endpoints); writes always go through the wrapped repository.
+
+    Inside a unit of work the invalidated tags stay pending until the
+    request commits: later reads of that request bypass the cache (they
+    see the uncommitted state), and the tags are invalidated once more
+    after the commit, so no other request keeps a value read before it.
+    """
+
+    def __init__(self, repository, cache: EntityCache = entity_cache,
+                 flights: Optional[SingleFlight] = single_flight):
+        self._repository = repository
+        self._cache = cache
+        self._flights = flights
+        self._model = repository.model_class
+        self._table = self._model.__tablename__
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._repository, name)
+        if name in self._repository.cached_lookups:
+            return self._cached_lookup(attribute, self._repository.cached_lookups[name])
+        if name in self._repository.cache_invalidating_writes:
+            return self._invalidating_write(attribute, self._repository.cache_invalidating_writes[name])
+        return attribute
+
+    @property
+    def repository(self):
+        """The wrapped repository."""
+        return self._repository
+
+    # Tags
+
+    def _entity_tag(self, entity_id: Any) -> str:
+        return entity_tag(self._table, _normalize(entity_id))
+
+    def _tenant_tag(self, tenant_id: Any) -> str:
+        return tenant_tag(self._table, _normalize(tenant_id))
+
+    def _missing_tag(self, tenant_id: Any) -> str:
+        return missing_tag(self._table, _normalize(tenant_id))
+
+    @property
+    def _pending(self) -> Optional[set]:
+        return self._repository.session.info.get(PENDING_TAGS)
+
+    async def _invalidate(self, tags: tuple) -> None:
+        await self._cache.invalidate(self._table, tags)
+        unit_of_work = self._repository.session.info.get('unit_of_work')
+        if unit_of_work is None:
+            return
+        pending = self._pending
+        if pending is None:
+            pending = self._repository.session.info[PENDING_TAGS] = set()
+            unit_of_work.after_complete(self._after_complete)
+        pending.update(tags)
+
+    async def _after_complete(self, committed: bool) -> None:
+        pending = self._repository.session.info.pop(PENDING_TAGS, None)
+        if not committed or not pending:
+            return
+        # The set is shared by all cached repositories of the session; tags name their table
+        by_table = {}
+        for tag in pending:
+            by_table.setdefault(tag.split(':', 2)[1], []).append(tag)
+        for table, tags in by_table.items():
+            await self._cache.invalidate(table, tags)
+
+    # Reads
+
+    async def _lookup(self, field: str, value: Any, tenant_id: Any, load):
+        # After a write the session must see its own uncommitted state: no cache, no shared flights
+        if self._pending:
+            return await load()
+
+        tenant = _normalize(tenant_id)
+        key = self._cache.key(self._model, field, _normalize(value), tenant)
+        if self._cache.is_known_miss(key):
+            if self._flights is not None:
+                self._flights.metrics.record(key, "negative_hits")
+            return None
+        if self._cache.enabled:
+            payload = await self._cache.get(self._table, key)
+            if payload is not None:
+                return load_entity(self._model, payload)
+
+        if self._flights is None:
+            instance, _ = await self._load(key, tenant, load)
+            return instance
+        result, leader = await self._flights.run(key, lambda: self._load(key, tenant, load))
+        if leader:
+            return result
+        if result == _MISSING:
+            return None
+        if result is None:
+            # The leader's entity could not be shared (not fully loaded)
+            return await load()
+        return load_entity(self._model, result)
+
+    async def _load(self, key: str, tenant: str, load):
+        """Query the database and fill the cache; returns (entity, value shared with coalesced callers)."""
+        instance = await load()
+        if instance is None:
+            self._cache.remember_miss(key, (self._missing_tag(tenant),))
+            return None, _MISSING
+        payload = dump_entity(instance)
+        if payload is not None and self._cache.enabled:
+            # Also reachable by id once looked up by another field
+            keys = {key, self._cache.key(self._model, 'id', _normalize(instance.id), tenant)}
+            tags = (self._entity_tag(instance.id), self._tenant_tag(tenant))
+            await self._cache.set(self._table, keys, payload, tags)
+        return instance, payload
+
+    async def get_by_id(self, id: str, tenant_id: str, fields: Optional[Sequence[str]] = None):
+        """Get entity by ID (read-through); a sparse fieldset is projected from the cached entity."""
+        keys = None if fields is None else column_keys(projected_columns(self._model, fields))
+        instance = await self._lookup('id', id, tenant_id, lambda: self._repository.get_by_id(id, tenant_id))
+        if instance is None or keys is None:
+            return instance
+        return {key: getattr(instance, key) for key in keys}
+
+    async def get_many(self, ids, tenant_id: str) -> dict:
+        """Get entities by ID: cached ones from the entity cache, the rest with one get_many query."""
+        if self._pending or not self._cache.enabled:
+            return await self._repository.get_many(ids, tenant_id)
+        tenant = _normalize(tenant_id)
+        keys = {
+            self._cache.key(self._model, 'id', _normalize(id), tenant): id
+            for id in ids if id is not None
+        }
+        payloads = await self._cache.get_many(self._table, list(keys))
+        found = {}
+        for key, payload in payloads.items():
+            instance = load_entity(self._model, payload)
+            found[instance.id] = instance
+        missing = [id for key, id in keys.items() if key not in payloads]
+        if missing:
+            loaded = await self._repository.get_many(missing, tenant_id)
+            for instance in loaded.values():
+                payload = dump_entity(instance)
+                if payload is not None:
+                    await self._cache.set(
+                        self._table, (self._cache.key(self._model, 'id', _normalize(instance.id), tenant),),
+                        payload, (self._entity_tag(instance.id), self._tenant_tag(tenant)),
+                    )
+            found.update(loaded)
+        return found
+
+    def _cached_lookup(self, method, field: str):
+        @wraps(method)
+        async def lookup(value, tenant_id, *args, **kwargs):
+            return await self._lookup(field, value, tenant_id, lambda: method(value, tenant_id, *args, **kwargs))
+        return lookup
+
+    # Writes
+
+    async def create(self, data: Any, tenant_id: str):
+        try:
+            return await self._repository.create(data, tenant_id)
+        finally:
+            await self._invalidate((self._missing_tag(tenant_id),))
+
+    async def update(self, id: str, data: Any, tenant_id: str):
+        try:
+            return await self._repository.update(id, data, tenant_id)
+        finally:
+            # An update may change a looked-up field (number, barcode) into a missing one
+            await self._invalidate((self._entity_tag(id), self._missing_tag(tenant_id)))
+
+    async def delete(self, id: str, tenant_id: str) -> bool:
+        try:
+            return await self._repository.delete(id, tenant_id)
+        finally:
+            await self._invalidate((self._entity_tag(id),))
+
+    async def bulk_create(self, rows, tenant_id: str, chunk_size: Optional[int] = None, indexes=None):
+        try:
+            return await self._repository.bulk_create(rows, tenant_id, chunk_size, indexes)
+        finally:
+            await self._invalidate((self._missing_tag(tenant_id),))
+
+    async def bulk_update(self, rows, tenant_id: str, chunk_size: Optional[int] = None, indexes=None):
+        try:
+            return await self._repository.bulk_update(rows, tenant_id, chunk_size, indexes)
+        finally:
+            await self._invalidate((self._tenant_tag(tenant_id), self._missing_tag(tenant_id)))
+
+    async def bulk_upsert(self, rows, tenant_id: str, chunk_size: Optional[int] = None, indexes=None):
+        try:
+            return await self._repository.bulk_upsert(rows, tenant_id, chunk_size, indexes)
+        finally:
+            await self._invalidate((self._tenant_tag(tenant_id), self._missing_tag(tenant_id)))
+
+    def _invalidating_write(self, method, id_parameter: str):
+        signature = inspect.signature(method)
+
+        @wraps(method)
+        async def write(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            # Batched writes name their entities by {id: delta} or (id, delta) pairs
+            ids = bound.arguments[id_parameter] = materialize(bound.arguments[id_parameter])
+            try:
+                return await method(*bound.args, **bound.kwargs)
+            finally:
+                await self._invalidate(tuple(self._entity_tag(id) for id in ids_of(ids)))
+        return write
+
+
+def cached(repository):
+    """Wrap a repository with the entity cache and lookup coalescing (unchanged if both are off)."""
+    if not (settings.ENABLE_CACHE or settings.ENABLE_LOOKUP_COALESCING):
+        return repository
+    return CachedRepository(repository, flights=single_flight if settings.ENABLE_LOOKUP_COALESCING else None)
@@ -0,0 +1,89 @@
+"""
+Request-scoped batch loading for VALEO-NeuroERP repositories
+Entity lookups made within one request are collected and fetched with a
+single get_many call (DataLoader), instead of one query per entity
+"""
+
+import asyncio
+import logging
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# session.info key of the request's loaders, (table, tenant) -> DataLoader
+DATA_LOADERS = 'data_loaders'
+
+
+def _key(id: Any) -> Any:
+    """UUID objects and their strings load the same entity."""
+    if isinstance(id, uuid.UUID):
+        return id
+    try:
+        return uuid.UUID(str(id))
+    except ValueError:
+        return id
+
+
+class DataLoader:
+    """
+    Batches and dedupes the by-id lookups of one repository and tenant.
+
+    Ids requested before the event loop moves on (e.g. one load per row of
+    a page, gathered) are fetched together with one get_many call, and
+    every id is fetched at most once per loader. Results are kept for the
+    lifetime of the loader, i.e. the request; they are not refreshed by
+    writes made later in the same request.
+    """
+
+    def __init__(self, repository, tenant_id: Any):
+        self._repository = repository
+        self._tenant_id = tenant_id
+        self._results: Dict[Any, asyncio.Future] = {}
+        self._queue: List[Any] = []
+        self.batches = 0
+
+    def load(self, id: Any) -> "asyncio.Future":
+        """Future of the entity with this id (None if not found)."""
+        loop = asyncio.get_running_loop()
+        if id is None:
+            future = loop.create_future()
+            future.set_result(None)
+            return future
+        key = _key(id)
+        future = self._results.get(key)
+        if future is None:
+            future = self._results[key] = loop.create_future()
+            self._queue.append(key)
+            if len(self._queue) == 1:
+                # Dispatch once the callers of this tick have queued their ids
+                loop.call_soon(lambda: asyncio.ensure_future(self._dispatch()))
+        return future
+
+    async def load_many(self, ids: Iterable[Any]) -> List[Optional[Any]]:
+        """Entities for the ids, in order (None where not found)."""
+        return list(await asyncio.gather(*(self.load(id) for id in ids)))
+
+    async def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        self.batches += 1
+        try:
+            found = await self._repository.get_many(keys, self._tenant_id)
+        except Exception as e:
+            logger.error(f"Batch load of {len(keys)} entities failed: {e}")
+            for key in keys:
+                # Not cached, so a later load retries
+                self._results.pop(key).set_exception(e)
+            return
+        for key in keys:
+            self._results[key].set_result(found.get(key))
+
+
+def data_loader(repository, tenant_id: Any) -> DataLoader:
+    """The loader of the repository's table and tenant for the current request (its session)."""
+    loaders = repository.session.info.setdefault(DATA_LOADERS, {})
+    scope = (repository.model_class.__tablename__, str(tenant_id))
+    loader = loaders.get(scope)
+    if loader is None:
+        loader = loaders[scope] = DataLoader(repository, tenant_id)
+    return loader
@@ -0,0 +1,249 @@
+"""
+DATEV format for VALEO-NeuroERP repositories
+Streaming reader of DATEV Buchungsstapel files (EXTF, format category 21):
+the header, the rows in batches of whole entries, their amounts in cents
+and their document dates
+"""
+
+import csv
+import hashlib
+from datetime import date, datetime
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, IO, Iterator, List, NamedTuple, Optional, Union
+
+import numpy as np
+
+from .money import CENTS, parse_cents, parse_cents_array
+
+# Header line: format mark, format category and name
+EXTF = 'EXTF'
+BOOKING_BATCH = '21'
+
+# Column headings (second line) of the fields the import reads
+AMOUNT = 'Umsatz (ohne Soll/Haben-Kz)'
+SIDE = 'Soll/Haben-Kennzeichen'
+CURRENCY = 'WKZ Umsatz'
+ACCOUNT = 'Konto'
+CONTRA_ACCOUNT = 'Gegenkonto (ohne BU-Schlüssel)'
+DOCUMENT_DATE = 'Belegdatum'
+DOCUMENT = 'Belegfeld 1'
+TEXT = 'Buchungstext'
+COST_CENTER = 'KOST1 - Kostenstelle'
+
+REQUIRED = (AMOUNT, SIDE, ACCOUNT, DOCUMENT_DATE)
+# In the order DatevReader.batches reads them
+FIELDS = (AMOUNT, SIDE, CURRENCY, ACCOUNT, CONTRA_ACCOUNT, DOCUMENT_DATE, DOCUMENT, TEXT, COST_CENTER)
+
+# Soll (debit) / Haben (credit) of the Konto; the Gegenkonto takes the other side
+DEBIT = 'S'
+CREDIT = 'H'
+
+# Rows 1 and 2 are the header and the headings
+FIRST_ROW = 3
+
+
+class DatevFormatError(ValueError):
+    """Raised for files that are no DATEV Buchungsstapel."""
+
+
+class DatevHeader(NamedTuple):
+    fiscal_year_start: date
+    period_start: date
+    period_end: date
+    account_length: int
+    fingerprint: str  # SHA-256 of the header line (it carries the export's creation time)
+
+
+class DatevBatch:
+    """
+    Consecutive rows of a file, as columns. Consecutive rows with the same
+    Belegfeld 1 and Belegdatum are one entry (rows without Belegfeld 1 are
+    an entry each), and an entry never spans two batches.
+    """
+
+    def __init__(self):
+        self.rows: List[int] = []  # Row numbers in the file
+        self.entries: List[int] = []  # Position of each row's entry in the batch
+        self.amounts: List[str] = []
+        self.sides: List[str] = []
+        self.currencies: List[str] = []
+        self.accounts: List[str] = []
+        self.contra_accounts: List[str] = []
+        self.dates: List[str] = []
+        self.documents: List[str] = []
+        self.texts: List[str] = []
+        self.cost_centers: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def entry_count(self) -> int:
+        return self.entries[-1] + 1 if self.entries else 0
+
+    @property
+    def last_row(self) -> int:
+        return self.rows[-1] if self.rows else 0
+
+    def cents(self, errors: Dict[int, str]) -> np.ndarray:
+        """
+        The amounts in int64 cents (one NumPy parse for a clean column);
+        invalid or non-positive amounts are 0 and reported in errors
+        ({position: message}).
+        """
+        try:
+            cents = parse_cents_array(self.amounts, ',')
+        except ValueError:
+            cents = np.zeros(len(self.amounts), dtype=CENTS)
+            for position, text in enumerate(self.amounts):
+                try:
+                    cents[position] = parse_cents(text, ',')
+                except ValueError as e:
+                    errors.setdefault(position, str(e))
+        for position in np.flatnonzero(cents <= 0).tolist():
+            errors.setdefault(position, f"Amount {self.amounts[position]!r} must be positive")
+            cents[position] = 0
+        return cents
+
+    def debits(self, errors: Dict[int, str]) -> np.ndarray:
+        """Whether each row books its Konto on the debit side; other marks than S and H are reported in errors."""
+        sides = np.asarray(self.sides)
+        for position in np.flatnonzero((sides != DEBIT) & (sides != CREDIT)).tolist():
+            errors.setdefault(position, f"Soll/Haben-Kennzeichen {self.sides[position]!r} is neither S nor H")
+        return sides == DEBIT
+
+
+class DatevReader:
+    """
+    Reads a Buchungsstapel file row by row (never the whole file): the
+    header on opening, then batches of about batch_size rows. Files are
+    UTF-8 (with or without BOM) or, as DATEV writes them, Windows-1252.
+    """
+
+    def __init__(self, file: Union[str, Path], encoding: Optional[str] = None):
+        self.path = Path(file)
+        self.encoding = encoding or detect_encoding(self.path)
+        self._file: Optional[IO[str]] = None
+        self._rows = None
+        self.header: Optional[DatevHeader] = None
+        self.columns: Dict[str, int] = {}
+
+    def __enter__(self) -> "DatevReader":
+        self._file = open(self.path, newline='', encoding=self.encoding)
+        self._rows = csv.reader(self._file, delimiter=';', quotechar='"')
+        try:
+            header, headings = next(self._rows), next(self._rows)
+        except StopIteration:
+            self.close()
+            raise DatevFormatError("The file has no DATEV header and headings") from None
+        self.header = parse_header(header)
+        self.columns = {name: position for position, name in enumerate(heading.strip() for heading in headings)}
+        missing = [name for name in REQUIRED if name not in self.columns]
+        if missing:
+            self.close()
+            raise DatevFormatError(f"Missing DATEV columns: {', '.join(missing)}")
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def batches(self, batch_size: int, after_row: int = 0) -> Iterator[DatevBatch]:
+        """Batches of whole entries, starting after row after_row (where a previous run stopped)."""
+        # Absent optional columns read the empty field appended to every row
+        fields = itemgetter(*(self.columns.get(name, -1) for name in FIELDS))
+        width = max(self.columns.values()) + 1
+        batch, key, entry = DatevBatch(), None, -1
+        for row_number, row in enumerate(self._rows, FIRST_ROW):
+            if row_number <= after_row or not any(row):
+                continue
+            if len(row) < width:
+                row += [''] * (width - len(row))
+            row.append('')
+            amount, side, currency, account, contra_account, document_date, document, text, cost_center = fields(row)
+            document, document_date = document.strip(), document_date.strip()
+            row_key = (document, document_date) if document else None
+            if row_key is None or row_key != key:
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch, entry = DatevBatch(), -1
+                entry += 1
+            key = row_key
+            batch.rows.append(row_number)
+            batch.entries.append(entry)
+            batch.amounts.append(amount)
+            batch.sides.append(side.strip().upper())
+            batch.currencies.append(currency.strip())
+            batch.accounts.append(account.strip())
+            batch.contra_accounts.append(contra_account.strip())
+            batch.dates.append(document_date)
+            batch.documents.append(document)
+            batch.texts.append(text)
+            batch.cost_centers.append(cost_center)
+        if len(batch):
+            yield batch
+
+
+def detect_encoding(path: Path) -> str:
+    """UTF-8 (with BOM: utf-8-sig) if the start of the file decodes as such, else Windows-1252."""
+    with open(path, 'rb') as file:
+        start = file.read(64 * 1024)
+    if start.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-sig'
+    try:
+        start.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off at the end of the sample is still UTF-8
+        if e.start < len(start) - 3:
+            return 'cp1252'
+    return 'utf-8'
+
+
+def parse_header(fields: List[str]) -> DatevHeader:
+    """The header line: EXTF;700;21;Buchungsstapel;...;WJ-Beginn;Sachkontenlänge;Datum vom;Datum bis;..."""
+    if len(fields) < 16 or fields[0].strip() != EXTF or fields[2].strip() != BOOKING_BATCH:
+        raise DatevFormatError("Not a DATEV Buchungsstapel (EXTF, format category 21)")
+    try:
+        fiscal_year_start, period_start, period_end = (
+            datetime.strptime(fields[i].strip(), '%Y%m%d').date() for i in (12, 14, 15)
+        )
+        account_length = int(fields[13])
+    except ValueError as e:
+        raise DatevFormatError(f"Invalid DATEV header: {e}") from None
+    fingerprint = hashlib.sha256(';'.join(fields).encode('utf-8')).hexdigest()
+    return DatevHeader(fiscal_year_start, period_start, period_end, account_length, fingerprint)
+
+
+class DocumentDates:
+    """
+    Belegdatum (DDMM, the year is not part of it) of a batch's rows as
+    dates in the header's period: a day before the period's start month
+    and day belongs to the next year (periods spanning the turn of a year).
+    """
+
+    def __init__(self, header: DatevHeader):
+        self.period_start = header.period_start
+        self._dates: Dict[str, Optional[datetime]] = {}
+
+    def get(self, text: str) -> Optional[datetime]:
+        """The date of a Belegdatum, None if it is invalid."""
+        value = self._dates.get(text, False)
+        if value is False:
+            value = self._dates[text] = self._parse(text)
+        return value
+
+    def _parse(self, text: str) -> Optional[datetime]:
+        if not text.isdigit() or len(text) not in (3, 4):
+            return None
+        day, month = int(text[:-2]), int(text[-2:])
+        start = self.period_start
+        year = start.year + ((month, day) < (start.month, start.day))
+        try:
+            return datetime(year, month, day)
+        except ValueError:
+            return None
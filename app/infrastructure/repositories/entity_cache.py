@@ -0,0 +1,453 @@
+"""
+Entity cache for VALEO-NeuroERP repositories
+Read-through cache of single entities: an in-process LRU (L1) in front of
+Redis (L2). Entries carry tags (tenant, entity) and are dropped by tag
+when the entity is written; invalidations are broadcast to the other
+processes over Redis pub/sub.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from ...core.config import settings
+from .bulk import _python_type, coerce_value
+
+logger = logging.getLogger(__name__)
+
+try:
+    from redis import asyncio as redis_asyncio
+    from redis.exceptions import RedisError
+except ImportError:  # redis is optional, see requirements.txt
+    redis_asyncio = None
+    RedisError = ConnectionError
+
+# Separates the tags from the payload in Redis values (escaped inside JSON)
+_SEPARATOR = "\x1e"
+
+# Errors after which a Redis call falls back to the database
+_REDIS_ERRORS = (RedisError, OSError, asyncio.TimeoutError)
+
+
+def tenant_tag(table: str, tenant_id: Any) -> str:
+    return f"t:{table}:{tenant_id}"
+
+
+def entity_tag(table: str, entity_id: Any) -> str:
+    return f"e:{table}:{entity_id}"
+
+
+def missing_tag(table: str, tenant_id: Any) -> str:
+    """Tag of a tenant's cached misses, dropped whenever rows are added or renumbered."""
+    return f"m:{table}:{tenant_id}"
+
+
+# Serialisation
+#
+# An entity is stored as a JSON array of its column values in mapper order.
+# The column layout is hashed into the cache key, so entries written before
+# a schema change are simply never read again.
+
+# model -> ([(key, column, python type)], layout hash)
+_layouts: Dict[type, Tuple[List[tuple], str]] = {}
+
+
+def _layout(model) -> Tuple[List[tuple], str]:
+    layout = _layouts.get(model)
+    if layout is None:
+        columns = [(attr.key, attr.columns[0]) for attr in inspect(model).column_attrs]
+        digest = hashlib.sha1(
+            ",".join(f"{key}:{column.type}" for key, column in columns).encode()
+        ).hexdigest()[:8]
+        layout = _layouts[model] = ([(key, column, _python_type(column)) for key, column in columns], digest)
+    return layout
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def dump_entity(instance) -> Optional[str]:
+    """Compact payload of a loaded entity (None if a column is not loaded)."""
+    columns, _ = _layout(type(instance))
+    loaded = inspect(instance).dict
+    values = []
+    for key, _, _ in columns:
+        if key not in loaded:
+            return None
+        values.append(_encode(loaded[key]))
+    return json.dumps(values, separators=(",", ":"))
+
+
+def load_entity(model, payload: str):
+    """
+    Rebuild an entity from its payload as a detached instance, so it can be
+    read like a loaded one (and merged into a session if needed).
+    """
+    columns, _ = _layout(model)
+    values = json.loads(payload)
+    instance = model(**{
+        key: coerce_value(column, value, python_type)
+        for (key, column, python_type), value in zip(columns, values)
+    })
+    make_transient_to_detached(instance)
+    return instance
+
+
+# Metrics
+
+class CacheStats:
+    """Counters of one cached entity type."""
+
+    __slots__ = ("l1_hits", "l2_hits", "misses", "fills", "invalidations", "errors")
+
+    def __init__(self):
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.fills = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        stats = {name: getattr(self, name) for name in self.__slots__}
+        stats["hit_ratio"] = round((self.l1_hits + self.l2_hits) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+class CacheMetrics:
+    """Hit/miss counters per entity type (table name)."""
+
+    def __init__(self):
+        self.entities: Dict[str, CacheStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, table: str, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            stats = self.entities.get(table)
+            if stats is None:
+                stats = self.entities[table] = CacheStats()
+            setattr(stats, counter, getattr(stats, counter) + amount)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.entities.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {table: stats.to_dict() for table, stats in sorted(self.entities.items())}
+
+    def prometheus(self) -> str:
+        """Render the counters in the Prometheus text exposition format."""
+        lines: List[str] = []
+        snapshot = self.snapshot()
+        for name, help_text in (
+            ("l1_hits", "Lookups served by the in-process cache"),
+            ("l2_hits", "Lookups served by Redis"),
+            ("misses", "Lookups served by the database"),
+            ("fills", "Entities written to the cache"),
+            ("invalidations", "Tags invalidated"),
+            ("errors", "Redis errors (the lookup fell back to the database)"),
+        ):
+            lines.append(f"# HELP entity_cache_{name}_total {help_text}")
+            lines.append(f"# TYPE entity_cache_{name}_total counter")
+            for table, stats in snapshot.items():
+                lines.append(f'entity_cache_{name}_total{{entity="{table}"}} {stats[name]}')
+        return "\n".join(lines) + "\n"
+
+
+# L1
+
+class LRUCache:
+    """
+    Bounded in-process cache with a per-entry TTL and a tag index.
+    Values are payload strings, so every hit yields a fresh instance.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, payload: str, tags: Tuple[str, ...], ttl: Optional[float] = None) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), payload, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class EntityCache:
+    """
+    Two-level entity cache.
+
+    Redis holds each entry under its key plus one set per tag listing the
+    keys carrying that tag; invalidating a tag deletes the listed keys.
+    Redis failures never fail a lookup: the cache reports a miss and stays
+    L1-only for CACHE_REDIS_RETRY_SECONDS before trying Redis again.
+
+    Misses are remembered in L1 only, for negative_ttl seconds (also
+    without Redis); other processes drop them through the broadcast.
+    """
+
+    def __init__(self, redis=None, ttl: int = 3600, l1_size: int = 10000, l1_ttl: float = 5.0,
+                 prefix: str = "valeo:cache", retry_seconds: float = 30.0, enabled: bool = True,
+                 negative_ttl: float = 0.0):
+        self.redis = redis
+        self.ttl = ttl
+        self.prefix = prefix
+        self.retry_seconds = retry_seconds
+        self.enabled = enabled
+        self.negative_ttl = negative_ttl
+        self.l1 = LRUCache(l1_size, l1_ttl)
+        self.metrics = CacheMetrics()
+        self.channel = f"{prefix}:invalidate"
+        # Identifies this process's own broadcasts
+        self.origin = uuid.uuid4().hex
+        self._redis_down_until = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "EntityCache":
+        redis = None
+        if settings.ENABLE_CACHE:
+            if redis_asyncio is None:
+                logger.warning("redis package not installed, entity cache disabled")
+            else:
+                redis = redis_asyncio.from_url(
+                    settings.REDIS_URL,
+                    socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT,
+                    socket_timeout=settings.CACHE_REDIS_TIMEOUT,
+                )
+        return cls(
+            redis,
+            ttl=settings.REDIS_CACHE_TTL,
+            l1_size=settings.CACHE_L1_SIZE,
+            l1_ttl=settings.CACHE_L1_TTL,
+            retry_seconds=settings.CACHE_REDIS_RETRY_SECONDS,
+            enabled=redis is not None,
+            negative_ttl=settings.CACHE_NEGATIVE_TTL if settings.ENABLE_CACHE else 0.0,
+        )
+
+    # Keys
+
+    def key(self, model, field: str, value: Any, tenant_id: Any) -> str:
+        """Cache key of the entity of model whose field equals value within a tenant."""
+        _, layout_hash = _layout(model)
+        return f"{model.__tablename__}.{layout_hash}:{tenant_id}:{field}:{value}"
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.prefix}:k:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
+
+    @property
+    def redis_available(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, table: str, error: Exception) -> None:
+        self.metrics.record(table, "errors")
+        if time.monotonic() >= self._redis_down_until:
+            logger.warning(f"Entity cache: Redis unavailable, using L1 only for {self.retry_seconds:.0f}s: {error}")
+        self._redis_down_until = time.monotonic() + self.retry_seconds
+
+    # Lookups
+
+    async def get(self, table: str, key: str) -> Optional[str]:
+        """Payload for key from L1, then Redis (refilling L1); None on a miss."""
+        payload = self.l1.get(key)
+        if payload is not None:
+            self.metrics.record(table, "l1_hits")
+            return payload
+        if self.redis_available:
+            try:
+                raw = await self.redis.get(self._redis_key(key))
+            except _REDIS_ERRORS as e:
+                self._redis_failed(table, e)
+            else:
+                if raw is not None:
+                    # Redis values carry their tags so an L2 hit can be indexed in L1
+                    *tags, payload = (raw.decode() if isinstance(raw, bytes) else raw).split(_SEPARATOR)
+                    self.l1.set(key, payload, tuple(tags))
+                    self.metrics.record(table, "l2_hits")
+                    return payload
+        self.metrics.record(table, "misses")
+        return None
+
+    async def get_many(self, table: str, keys: List[str]) -> Dict[str, str]:
+        """Payloads of the keys found in L1, then Redis with one MGET (refilling L1)."""
+        found: Dict[str, str] = {}
+        missing = []
+        for key in keys:
+            payload = self.l1.get(key)
+            if payload is None:
+                missing.append(key)
+            else:
+                found[key] = payload
+        if found:
+            self.metrics.record(table, "l1_hits", len(found))
+        if missing and self.redis_available:
+            try:
+                values = await self.redis.mget([self._redis_key(key) for key in missing])
+            except _REDIS_ERRORS as e:
+                self._redis_failed(table, e)
+            else:
+                for key, raw in zip(missing, values):
+                    if raw is not None:
+                        *tags, payload = (raw.decode() if isinstance(raw, bytes) else raw).split(_SEPARATOR)
+                        self.l1.set(key, payload, tuple(tags))
+                        found[key] = payload
+                        self.metrics.record(table, "l2_hits")
+        misses = len(keys) - len(found)
+        if misses:
+            self.metrics.record(table, "misses", misses)
+        return found
+
+    async def set(self, table: str, keys: Iterable[str], payload: str, tags: Tuple[str, ...]) -> None:
+        """Store one entity under all its lookup keys, tagged for invalidation."""
+        keys = list(keys)
+        for key in keys:
+            self.l1.set(key, payload, tags)
+        self.metrics.record(table, "fills")
+        if not self.redis_available:
+            return
+        value = _SEPARATOR.join((*tags, payload))
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.set(self._redis_key(key), value, ex=self.ttl)
+                for tag in tags:
+                    tag_key = self._tag_key(tag)
+                    pipe.sadd(tag_key, *(self._redis_key(key) for key in keys))
+                    # Tag sets outlive their entries a little and then expire on their own
+                    pipe.expire(tag_key, self.ttl * 2)
+                await pipe.execute()
+        except _REDIS_ERRORS as e:
+            self._redis_failed(table, e)
+
+    def is_known_miss(self, key: str) -> bool:
+        """Whether a lookup of key found nothing less than negative_ttl seconds ago."""
+        return self.negative_ttl > 0 and self.l1.get(f"miss:{key}") is not None
+
+    def remember_miss(self, key: str, tags: Tuple[str, ...]) -> None:
+        if self.negative_ttl > 0:
+            self.l1.set(f"miss:{key}", "", tags, ttl=self.negative_ttl)
+
+    async def invalidate(self, table: str, tags: Iterable[str], broadcast: bool = True) -> None:
+        """Drop every entry carrying one of the tags, here, in Redis and in the other processes."""
+        tags = list(tags)
+        if not tags:
+            return
+        self.l1.invalidate(tags)
+        self.metrics.record(table, "invalidations", len(tags))
+        if not self.redis_available:
+            return
+        try:
+            # Read and drop the tag sets atomically, then delete the listed keys
+            async with self.redis.pipeline(transaction=True) as pipe:
+                for tag in tags:
+                    pipe.smembers(self._tag_key(tag))
+                pipe.delete(*(self._tag_key(tag) for tag in tags))
+                results = await pipe.execute()
+            keys = set().union(*results[:len(tags)])
+            async with self.redis.pipeline(transaction=False) as pipe:
+                if keys:
+                    pipe.delete(*keys)
+                if broadcast:
+                    pipe.publish(self.channel, json.dumps({"origin": self.origin, "tags": tags}))
+                await pipe.execute()
+        except _REDIS_ERRORS as e:
+            self._redis_failed(table, e)
+
+    async def listen(self) -> None:
+        """
+        Apply invalidations broadcast by other processes to L1.
+        Runs until cancelled (started from the application lifespan).
+        """
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                await pubsub.subscribe(self.channel)
+                try:
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        event = json.loads(message["data"])
+                        if event.get("origin") != self.origin:
+                            self.l1.invalidate(event.get("tags", ()))
+                finally:
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except _REDIS_ERRORS as e:
+                # Missed broadcasts are bounded by the L1 TTL
+                logger.warning(f"Entity cache invalidation listener disconnected: {e}")
+                self.l1.clear()
+                await asyncio.sleep(self.retry_seconds)
+
+    async def close(self) -> None:
+        if self.redis is not None:
+            await self.redis.aclose()
+
+
+# Shared by all repositories of the process
+entity_cache = EntityCache.from_settings()
@@ -0,0 +1,112 @@
+"""
+Bulk export for VALEO-NeuroERP repositories
+Entities that can be streamed in full (GET /export/{entity}) and the
+repositories that stream them
+"""
+
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Type, Union
+
+from sqlalchemy import and_, select
+from sqlalchemy import inspect as sqlalchemy_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ...core.database import Base
+from ...core.models import Article, Customer, JournalEntry, JournalEntryLine, Lead, StockMovement
+from .base_repository import BaseRepositoryImpl
+from .projection import column_keys
+
+# URL name -> model; each table has a (tenant_id, updated_at, id) index for since=
+EXPORTS: Dict[str, Type[Base]] = {
+    'customers': Customer,
+    'leads': Lead,
+    'articles': Article,
+    'stock-movements': StockMovement,
+    'journal-entries': JournalEntry,
+}
+
+
+# Line columns exported with each journal entry (its id and tenant are the entry's)
+JOURNAL_LINE_KEYS = [
+    attribute.key for attribute in sqlalchemy_inspect(JournalEntryLine).column_attrs
+    if attribute.key not in ('tenant_id', 'journal_entry_id')
+]
+
+# URL name -> keys of the lines nested under 'lines' (CSV: one row per line)
+NESTED_LINES: Dict[str, List[str]] = {
+    'journal-entries': JOURNAL_LINE_KEYS,
+}
+
+
+class UnknownExportError(KeyError):
+    """Raised for entities that cannot be exported."""
+
+
+class JournalEntryExportRepository(BaseRepositoryImpl[JournalEntry, dict, dict]):
+    """
+    Journal entries with their lines nested under 'lines' (in line_number
+    order). Entries and lines are read by one outer join in the entries'
+    (updated_at, id) order, so the export streams through the same
+    server-side cursor and since= position as the other entities.
+    """
+
+    def __init__(self, session: Union[AsyncSession, Session]):
+        super().__init__(session, JournalEntry)
+
+    async def stream(self, tenant_id: str, since: Optional[datetime] = None,
+                     fields: Optional[Sequence[str]] = None,
+                     batch_size: Optional[int] = None) -> AsyncIterator[List[dict]]:
+        columns = self._stream_columns(fields)
+        keys = column_keys(columns)
+        lines = [getattr(JournalEntryLine, key).label(f"line_{key}") for key in JOURNAL_LINE_KEYS]
+
+        statement = (
+            select(*columns, *lines)
+            .outerjoin(JournalEntryLine, and_(
+                JournalEntryLine.journal_entry_id == JournalEntry.id,
+                JournalEntryLine.tenant_id == JournalEntry.tenant_id,
+            ))
+            .where(JournalEntry.tenant_id == tenant_id)
+        )
+        if since is not None:
+            statement = statement.where(JournalEntry.updated_at >= since)
+        statement = statement.order_by(
+            JournalEntry.updated_at.asc(), JournalEntry.id.asc(), JournalEntryLine.line_number.asc()
+        )
+
+        # A batch ends with the entry whose lines may go on in the next one
+        width, entry_id, line_id = len(keys), keys.index('id'), len(keys) + JOURNAL_LINE_KEYS.index('id')
+        entry = None
+        async for partition in self._stream_partitions(statement, tenant_id, batch_size or self.stream_batch_size):
+            entries = []
+            for row in partition:
+                if entry is None or entry['id'] != row[entry_id]:
+                    if entry is not None:
+                        entries.append(entry)
+                    entry = dict(zip(keys, row[:width]), lines=[])
+                if row[line_id] is not None:
+                    entry['lines'].append(dict(zip(JOURNAL_LINE_KEYS, row[width:])))
+            if entries:
+                yield entries
+        if entry is not None:
+            yield [entry]
+
+
+# URL name -> repository, where stream() does more than read the table
+REPOSITORIES = {
+    'journal-entries': JournalEntryExportRepository,
+}
+
+
+def export_repository(entity: str, session: Union[AsyncSession, Session]) -> BaseRepositoryImpl:
+    """
+    A plain repository for the entity (only stream() is used, so neither the
+    entity cache nor a domain repository is needed).
+    """
+    model = EXPORTS.get(entity)
+    if model is None:
+        raise UnknownExportError(entity)
+    if entity in REPOSITORIES:
+        return REPOSITORIES[entity](session)
+    return BaseRepositoryImpl(session, model)
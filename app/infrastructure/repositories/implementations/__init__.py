@@ -1,11 +1,25 @@
 # Repository implementations package
 
+from .number_range_repository_impl import NumberRangeRepositoryImpl
+from .customer_repository_impl import CustomerRepositoryImpl
 from .lead_repository_impl import LeadRepositoryImpl
 from .contact_repository_impl import ContactRepositoryImpl
 from .account_repository_impl import AccountRepositoryImpl
+from .article_repository_impl import ArticleRepositoryImpl
+from .stock_reservation_repository_impl import StockReservationRepositoryImpl
+from .account_period_balance_repository_impl import AccountPeriodBalanceRepositoryImpl
+from .journal_entry_repository_impl import JournalEntryRepositoryImpl
+from .journal_import_repository_impl import JournalImportRepositoryImpl
 
 __all__ = [
+    'NumberRangeRepositoryImpl',
+    'CustomerRepositoryImpl',
     'LeadRepositoryImpl',
     'ContactRepositoryImpl',
-    'AccountRepositoryImpl'
+    'AccountRepositoryImpl',
+    'ArticleRepositoryImpl',
+    'StockReservationRepositoryImpl',
+    'AccountPeriodBalanceRepositoryImpl',
+    'JournalEntryRepositoryImpl',
+    'JournalImportRepositoryImpl'
 ]
\ No newline at end of file
@@ -0,0 +1,346 @@
+"""
+Account Period Balance Repository Implementation
+PostgreSQL-based implementation of the AccountPeriodBalance repository interface
+"""
+
+import logging
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple, Union
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, bindparam, delete, func, insert, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..base_repository import BaseRepositoryImpl
+from ..bulk import chunked, coerce_value
+from ..increments import delta_case
+from ..interfaces import AccountPeriodBalanceRepository
+from ..period_balances import PeriodClosedError, PeriodOrderError, month_start, next_month, period_label
+from ..trial_balance import BOOKED
+from ....core.models import Account, AccountPeriodBalance, JournalEntry, JournalEntryLine
+
+logger = logging.getLogger(__name__)
+
+# (account_id, period_start) -> (debit, credit)
+Movements = Mapping[Tuple[Any, date], Tuple[Decimal, Decimal]]
+
+ZERO = Decimal('0.00')
+
+
+class AccountPeriodBalanceRepositoryImpl(BaseRepositoryImpl[AccountPeriodBalance, dict, dict],
+                                         AccountPeriodBalanceRepository):
+    """
+    PostgreSQL implementation of AccountPeriodBalance repository.
+
+    One row per account and month holds the month's debit and credit and
+    the closing balance (debit - credit) at its end. Closing a period
+    writes the rows of every account from the journal lines; postings into
+    open periods add to their period's row and move the closing balances
+    of the later ones. A balance as of a date is the closing balance of the
+    account's last period before that month plus the lines since.
+    """
+
+    upsert_keys = ('tenant_id', 'account_id', 'period_start')
+
+    def __init__(self, session: Union[AsyncSession, Session]):
+        super().__init__(session, AccountPeriodBalance)
+
+    async def get_balance_as_of(self, account_id: str, as_of: date, tenant_id: str) -> Decimal:
+        """Balance (debit - credit) of one account at the end of as_of"""
+        account_id = coerce_value(AccountPeriodBalance.__table__.c.account_id, account_id)
+        balances = await self.get_balances_as_of(tenant_id, as_of, [account_id])
+        return balances[account_id]
+
+    async def get_balances_as_of(self, tenant_id: str, as_of: date,
+                                 account_ids: Optional[Iterable[Any]] = None) -> Dict[Any, Decimal]:
+        """
+        Balances (debit - credit) at the end of as_of, of the given accounts
+        (all with snapshots or movements otherwise): the last snapshot before
+        the month of as_of plus the booked lines dated after it, at most one
+        month of lines per account once its periods are closed.
+        """
+        if account_ids is not None:
+            account_ids = [coerce_value(AccountPeriodBalance.__table__.c.account_id, id) for id in account_ids]
+        period = month_start(as_of)
+        try:
+            snapshots = self._latest_snapshots(period, tenant_id, account_ids)
+            balances = {row.account_id: row.closing_balance for row in (await self._read(snapshots, tenant_id)).all()}
+            if account_ids is not None:
+                balances = {id: balances.get(id, ZERO) for id in account_ids}
+
+            # Accounts without a snapshot have no lines before the last closed period ended
+            latest_closed = await self.latest_closed_period(tenant_id)
+            floor = min(next_month(latest_closed), period) if latest_closed is not None else None
+            latest = snapshots.subquery()
+            statement = (
+                select(
+                    JournalEntryLine.account_id,
+                    func.sum(JournalEntryLine.debit_amount - JournalEntryLine.credit_amount).label('delta'),
+                )
+                .join(JournalEntry, JournalEntry.id == JournalEntryLine.journal_entry_id)
+                .outerjoin(latest, latest.c.account_id == JournalEntryLine.account_id)
+                .where(
+                    JournalEntry.tenant_id == tenant_id,
+                    JournalEntry.status.in_(BOOKED),
+                    JournalEntry.entry_date < datetime.combine(as_of + timedelta(days=1), datetime.min.time()),
+                    JournalEntryLine.tenant_id == tenant_id,
+                    or_(latest.c.period_end.is_(None), JournalEntry.entry_date >= latest.c.period_end),
+                )
+                .group_by(JournalEntryLine.account_id)
+            )
+            if floor is not None:
+                statement = statement.where(JournalEntry.entry_date >= datetime.combine(floor, datetime.min.time()))
+            if account_ids is not None:
+                statement = statement.where(JournalEntryLine.account_id.in_(account_ids))
+            for row in (await self._read(statement, tenant_id)).all():
+                balances[row.account_id] = balances.get(row.account_id, ZERO) + (row.delta or ZERO)
+            return balances
+        except Exception as e:
+            logger.error(f"Failed to get balances as of {as_of} for tenant {tenant_id}: {e}")
+            raise
+
+    def _latest_snapshots(self, period: date, tenant_id: str, account_ids: Optional[list] = None):
+        """Per account the last snapshot of a period before period (account_id, closing_balance, period_end)."""
+        conditions = [AccountPeriodBalance.tenant_id == tenant_id, AccountPeriodBalance.period_start < period]
+        if account_ids is not None:
+            conditions.append(AccountPeriodBalance.account_id.in_(account_ids))
+        latest = (
+            select(AccountPeriodBalance.account_id, func.max(AccountPeriodBalance.period_start).label('period_start'))
+            .where(*conditions)
+            .group_by(AccountPeriodBalance.account_id)
+            .subquery()
+        )
+        return (
+            select(AccountPeriodBalance.account_id, AccountPeriodBalance.closing_balance,
+                   AccountPeriodBalance.period_end)
+            .join(latest, and_(AccountPeriodBalance.account_id == latest.c.account_id,
+                               AccountPeriodBalance.period_start == latest.c.period_start))
+            .where(AccountPeriodBalance.tenant_id == tenant_id)
+        )
+
+    async def next_period_to_close(self, tenant_id: str) -> Optional[date]:
+        """The month after the last closed one, or the month of the first booked entry (None without entries)."""
+        latest_closed = await self.latest_closed_period(tenant_id)
+        if latest_closed is not None:
+            return next_month(latest_closed)
+        first = await self._first_booked(tenant_id)
+        return month_start(first) if first is not None else None
+
+    async def latest_closed_period(self, tenant_id: str) -> Optional[date]:
+        """First day of the last closed period (None if no period is closed)."""
+        statement = select(func.max(AccountPeriodBalance.period_start)).where(
+            AccountPeriodBalance.tenant_id == tenant_id, AccountPeriodBalance.is_closed == True
+        )
+        return (await self._execute(statement, tenant_id=tenant_id)).scalar()
+
+    async def apply_movements(self, movements: Movements, tenant_id: str) -> int:
+        """
+        Add the movements ({(account_id, period_start): (debit, credit)}) of
+        entries just booked in this transaction to the snapshots of their
+        periods, one upsert per period: an existing row is increased by them,
+        a missing one is created from the booked lines (the balance at the
+        end of its month, so it includes them). The closing balances of the
+        account's later periods move by the same amounts (one UPDATE per
+        period). PeriodClosedError if any of the periods is closed.
+        Returns the number of rows written.
+        """
+        by_period: Dict[date, Dict[Any, Tuple[Decimal, Decimal]]] = {}
+        for (account_id, period), (debit, credit) in movements.items():
+            accounts = by_period.setdefault(month_start(period), {})
+            key = coerce_value(AccountPeriodBalance.__table__.c.account_id, account_id)
+            previous_debit, previous_credit = accounts.get(key, (ZERO, ZERO))
+            accounts[key] = (previous_debit + Decimal(debit), previous_credit + Decimal(credit))
+        if not by_period:
+            return 0
+
+        written = 0
+        try:
+            latest_closed = await self.latest_closed_period(tenant_id)
+            if latest_closed is not None and min(by_period) <= latest_closed:
+                raise PeriodClosedError(min(by_period))
+            # Keep the reads below on the primary (they must see this transaction)
+            self._record_write(tenant_id)
+            now = datetime.utcnow()
+            for period, amounts in sorted(by_period.items()):
+                accounts = list(amounts)
+                totals = {
+                    row.account_id: (row.debit or ZERO, row.credit or ZERO)
+                    for row in (await self._execute(
+                        self._month_movements(period, tenant_id, accounts), tenant_id=tenant_id
+                    )).all()
+                }
+                closings = await self.get_balances_as_of(tenant_id, next_month(period) - timedelta(days=1), accounts)
+                rows = [
+                    {
+                        'id': uuid.uuid4(), 'tenant_id': tenant_id, 'account_id': account_id,
+                        'period_start': period, 'period_end': next_month(period),
+                        'debit_total': totals.get(account_id, (ZERO, ZERO))[0],
+                        'credit_total': totals.get(account_id, (ZERO, ZERO))[1],
+                        'closing_balance': closings[account_id],
+                        'is_closed': False, 'created_at': now, 'updated_at': now,
+                        'added_debit': debit, 'added_credit': credit,
+                    }
+                    for account_id, (debit, credit) in amounts.items()
+                ]
+                await self._execute(self._add_statement(), rows, tenant_id=tenant_id)
+                written += len(rows)
+
+                deltas = {account_id: debit - credit for account_id, (debit, credit) in amounts.items() if debit != credit}
+                for _, items in chunked(list(deltas.items()), self.bulk_chunk_size):
+                    chunk = dict(items)
+                    await self._execute(
+                        update(AccountPeriodBalance)
+                        .where(
+                            AccountPeriodBalance.tenant_id == tenant_id,
+                            AccountPeriodBalance.account_id.in_(list(chunk)),
+                            AccountPeriodBalance.period_start > period,
+                        )
+                        .values(
+                            closing_balance=AccountPeriodBalance.closing_balance + delta_case(
+                                AccountPeriodBalance.account_id, chunk, AccountPeriodBalance.closing_balance.type
+                            ),
+                            updated_at=now,
+                        )
+                        .execution_options(synchronize_session=False),
+                        tenant_id=tenant_id,
+                    )
+            await self._commit()
+        except SQLAlchemyError as e:
+            await self._rollback()
+            logger.error(f"Failed to apply movements of {len(by_period)} periods for tenant {tenant_id}: {e}")
+            raise
+        return written
+
+    def _add_statement(self):
+        """INSERT ... ON CONFLICT DO UPDATE adding the movements (added_debit, added_credit) to an existing row."""
+        table = AccountPeriodBalance.__table__
+        statement = self._insert_statement()
+        added_debit = bindparam('added_debit', type_=table.c.debit_total.type)
+        added_credit = bindparam('added_credit', type_=table.c.credit_total.type)
+        return statement.on_conflict_do_update(
+            index_elements=list(self.upsert_keys),
+            set_={
+                'debit_total': table.c.debit_total + added_debit,
+                'credit_total': table.c.credit_total + added_credit,
+                'closing_balance': table.c.closing_balance + added_debit - added_credit,
+                'updated_at': statement.excluded.updated_at,
+            },
+        )
+
+    async def close_period(self, period_start: date, tenant_id: str) -> int:
+        """
+        Close a month: write the snapshot of every account of the tenant from
+        the booked lines of the month and the previous period's closing
+        balances, and rebase the closing balances of the open periods after
+        it. Periods close in order, starting with the month of the first
+        booked entry. Returns the number of accounts.
+        """
+        period = month_start(period_start)
+        try:
+            latest_closed = await self.latest_closed_period(tenant_id)
+            if latest_closed is not None and period <= latest_closed:
+                raise PeriodClosedError(period, "is already closed")
+            if latest_closed is not None and period != next_month(latest_closed):
+                raise PeriodOrderError(f"Close period {period_label(next_month(latest_closed))} first")
+            if latest_closed is None:
+                first = await self._first_booked(tenant_id)
+                if first is not None and month_start(first) < period:
+                    raise PeriodOrderError(f"Close period {period_label(month_start(first))} first")
+
+            openings = {}
+            if latest_closed is not None:
+                statement = select(AccountPeriodBalance.account_id, AccountPeriodBalance.closing_balance).where(
+                    AccountPeriodBalance.tenant_id == tenant_id, AccountPeriodBalance.period_start == latest_closed
+                )
+                openings = {row.account_id: row.closing_balance
+                            for row in (await self._execute(statement, tenant_id=tenant_id)).all()}
+            movements = {row.account_id: (row.debit, row.credit)
+                         for row in (await self._execute(self._month_movements(period, tenant_id),
+                                                         tenant_id=tenant_id)).all()}
+            account_ids = (await self._execute(
+                select(Account.id).where(Account.tenant_id == tenant_id), tenant_id=tenant_id
+            )).scalars().all()
+
+            now = datetime.utcnow()
+            rows = []
+            for account_id in account_ids:
+                debit, credit = movements.get(account_id, (ZERO, ZERO))
+                rows.append({
+                    'id': uuid.uuid4(), 'tenant_id': tenant_id, 'account_id': account_id,
+                    'period_start': period, 'period_end': next_month(period),
+                    'debit_total': debit or ZERO, 'credit_total': credit or ZERO,
+                    'closing_balance': openings.get(account_id, ZERO) + (debit or ZERO) - (credit or ZERO),
+                    'is_closed': True, 'closed_at': now, 'created_at': now, 'updated_at': now,
+                })
+            # The open snapshot of the month is replaced by the one computed from the lines
+            await self._execute(
+                delete(AccountPeriodBalance).where(
+                    AccountPeriodBalance.tenant_id == tenant_id, AccountPeriodBalance.period_start == period
+                ),
+                tenant_id=tenant_id,
+            )
+            for _, chunk in chunked(rows, self.bulk_chunk_size):
+                await self._execute(insert(AccountPeriodBalance), chunk, tenant_id=tenant_id)
+            await self._rebase_open_periods(period, tenant_id, now)
+            self._record_write(tenant_id)
+            await self._commit()
+        except SQLAlchemyError as e:
+            await self._rollback()
+            logger.error(f"Failed to close period {period_label(period)} for tenant {tenant_id}: {e}")
+            raise
+
+        logger.info(f"Closed period {period_label(period)} for tenant {tenant_id}: {len(rows)} accounts")
+        return len(rows)
+
+    def _month_movements(self, period: date, tenant_id: str, account_ids: Optional[list] = None):
+        statement = (
+            select(
+                JournalEntryLine.account_id,
+                func.sum(JournalEntryLine.debit_amount).label('debit'),
+                func.sum(JournalEntryLine.credit_amount).label('credit'),
+            )
+            .join(JournalEntry, JournalEntry.id == JournalEntryLine.journal_entry_id)
+            .where(
+                JournalEntry.tenant_id == tenant_id,
+                JournalEntry.status.in_(BOOKED),
+                JournalEntry.entry_date >= datetime.combine(period, datetime.min.time()),
+                JournalEntry.entry_date < datetime.combine(next_month(period), datetime.min.time()),
+                JournalEntryLine.tenant_id == tenant_id,
+            )
+            .group_by(JournalEntryLine.account_id)
+        )
+        if account_ids is not None:
+            statement = statement.where(JournalEntryLine.account_id.in_(account_ids))
+        return statement
+
+    async def _first_booked(self, tenant_id: str) -> Optional[datetime]:
+        statement = select(func.min(JournalEntry.entry_date)).where(
+            JournalEntry.tenant_id == tenant_id, JournalEntry.status.in_(BOOKED)
+        )
+        return (await self._execute(statement, tenant_id=tenant_id)).scalar()
+
+    async def _rebase_open_periods(self, period: date, tenant_id: str, now: datetime) -> None:
+        """Closing balance of each later (open) row: the closed one plus the movements up to its period."""
+        closed = aliased(AccountPeriodBalance)
+        between = aliased(AccountPeriodBalance)
+        opening = (
+            select(closed.closing_balance)
+            .where(closed.tenant_id == tenant_id, closed.account_id == AccountPeriodBalance.account_id,
+                   closed.period_start == period)
+            .scalar_subquery()
+        )
+        moved = (
+            select(func.sum(between.debit_total - between.credit_total))
+            .where(between.tenant_id == tenant_id, between.account_id == AccountPeriodBalance.account_id,
+                   between.period_start > period, between.period_start <= AccountPeriodBalance.period_start)
+            .scalar_subquery()
+        )
+        await self._execute(
+            update(AccountPeriodBalance)
+            .where(AccountPeriodBalance.tenant_id == tenant_id, AccountPeriodBalance.period_start > period)
+            .values(closing_balance=func.coalesce(opening, ZERO) + func.coalesce(moved, ZERO), updated_at=now)
+            .execution_options(synchronize_session=False),
+            tenant_id=tenant_id,
+        )
@@ -4,198 +4,155 @@ PostgreSQL-based implementation of the Account repository interface
 """
 
 import logging
-from typing import List, Optional, Dict, Any
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Union
+from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+
+from ..base_repository import BaseRepositoryImpl
+from ..pagination import Page, OffsetPage, InvalidCursorError
+from ..projection import InvalidFieldsError
+from ..bulk import coerce_value
+from ..increments import Deltas, aggregate_deltas, delta_case
+from ..money import from_cents, to_cents
 from ..interfaces import AccountRepository
 from ....core.models import Account
 
 logger = logging.getLogger(__name__)
 
 
-class AccountRepositoryImpl(AccountRepository):
+class AccountRepositoryImpl(BaseRepositoryImpl[Account, dict, dict], AccountRepository):
     """PostgreSQL implementation of Account repository"""
 
-    def __init__(self, session_factory):
-        self.session_factory = session_factory
+    cursor_sort_key = 'account_number'
+    upsert_keys = ('tenant_id', 'account_number')
+    cached_lookups = {'get_by_number': 'account_number'}
+    version_column = 'version'
+    cache_invalidating_writes = {'update_balance': 'account_id', 'update_balances': 'deltas'}
 
-    def _get_session(self) -> Session:
-        return self.session_factory()
+    def __init__(self, session: Union[AsyncSession, Session]):
+        super().__init__(session, Account)
 
-    async def create(self, data: Dict[str, Any], tenant_id: str) -> Account:
-        """Create a new account"""
-        try:
-            session = self._get_session()
-            account = Account(
-                tenant_id=tenant_id,
-                **data
-            )
-            session.add(account)
-            session.commit()
-            session.refresh(account)
-            logger.info(f"Created account {account.account_number} for tenant {tenant_id}")
-            return account
-        except Exception as e:
-            session.rollback()
-            logger.error(f"Failed to create account: {e}")
-            raise
-        finally:
-            session.close()
-
-    async def get_by_id(self, account_id: str, tenant_id: str) -> Optional[Account]:
-        """Get account by ID"""
-        try:
-            session = self._get_session()
-            account = session.query(Account).filter(
-                and_(Account.id == account_id, Account.tenant_id == tenant_id, Account.is_active == True)
-            ).first()
-            return account
-        except Exception as e:
-            logger.error(f"Failed to get account {account_id}: {e}")
-            raise
-        finally:
-            session.close()
+    def _filters(self, tenant_id: str, account_type: Optional[str], category: Optional[str]) -> list:
+        conditions = self._scope_conditions(tenant_id)
+        if account_type:
+            conditions.append(Account.account_type == account_type)
+        if category:
+            conditions.append(Account.category == category)
+        return conditions
 
     async def get_by_number(self, account_number: str, tenant_id: str) -> Optional[Account]:
         """Get account by account number"""
         try:
-            session = self._get_session()
-            account = session.query(Account).filter(
-                and_(Account.account_number == account_number, Account.tenant_id == tenant_id, Account.is_active == True)
-            ).first()
-            return account
+            statement = select(Account).where(
+                Account.account_number == account_number, *self._scope_conditions(tenant_id)
+            )
+            result = await self._read(statement, tenant_id)
+            return result.scalars().first()
         except Exception as e:
             logger.error(f"Failed to get account {account_number}: {e}")
             raise
-        finally:
-            session.close()
+
+    async def get_chart(self, tenant_id: str) -> Dict[str, UUID]:
+        """The tenant's chart of accounts: {account number: id} of the active accounts (one query)."""
+        statement = select(Account.account_number, Account.id).where(*self._scope_conditions(tenant_id))
+        result = await self._read(statement, tenant_id)
+        return {row.account_number: row.id for row in result.all()}
 
     async def get_all(self, tenant_id: str, skip: int = 0, limit: int = 100,
-                     account_type: Optional[str] = None, category: Optional[str] = None) -> List[Account]:
+                      account_type: Optional[str] = None, category: Optional[str] = None) -> List[Account]:
         """Get all accounts with optional filtering"""
         try:
-            session = self._get_session()
-            query = session.query(Account).filter(
-                and_(Account.tenant_id == tenant_id, Account.is_active == True)
+            statement = (
+                select(Account)
+                .where(*self._filters(tenant_id, account_type, category))
+                .offset(skip)
+                .limit(limit)
             )
-
-            if account_type:
-                query = query.filter(Account.account_type == account_type)
-            if category:
-                query = query.filter(Account.category == category)
-
-            accounts = query.offset(skip).limit(limit).all()
-            return accounts
+            result = await self._read(statement, tenant_id)
+            return list(result.scalars().all())
         except Exception as e:
             logger.error(f"Failed to get accounts for tenant {tenant_id}: {e}")
             raise
-        finally:
-            session.close()
 
-    async def count(self, tenant_id: str, account_type: Optional[str] = None,
-                   category: Optional[str] = None) -> int:
-        """Count accounts with optional filtering"""
+    async def get_all_with_total(self, tenant_id: str, skip: int = 0, limit: int = 100,
+                                 account_type: Optional[str] = None, category: Optional[str] = None,
+                                 total_mode: str = "exact",
+                                 fields: Optional[Sequence[str]] = None) -> OffsetPage[Account]:
+        """Get a page of accounts and the total in one round trip, with optional filtering"""
         try:
-            session = self._get_session()
-            query = session.query(func.count(Account.id)).filter(
-                and_(Account.tenant_id == tenant_id, Account.is_active == True)
-            )
-
-            if account_type:
-                query = query.filter(Account.account_type == account_type)
-            if category:
-                query = query.filter(Account.category == category)
-
-            count = query.scalar()
-            return count or 0
+            return await self._offset_page(self._filters(tenant_id, account_type, category), tenant_id, skip, limit, total_mode, fields=fields)
+        except InvalidFieldsError:
+            raise
         except Exception as e:
-            logger.error(f"Failed to count accounts for tenant {tenant_id}: {e}")
+            logger.error(f"Failed to get accounts for tenant {tenant_id}: {e}")
             raise
-        finally:
-            session.close()
 
-    async def update(self, account_id: str, data: Dict[str, Any], tenant_id: str) -> Optional[Account]:
-        """Update account"""
+    async def get_page(self, tenant_id: str, limit: int = 100, cursor: Optional[str] = None,
+                       account_type: Optional[str] = None, category: Optional[str] = None,
+                       fields: Optional[Sequence[str]] = None) -> Page[Account]:
+        """Get one keyset page of accounts with optional filtering"""
         try:
-            session = self._get_session()
-            account = session.query(Account).filter(
-                and_(Account.id == account_id, Account.tenant_id == tenant_id, Account.is_active == True)
-            ).first()
-
-            if not account:
-                return None
-
-            for key, value in data.items():
-                if hasattr(account, key):
-                    setattr(account, key, value)
-
-            session.commit()
-            session.refresh(account)
-            logger.info(f"Updated account {account_id}")
-            return account
+            return await self._keyset_page(self._filters(tenant_id, account_type, category), tenant_id, limit, cursor, fields)
+        except (InvalidCursorError, InvalidFieldsError):
+            raise
         except Exception as e:
-            session.rollback()
-            logger.error(f"Failed to update account {account_id}: {e}")
+            logger.error(f"Failed to get accounts page for tenant {tenant_id}: {e}")
             raise
-        finally:
-            session.close()
 
-    async def delete(self, account_id: str, tenant_id: str) -> bool:
-        """Soft delete account"""
+    async def count(self, tenant_id: str, account_type: Optional[str] = None,
+                    category: Optional[str] = None) -> int:
+        """Count accounts with optional filtering"""
         try:
-            session = self._get_session()
-            account = session.query(Account).filter(
-                and_(Account.id == account_id, Account.tenant_id == tenant_id, Account.is_active == True)
-            ).first()
-
-            if not account:
-                return False
-
-            account.is_active = False
-            session.commit()
-            logger.info(f"Soft deleted account {account_id}")
-            return True
+            statement = select(func.count(Account.id)).where(*self._filters(tenant_id, account_type, category))
+            result = await self._read(statement, tenant_id)
+            return result.scalar() or 0
         except Exception as e:
-            session.rollback()
-            logger.error(f"Failed to delete account {account_id}: {e}")
+            logger.error(f"Failed to count accounts for tenant {tenant_id}: {e}")
             raise
-        finally:
-            session.close()
 
-    async def get_balance(self, account_id: str, tenant_id: str) -> float:
-        """Get current account balance"""
+    async def get_balance(self, account_id: str, tenant_id: str) -> Decimal:
+        """Get current account balance (exact, with two places)"""
         try:
-            session = self._get_session()
-            account = session.query(Account).filter(
-                and_(Account.id == account_id, Account.tenant_id == tenant_id, Account.is_active == True)
-            ).first()
-
-            return float(account.balance) if account else 0.0
+            statement = select(Account.balance).where(
+                Account.id == account_id, *self._scope_conditions(tenant_id)
+            )
+            result = await self._execute(statement, tenant_id=tenant_id)
+            balance = result.scalar()
+            return from_cents(to_cents(balance))
         except Exception as e:
             logger.error(f"Failed to get balance for account {account_id}: {e}")
             raise
-        finally:
-            session.close()
 
-    async def update_balance(self, account_id: str, amount: float, tenant_id: str) -> bool:
-        """Update account balance"""
-        try:
-            session = self._get_session()
-            account = session.query(Account).filter(
-                and_(Account.id == account_id, Account.tenant_id == tenant_id, Account.is_active == True)
-            ).first()
-
-            if not account:
-                return False
-
-            account.balance += amount
-            session.commit()
-            logger.info(f"Updated balance for account {account_id}: {amount}")
-            return True
-        except Exception as e:
-            session.rollback()
-            logger.error(f"Failed to update balance for account {account_id}: {e}")
-            raise
-        finally:
-            session.close()
\ No newline at end of file
+    async def update_balance(self, account_id: str, amount: Union[Decimal, float], tenant_id: str,
+                             expected_version: Optional[int] = None) -> bool:
+        """
+        Add amount to the account balance (atomic, balance = balance + amount).
+        With expected_version the update only applies at that version
+        (StaleVersionError otherwise).
+        """
+        amount = coerce_value(Account.__table__.c.balance, amount, Decimal)
+        row = await self._increment(
+            account_id, tenant_id, {'balance': Account.balance + amount}, (Account.balance,), expected_version
+        )
+        if row is None:
+            return False
+        logger.info(f"Updated balance for account {account_id}: {amount}")
+        return True
+
+    async def update_balances(self, deltas: Deltas, tenant_id: str) -> Dict[UUID, Decimal]:
+        """
+        Apply many balance changes at once ({account_id: amount} or
+        (account_id, amount) pairs; amounts for the same account are summed)
+        in one UPDATE per chunk. Returns the new balance per account found.
+        """
+        totals = aggregate_deltas(deltas, Account.__table__.c.id, Account.__table__.c.balance)
+        rows = await self._increment_many(
+            totals, tenant_id,
+            lambda chunk: {'balance': Account.balance + delta_case(Account.id, chunk, Account.balance.type)},
+            (Account.balance,),
+        )
+        logger.info(f"Updated balances of {len(rows)} accounts")
+        return {id: row.balance for id, row in rows.items()}
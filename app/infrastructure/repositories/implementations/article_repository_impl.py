@@ -0,0 +1,168 @@
+"""
+Article Repository Implementation
+PostgreSQL-based implementation of the Article repository interface
+"""
+
+import logging
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Optional, Sequence, Union
+from uuid import UUID
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from ..base_repository import BaseRepositoryImpl
+from ..bulk import coerce_value
+from ..increments import Deltas, aggregate_deltas, delta_case
+from ..interfaces import ArticleRepository
+from ....core.models import Article
+
+logger = logging.getLogger(__name__)
+
+
+class ArticleRepositoryImpl(BaseRepositoryImpl[Article, dict, dict], ArticleRepository):
+    """PostgreSQL implementation of Article repository"""
+
+    upsert_keys = ('tenant_id', 'article_number')
+    cached_lookups = {'get_by_barcode': 'barcode', 'get_by_article_number': 'article_number'}
+    version_column = 'version'
+    cache_invalidating_writes = {
+        'update_stock': 'article_id', 'update_stocks': 'deltas',
+        'hold_stock': 'quantities', 'release_stock': 'quantities', 'consume_stock': 'quantities',
+    }
+
+    def __init__(self, session: Union[AsyncSession, Session]):
+        super().__init__(session, Article)
+
+    async def get_by_barcode(self, barcode: str, tenant_id: str) -> Optional[Article]:
+        """Get article by barcode"""
+        try:
+            statement = select(Article).where(
+                Article.barcode == barcode, *self._scope_conditions(tenant_id)
+            )
+            result = await self._read(statement, tenant_id)
+            return result.scalars().first()
+        except Exception as e:
+            logger.error(f"Failed to get article by barcode {barcode}: {e}")
+            raise
+
+    async def get_by_article_number(self, article_number: str, tenant_id: str) -> Optional[Article]:
+        """Get article by article number"""
+        try:
+            statement = select(Article).where(
+                Article.article_number == article_number, *self._scope_conditions(tenant_id)
+            )
+            result = await self._read(statement, tenant_id)
+            return result.scalars().first()
+        except Exception as e:
+            logger.error(f"Failed to get article {article_number}: {e}")
+            raise
+
+    @staticmethod
+    def _stock_values(delta) -> dict:
+        # SET expressions see the old row, so available_stock is derived from the old current_stock
+        return {
+            'current_stock': Article.current_stock + delta,
+            'available_stock': Article.current_stock + delta - Article.reserved_stock,
+        }
+
+    async def update_stock(self, article_id: str, quantity_change: Union[Decimal, float], tenant_id: str,
+                           expected_version: Optional[int] = None) -> bool:
+        """
+        Add quantity_change to the stock level (atomic, current_stock =
+        current_stock + change; available_stock follows). With
+        expected_version the update only applies at that version
+        (StaleVersionError otherwise).
+        """
+        quantity_change = coerce_value(Article.__table__.c.current_stock, quantity_change, Decimal)
+        row = await self._increment(
+            article_id, tenant_id, self._stock_values(quantity_change),
+            (Article.current_stock, Article.available_stock), expected_version
+        )
+        if row is None:
+            return False
+        logger.info(f"Updated stock for article {article_id}: {quantity_change}")
+        return True
+
+    async def update_stocks(self, deltas: Deltas, tenant_id: str) -> Dict[UUID, Decimal]:
+        """
+        Apply many stock changes at once ({article_id: quantity} or
+        (article_id, quantity) pairs; quantities for the same article are
+        summed) in one UPDATE per chunk. Returns the new current_stock per
+        article found.
+        """
+        totals = aggregate_deltas(deltas, Article.__table__.c.id, Article.__table__.c.current_stock)
+        rows = await self._increment_many(
+            totals, tenant_id,
+            lambda chunk: self._stock_values(delta_case(Article.id, chunk, Article.current_stock.type)),
+            (Article.current_stock, Article.available_stock),
+        )
+        logger.info(f"Updated stock of {len(rows)} articles")
+        return {id: row.current_stock for id, row in rows.items()}
+
+    # Reservations (see stock_reservation_repository_impl.py)
+    #
+    # These run in the caller's transaction and do not commit: the stock
+    # level and the reservation rows change together or not at all.
+
+    async def lock_stock(self, article_ids: Sequence[UUID], tenant_id: str) -> Dict[UUID, Decimal]:
+        """
+        Lock the articles (in id order, so concurrent orders over the same
+        articles cannot deadlock) and return their available stock.
+        """
+        statement = (
+            select(Article.id, Article.available_stock)
+            .where(Article.id.in_(list(article_ids)), *self._scope_conditions(tenant_id))
+            .order_by(Article.id)
+            .with_for_update()
+        )
+        result = await self._execute(statement, tenant_id=tenant_id)
+        return {row.id: row.available_stock for row in result.all()}
+
+    async def hold_stock(self, quantities: Dict[UUID, Decimal], tenant_id: str) -> Dict[UUID, Decimal]:
+        """
+        Move quantities from available to reserved stock. The available-to-promise
+        check is part of the UPDATE (available_stock >= quantity), so an
+        article is never oversold; articles without enough stock are left
+        unchanged and missing from the result (id -> new available stock).
+        """
+        delta = delta_case(Article.id, quantities, Article.current_stock.type)
+        rows = await self._update_returning(
+            [Article.id.in_(list(quantities)), *self._scope_conditions(tenant_id), Article.available_stock >= delta],
+            {'reserved_stock': Article.reserved_stock + delta, 'available_stock': Article.available_stock - delta},
+            tenant_id, (Article.available_stock,),
+        )
+        return {row.id: row.available_stock for row in rows}
+
+    async def release_stock(self, quantities: Dict[UUID, Decimal], tenant_id: str) -> None:
+        """Return reserved quantities to available stock (released or expired reservations)."""
+        delta = delta_case(Article.id, quantities, Article.current_stock.type)
+        await self._update_returning(
+            [Article.id.in_(list(quantities)), Article.tenant_id == tenant_id],
+            {'reserved_stock': Article.reserved_stock - delta, 'available_stock': Article.available_stock + delta},
+            tenant_id, (),
+        )
+
+    async def consume_stock(self, quantities: Dict[UUID, Decimal], tenant_id: str) -> None:
+        """Take reserved quantities out of stock (committed reservations); available stock is unchanged."""
+        delta = delta_case(Article.id, quantities, Article.current_stock.type)
+        await self._update_returning(
+            [Article.id.in_(list(quantities)), Article.tenant_id == tenant_id],
+            {'current_stock': Article.current_stock - delta, 'reserved_stock': Article.reserved_stock - delta},
+            tenant_id, (),
+        )
+
+    async def get_stock_levels(self, tenant_id: str, since: Optional[datetime] = None) -> list:
+        """
+        (id, available_stock, is_active, updated_at) of the tenant's active
+        articles, or with since of all articles changed at or after it
+        (deactivated ones included, so snapshots can drop them).
+        """
+        columns = (Article.id, Article.available_stock, Article.is_active, Article.updated_at)
+        if since is None:
+            statement = select(*columns).where(*self._scope_conditions(tenant_id))
+        else:
+            statement = select(*columns).where(Article.tenant_id == tenant_id, Article.updated_at >= since)
+        result = await self._read(statement, tenant_id)
+        return result.all()
@@ -4,142 +4,84 @@ PostgreSQL-based implementation of the Contact repository interface
 """
 
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Sequence, Union
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
 
+from ..base_repository import BaseRepositoryImpl
+from ..pagination import Page, OffsetPage, InvalidCursorError
+from ..projection import InvalidFieldsError
 from ..interfaces import ContactRepository
 from ....core.models import Contact
 
 logger = logging.getLogger(__name__)
 
 
-class ContactRepositoryImpl(ContactRepository):
+class ContactRepositoryImpl(BaseRepositoryImpl[Contact, dict, dict], ContactRepository):
     """PostgreSQL implementation of Contact repository"""
 
-    def __init__(self, session_factory):
-        self.session_factory = session_factory
+    def __init__(self, session: Union[AsyncSession, Session]):
+        super().__init__(session, Contact)
 
-    def _get_session(self) -> Session:
-        return self.session_factory()
-
-    async def create(self, data: Dict[str, Any], tenant_id: str) -> Contact:
-        """Create a new contact"""
-        try:
-            session = self._get_session()
-            contact = Contact(
-                tenant_id=tenant_id,
-                **data
-            )
-            session.add(contact)
-            session.commit()
-            session.refresh(contact)
-            logger.info(f"Created contact {contact.id} for tenant {tenant_id}")
-            return contact
-        except Exception as e:
-            session.rollback()
-            logger.error(f"Failed to create contact: {e}")
-            raise
-        finally:
-            session.close()
-
-    async def get_by_id(self, contact_id: str, tenant_id: str) -> Optional[Contact]:
-        """Get contact by ID"""
-        try:
-            session = self._get_session()
-            contact = session.query(Contact).filter(
-                and_(Contact.id == contact_id, Contact.tenant_id == tenant_id, Contact.is_active == True)
-            ).first()
-            return contact
-        except Exception as e:
-            logger.error(f"Failed to get contact {contact_id}: {e}")
-            raise
-        finally:
-            session.close()
+    def _filters(self, tenant_id: str, customer_id: Optional[str], search: Optional[str] = None) -> list:
+        conditions = self._scope_conditions(tenant_id)
+        if customer_id:
+            conditions.append(Contact.customer_id == customer_id)
+        if search:
+            conditions.append(self._search_clause(search).condition)
+        return conditions
 
     async def get_all(self, tenant_id: str, skip: int = 0, limit: int = 100,
-                     customer_id: Optional[str] = None) -> List[Contact]:
+                      customer_id: Optional[str] = None) -> List[Contact]:
         """Get all contacts with optional filtering"""
         try:
-            session = self._get_session()
-            query = session.query(Contact).filter(
-                and_(Contact.tenant_id == tenant_id, Contact.is_active == True)
+            statement = (
+                select(Contact)
+                .where(*self._filters(tenant_id, customer_id))
+                .offset(skip)
+                .limit(limit)
             )
-
-            if customer_id:
-                query = query.filter(Contact.customer_id == customer_id)
-
-            contacts = query.offset(skip).limit(limit).all()
-            return contacts
+            result = await self._read(statement, tenant_id)
+            return list(result.scalars().all())
         except Exception as e:
             logger.error(f"Failed to get contacts for tenant {tenant_id}: {e}")
             raise
-        finally:
-            session.close()
 
-    async def count(self, tenant_id: str, customer_id: Optional[str] = None) -> int:
-        """Count contacts with optional filtering"""
+    async def get_all_with_total(self, tenant_id: str, skip: int = 0, limit: int = 100,
+                                 customer_id: Optional[str] = None,
+                                 total_mode: str = "exact", search: Optional[str] = None,
+                                 fields: Optional[Sequence[str]] = None) -> OffsetPage[Contact]:
+        """Get a page of contacts and the total in one round trip, with optional filtering and search (ranked)"""
         try:
-            session = self._get_session()
-            query = session.query(func.count(Contact.id)).filter(
-                and_(Contact.tenant_id == tenant_id, Contact.is_active == True)
+            ranking = self._search_clause(search) if search else None
+            return await self._offset_page(
+                self._filters(tenant_id, customer_id, search), tenant_id, skip, limit, total_mode, ranking, fields=fields
             )
-
-            if customer_id:
-                query = query.filter(Contact.customer_id == customer_id)
-
-            count = query.scalar()
-            return count or 0
+        except InvalidFieldsError:
+            raise
         except Exception as e:
-            logger.error(f"Failed to count contacts for tenant {tenant_id}: {e}")
+            logger.error(f"Failed to get contacts for tenant {tenant_id}: {e}")
             raise
-        finally:
-            session.close()
 
-    async def update(self, contact_id: str, data: Dict[str, Any], tenant_id: str) -> Optional[Contact]:
-        """Update contact"""
+    async def get_page(self, tenant_id: str, limit: int = 100, cursor: Optional[str] = None,
+                       customer_id: Optional[str] = None, search: Optional[str] = None,
+                       fields: Optional[Sequence[str]] = None) -> Page[Contact]:
+        """Get one keyset page of contacts with optional filtering and search"""
         try:
-            session = self._get_session()
-            contact = session.query(Contact).filter(
-                and_(Contact.id == contact_id, Contact.tenant_id == tenant_id, Contact.is_active == True)
-            ).first()
-
-            if not contact:
-                return None
-
-            for key, value in data.items():
-                if hasattr(contact, key):
-                    setattr(contact, key, value)
-
-            session.commit()
-            session.refresh(contact)
-            logger.info(f"Updated contact {contact_id}")
-            return contact
+            return await self._keyset_page(self._filters(tenant_id, customer_id, search), tenant_id, limit, cursor, fields)
+        except (InvalidCursorError, InvalidFieldsError):
+            raise
         except Exception as e:
-            session.rollback()
-            logger.error(f"Failed to update contact {contact_id}: {e}")
+            logger.error(f"Failed to get contacts page for tenant {tenant_id}: {e}")
             raise
-        finally:
-            session.close()
 
-    async def delete(self, contact_id: str, tenant_id: str) -> bool:
-        """Soft delete contact"""
+    async def count(self, tenant_id: str, customer_id: Optional[str] = None) -> int:
+        """Count contacts with optional filtering"""
         try:
-            session = self._get_session()
-            contact = session.query(Contact).filter(
-                and_(Contact.id == contact_id, Contact.tenant_id == tenant_id, Contact.is_active == True)
-            ).first()
-
-            if not contact:
-                return False
-
-            contact.is_active = False
-            session.commit()
-            logger.info(f"Soft deleted contact {contact_id}")
-            return True
+            statement = select(func.count(Contact.id)).where(*self._filters(tenant_id, customer_id))
+            result = await self._read(statement, tenant_id)
+            return result.scalar() or 0
         except Exception as e:
-            session.rollback()
-            logger.error(f"Failed to delete contact {contact_id}: {e}")
+            logger.error(f"Failed to count contacts for tenant {tenant_id}: {e}")
             raise
-        finally:
-            session.close()
\ No newline at end of file
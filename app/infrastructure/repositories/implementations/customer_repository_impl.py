@@ -0,0 +1,126 @@
+"""
+Customer Repository Implementation
+PostgreSQL-based implementation of the Customer repository interface
+"""
+
+import logging
+from typing import Any, List, Optional, Sequence, Union
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+
+from ..base_repository import BaseRepositoryImpl
+from ..pagination import Page, OffsetPage, InvalidCursorError
+from ..projection import InvalidFieldsError
+from ..interfaces import CustomerRepository
+from ..number_ranges import CUSTOMER
+from ....core.models import Customer
+from .number_range_repository_impl import NumberRangeRepositoryImpl
+
+logger = logging.getLogger(__name__)
+
+
+class CustomerRepositoryImpl(BaseRepositoryImpl[Customer, dict, dict], CustomerRepository):
+    """
+    PostgreSQL implementation of Customer repository.
+
+    Customers created without a customer number get the next one of the
+    tenant's customer number range.
+    """
+
+    # customer_number is unique per tenant
+    upsert_keys = ('tenant_id', 'customer_number')
+    cached_lookups = {'get_by_customer_number': 'customer_number'}
+
+    def __init__(self, session: Union[AsyncSession, Session],
+                 number_ranges: Optional[NumberRangeRepositoryImpl] = None):
+        super().__init__(session, Customer)
+        self.number_ranges = number_ranges or NumberRangeRepositoryImpl(session)
+
+    async def create(self, data: Any, tenant_id: str) -> Customer:
+        """Create a customer, numbered from the customer number range unless it has a customer_number"""
+        data = dict(self._to_dict(data))
+        if not data.get('customer_number'):
+            data['customer_number'], = await self.number_ranges.next_numbers(CUSTOMER, tenant_id)
+        return await super().create(data, tenant_id)
+
+    async def bulk_create(self, rows: List[Any], tenant_id: str, chunk_size: Optional[int] = None,
+                          indexes: Optional[List[int]] = None):
+        """Insert many customers; rows without a customer_number are numbered with one range reservation"""
+        rows = [dict(self._to_dict(row)) for row in rows]
+        unnumbered = [row for row in rows if not row.get('customer_number')]
+        if unnumbered:
+            numbers = await self.number_ranges.next_numbers(CUSTOMER, tenant_id, len(unnumbered))
+            for row, number in zip(unnumbered, numbers):
+                row['customer_number'] = number
+        return await super().bulk_create(rows, tenant_id, chunk_size, indexes)
+
+    def _filters(self, tenant_id: str, search: Optional[str]) -> list:
+        conditions = self._scope_conditions(tenant_id)
+        if search:
+            conditions.append(self._search_clause(search).condition)
+        return conditions
+
+    async def get_by_customer_number(self, customer_number: str, tenant_id: str) -> Optional[Customer]:
+        """Get customer by customer number"""
+        try:
+            statement = select(Customer).where(
+                Customer.customer_number == customer_number, *self._scope_conditions(tenant_id)
+            )
+            result = await self._read(statement, tenant_id)
+            return result.scalars().first()
+        except Exception as e:
+            logger.error(f"Failed to get customer {customer_number}: {e}")
+            raise
+
+    async def get_all(self, tenant_id: str, skip: int = 0, limit: int = 100,
+                      search: Optional[str] = None) -> List[Customer]:
+        """Get all customers with optional search"""
+        try:
+            statement = (
+                select(Customer)
+                .where(*self._filters(tenant_id, search))
+                .offset(skip)
+                .limit(limit)
+            )
+            result = await self._read(statement, tenant_id)
+            return list(result.scalars().all())
+        except Exception as e:
+            logger.error(f"Failed to get customers for tenant {tenant_id}: {e}")
+            raise
+
+    async def get_all_with_total(self, tenant_id: str, skip: int = 0, limit: int = 100,
+                                 search: Optional[str] = None,
+                                 total_mode: str = "exact",
+                                 fields: Optional[Sequence[str]] = None) -> OffsetPage[Customer]:
+        """Get a page of customers and the total in one round trip, with optional search (ranked)"""
+        try:
+            ranking = self._search_clause(search) if search else None
+            return await self._offset_page(self._filters(tenant_id, search), tenant_id, skip, limit, total_mode, ranking, fields=fields)
+        except InvalidFieldsError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to get customers for tenant {tenant_id}: {e}")
+            raise
+
+    async def get_page(self, tenant_id: str, limit: int = 100, cursor: Optional[str] = None,
+                       search: Optional[str] = None,
+                       fields: Optional[Sequence[str]] = None) -> Page[Customer]:
+        """Get one keyset page of customers with optional search"""
+        try:
+            return await self._keyset_page(self._filters(tenant_id, search), tenant_id, limit, cursor, fields)
+        except (InvalidCursorError, InvalidFieldsError):
+            raise
+        except Exception as e:
+            logger.error(f"Failed to get customers page for tenant {tenant_id}: {e}")
+            raise
+
+    async def count(self, tenant_id: str, search: Optional[str] = None) -> int:
+        """Count customers with optional search"""
+        try:
+            statement = select(func.count(Customer.id)).where(*self._filters(tenant_id, search))
+            result = await self._read(statement, tenant_id)
+            return result.scalar() or 0
+        except Exception as e:
+            logger.error(f"Failed to count customers for tenant {tenant_id}: {e}")
+            raise
@@ -0,0 +1,622 @@
+"""
+Journal Entry Repository Implementation
+PostgreSQL-based implementation of the JournalEntry repository interface
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, update, func, extract, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..base_repository import BaseRepositoryImpl
+from ..bulk import chunked, coerce_value, error_message, prepare_row
+from ..interfaces import JournalEntryRepository
+from ..journal_query import JournalEntryQuery, date_range, day
+from ..money import cents_array, from_cents, to_cents, totals_by_key
+from ..number_ranges import JOURNAL_ENTRY
+from ..pagination import NEXT, InvalidCursorError, OffsetPage, Page, cursor_value, decode_cursor, encode_cursor
+from ..period_balances import PeriodClosedError, month_start
+from ..posting import PostingProgress, UnbalancedEntryError
+from ..trial_balance import BOOKED, ZERO, invalidate_trial_balance
+from ....core.models import Account, JournalEntry, JournalEntryLine
+from .account_period_balance_repository_impl import AccountPeriodBalanceRepositoryImpl
+from .account_repository_impl import AccountRepositoryImpl
+from .number_range_repository_impl import NumberRangeRepositoryImpl
+
+logger = logging.getLogger(__name__)
+
+
+class JournalEntryRepositoryImpl(BaseRepositoryImpl[JournalEntry, dict, dict], JournalEntryRepository):
+    """
+    PostgreSQL implementation of JournalEntry repository.
+
+    Posting an entry adds its lines to the account period balances and the
+    account balances in the same transaction; entries that do not balance
+    or are dated in a closed period cannot be posted. Reversing a posted
+    entry books a new entry with the lines' debit and credit swapped.
+    """
+
+    # Keyset pages in date order (the (tenant_id, entry_date, status) index serves the range)
+    cursor_sort_key = 'entry_date'
+    # Entries per transaction for post_entries and reverse_entries
+    posting_chunk_size = 500
+    reversal_chunk_size = 500
+
+    def __init__(self, session: Union[AsyncSession, Session],
+                 period_balances: Optional[AccountPeriodBalanceRepositoryImpl] = None,
+                 accounts: Optional[AccountRepositoryImpl] = None,
+                 number_ranges: Optional[NumberRangeRepositoryImpl] = None):
+        super().__init__(session, JournalEntry)
+        self.period_balances = period_balances or AccountPeriodBalanceRepositoryImpl(session)
+        self.accounts = accounts or AccountRepositoryImpl(session)
+        self.number_ranges = number_ranges or NumberRangeRepositoryImpl(session)
+
+    async def create(self, data: Any, tenant_id: str) -> JournalEntry:
+        """
+        Create an entry together with its lines in one transaction: one
+        INSERT for the entry and one multi-row INSERT for all of its lines.
+        The totals default to the sums of the lines. Without an entry_number
+        the entry gets the next number of the tenant's journal number range,
+        taken in the same transaction (a failed insert leaves no gap).
+        ValueError for unknown fields or invalid values. Returns the entry
+        with its lines loaded.
+        """
+        data = dict(self._to_dict(data))
+        lines = [dict(self._to_dict(line)) for line in data.pop('lines', None) or []]
+        data['tenant_id'] = tenant_id
+        if data.get('total_debit') is None:
+            data['total_debit'] = from_cents(sum(to_cents(line.get('debit_amount')) for line in lines))
+        if data.get('total_credit') is None:
+            data['total_credit'] = from_cents(sum(to_cents(line.get('credit_amount')) for line in lines))
+        entry = prepare_row(JournalEntry.__table__, data)
+        rows = [
+            prepare_row(JournalEntryLine.__table__, {
+                **line, 'tenant_id': tenant_id, 'journal_entry_id': entry['id'], 'entry_date': entry['entry_date'],
+            })
+            for line in lines
+        ]
+        try:
+            if not entry.get('entry_number'):
+                entry['entry_number'], = await self.number_ranges.next_numbers(JOURNAL_ENTRY, tenant_id)
+            await self._execute(insert(JournalEntry.__table__), entry, tenant_id=tenant_id)
+            if rows:
+                await self._execute(insert(JournalEntryLine.__table__), rows, tenant_id=tenant_id)
+            self._record_write(tenant_id)
+            await self._commit()
+        except SQLAlchemyError as e:
+            await self._rollback()
+            logger.error(f"Failed to create journal entry {entry.get('entry_number')}: {e}")
+            raise
+        logger.info(f"Created journal entry {entry['id']} with {len(rows)} lines")
+        return await self.get_with_lines(entry['id'], entry['tenant_id'])
+
+    async def get_with_lines(self, entry_id: Any, tenant_id: str) -> Optional[JournalEntry]:
+        """Get an entry with its lines loaded (in line order)"""
+        statement = (
+            select(JournalEntry)
+            .where(JournalEntry.id == entry_id, *self._scope_conditions(tenant_id))
+            .options(selectinload(JournalEntry.lines))
+        )
+        result = await self._read(statement, tenant_id)
+        entry = result.scalars().first()
+        if entry is not None:
+            entry.lines.sort(key=lambda line: line.line_number)
+        return entry
+
+    async def update(self, id: str, data: Any, tenant_id: str) -> Optional[JournalEntry]:
+        """Update an entry; a new entry date is copied onto its lines in the same transaction."""
+        values = self._to_dict(data, exclude_unset=True)
+        if values.get('entry_date') is not None:
+            await self._execute(
+                update(JournalEntryLine)
+                .where(JournalEntryLine.journal_entry_id == id, JournalEntryLine.tenant_id == tenant_id)
+                .values(entry_date=values['entry_date'])
+                .execution_options(synchronize_session=False),
+                tenant_id=tenant_id,
+            )
+        return await super().update(id, data, tenant_id)
+
+    async def post_entry(self, entry_id: str, tenant_id: str) -> bool:
+        """
+        Post a draft journal entry (a single conditional UPDATE; False if it
+        is not a draft). UnbalancedEntryError if its lines do not balance,
+        PeriodClosedError if it is dated in a closed period.
+        """
+        try:
+            rows = await self._update_returning(
+                [JournalEntry.id == entry_id, *self._scope_conditions(tenant_id), JournalEntry.status == 'draft'],
+                {'status': 'posted', 'posted_at': datetime.utcnow()}, tenant_id, (),
+            )
+            if not rows:
+                return False
+            self._record_write(tenant_id)
+            debit, credit, lines = (await self._line_totals([rows[0].id], tenant_id)).get(rows[0].id, (ZERO, ZERO, 0))
+            if not lines or debit != credit:
+                raise UnbalancedEntryError(entry_id, debit, credit)
+            await self._book([entry_id], tenant_id)
+            await self._commit()
+        except (SQLAlchemyError, PeriodClosedError, UnbalancedEntryError) as e:
+            await self._rollback()
+            logger.error(f"Failed to post journal entry {entry_id}: {e}")
+            raise
+        await invalidate_trial_balance(self.session, [tenant_id])
+        logger.info(f"Posted journal entry {entry_id}")
+        return True
+
+    async def post_entries(self, entry_ids: Iterable[Any], tenant_id: str, chunk_size: Optional[int] = None,
+                           progress: Optional[PostingProgress] = None) -> PostingProgress:
+        """
+        Post many draft entries, posting_chunk_size entries per transaction.
+        Each chunk locks its drafts (SKIP LOCKED: entries another worker is
+        posting are skipped, not waited for), rejects the entries that do not
+        balance or are dated in a closed period, sets the others to posted
+        with one UPDATE and adds their lines to the period balances and,
+        summed per account, to the account balances (one update per account
+        and chunk). Entries that are no drafts are skipped; a failing chunk
+        fails its entries and the next chunk goes on.
+        Returns the progress (also updated after every chunk).
+        """
+        entry_ids = [coerce_value(JournalEntry.__table__.c.id, id) for id in dict.fromkeys(entry_ids)]
+        progress = progress or PostingProgress(len(entry_ids))
+        self._record_write(tenant_id)
+        latest_closed = await self.period_balances.latest_closed_period(tenant_id)
+
+        for _, chunk in chunked(entry_ids, chunk_size or self.posting_chunk_size):
+            try:
+                async with self._chunk_transaction():
+                    posted, rejected = await self._post_chunk(chunk, tenant_id, latest_closed)
+            except (SQLAlchemyError, PeriodClosedError) as e:
+                logger.warning(f"Posting chunk of {len(chunk)} journal entries failed: {error_message(e)}")
+                progress.record(failed={id: error_message(e) for id in chunk})
+                continue
+            progress.record(posted=posted, skipped=len(chunk) - posted - len(rejected), failed=rejected)
+
+        if progress.posted:
+            await invalidate_trial_balance(self.session, [tenant_id])
+        logger.info(
+            f"Posted {progress.posted} of {progress.total} journal entries for tenant {tenant_id} "
+            f"({progress.skipped} skipped, {progress.failed} failed, {progress.entries_per_second:.0f} entries/s)"
+        )
+        return progress
+
+    async def _post_chunk(self, entry_ids: List[Any], tenant_id: str,
+                          latest_closed: Optional[date]) -> Tuple[int, Dict[Any, str]]:
+        """Post the drafts among entry_ids in the current transaction; returns (posted, {entry_id: error})."""
+        locked = (await self._execute(
+            select(JournalEntry.id, JournalEntry.entry_date)
+            .where(JournalEntry.id.in_(entry_ids), *self._scope_conditions(tenant_id), JournalEntry.status == 'draft')
+            .order_by(JournalEntry.id)
+            .with_for_update(skip_locked=True),
+            tenant_id=tenant_id,
+        )).all()
+        if not locked:
+            return 0, {}
+
+        totals = await self._line_totals([row.id for row in locked], tenant_id)
+        valid, rejected = [], {}
+        for row in locked:
+            debit, credit, lines = totals.get(row.id, (ZERO, ZERO, 0))
+            if not lines or debit != credit:
+                rejected[row.id] = str(UnbalancedEntryError(row.id, debit, credit))
+            elif latest_closed is not None and month_start(row.entry_date) <= latest_closed:
+                rejected[row.id] = str(PeriodClosedError(month_start(row.entry_date)))
+            else:
+                valid.append(row.id)
+        if not valid:
+            return 0, rejected
+
+        await self._execute(
+            update(JournalEntry)
+            .where(JournalEntry.id.in_(valid))
+            .values(status='posted', posted_at=datetime.utcnow())
+            .execution_options(synchronize_session=False),
+            tenant_id=tenant_id,
+        )
+        await self._book(valid, tenant_id)
+        return len(valid), rejected
+
+    async def _book(self, entry_ids: List[Any], tenant_id: str) -> None:
+        """Add the lines of entries just posted to the period balances and the account balances (debit - credit)."""
+        movements = await self._movements(entry_ids, tenant_id)
+        await self.period_balances.apply_movements(movements, tenant_id)
+        account_ids, debit, credit = totals_by_key(
+            (account_id for account_id, _ in movements),
+            cents_array(debit for debit, _ in movements.values()),
+            cents_array(credit for _, credit in movements.values()),
+        )
+        deltas = {id: from_cents(delta) for id, delta in zip(account_ids, (debit - credit).tolist()) if delta}
+        await self.accounts.update_balances(deltas, tenant_id)
+
+    async def _line_totals(self, entry_ids: List[Any], tenant_id: str) -> Dict[Any, Tuple[Decimal, Decimal, int]]:
+        """Debit, credit and number of lines per entry ({entry_id: (debit, credit, lines)}; entries without lines are missing)."""
+        statement = (
+            select(
+                JournalEntryLine.journal_entry_id,
+                func.sum(JournalEntryLine.debit_amount).label('debit'),
+                func.sum(JournalEntryLine.credit_amount).label('credit'),
+                func.count().label('lines'),
+            )
+            .where(JournalEntryLine.journal_entry_id.in_(entry_ids), JournalEntryLine.tenant_id == tenant_id)
+            .group_by(JournalEntryLine.journal_entry_id)
+        )
+        result = await self._execute(statement, tenant_id=tenant_id)
+        return {
+            row.journal_entry_id: (Decimal(row.debit or 0), Decimal(row.credit or 0), row.lines)
+            for row in result.all()
+        }
+
+    async def _movements(self, entry_ids: Iterable[Any], tenant_id: str) -> Dict[Tuple[Any, date], Tuple[Decimal, Decimal]]:
+        """Debit and credit of the entries' lines per account and month ({(account_id, period_start): (debit, credit)})."""
+        year = extract('year', JournalEntry.entry_date)
+        month = extract('month', JournalEntry.entry_date)
+        statement = (
+            select(
+                JournalEntryLine.account_id,
+                year.label('year'),
+                month.label('month'),
+                func.sum(JournalEntryLine.debit_amount).label('debit'),
+                func.sum(JournalEntryLine.credit_amount).label('credit'),
+            )
+            .join(JournalEntry, JournalEntry.id == JournalEntryLine.journal_entry_id)
+            .where(JournalEntry.id.in_(list(entry_ids)), JournalEntry.tenant_id == tenant_id)
+            .group_by(JournalEntryLine.account_id, year, month)
+        )
+        result = await self._execute(statement, tenant_id=tenant_id)
+        return {
+            (row.account_id, date(int(row.year), int(row.month), 1)): (row.debit, row.credit)
+            for row in result.all()
+        }
+
+    async def get_entries_by_date_range(self, start_date: str, end_date: str, tenant_id: str) -> List[JournalEntry]:
+        """Get journal entries dated within the range (both days included)"""
+        try:
+            start, end = date_range(start_date, end_date)
+            statement = (
+                select(JournalEntry)
+                .where(*self._scope_conditions(tenant_id), JournalEntry.entry_date >= start, JournalEntry.entry_date < end)
+                .order_by(JournalEntry.entry_date, JournalEntry.entry_number)
+            )
+            result = await self._read(statement, tenant_id)
+            return list(result.scalars().all())
+        except Exception as e:
+            logger.error(f"Failed to get journal entries {start_date}..{end_date} for tenant {tenant_id}: {e}")
+            raise
+
+    async def find_entries(self, query: JournalEntryQuery, tenant_id: str, skip: int = 0, limit: int = 100,
+                           total_mode: str = "exact") -> OffsetPage[JournalEntry]:
+        """
+        One page of the entries matching the query, in date order, with the
+        total, in a single statement; the lines of the page's entries are
+        loaded with one more query.
+        """
+        try:
+            return await self._offset_page(
+                [*self._scope_conditions(tenant_id), *query.conditions()], tenant_id, skip, limit, total_mode,
+                order_by=(JournalEntry.entry_date, JournalEntry.id), options=(selectinload(JournalEntry.lines),),
+            )
+        except Exception as e:
+            logger.error(f"Failed to find journal entries for tenant {tenant_id}: {e}")
+            raise
+
+    async def find_entries_page(self, query: JournalEntryQuery, tenant_id: str, limit: int = 100,
+                                cursor: Optional[str] = None) -> Page[JournalEntry]:
+        """One keyset page of the entries matching the query, in date order (same cost at any depth)."""
+        try:
+            return await self._keyset_page(
+                [*self._scope_conditions(tenant_id), *query.conditions()], tenant_id, limit, cursor,
+                options=(selectinload(JournalEntry.lines),),
+            )
+        except Exception as e:
+            logger.error(f"Failed to find journal entries for tenant {tenant_id}: {e}")
+            raise
+
+    async def get_entries_by_account(self, account_id: str, tenant_id: str,
+                                     start_date: Optional[str] = None, end_date: Optional[str] = None,
+                                     skip: int = 0, limit: int = 100) -> List[JournalEntry]:
+        """Entries with a line on the account (dated within the range if given), in date order"""
+        entry_ids = select(JournalEntryLine.journal_entry_id).where(
+            *self._line_conditions(account_id, tenant_id, start_date, end_date)
+        )
+        statement = (
+            select(JournalEntry)
+            .where(*self._scope_conditions(tenant_id), JournalEntry.id.in_(entry_ids))
+            .order_by(JournalEntry.entry_date, JournalEntry.entry_number)
+            .offset(skip)
+            .limit(limit)
+        )
+        try:
+            result = await self._read(statement, tenant_id)
+            return list(result.scalars().all())
+        except Exception as e:
+            logger.error(f"Failed to get journal entries of account {account_id} for tenant {tenant_id}: {e}")
+            raise
+
+    async def get_account_ledger(self, account_id: str, tenant_id: str,
+                                 start_date: Optional[Union[str, date]] = None,
+                                 end_date: Optional[Union[str, date]] = None,
+                                 limit: int = 100, cursor: Optional[str] = None) -> Page[dict]:
+        """
+        The booked lines of an account in date order with the running
+        balance (debit - credit), one keyset page at a time (next cursors
+        only). The lines are read along the (tenant, account, entry date)
+        index, so a page costs the same however long the account's history
+        is; the opening balance comes from the period snapshots.
+        Items: line_id, entry_id, entry_number, entry_date, account_number,
+        account_name, description, reference, debit_amount, credit_amount, balance.
+        """
+        account = await self.accounts.get_by_id(account_id, tenant_id)
+        if account is None:
+            return Page([])
+        conditions = [
+            *self._line_conditions(account.id, tenant_id, start_date, end_date),
+            JournalEntry.status.in_(BOOKED),
+        ]
+        position = tuple_(JournalEntryLine.entry_date, JournalEntryLine.id)
+
+        # Balance before the page: before the range from the snapshots, within it from the lines
+        balance = ZERO
+        if start_date is not None:
+            balance = await self.period_balances.get_balance_as_of(account.id, day(start_date) - timedelta(days=1), tenant_id)
+        boundary = None
+        if cursor:
+            sort_raw, id_raw, direction = decode_cursor(cursor)
+            if direction != NEXT:
+                raise InvalidCursorError("The account ledger only pages forward")
+            boundary = (cursor_value(JournalEntryLine.entry_date, sort_raw), cursor_value(JournalEntryLine.id, id_raw))
+            before = await self._read(
+                select(func.sum(JournalEntryLine.debit_amount - JournalEntryLine.credit_amount))
+                .join(JournalEntry, JournalEntry.id == JournalEntryLine.journal_entry_id)
+                .where(*conditions, position <= boundary),
+                tenant_id,
+            )
+            balance += before.scalar() or ZERO
+
+        statement = (
+            select(
+                JournalEntryLine.id.label('line_id'),
+                JournalEntryLine.journal_entry_id.label('entry_id'),
+                JournalEntry.entry_number,
+                JournalEntryLine.entry_date,
+                func.coalesce(JournalEntryLine.description, JournalEntry.description).label('description'),
+                JournalEntry.reference,
+                JournalEntryLine.debit_amount,
+                JournalEntryLine.credit_amount,
+            )
+            .join(JournalEntry, JournalEntry.id == JournalEntryLine.journal_entry_id)
+            .where(*conditions, *([position > boundary] if boundary is not None else []))
+            .order_by(JournalEntryLine.entry_date, JournalEntryLine.id)
+            .limit(limit + 1)
+        )
+        try:
+            result = await self._read(statement, tenant_id)
+            rows = result.all()
+        except Exception as e:
+            logger.error(f"Failed to get ledger of account {account_id} for tenant {tenant_id}: {e}")
+            raise
+
+        items = []
+        for row in rows[:limit]:
+            balance += row.debit_amount - row.credit_amount
+            items.append({
+                **row._mapping, 'account_number': account.account_number, 'account_name': account.account_name,
+                'balance': balance,
+            })
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(items[-1]['entry_date'], items[-1]['line_id'], NEXT)
+        return Page(items, next_cursor=next_cursor)
+
+    def _line_conditions(self, account_id: Any, tenant_id: str, start_date: Optional[Union[str, date]],
+                         end_date: Optional[Union[str, date]]) -> list:
+        """Lines of an account for the ledger index (tenant, account, entry date)."""
+        conditions = [JournalEntryLine.tenant_id == tenant_id, JournalEntryLine.account_id == account_id]
+        if start_date is not None:
+            conditions.append(JournalEntryLine.entry_date >= date_range(start_date, start_date)[0])
+        if end_date is not None:
+            conditions.append(JournalEntryLine.entry_date < date_range(end_date, end_date)[1])
+        return conditions
+
+    async def reverse_entry(self, entry_id: str, reason: str, tenant_id: str,
+                            reversal_date: Optional[Union[date, datetime]] = None) -> Optional[JournalEntry]:
+        """
+        Reverse a posted entry (see _reverse_chunk) in the current transaction.
+        Returns the reversal entry with its lines, None if the entry is not
+        posted. PeriodClosedError if reversal_date (default: now) lies in a
+        closed period.
+        """
+        reversal_date = self._reversal_datetime(reversal_date)
+        try:
+            reversal_ids = await self._reverse_chunk(
+                [coerce_value(JournalEntry.__table__.c.id, entry_id)], reason, reversal_date, tenant_id
+            )
+            self._record_write(tenant_id)
+            await self._commit()
+        except (SQLAlchemyError, PeriodClosedError) as e:
+            await self._rollback()
+            logger.error(f"Failed to reverse journal entry {entry_id}: {e}")
+            raise
+        if not reversal_ids:
+            return None
+        await invalidate_trial_balance(self.session, [tenant_id])
+        logger.info(f"Reversed journal entry {entry_id} by {reversal_ids[0]}")
+        return await self.get_with_lines(reversal_ids[0], tenant_id)
+
+    async def reverse_entries(self, query: JournalEntryQuery, reason: str, tenant_id: str,
+                              reversal_date: Optional[Union[date, datetime]] = None, chunk_size: Optional[int] = None,
+                              progress: Optional[PostingProgress] = None) -> PostingProgress:
+        """
+        Reverse the posted entries matching the query (reversals themselves
+        excepted), reversal_chunk_size entries per chunk taken in id order.
+        A chunk is a savepoint inside a request's unit of work (the request
+        still commits once) and a transaction of its own otherwise. Entries
+        locked by another transaction are skipped; a failing chunk fails its
+        entries and the next chunk goes on. PeriodClosedError
+        up front if reversal_date (default: now) lies in a closed period.
+        Returns the progress (posted counts the entries reversed).
+        """
+        reversal_date = self._reversal_datetime(reversal_date)
+        latest_closed = await self.period_balances.latest_closed_period(tenant_id)
+        if latest_closed is not None and month_start(reversal_date) <= latest_closed:
+            raise PeriodClosedError(month_start(reversal_date))
+        conditions = [
+            *self._scope_conditions(tenant_id), *query.conditions(),
+            JournalEntry.status == 'posted', JournalEntry.reversal_of.is_(None),
+        ]
+        chunk_size = chunk_size or self.reversal_chunk_size
+        progress = progress or PostingProgress()
+        self._record_write(tenant_id)
+
+        last_id = None
+        while True:
+            statement = select(JournalEntry.id).where(*conditions).order_by(JournalEntry.id).limit(chunk_size)
+            if last_id is not None:
+                statement = statement.where(JournalEntry.id > last_id)
+            chunk = list((await self._execute(statement, tenant_id=tenant_id)).scalars().all())
+            if not chunk:
+                break
+            last_id = chunk[-1]
+            progress.total += len(chunk)
+            try:
+                async with self._chunk_transaction():
+                    reversed_count = len(await self._reverse_chunk(chunk, reason, reversal_date, tenant_id))
+            except (SQLAlchemyError, PeriodClosedError) as e:
+                logger.warning(f"Reversal chunk of {len(chunk)} journal entries failed: {error_message(e)}")
+                progress.record(failed={id: error_message(e) for id in chunk})
+                continue
+            progress.record(posted=reversed_count, skipped=len(chunk) - reversed_count)
+
+        if progress.posted:
+            await invalidate_trial_balance(self.session, [tenant_id])
+        logger.info(
+            f"Reversed {progress.posted} of {progress.total} journal entries for tenant {tenant_id} "
+            f"({progress.skipped} skipped, {progress.failed} failed, {progress.entries_per_second:.0f} entries/s)"
+        )
+        return progress
+
+    async def _reverse_chunk(self, entry_ids: List[Any], reason: str, reversal_date: datetime,
+                             tenant_id: str) -> List[Any]:
+        """
+        Reverse the posted entries among entry_ids in the current transaction:
+        one posted reversal entry per original (dated reversal_date, numbered
+        from the journal range, linked by reversal_of), its lines copied by
+        the database with debit and credit swapped (one INSERT ... SELECT),
+        the originals set to reversed, and the reversal lines booked into the
+        period and account balances (one update per account). Returns the
+        ids of the reversal entries.
+        """
+        originals = (await self._execute(
+            select(
+                JournalEntry.id, JournalEntry.entry_number, JournalEntry.reference, JournalEntry.source,
+                JournalEntry.total_debit, JournalEntry.total_credit, JournalEntry.currency,
+            )
+            .where(JournalEntry.id.in_(entry_ids), *self._scope_conditions(tenant_id), JournalEntry.status == 'posted')
+            .order_by(JournalEntry.id)
+            .with_for_update(skip_locked=True),
+            tenant_id=tenant_id,
+        )).all()
+        if not originals:
+            return []
+
+        numbers = await self.number_ranges.next_numbers(JOURNAL_ENTRY, tenant_id, len(originals))
+        now = datetime.utcnow()
+        reversals = [
+            prepare_row(JournalEntry.__table__, {
+                'tenant_id': tenant_id, 'entry_number': number, 'entry_date': reversal_date,
+                'posting_date': reversal_date, 'description': f"Reversal of {row.entry_number}: {reason}"[:500],
+                'reference': row.reference, 'source': row.source, 'status': 'posted', 'posted_at': now,
+                'total_debit': row.total_credit, 'total_credit': row.total_debit, 'currency': row.currency,
+                'reversal_of': row.id, 'reversal_date': reversal_date,
+            })
+            for row, number in zip(originals, numbers)
+        ]
+        await self._execute(insert(JournalEntry.__table__), reversals, tenant_id=tenant_id)
+        reversal_ids = [row['id'] for row in reversals]
+        await self._execute(self._reversal_lines(reversal_ids, tenant_id), tenant_id=tenant_id)
+        await self._execute(
+            update(JournalEntry)
+            .where(JournalEntry.id.in_([row.id for row in originals]))
+            .values(status='reversed', reversal_date=reversal_date)
+            .execution_options(synchronize_session=False),
+            tenant_id=tenant_id,
+        )
+        await self._book(reversal_ids, tenant_id)
+        return reversal_ids
+
+    def _reversal_lines(self, reversal_ids: List[Any], tenant_id: str):
+        """INSERT ... SELECT of the lines of the reversal entries: the originals' lines, debit and credit swapped."""
+        line = JournalEntryLine.__table__
+        reversal = JournalEntry.__table__.alias('reversal')
+        copied = ('line_number', 'description', 'tax_code', 'tax_amount', 'cost_center', 'profit_center', 'segment')
+        statement = (
+            select(
+                self._generated_id(), line.c.tenant_id, reversal.c.id, line.c.account_id, reversal.c.entry_date,
+                line.c.credit_amount, line.c.debit_amount, *(line.c[name] for name in copied),
+            )
+            .join(reversal, reversal.c.reversal_of == line.c.journal_entry_id)
+            .where(reversal.c.id.in_(reversal_ids), line.c.tenant_id == tenant_id)
+        )
+        return insert(line).from_select(
+            ['id', 'tenant_id', 'journal_entry_id', 'account_id', 'entry_date', 'debit_amount', 'credit_amount',
+             *copied],
+            statement,
+        )
+
+    @staticmethod
+    def _reversal_datetime(reversal_date: Optional[Union[date, datetime]]) -> datetime:
+        if reversal_date is None:
+            return datetime.utcnow()
+        if isinstance(reversal_date, datetime):
+            return reversal_date
+        return datetime.combine(reversal_date, datetime.min.time())
+
+    async def get_trial_balance_rows(self, tenant_id: str, start_date: Union[str, date],
+                                     end_date: Union[str, date]) -> List[Any]:
+        """
+        Debit and credit per account and month of the booked entries in the
+        range, summed by the database in one statement: the lines are
+        grouped before the accounts are joined, so the accounts are read
+        once per group instead of once per line.
+        Rows: id, account_number, account_name, account_type, category,
+        year, month, debit, credit (accounts without movements are left out).
+        """
+        start, end = date_range(start_date, end_date)
+        year = extract('year', JournalEntry.entry_date)
+        month = extract('month', JournalEntry.entry_date)
+        movements = (
+            select(
+                JournalEntryLine.account_id,
+                year.label('year'),
+                month.label('month'),
+                func.sum(JournalEntryLine.debit_amount).label('debit'),
+                func.sum(JournalEntryLine.credit_amount).label('credit'),
+            )
+            .join(JournalEntry, JournalEntry.id == JournalEntryLine.journal_entry_id)
+            .where(
+                JournalEntry.tenant_id == tenant_id,
+                JournalEntry.status.in_(BOOKED),
+                JournalEntry.entry_date >= start,
+                JournalEntry.entry_date < end,
+                JournalEntryLine.tenant_id == tenant_id,
+            )
+            .group_by(JournalEntryLine.account_id, year, month)
+            .subquery()
+        )
+        statement = (
+            select(
+                Account.id, Account.account_number, Account.account_name, Account.account_type, Account.category,
+                movements.c.year, movements.c.month, movements.c.debit, movements.c.credit,
+            )
+            .join(movements, movements.c.account_id == Account.id)
+            .where(Account.tenant_id == tenant_id)
+            .order_by(Account.account_number, movements.c.year, movements.c.month)
+        )
+        try:
+            result = await self._read(statement, tenant_id)
+            return result.all()
+        except Exception as e:
+            logger.error(f"Failed to aggregate trial balance {start_date}..{end_date} for tenant {tenant_id}: {e}")
+            raise
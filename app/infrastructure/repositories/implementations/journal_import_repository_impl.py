@@ -0,0 +1,351 @@
+"""
+Journal Import Repository Implementation
+PostgreSQL-based implementation of the JournalImport repository interface
+"""
+
+import logging
+import uuid
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import DateTime, and_, delete, func, insert, literal, or_, select
+from sqlalchemy.exc import IntegrityError
+
+from ..base_repository import BaseRepositoryImpl
+from ..bulk import coerce_value, error_message
+from ..datev import DatevBatch, DatevReader, DocumentDates
+from ..interfaces import JournalImportRepository
+from ..journal_import import SOURCE, STALE_AFTER, ImportConflictError, import_path
+from ..money import entry_totals, from_cents, sql_amount
+from ..number_ranges import JOURNAL_ENTRY
+from ..pagination import OffsetPage
+from ..period_balances import PeriodClosedError, month_start
+from ..posting import COMPLETED, FAILED, QUEUED, RUNNING
+from ..trial_balance import invalidate_trial_balance
+from ....core.models import JournalEntry, JournalEntryLine, JournalImport, JournalImportError, JournalImportLine
+from .account_repository_impl import AccountRepositoryImpl
+from .journal_entry_repository_impl import JournalEntryRepositoryImpl
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CURRENCY = 'EUR'
+
+# Returned by every update of an import, so an instance loaded in the session stays current
+PROGRESS = (
+    JournalImport.post, JournalImport.status, JournalImport.last_row, JournalImport.rows, JournalImport.entries,
+    JournalImport.lines, JournalImport.failed_rows, JournalImport.error, JournalImport.started_at,
+    JournalImport.finished_at, JournalImport.updated_at,
+)
+
+
+def account_key(number: str) -> str:
+    """Account numbers compare without leading zeros (DATEV 1200 is account 001200)."""
+    return number.lstrip('0') or '0'
+
+
+class JournalImportRepositoryImpl(BaseRepositoryImpl[JournalImport, dict, dict], JournalImportRepository):
+    """
+    PostgreSQL implementation of JournalImport repository.
+
+    Imports a DATEV Buchungsstapel file chunk by chunk, one transaction per
+    chunk: its rows are checked (accounts against the chart of accounts
+    loaded once per run, amounts and entry balances as int64 cent arrays),
+    the lines of its valid entries are loaded into the staging table (COPY
+    on PostgreSQL) and merged into the journal with one INSERT ... SELECT
+    for the entries and one for the lines, the rejected rows are recorded
+    and the import's progress advances. A run that fails stops after its
+    last committed chunk and is resumed from there.
+    """
+
+    # Rows per transaction (entries are never split, so chunks can be a little larger)
+    import_chunk_size = 5000
+
+    def __init__(self, session: Union[AsyncSession, Session],
+                 journal_entries: Optional[JournalEntryRepositoryImpl] = None,
+                 accounts: Optional[AccountRepositoryImpl] = None):
+        super().__init__(session, JournalImport)
+        self.journal_entries = journal_entries or JournalEntryRepositoryImpl(session)
+        self.accounts = accounts or AccountRepositoryImpl(session)
+        self.staging = BaseRepositoryImpl(session, JournalImportLine)
+        self.errors = BaseRepositoryImpl(session, JournalImportError)
+
+    async def create_import(self, import_id: Any, tenant_id: str, file_name: Optional[str] = None,
+                            post: bool = False) -> JournalImport:
+        """
+        Register the import of the DATEV file stored at import_path(import_id)
+        (committed right away, so a job can run it). DatevFormatError if it is
+        no Buchungsstapel, ImportConflictError if the tenant imported the same
+        file (by its header) before.
+        """
+        with DatevReader(import_path(import_id)) as reader:
+            fingerprint = reader.header.fingerprint
+        tenant = coerce_value(JournalImport.__table__.c.tenant_id, tenant_id)
+        result = await self._read(
+            select(JournalImport.id).where(JournalImport.tenant_id == tenant, JournalImport.fingerprint == fingerprint),
+            tenant_id,
+        )
+        existing = result.scalar()
+        if existing is not None:
+            raise ImportConflictError(f"The file was imported before (import {existing})", existing)
+        try:
+            async with self._chunk_transaction():
+                return await self.create({
+                    'id': coerce_value(JournalImport.__table__.c.id, import_id), 'file_name': file_name,
+                    'fingerprint': fingerprint, 'post': post, 'status': QUEUED,
+                }, tenant)
+        except IntegrityError:
+            # The same file registered at the same time
+            raise ImportConflictError("The file is being imported already", None) from None
+
+    async def run_import(self, import_id: Any, tenant_id: str, chunk_size: Optional[int] = None) -> Optional[JournalImport]:
+        """
+        Run a queued import, or resume a failed or interrupted one after its
+        last committed chunk. Returns the import, None if it is not found,
+        completed or running on another worker.
+        """
+        import_id = coerce_value(JournalImport.__table__.c.id, import_id)
+        async with self._chunk_transaction():
+            claimed = await self._claim(import_id, tenant_id)
+        if claimed is None:
+            logger.info(f"Journal import {import_id} is not found, completed or running elsewhere")
+            return None
+        last_row, post = claimed
+        posted = 0
+        try:
+            chart = {account_key(number): id for number, id in (await self.accounts.get_chart(tenant_id)).items()}
+            latest_closed = await self.journal_entries.period_balances.latest_closed_period(tenant_id) if post else None
+            with DatevReader(import_path(import_id)) as reader:
+                dates = DocumentDates(reader.header)
+                for batch in reader.batches(chunk_size or self.import_chunk_size, last_row):
+                    async with self._chunk_transaction():
+                        entries = await self._import_chunk(import_id, post, batch, chart, dates, latest_closed, tenant_id)
+                    posted += entries if post else 0
+        except Exception as e:
+            async with self._chunk_transaction():
+                await self._finish(import_id, tenant_id, FAILED, error_message(e)[:500])
+            raise
+        finally:
+            if posted:
+                await invalidate_trial_balance(self.session, [tenant_id])
+
+        async with self._chunk_transaction():
+            await self._finish(import_id, tenant_id, COMPLETED)
+        import_path(import_id).unlink(missing_ok=True)
+        record = await self.get_by_id(import_id, tenant_id)
+        logger.info(
+            f"Journal import {import_id} completed: {record.rows} rows, {record.entries} entries, "
+            f"{record.lines} lines, {record.failed_rows} rows rejected"
+        )
+        return record
+
+    async def get_errors(self, import_id: Any, tenant_id: str, skip: int = 0,
+                         limit: int = 100) -> Optional[OffsetPage[JournalImportError]]:
+        """The rejected rows of an import in file order (None if the import is not found)."""
+        if await self.get_by_id(import_id, tenant_id) is None:
+            return None
+        import_id = coerce_value(JournalImport.__table__.c.id, import_id)
+        return await self.errors._offset_page(
+            [JournalImportError.import_id == import_id], tenant_id, skip, limit,
+            order_by=[JournalImportError.row_number],
+        )
+
+    async def _claim(self, import_id: Any, tenant_id: str) -> Optional[Tuple[int, bool]]:
+        """Mark the import running unless it completed or another worker runs it; returns (last_row, post)."""
+        now = datetime.utcnow()
+        rows = await self._update_returning(
+            [
+                JournalImport.id == import_id, *self._scope_conditions(tenant_id),
+                or_(
+                    JournalImport.status.in_((QUEUED, FAILED)),
+                    and_(JournalImport.status == RUNNING, JournalImport.updated_at < now - STALE_AFTER),
+                ),
+            ],
+            {'status': RUNNING, 'error': None, 'started_at': now, 'finished_at': None, 'updated_at': now},
+            tenant_id,
+            PROGRESS,
+        )
+        return (rows[0].last_row, rows[0].post) if rows else None
+
+    async def _finish(self, import_id: Any, tenant_id: str, status: str, error: Optional[str] = None) -> None:
+        now = datetime.utcnow()
+        await self._update_returning(
+            [JournalImport.id == import_id, *self._scope_conditions(tenant_id)],
+            {'status': status, 'error': error, 'finished_at': now, 'updated_at': now},
+            tenant_id,
+            PROGRESS,
+        )
+
+    async def _import_chunk(self, import_id: Any, post: bool, batch: DatevBatch, chart: Dict[str, Any],
+                            dates: DocumentDates, latest_closed: Optional[date], tenant_id: str) -> int:
+        """
+        Import one batch in the current transaction: check its rows, merge its
+        valid entries into the journal (posted and booked if post), record
+        the rejected rows and advance the import. Returns the entries imported.
+        """
+        errors: Dict[int, str] = {}
+        cents = batch.cents(errors)
+        debits = batch.debits(errors)
+        accounts, contra_accounts, entry_dates, currencies = self._check_rows(
+            batch, chart, dates, latest_closed, errors
+        )
+
+        # Every row books its amount on the Konto and, with a Gegenkonto, the other side on that;
+        # rows without Gegenkonto must balance with the other rows of their entry
+        entries = np.asarray(batch.entries, dtype=np.intp)
+        has_contra = np.fromiter((contra is not None for contra in contra_accounts), dtype=bool, count=len(batch))
+        konto_debit = np.where(debits, cents, 0)
+        konto_credit = cents - konto_debit
+        debit = konto_debit + np.where(has_contra, konto_credit, 0)
+        credit = konto_credit + np.where(has_contra, konto_debit, 0)
+        entry_debit, entry_credit, _ = entry_totals(entries, debit, credit, batch.entry_count)
+
+        rejected: Dict[int, str] = {}
+        for position in sorted(errors):
+            rejected.setdefault(batch.entries[position], f"Rejected with row {batch.rows[position]} of its entry")
+        for entry in np.flatnonzero(entry_debit != entry_credit).tolist():
+            rejected.setdefault(entry, (
+                f"Entry does not balance (debit {from_cents(entry_debit[entry])}, "
+                f"credit {from_cents(entry_credit[entry])})"
+            ))
+        row_errors = [
+            {'id': uuid.uuid4(), 'import_id': import_id, 'row_number': row_number,
+             'error': (errors.get(position) or rejected[entry])[:500]}
+            for position, (row_number, entry) in enumerate(zip(batch.rows, batch.entries))
+            if entry in rejected
+        ]
+
+        count = batch.entry_count - len(rejected)
+        numbers = iter(await self.journal_entries.number_ranges.next_numbers(JOURNAL_ENTRY, tenant_id, count))
+        tenant = coerce_value(JournalImportLine.__table__.c.tenant_id, tenant_id)
+        staged, entry_ids = self._staged_lines(
+            import_id, tenant, batch, rejected, numbers, cents.tolist(), debits.tolist(),
+            accounts, contra_accounts, entry_dates, currencies,
+        )
+
+        if staged:
+            if self.staging._copy_supported:
+                await self.staging._copy_rows(staged, tenant_id)
+            else:
+                await self._execute(insert(JournalImportLine.__table__), staged, tenant_id=tenant_id)
+            await self._execute(self._merged_entries(import_id, post), tenant_id=tenant_id)
+            await self._execute(self._merged_lines(import_id), tenant_id=tenant_id)
+            await self._execute(
+                delete(JournalImportLine.__table__).where(JournalImportLine.import_id == import_id),
+                tenant_id=tenant_id,
+            )
+            if post:
+                # Period and account balances of the new entries, as posting them would
+                await self.journal_entries._book(entry_ids, tenant_id)
+        if row_errors:
+            await self._execute(insert(JournalImportError.__table__), row_errors, tenant_id=tenant_id)
+        await self._update_returning(
+            [JournalImport.id == import_id],
+            {
+                'last_row': batch.last_row, 'rows': JournalImport.rows + len(batch),
+                'entries': JournalImport.entries + len(entry_ids), 'lines': JournalImport.lines + len(staged),
+                'failed_rows': JournalImport.failed_rows + len(row_errors), 'updated_at': datetime.utcnow(),
+            },
+            tenant_id,
+            PROGRESS,
+        )
+        self._record_write(tenant_id)
+        return len(entry_ids)
+
+    @staticmethod
+    def _check_rows(batch: DatevBatch, chart: Dict[str, Any], dates: DocumentDates, latest_closed: Optional[date],
+                    errors: Dict[int, str]) -> Tuple[List[Any], List[Any], List[Any], List[str]]:
+        """Accounts, Gegenkonten (None if absent), dates and currencies of the rows; what is invalid goes to errors."""
+        accounts, contra_accounts, entry_dates, currencies = [], [], [], []
+        rows = zip(batch.accounts, batch.contra_accounts, batch.dates, batch.currencies)
+        for position, (account, contra, document_date, currency) in enumerate(rows):
+            account_id = chart.get(account_key(account)) if account else None
+            if account_id is None:
+                errors.setdefault(position, f"Unknown account {account!r}")
+            contra_id = chart.get(account_key(contra)) if contra else None
+            if contra and contra_id is None:
+                errors.setdefault(position, f"Unknown account {contra!r}")
+            entry_date = dates.get(document_date)
+            if entry_date is None:
+                errors.setdefault(position, f"Invalid Belegdatum {document_date!r}")
+            elif latest_closed is not None and month_start(entry_date) <= latest_closed:
+                errors.setdefault(position, str(PeriodClosedError(month_start(entry_date))))
+            currency = currency.upper() or DEFAULT_CURRENCY
+            if len(currency) != 3:
+                errors.setdefault(position, f"Invalid currency {currency!r}")
+            accounts.append(account_id)
+            contra_accounts.append(contra_id)
+            entry_dates.append(entry_date)
+            currencies.append(currency)
+        return accounts, contra_accounts, entry_dates, currencies
+
+    @staticmethod
+    def _staged_lines(import_id: Any, tenant: Any, batch: DatevBatch, rejected: Dict[int, str], numbers,
+                      cents: List[int], debits: List[bool], accounts: List[Any], contra_accounts: List[Any],
+                      entry_dates: List[Any], currencies: List[str]) -> Tuple[List[dict], List[Any]]:
+        """Staging rows of the lines of the batch's valid entries (ids and numbers assigned) and the entry ids."""
+        staged, entry_ids = [], []
+        current, head, line_number = None, None, 0
+        for position, entry in enumerate(batch.entries):
+            if entry in rejected:
+                continue
+            text, document = batch.texts[position], batch.documents[position]
+            if entry != current:
+                current, line_number = entry, 0
+                entry_id = uuid.uuid4()
+                entry_ids.append(entry_id)
+                head = {
+                    'import_id': import_id, 'journal_entry_id': entry_id, 'tenant_id': tenant,
+                    'entry_number': next(numbers), 'entry_date': entry_dates[position],
+                    'description': (text or f"DATEV {document or batch.rows[position]}")[:500],
+                    'reference': document[:100] or None, 'currency': currencies[position],
+                }
+            amount, debit = cents[position], debits[position]
+            line = {'line_description': text[:200] or None, 'cost_center': batch.cost_centers[position][:50] or None}
+            line_number += 1
+            staged.append({
+                **head, **line, 'line_number': line_number, 'account_id': accounts[position],
+                'debit_cents': amount if debit else 0, 'credit_cents': 0 if debit else amount,
+            })
+            if contra_accounts[position] is not None:
+                line_number += 1
+                staged.append({
+                    **head, **line, 'line_number': line_number, 'account_id': contra_accounts[position],
+                    'debit_cents': 0 if debit else amount, 'credit_cents': amount if debit else 0,
+                })
+        return staged, entry_ids
+
+    @staticmethod
+    def _merged_entries(import_id: Any, post: bool):
+        """INSERT ... SELECT of the staged entries, totals summed from their lines."""
+        stage = JournalImportLine.__table__
+        grouped = (
+            stage.c.journal_entry_id, stage.c.tenant_id, stage.c.entry_number, stage.c.entry_date,
+            stage.c.description, stage.c.reference, stage.c.currency,
+        )
+        columns = ['id', 'tenant_id', 'entry_number', 'entry_date', 'description', 'reference', 'currency',
+                   'posting_date', 'source', 'status', 'total_debit', 'total_credit']
+        selected = [
+            *grouped, stage.c.entry_date.label('posting_date'), literal(SOURCE), literal('posted' if post else 'draft'),
+            sql_amount(func.sum(stage.c.debit_cents)), sql_amount(func.sum(stage.c.credit_cents)),
+        ]
+        if post:
+            columns.append('posted_at')
+            selected.append(literal(datetime.utcnow(), DateTime))
+        statement = select(*selected).where(stage.c.import_id == import_id).group_by(*grouped)
+        return insert(JournalEntry.__table__).from_select(columns, statement)
+
+    def _merged_lines(self, import_id: Any):
+        """INSERT ... SELECT of the staged lines (their ids generated by the database)."""
+        stage = JournalImportLine.__table__
+        statement = select(
+            self._generated_id(), stage.c.tenant_id, stage.c.journal_entry_id, stage.c.account_id, stage.c.entry_date,
+            sql_amount(stage.c.debit_cents), sql_amount(stage.c.credit_cents), stage.c.line_number,
+            stage.c.line_description, stage.c.cost_center,
+        ).where(stage.c.import_id == import_id)
+        return insert(JournalEntryLine.__table__).from_select(
+            ['id', 'tenant_id', 'journal_entry_id', 'account_id', 'entry_date', 'debit_amount', 'credit_amount',
+             'line_number', 'description', 'cost_center'],
+            statement,
+        )
@@ -4,174 +4,118 @@ PostgreSQL-based implementation of the Lead repository interface
 """
 
 import logging
-from typing import List, Optional, Dict, Any
+from datetime import datetime
+from typing import List, Optional, Sequence, Union
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func
 
+from ..base_repository import BaseRepositoryImpl
+from ..pagination import Page, OffsetPage, InvalidCursorError
+from ..projection import InvalidFieldsError
 from ..interfaces import LeadRepository
 from ....core.models import Lead
 
 logger = logging.getLogger(__name__)
 
 
-class LeadRepositoryImpl(LeadRepository):
+class LeadRepositoryImpl(BaseRepositoryImpl[Lead, dict, dict], LeadRepository):
     """PostgreSQL implementation of Lead repository"""
 
-    def __init__(self, session_factory):
-        self.session_factory = session_factory
+    cache_invalidating_writes = {'convert_to_customer': 'lead_id'}
 
-    def _get_session(self) -> Session:
-        return self.session_factory()
+    def __init__(self, session: Union[AsyncSession, Session]):
+        super().__init__(session, Lead)
 
-    async def create(self, data: Dict[str, Any], tenant_id: str) -> Lead:
-        """Create a new lead"""
-        try:
-            session = self._get_session()
-            lead = Lead(
-                tenant_id=tenant_id,
-                **data
-            )
-            session.add(lead)
-            session.commit()
-            session.refresh(lead)
-            logger.info(f"Created lead {lead.id} for tenant {tenant_id}")
-            return lead
-        except Exception as e:
-            session.rollback()
-            logger.error(f"Failed to create lead: {e}")
-            raise
-        finally:
-            session.close()
-
-    async def get_by_id(self, lead_id: str, tenant_id: str) -> Optional[Lead]:
-        """Get lead by ID"""
-        try:
-            session = self._get_session()
-            lead = session.query(Lead).filter(
-                and_(Lead.id == lead_id, Lead.tenant_id == tenant_id, Lead.is_active == True)
-            ).first()
-            return lead
-        except Exception as e:
-            logger.error(f"Failed to get lead {lead_id}: {e}")
-            raise
-        finally:
-            session.close()
+    def _filters(self, tenant_id: str, status: Optional[str], assigned_to: Optional[str],
+                 search: Optional[str] = None) -> list:
+        conditions = self._scope_conditions(tenant_id)
+        if status:
+            conditions.append(Lead.status == status)
+        if assigned_to:
+            conditions.append(Lead.assigned_to == assigned_to)
+        if search:
+            conditions.append(self._search_clause(search).condition)
+        return conditions
 
     async def get_all(self, tenant_id: str, skip: int = 0, limit: int = 100,
-                     status: Optional[str] = None, assigned_to: Optional[str] = None) -> List[Lead]:
+                      status: Optional[str] = None, assigned_to: Optional[str] = None) -> List[Lead]:
         """Get all leads with optional filtering"""
         try:
-            session = self._get_session()
-            query = session.query(Lead).filter(
-                and_(Lead.tenant_id == tenant_id, Lead.is_active == True)
+            statement = (
+                select(Lead)
+                .where(*self._filters(tenant_id, status, assigned_to))
+                .offset(skip)
+                .limit(limit)
             )
-
-            if status:
-                query = query.filter(Lead.status == status)
-            if assigned_to:
-                query = query.filter(Lead.assigned_to == assigned_to)
-
-            leads = query.offset(skip).limit(limit).all()
-            return leads
+            result = await self._read(statement, tenant_id)
+            return list(result.scalars().all())
         except Exception as e:
             logger.error(f"Failed to get leads for tenant {tenant_id}: {e}")
             raise
-        finally:
-            session.close()
 
-    async def count(self, tenant_id: str, status: Optional[str] = None,
-                   assigned_to: Optional[str] = None) -> int:
-        """Count leads with optional filtering"""
+    async def get_all_with_total(self, tenant_id: str, skip: int = 0, limit: int = 100,
+                                 status: Optional[str] = None, assigned_to: Optional[str] = None,
+                                 total_mode: str = "exact", search: Optional[str] = None,
+                                 fields: Optional[Sequence[str]] = None) -> OffsetPage[Lead]:
+        """Get a page of leads and the total in one round trip, with optional filtering and search (ranked)"""
         try:
-            session = self._get_session()
-            query = session.query(func.count(Lead.id)).filter(
-                and_(Lead.tenant_id == tenant_id, Lead.is_active == True)
+            ranking = self._search_clause(search) if search else None
+            return await self._offset_page(
+                self._filters(tenant_id, status, assigned_to, search), tenant_id, skip, limit, total_mode, ranking, fields=fields
             )
-
-            if status:
-                query = query.filter(Lead.status == status)
-            if assigned_to:
-                query = query.filter(Lead.assigned_to == assigned_to)
-
-            count = query.scalar()
-            return count or 0
+        except InvalidFieldsError:
+            raise
         except Exception as e:
-            logger.error(f"Failed to count leads for tenant {tenant_id}: {e}")
+            logger.error(f"Failed to get leads for tenant {tenant_id}: {e}")
             raise
-        finally:
-            session.close()
 
-    async def update(self, lead_id: str, data: Dict[str, Any], tenant_id: str) -> Optional[Lead]:
-        """Update lead"""
+    async def get_page(self, tenant_id: str, limit: int = 100, cursor: Optional[str] = None,
+                       status: Optional[str] = None, assigned_to: Optional[str] = None,
+                       search: Optional[str] = None,
+                       fields: Optional[Sequence[str]] = None) -> Page[Lead]:
+        """Get one keyset page of leads with optional filtering and search"""
         try:
-            session = self._get_session()
-            lead = session.query(Lead).filter(
-                and_(Lead.id == lead_id, Lead.tenant_id == tenant_id, Lead.is_active == True)
-            ).first()
-
-            if not lead:
-                return None
-
-            for key, value in data.items():
-                if hasattr(lead, key):
-                    setattr(lead, key, value)
-
-            session.commit()
-            session.refresh(lead)
-            logger.info(f"Updated lead {lead_id}")
-            return lead
+            return await self._keyset_page(self._filters(tenant_id, status, assigned_to, search), tenant_id, limit, cursor, fields)
+        except (InvalidCursorError, InvalidFieldsError):
+            raise
         except Exception as e:
-            session.rollback()
-            logger.error(f"Failed to update lead {lead_id}: {e}")
+            logger.error(f"Failed to get leads page for tenant {tenant_id}: {e}")
             raise
-        finally:
-            session.close()
 
-    async def delete(self, lead_id: str, tenant_id: str) -> bool:
-        """Soft delete lead"""
+    async def count(self, tenant_id: str, status: Optional[str] = None,
+                    assigned_to: Optional[str] = None) -> int:
+        """Count leads with optional filtering"""
         try:
-            session = self._get_session()
-            lead = session.query(Lead).filter(
-                and_(Lead.id == lead_id, Lead.tenant_id == tenant_id, Lead.is_active == True)
-            ).first()
-
-            if not lead:
-                return False
-
-            lead.is_active = False
-            session.commit()
-            logger.info(f"Soft deleted lead {lead_id}")
-            return True
+            statement = select(func.count(Lead.id)).where(*self._filters(tenant_id, status, assigned_to))
+            result = await self._read(statement, tenant_id)
+            return result.scalar() or 0
         except Exception as e:
-            session.rollback()
-            logger.error(f"Failed to delete lead {lead_id}: {e}")
+            logger.error(f"Failed to count leads for tenant {tenant_id}: {e}")
             raise
-        finally:
-            session.close()
 
     async def convert_to_customer(self, lead_id: str, customer_id: str, tenant_id: str) -> bool:
         """Convert lead to customer"""
         try:
-            session = self._get_session()
-            lead = session.query(Lead).filter(
-                and_(Lead.id == lead_id, Lead.tenant_id == tenant_id, Lead.is_active == True)
-            ).first()
+            # Update lead status and conversion info
+            statement = (
+                update(Lead)
+                .where(Lead.id == lead_id, *self._scope_conditions(tenant_id))
+                .values(
+                    status="converted",
+                    converted_at=datetime.utcnow(),
+                    converted_to_customer_id=customer_id,
+                )
+            )
+            result = await self._execute(statement, tenant_id=tenant_id)
+            await self._commit()
 
-            if not lead:
+            if result.rowcount == 0:
                 return False
 
-            # Update lead status and conversion info
-            from datetime import datetime
-            lead.status = "converted"
-            lead.converted_at = datetime.utcnow()
-            lead.converted_to_customer_id = customer_id
-
-            session.commit()
             logger.info(f"Converted lead {lead_id} to customer {customer_id}")
             return True
         except Exception as e:
-            session.rollback()
+            await self._rollback()
             logger.error(f"Failed to convert lead {lead_id}: {e}")
             raise
-        finally:
-            session.close()
\ No newline at end of file
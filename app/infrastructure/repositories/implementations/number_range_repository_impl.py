@@ -0,0 +1,111 @@
+"""
+Number Range Repository Implementation
+PostgreSQL-based implementation of the NumberRange repository interface
+"""
+
+import logging
+from typing import Callable, List, Tuple, Union
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..base_repository import BaseRepositoryImpl
+from ..bulk import coerce_value, prepare_row
+from ..interfaces import NumberRangeRepository
+from ..number_ranges import NumberBlock, NumberBlocks, RangeSettings, format_number, number_blocks, range_settings
+from ....core.database import create_session
+from ....core.models import NumberRange
+
+logger = logging.getLogger(__name__)
+
+
+class NumberRangeRepositoryImpl(BaseRepositoryImpl[NumberRange, dict, dict], NumberRangeRepository):
+    """
+    PostgreSQL implementation of NumberRange repository.
+
+    Every reservation is one UPDATE ... RETURNING of the range row, so
+    concurrent writers on all workers and nodes get disjoint numbers
+    without MAX()+1. Gapless ranges reserve in the session's transaction:
+    the row stays locked until the caller commits and a rollback returns
+    the numbers. Gap-tolerant ranges reserve a block in a short transaction
+    of its own (a new session from session_factory) and hand it out from
+    this worker's memory, so writers meet at the row once per block.
+    """
+
+    upsert_keys = ('tenant_id', 'document_type')
+
+    def __init__(self, session: Union[AsyncSession, Session],
+                 session_factory: Callable[[], Union[AsyncSession, Session]] = create_session,
+                 blocks: NumberBlocks = number_blocks):
+        super().__init__(session, NumberRange)
+        self.session_factory = session_factory
+        self.blocks = blocks
+
+    async def next_numbers(self, document_type: str, tenant_id: str, count: int = 1) -> List[str]:
+        """count new document numbers of the tenant's range, in order. ValueError for unknown document types."""
+        settings = range_settings(document_type)
+        if count <= 0:
+            return []
+        if settings.gapless:
+            first, prefix, width = await self.reserve(document_type, count, tenant_id, settings.prefix, settings.width)
+            return [format_number(prefix, width, value) for value in range(first, first + count)]
+
+        key = self.blocks.key(document_type, tenant_id)
+        async with self.blocks.lock(key):
+            block = self.blocks.get(key)
+            numbers = block.take(count) if block is not None else []
+            if len(numbers) < count:
+                missing = count - len(numbers)
+                block = await self._reserve_block(document_type, tenant_id, max(settings.block_size, missing), settings)
+                self.blocks.set(key, block)
+                numbers += block.take(missing)
+        return numbers
+
+    async def reserve(self, document_type: str, count: int, tenant_id: str, prefix: str = '',
+                      width: int = 6) -> Tuple[int, str, int]:
+        """
+        Reserve count consecutive values of a range (created with prefix and
+        width on first use) in the session's transaction; the caller commits.
+        Returns (first value, prefix, width).
+        """
+        tenant = coerce_value(NumberRange.__table__.c.tenant_id, tenant_id)
+        conditions = [NumberRange.tenant_id == tenant, NumberRange.document_type == document_type]
+        values = {'next_value': NumberRange.next_value + count}
+        returning = (NumberRange.next_value, NumberRange.prefix, NumberRange.width)
+        try:
+            rows = await self._update_returning(conditions, values, tenant_id, returning)
+            if not rows:
+                # First use; a writer creating the range at the same time wins, both then increment it
+                row = prepare_row(NumberRange.__table__, {
+                    'tenant_id': tenant, 'document_type': document_type, 'prefix': prefix, 'width': width,
+                    'next_value': 1,
+                })
+                statement = self._insert_statement().values(row).on_conflict_do_nothing(
+                    index_elements=list(self.upsert_keys)
+                )
+                await self._execute(statement, tenant_id=tenant_id)
+                rows = await self._update_returning(conditions, values, tenant_id, returning)
+            self._record_write(tenant_id)
+        except SQLAlchemyError as e:
+            await self._rollback()
+            logger.error(f"Failed to reserve {count} {document_type} numbers for tenant {tenant_id}: {e}")
+            raise
+        row = rows[0]
+        return row.next_value - count, row.prefix, row.width
+
+    async def _reserve_block(self, document_type: str, tenant_id: str, size: int,
+                             settings: RangeSettings) -> NumberBlock:
+        """Reserve size numbers in a transaction of their own (committed before they are handed out)."""
+        session = self.session_factory()
+        try:
+            repository = NumberRangeRepositoryImpl(session)
+            first, prefix, width = await repository.reserve(document_type, size, tenant_id, settings.prefix, settings.width)
+            await repository._commit()
+        finally:
+            if isinstance(session, AsyncSession):
+                await session.close()
+            else:
+                session.close()
+        logger.debug(f"Reserved {document_type} numbers {first}-{first + size - 1} for tenant {tenant_id}")
+        return NumberBlock(first, first + size, prefix, width)
+
@@ -0,0 +1,190 @@
+"""
+Stock Reservation Repository Implementation
+PostgreSQL-based implementation of the StockReservation repository interface
+"""
+
+import logging
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Union
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..base_repository import BaseRepositoryImpl
+from ..increments import Deltas, aggregate_deltas
+from ..interfaces import StockReservationRepository
+from ..reservations import ACTIVE, COMMITTED, EXPIRED, RELEASED, InsufficientStockError
+from ....core.config import settings
+from ....core.models import Article, StockReservation
+from .article_repository_impl import ArticleRepositoryImpl
+
+logger = logging.getLogger(__name__)
+
+
+class StockReservationRepositoryImpl(BaseRepositoryImpl[StockReservation, dict, dict], StockReservationRepository):
+    """
+    PostgreSQL implementation of StockReservation repository.
+
+    Reserving moves the quantity from the article's available to its
+    reserved stock; releasing (or expiry) moves it back and committing
+    takes it out of current stock. Each operation changes the reservations
+    and the article stock levels in one transaction.
+    """
+
+    def __init__(self, session: Union[AsyncSession, Session], articles: Optional[ArticleRepositoryImpl] = None):
+        super().__init__(session, StockReservation)
+        # Pass the cached article repository so stock changes invalidate cached articles
+        self.articles = articles or ArticleRepositoryImpl(session)
+
+    async def reserve(self, article_id: str, quantity: Union[Decimal, float], tenant_id: str,
+                      reference_number: Optional[str] = None,
+                      ttl_minutes: Optional[int] = None) -> StockReservation:
+        """Reserve quantity of one article (InsufficientStockError if not available)."""
+        reservations = await self.reserve_for_order(
+            [(article_id, quantity)], tenant_id, reference_number, ttl_minutes
+        )
+        return reservations[0]
+
+    async def reserve_for_order(self, lines: Deltas, tenant_id: str, reference_number: Optional[str] = None,
+                                ttl_minutes: Optional[int] = None) -> List[StockReservation]:
+        """
+        Reserve all lines of an order ({article_id: quantity} or (article_id,
+        quantity) pairs) in one transaction: either every line is reserved
+        or none is (InsufficientStockError names the short articles).
+        Lines for the same article are combined into one reservation.
+        """
+        quantities = aggregate_deltas(lines, Article.__table__.c.id, Article.__table__.c.current_stock)
+        if not quantities:
+            raise ValueError("Nothing to reserve")
+        invalid = [str(id) for id, quantity in quantities.items() if quantity <= 0]
+        if invalid:
+            raise ValueError(f"Reserved quantities must be positive: {', '.join(invalid)}")
+
+        try:
+            available = await self.articles.lock_stock(list(quantities), tenant_id)
+            shortages = self._shortages(quantities, available)
+            if shortages:
+                if not self.in_unit_of_work:
+                    # Nothing written yet; just end the transaction holding the locks
+                    await self._rollback()
+                raise InsufficientStockError(shortages)
+
+            held = await self.articles.hold_stock(quantities, tenant_id)
+            if len(held) < len(quantities):
+                # Only without row locks (SQLite): stock was taken between lock_stock and hold_stock
+                await self._rollback()
+                raise InsufficientStockError(self._shortages(
+                    quantities, await self.articles.lock_stock(list(quantities), tenant_id)
+                ))
+
+            now = datetime.utcnow()
+            expires_at = now + timedelta(
+                minutes=settings.STOCK_RESERVATION_TTL_MINUTES if ttl_minutes is None else ttl_minutes
+            )
+            reservations = [
+                StockReservation(
+                    id=uuid.uuid4(), tenant_id=tenant_id, article_id=article_id, quantity=quantity,
+                    status=ACTIVE, reference_number=reference_number, expires_at=expires_at,
+                    created_at=now, updated_at=now,
+                )
+                for article_id, quantity in quantities.items()
+            ]
+            self.session.add_all(reservations)
+            self._record_write(tenant_id)
+            await self._commit()
+        except SQLAlchemyError as e:
+            await self._rollback()
+            logger.error(f"Failed to reserve {len(quantities)} articles for {reference_number}: {e}")
+            raise
+
+        logger.info(f"Reserved {len(reservations)} articles for {reference_number or 'no reference'}")
+        return reservations
+
+    @staticmethod
+    def _shortages(quantities: Dict[Any, Decimal], available: Dict[Any, Decimal]) -> Dict[Any, Dict[str, Decimal]]:
+        return {
+            id: {'requested': quantity, 'available': available.get(id, Decimal(0))}
+            for id, quantity in quantities.items()
+            if id not in available or available[id] < quantity
+        }
+
+    async def release(self, reservation_id: str, tenant_id: str) -> bool:
+        """Release an active reservation, returning its quantity to available stock."""
+        return bool(await self._settle([StockReservation.id == reservation_id], tenant_id, RELEASED))
+
+    async def commit(self, reservation_id: str, tenant_id: str) -> bool:
+        """Commit an active, unexpired reservation (the goods ship): the quantity leaves current stock."""
+        return bool(await self._settle([StockReservation.id == reservation_id], tenant_id, COMMITTED))
+
+    async def release_order(self, reference_number: str, tenant_id: str) -> int:
+        """Release all active reservations of an order; returns how many."""
+        return await self._settle([StockReservation.reference_number == reference_number], tenant_id, RELEASED)
+
+    async def commit_order(self, reference_number: str, tenant_id: str) -> int:
+        """Commit all active, unexpired reservations of an order; returns how many."""
+        return await self._settle([StockReservation.reference_number == reference_number], tenant_id, COMMITTED)
+
+    async def _settle(self, conditions: list, tenant_id: str, status: str) -> int:
+        conditions = [*conditions, *self._scope_conditions(tenant_id), StockReservation.status == ACTIVE]
+        if status == COMMITTED:
+            # An expired hold may already be promised to someone else
+            conditions.append(StockReservation.expires_at > datetime.utcnow())
+        try:
+            rows = await self._update_returning(
+                conditions, {'status': status}, tenant_id, (StockReservation.article_id, StockReservation.quantity)
+            )
+            if rows:
+                quantities = aggregate_deltas(
+                    ((row.article_id, row.quantity) for row in rows),
+                    Article.__table__.c.id, Article.__table__.c.current_stock,
+                )
+                if status == COMMITTED:
+                    await self.articles.consume_stock(quantities, tenant_id)
+                else:
+                    await self.articles.release_stock(quantities, tenant_id)
+            await self._commit()
+        except SQLAlchemyError as e:
+            await self._rollback()
+            logger.error(f"Failed to mark reservations {status}: {e}")
+            raise
+        if rows:
+            logger.info(f"Marked {len(rows)} reservations {status}")
+        return len(rows)
+
+    async def expire_reservations(self, now: Optional[datetime] = None) -> int:
+        """
+        Expire the active reservations of all tenants whose expires_at has
+        passed and return their stock; returns how many expired.
+        """
+        try:
+            rows = await self._update_returning(
+                [StockReservation.status == ACTIVE, StockReservation.expires_at <= (now or datetime.utcnow())],
+                {'status': EXPIRED}, None,
+                (StockReservation.tenant_id, StockReservation.article_id, StockReservation.quantity),
+            )
+            by_tenant: Dict[Any, list] = {}
+            for row in rows:
+                by_tenant.setdefault(row.tenant_id, []).append((row.article_id, row.quantity))
+            for tenant_id, lines in by_tenant.items():
+                await self.articles.release_stock(
+                    aggregate_deltas(lines, Article.__table__.c.id, Article.__table__.c.current_stock), tenant_id
+                )
+            await self._commit()
+        except SQLAlchemyError as e:
+            await self._rollback()
+            logger.error(f"Failed to expire reservations: {e}")
+            raise
+        if rows:
+            logger.info(f"Expired {len(rows)} reservations of {len(by_tenant)} tenants")
+        return len(rows)
+
+    async def get_by_reference(self, reference_number: str, tenant_id: str) -> List[StockReservation]:
+        """All reservations of an order."""
+        statement = select(StockReservation).where(
+            StockReservation.reference_number == reference_number, *self._scope_conditions(tenant_id)
+        ).order_by(StockReservation.created_at, StockReservation.id)
+        result = await self._read(statement, tenant_id)
+        return list(result.scalars().all())
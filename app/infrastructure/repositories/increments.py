@@ -0,0 +1,63 @@
+"""
+Atomic increments for VALEO-NeuroERP repositories
+Balance and stock deltas applied by the database (SET x = x + :delta)
+instead of read-modify-write in Python, optionally guarded by a version
+"""
+
+from collections.abc import Mapping
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, Tuple, Union
+
+from sqlalchemy import case, literal
+
+from .bulk import coerce_value
+
+Deltas = Union[Mapping, Iterable[Tuple[Any, Any]]]
+
+
+class StaleVersionError(RuntimeError):
+    """Raised when an update expected a version the row no longer has."""
+
+    def __init__(self, entity: str, id: Any, expected_version: int):
+        super().__init__(f"{entity} {id} was modified concurrently (expected version {expected_version})")
+        self.entity = entity
+        self.id = id
+        self.expected_version = expected_version
+
+
+def aggregate_deltas(deltas: Deltas, id_column, amount_column) -> Dict[Any, Decimal]:
+    """
+    Sum the deltas per id, so several postings to the same account or
+    article become one change. Accepts a mapping or (id, delta) pairs.
+    """
+    pairs = deltas.items() if isinstance(deltas, Mapping) else deltas
+    totals: Dict[Any, Decimal] = {}
+    for id, delta in pairs:
+        key = coerce_value(id_column, id)
+        totals[key] = totals.get(key, Decimal(0)) + coerce_value(amount_column, delta, Decimal)
+    return totals
+
+
+def delta_case(id_column, deltas: Dict[Any, Decimal], amount_type):
+    """CASE id WHEN :id THEN :delta ... END - the delta of each row of a batched UPDATE."""
+    return case(
+        {id: literal(delta, amount_type) for id, delta in deltas.items()},
+        value=id_column,
+        else_=literal(Decimal(0), amount_type),
+    )
+
+
+def materialize(value: Any) -> Any:
+    """A list of the (id, delta) pairs of a one-shot iterator, so they can be read twice."""
+    if isinstance(value, Iterator):
+        return list(value)
+    return value
+
+
+def ids_of(value: Any) -> list:
+    """Entity ids named by a single id, a mapping of id -> delta or (id, delta) pairs."""
+    if isinstance(value, Mapping):
+        return list(value)
+    if isinstance(value, (str, bytes)) or not isinstance(value, Iterable):
+        return [value]
+    return [item[0] if isinstance(item, tuple) else item for item in value]
@@ -0,0 +1,395 @@
+"""
+Index advisor for VALEO-NeuroERP repositories
+Replays the repository query shapes, reads their EXPLAIN plans and proposes
+composite and partial indexes for the tenant and soft-delete filters
+"""
+
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Index, event, inspect, true
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, BooleanClauseList, UnaryExpression
+from sqlalchemy.sql.schema import Column
+
+from ...core.db_telemetry import Explain
+from .implementations import (
+    AccountRepositoryImpl, ArticleRepositoryImpl, ContactRepositoryImpl, CustomerRepositoryImpl,
+    LeadRepositoryImpl, StockReservationRepositoryImpl,
+)
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL truncates longer identifiers
+MAX_NAME_LENGTH = 63
+# Bound to the replayed lookups; the plans, not the rows, matter
+PROBE_ID = uuid.UUID(int=0)
+
+_EQUALITY = (operators.eq, operators.in_op)
+_RANGE = (operators.lt, operators.le, operators.gt, operators.ge)
+
+
+class QueryShape:
+    """A repository call whose statements are replayed."""
+
+    def __init__(self, name: str, repository: Callable[[Session], Any],
+                 call: Callable[[Any, Any], Awaitable[Any]]):
+        self.name = name
+        self.repository = repository  # Repository class (or factory) taking a session
+        self.call = call  # (repository, tenant_id) -> awaitable
+
+
+# The lookups, filters and page orders the repositories issue per request
+SHAPES = [
+    QueryShape('customers.get_by_id', CustomerRepositoryImpl, lambda r, t: r.get_by_id(PROBE_ID, t)),
+    QueryShape('customers.get_by_customer_number', CustomerRepositoryImpl,
+               lambda r, t: r.get_by_customer_number('K0000001', t)),
+    QueryShape('customers.get_page', CustomerRepositoryImpl, lambda r, t: r.get_page(t, 50)),
+    QueryShape('contacts.get_all_with_total(customer_id)', ContactRepositoryImpl,
+               lambda r, t: r.get_all_with_total(t, 0, 50, customer_id=PROBE_ID)),
+    QueryShape('contacts.get_page', ContactRepositoryImpl, lambda r, t: r.get_page(t, 50)),
+    QueryShape('leads.get_all_with_total(status)', LeadRepositoryImpl,
+               lambda r, t: r.get_all_with_total(t, 0, 50, status='new')),
+    QueryShape('leads.get_all_with_total(assigned_to)', LeadRepositoryImpl,
+               lambda r, t: r.get_all_with_total(t, 0, 50, assigned_to=PROBE_ID)),
+    QueryShape('leads.get_page', LeadRepositoryImpl, lambda r, t: r.get_page(t, 50)),
+    QueryShape('accounts.get_by_number', AccountRepositoryImpl, lambda r, t: r.get_by_number('1200', t)),
+    QueryShape('accounts.get_all_with_total(account_type)', AccountRepositoryImpl,
+               lambda r, t: r.get_all_with_total(t, 0, 50, account_type='asset')),
+    QueryShape('accounts.get_page', AccountRepositoryImpl, lambda r, t: r.get_page(t, 50)),
+    QueryShape('articles.get_by_article_number', ArticleRepositoryImpl,
+               lambda r, t: r.get_by_article_number('A0000001', t)),
+    QueryShape('articles.get_by_barcode', ArticleRepositoryImpl, lambda r, t: r.get_by_barcode('4000000000001', t)),
+    QueryShape('articles.get_page', ArticleRepositoryImpl, lambda r, t: r.get_page(t, 50)),
+    QueryShape('stock_reservations.get_by_reference', StockReservationRepositoryImpl,
+               lambda r, t: r.get_by_reference('SO-0000001', t)),
+]
+
+
+class PlanCost:
+    """Planner cost (PostgreSQL total cost, None on SQLite) and plan text of a statement."""
+
+    def __init__(self, cost: Optional[float], plan: str):
+        self.cost = cost
+        self.plan = plan
+
+    def uses(self, index_name: str) -> bool:
+        return index_name in self.plan
+
+
+class IndexCandidate:
+    """An index a replayed statement would seek on, and the shapes that issue it."""
+
+    def __init__(self, table, columns: Tuple[str, ...], equality: int, partial: bool):
+        self.table = table
+        self.columns = columns
+        self.equality = equality  # Leading columns compared for equality (any order)
+        self.partial = partial  # Only rows with is_active = true
+        self.shapes: List[str] = []
+        self.statements: List[Any] = []
+        self.before: List[PlanCost] = []
+        self.after: List[PlanCost] = []
+        self.superseded: List[str] = []  # Existing full indexes on the same columns
+
+    @property
+    def key(self) -> Tuple[str, Tuple[str, ...], bool]:
+        return self.table.name, self.columns, self.partial
+
+    @property
+    def name(self) -> str:
+        return index_name(self.table.name, self.columns, self.partial)
+
+    @property
+    def used(self) -> bool:
+        """Whether the planner chose the index for every statement it was proposed for."""
+        return bool(self.after) and all(cost.uses(self.name) for cost in self.after)
+
+    def index(self) -> Index:
+        """The candidate as a (table-bound) Index."""
+        options = {}
+        if self.partial:
+            predicate = self.table.c.is_active == true()
+            options = {'postgresql_where': predicate, 'sqlite_where': predicate}
+        return Index(self.name, *(self.table.c[name] for name in self.columns), **options)
+
+
+def index_name(table: str, columns: Sequence[str], partial: bool) -> str:
+    """ix_<table>_tenant_<columns>[_active], the naming of app/core/models.py."""
+    parts = []
+    for column in columns:
+        if column == 'tenant_id':
+            parts.append('tenant')
+        elif column.endswith('_at'):
+            parts.append(column[:-3])
+        else:
+            parts.append(column)
+    suffix = '_'.join(parts) + ('_active' if partial else '')
+    name = f"ix_{table}_{suffix}"
+    if len(name) > MAX_NAME_LENGTH:
+        # Drop the domain prefix (crm_, inventory_, ...) before truncating
+        name = f"ix_{table.split('_', 1)[-1]}_{suffix}"
+    return name[:MAX_NAME_LENGTH]
+
+
+# Statement analysis
+
+def _conjuncts(clause) -> list:
+    if clause is None:
+        return []
+    if isinstance(clause, BooleanClauseList) and clause.operator is operators.and_:
+        return [term for inner in clause.clauses for term in _conjuncts(inner)]
+    return [clause]
+
+
+def _table_column(element, table) -> Optional[str]:
+    if isinstance(element, Column) and element.table is table:
+        return element.name
+    return None
+
+
+def candidate_for(statement) -> Optional[IndexCandidate]:
+    """
+    The index a single-table SELECT would seek on: tenant_id, the other
+    equality columns, then the ORDER BY (or range) columns; partial on
+    is_active when the statement filters it. None for statements on
+    several tables and for lookups by primary key.
+    """
+    froms = statement.get_final_froms()
+    if len(froms) != 1 or not hasattr(froms[0], 'primary_key'):
+        return None
+    table = froms[0]
+
+    equality, ranges, partial = [], [], False
+    for term in _conjuncts(statement.whereclause):
+        if not isinstance(term, BinaryExpression):
+            continue
+        column = _table_column(term.left, table)
+        if column is None:
+            continue
+        if column == 'is_active' and term.operator is operators.eq:
+            partial = True
+        elif term.operator in _EQUALITY and isinstance(term.right, BindParameter):
+            equality.append(column)
+        elif term.operator in _RANGE:
+            ranges.append(column)
+    if not equality or set(table.primary_key.columns.keys()) <= set(equality):
+        return None
+
+    ordering = []
+    for clause in statement._order_by_clauses:
+        element = clause.element if isinstance(clause, UnaryExpression) else clause
+        column = _table_column(element, table)
+        if column is None:
+            break
+        ordering.append(column)
+
+    columns = sorted(dict.fromkeys(equality), key=lambda name: name != 'tenant_id')
+    for column in ordering or ranges[:1]:
+        if column not in columns:
+            columns.append(column)
+    return IndexCandidate(table, tuple(columns), len(set(equality)), partial and 'is_active' in table.c)
+
+
+def _covers(existing: Dict[str, Any], candidate: IndexCandidate) -> bool:
+    """Whether an existing index serves the candidate's seek and order as well."""
+    columns, equality = list(existing['column_names']), candidate.equality
+    seek = set(candidate.columns[:equality])
+    if existing.get('unique'):
+        # At most one row per key: a unique index on the equality columns
+        # (or a subset) serves the lookup; one extended by the order columns the page
+        if set(columns) <= seek:
+            return True
+        if set(columns[:equality]) == seek and columns[equality:] == list(candidate.columns[equality:len(columns)]):
+            return True
+    if len(columns) < len(candidate.columns):
+        return False
+    if set(columns[:equality]) != set(candidate.columns[:equality]) or \
+            columns[equality:len(candidate.columns)] != list(candidate.columns[equality:]):
+        return False
+    if not candidate.partial:
+        return True
+    options = existing.get('dialect_options', {})
+    predicate = options.get('postgresql_where') or options.get('sqlite_where')
+    return predicate is not None and 'is_active' in str(predicate)
+
+
+def _existing_indexes(connection: Connection, table: str) -> List[Dict[str, Any]]:
+    inspector = inspect(connection)
+    indexes = list(inspector.get_indexes(table))
+    for constraint in inspector.get_unique_constraints(table):
+        indexes.append({'name': constraint['name'], 'column_names': constraint['column_names'], 'unique': True})
+    return indexes
+
+
+# Plans
+
+def explain(connection: Connection, statement) -> PlanCost:
+    """Planner cost and plan of a statement, without running it."""
+    result = connection.execute(Explain(statement))
+    if connection.dialect.name == 'postgresql':
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return PlanCost(float(plan[0]['Plan']['Total Cost']), json.dumps(plan))
+    return PlanCost(None, '; '.join(str(row[-1]) for row in result))
+
+
+async def capture(session: Session, shape: QueryShape, tenant_id: Any) -> List[Any]:
+    """Run the shape's repository call and collect the SELECT statements it executed."""
+    statements = []
+
+    def collect(orm_execute_state):
+        if orm_execute_state.is_select:
+            statements.append(orm_execute_state.statement)
+
+    event.listen(session, 'do_orm_execute', collect)
+    try:
+        await shape.call(shape.repository(session), tenant_id)
+    finally:
+        event.remove(session, 'do_orm_execute', collect)
+        session.rollback()
+    return statements
+
+
+async def advise(engine: Engine, tenant_id: Any, shapes: Sequence[QueryShape] = SHAPES) -> List[IndexCandidate]:
+    """
+    Replay the shapes against the engine's database and propose indexes.
+
+    Every candidate not covered by an existing index is created, the
+    statements are explained again and the index is dropped: candidates
+    carry plan costs before and after, and
+    .used tells whether the planner picked them. Plans depend on the
+    table statistics, so run this against a production-sized database.
+    """
+    candidates: Dict[Tuple, IndexCandidate] = {}
+    with Session(engine) as session:
+        for shape in shapes:
+            for statement in await capture(session, shape, tenant_id):
+                candidate = candidate_for(statement)
+                if candidate is None:
+                    continue
+                candidate = candidates.setdefault(candidate.key, candidate)
+                if shape.name not in candidate.shapes:
+                    candidate.shapes.append(shape.name)
+                candidate.statements.append(statement)
+
+    proposed = []
+    with engine.connect() as connection:
+        for candidate in candidates.values():
+            existing = _existing_indexes(connection, candidate.table.name)
+            if any(_covers(index, candidate) for index in existing):
+                logger.info(f"{candidate.name}: already covered")
+                continue
+            candidate.superseded = [
+                index['name'] for index in existing
+                if list(index['column_names']) == list(candidate.columns) and not index.get('unique')
+            ]
+            candidate.before = [explain(connection, statement) for statement in candidate.statements]
+            # Try the index, then drop it again (pysqlite runs DDL outside the transaction)
+            index = candidate.index()
+            index.create(connection)
+            try:
+                candidate.after = [explain(connection, statement) for statement in candidate.statements]
+            finally:
+                index.drop(connection)
+                connection.commit()
+            proposed.append(candidate)
+    return proposed
+
+
+# Reporting
+
+def _cost(costs: List[PlanCost]) -> str:
+    values = [cost.cost for cost in costs if cost.cost is not None]
+    return f"{max(values):.2f}" if values else "n/a"
+
+
+def _change(candidate: IndexCandidate) -> str:
+    if candidate.before and candidate.before[0].cost is None:
+        return "chosen by the planner (SQLite, no costs)"
+    return f"cost {_cost(candidate.before)} -> {_cost(candidate.after)}"
+
+
+def report(candidates: Sequence[IndexCandidate]) -> str:
+    """Plain-text before/after table of the proposed indexes."""
+    lines = [f"{'index':<64} {'before':>10} {'after':>10}  used  shapes"]
+    for candidate in candidates:
+        lines.append(
+            f"{candidate.name:<64} {_cost(candidate.before):>10} {_cost(candidate.after):>10}  "
+            f"{'yes ' if candidate.used else 'no  '}  {', '.join(candidate.shapes)}"
+        )
+        if candidate.before and candidate.before[0].cost is None:
+            # No costs (SQLite): show the plans instead
+            lines.append(f"    before: {candidate.before[0].plan}")
+            lines.append(f"    after:  {candidate.after[0].plan}")
+        if candidate.superseded:
+            lines.append(f"    supersedes {', '.join(candidate.superseded)} once in place")
+    return '\n'.join(lines)
+
+
+MIGRATION_TEMPLATE = '''# VALEO-NeuroERP Tenant / Soft-Delete Indexes
+# Composite and partial indexes proposed by scripts/index_advisor.py for the repository query shapes
+
+"""{slug}
+
+Revision ID: {revision}
+Revises: {down_revision}
+Create Date: {created}
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '{revision}'
+down_revision = '{down_revision}'
+branch_labels = None
+depends_on = None
+
+# Repository queries only read active rows; partial indexes leave soft-deleted ones out
+ACTIVE = {{'postgresql_where': sa.text('is_active = true'), 'sqlite_where': sa.text('is_active = 1')}}
+
+# (index name, table, columns, partial) - must match the indexes declared in app/core/models.py
+# Replayed shapes and their plan cost before -> after
+INDEXES = [
+{indexes}
+]
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction; avoids locking large tables for writes
+    with op.get_context().autocommit_block():
+        for name, table, columns, partial in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True,
+                            **(ACTIVE if partial else {{}}))
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+'''
+
+
+def render_migration(candidates: Sequence[IndexCandidate], revision: str, down_revision: str,
+                     slug: str = 'tenant_active_indexes') -> str:
+    """Alembic migration creating the used candidates with CREATE INDEX CONCURRENTLY."""
+    entries = []
+    for candidate in candidates:
+        if not candidate.used:
+            continue
+        entries.append(
+            f"    # {', '.join(candidate.shapes)}: {_change(candidate)}\n"
+            f"    ({candidate.name!r}, {candidate.table.name!r}, {list(candidate.columns)!r}, {candidate.partial!r}),"
+        )
+    return MIGRATION_TEMPLATE.format(
+        slug=slug, revision=revision, down_revision=down_revision,
+        created=datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S.%f'),
+        indexes='\n'.join(entries),
+    )
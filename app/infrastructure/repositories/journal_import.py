@@ -0,0 +1,80 @@
+"""
+Journal imports for VALEO-NeuroERP repositories
+Import errors, where the files of journal imports are kept and the import
+jobs running in this process
+"""
+
+import asyncio
+import logging
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from ...core.config import settings
+from ...core.unit_of_work import unit_of_work
+
+logger = logging.getLogger(__name__)
+
+# A running import whose record has not been updated for this long lost its
+# worker (every chunk updates it) and may be resumed elsewhere
+STALE_AFTER = timedelta(minutes=10)
+
+# Source of the imported entries
+SOURCE = 'import'
+
+
+class ImportConflictError(ValueError):
+    """Raised for a file the tenant imported before, or an import that is still running."""
+
+    def __init__(self, message: str, import_id: Any):
+        super().__init__(message)
+        self.import_id = import_id
+
+
+def import_path(import_id: Any) -> Path:
+    """Where the file of an import is kept until the import completed."""
+    return Path(settings.JOURNAL_IMPORT_DIR) / f"{import_id}.csv"
+
+
+class ImportJobs:
+    """
+    The import jobs running in this process. Their progress is not kept
+    here but in finance_journal_imports, so any worker can report it and
+    an import interrupted by a restart can be resumed.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def start(self, import_id: Any, tenant_id: Any, repository_factory: Callable[[], Any],
+              chunk_size: Optional[int] = None) -> asyncio.Task:
+        """Run the import in the background (repository_factory resolves the repository in its unit of work)."""
+        key = str(import_id)
+        task = self._tasks.get(key)
+        if task is not None and not task.done():
+            return task
+        task = self._tasks[key] = asyncio.create_task(
+            run_import_job(import_id, tenant_id, repository_factory, chunk_size)
+        )
+        task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return task
+
+    def running(self, import_id: Any) -> bool:
+        task = self._tasks.get(str(import_id))
+        return task is not None and not task.done()
+
+
+import_jobs = ImportJobs()
+
+
+async def run_import_job(import_id: Any, tenant_id: Any, repository_factory: Callable[[], Any],
+                         chunk_size: Optional[int] = None) -> None:
+    """Import the file in its own unit of work; every chunk commits on its own, failures are kept on the import."""
+    try:
+        async with unit_of_work(f"journal import {import_id}", commit_chunks=True):
+            await repository_factory().run_import(import_id, tenant_id, chunk_size)
+    except asyncio.CancelledError:
+        logger.warning(f"Journal import {import_id} cancelled; it can be resumed")
+        raise
+    except Exception as e:
+        logger.error(f"Journal import {import_id} failed: {e}")
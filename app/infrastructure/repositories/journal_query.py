@@ -0,0 +1,108 @@
+"""
+Journal entry queries for VALEO-NeuroERP repositories
+Date ranges and a composable journal entry filter translated into SQL conditions
+"""
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, List, Optional, Tuple, Union
+
+from ...core.models import JournalEntry
+
+STATUSES = ('draft', 'posted', 'reversed')
+
+DateLike = Union[str, date, datetime]
+
+
+def day(value: DateLike) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(value).date()
+
+
+def date_range(start_date: DateLike, end_date: DateLike) -> Tuple[datetime, datetime]:
+    """[start, end) datetimes of a date range including its end day (entry_date holds times)."""
+    start, end = day(start_date), day(end_date)
+    return datetime.combine(start, datetime.min.time()), datetime.combine(end + timedelta(days=1), datetime.min.time())
+
+
+class JournalEntryQuery:
+    """
+    Filters of a journal entry search, combined with AND and evaluated by
+    the database. Every method returns the query, so filters chain:
+
+        JournalEntryQuery().dated(start, end).with_status('posted').amount_between(Decimal('100'))
+
+    The entry date range and status lead the conditions; together with the
+    tenant they are served by the (tenant_id, entry_date, status) index.
+    Amounts compare the entry's total (debit, which equals its credit).
+    Invalid filters raise ValueError.
+    """
+
+    def __init__(self):
+        self.start: Optional[date] = None
+        self.end: Optional[date] = None
+        self.statuses: Tuple[str, ...] = ()
+        self.sources: Tuple[str, ...] = ()
+        self.reference: Optional[str] = None
+        self.reference_prefix = False
+        self.min_amount: Optional[Decimal] = None
+        self.max_amount: Optional[Decimal] = None
+
+    def dated(self, start_date: Optional[DateLike] = None, end_date: Optional[DateLike] = None) -> "JournalEntryQuery":
+        """Entries dated from start_date through end_date (both days included, either may be open)."""
+        self.start = day(start_date) if start_date is not None else None
+        self.end = day(end_date) if end_date is not None else None
+        if self.start is not None and self.end is not None and self.end < self.start:
+            raise ValueError("end_date must not be before start_date")
+        return self
+
+    def with_status(self, *statuses: str) -> "JournalEntryQuery":
+        unknown = [status for status in statuses if status not in STATUSES]
+        if unknown:
+            raise ValueError(f"Unknown status {', '.join(unknown)}; use one of {', '.join(STATUSES)}")
+        self.statuses = tuple(statuses)
+        return self
+
+    def from_source(self, *sources: str) -> "JournalEntryQuery":
+        self.sources = tuple(sources)
+        return self
+
+    def with_reference(self, reference: str, prefix: bool = False) -> "JournalEntryQuery":
+        """Entries with exactly this reference, or with prefix those whose reference starts with it."""
+        self.reference = reference
+        self.reference_prefix = prefix
+        return self
+
+    def amount_between(self, min_amount: Optional[Any] = None, max_amount: Optional[Any] = None) -> "JournalEntryQuery":
+        """Entries whose total lies within [min_amount, max_amount] (either may be open)."""
+        self.min_amount = Decimal(str(min_amount)) if min_amount is not None else None
+        self.max_amount = Decimal(str(max_amount)) if max_amount is not None else None
+        if self.min_amount is not None and self.max_amount is not None and self.max_amount < self.min_amount:
+            raise ValueError("max_amount must not be below min_amount")
+        return self
+
+    def conditions(self) -> List[Any]:
+        """The SQL conditions of the filters (without the tenant scope)."""
+        conditions = []
+        if self.start is not None:
+            conditions.append(JournalEntry.entry_date >= date_range(self.start, self.start)[0])
+        if self.end is not None:
+            conditions.append(JournalEntry.entry_date < date_range(self.end, self.end)[1])
+        if self.statuses:
+            conditions.append(JournalEntry.status.in_(self.statuses))
+        if self.sources:
+            conditions.append(JournalEntry.source.in_(self.sources))
+        if self.reference is not None:
+            if self.reference_prefix:
+                escaped = self.reference.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                conditions.append(JournalEntry.reference.like(f"{escaped}%", escape='\\'))
+            else:
+                conditions.append(JournalEntry.reference == self.reference)
+        if self.min_amount is not None:
+            conditions.append(JournalEntry.total_debit >= self.min_amount)
+        if self.max_amount is not None:
+            conditions.append(JournalEntry.total_debit <= self.max_amount)
+        return conditions
@@ -0,0 +1,144 @@
+"""
+Money for VALEO-NeuroERP repositories
+Amounts as integer cents: lossless conversion from and to the Decimal
+values of the API and the DECIMAL(15,2) columns, and vectorized (NumPy
+int64) balance checks and aggregation for batches of journal lines
+"""
+
+import re
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Pattern, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Numeric, cast, literal_column
+
+# Largest amount of a DECIMAL(15,2) column, in cents
+MAX_CENTS = 10 ** 15 - 1
+
+CENTS = np.int64
+
+
+def to_cents(value: Any) -> int:
+    """
+    An amount (Decimal, int, str or float) in integer cents, exactly.
+    None is 0. ValueError for amounts with fractions of a cent, beyond
+    DECIMAL(15,2) or that are no number.
+    """
+    if isinstance(value, Decimal):
+        amount = value
+    elif value is None:
+        return 0
+    elif isinstance(value, int) and not isinstance(value, bool):
+        amount = Decimal(value)
+    else:
+        try:
+            # str() of a float is its shortest repr, so 0.1 is 10 cents and not 10.000000000000000555
+            amount = Decimal(str(value).strip())
+        except InvalidOperation:
+            raise ValueError(f"Invalid amount {value!r}") from None
+    scaled = amount.scaleb(2)
+    try:
+        cents = int(scaled)
+    except (ValueError, OverflowError):  # NaN, Infinity
+        raise ValueError(f"Invalid amount {value!r}") from None
+    if cents != scaled:
+        raise ValueError(f"Amount {value} has fractions of a cent")
+    if not -MAX_CENTS <= cents <= MAX_CENTS:
+        raise ValueError(f"Amount {value} exceeds DECIMAL(15,2)")
+    return cents
+
+
+def parse_cents(text: str, decimal_separator: str = '.') -> int:
+    """
+    A decimal string ("1234.5", "-0,07" with decimal_separator ",") in
+    integer cents, parsed without a Decimal in between (the import hot
+    path). ValueError like to_cents.
+    """
+    whole, _, fraction = text.strip().partition(decimal_separator)
+    digits = whole.lstrip('-+')
+    if len(fraction) > 2 or len(whole) - len(digits) > 1 or not (digits + fraction).isdecimal():
+        raise ValueError(f"Invalid amount {text!r}")
+    cents = int(digits + fraction.ljust(2, '0'))
+    if cents > MAX_CENTS:
+        raise ValueError(f"Amount {text} exceeds DECIMAL(15,2)")
+    return -cents if whole[:1] == '-' else cents
+
+
+@lru_cache(maxsize=None)
+def _regular_amounts(decimal_separator: str) -> Pattern:
+    # One amount with exactly two places per line, within DECIMAL(15,2)
+    return re.compile(rf'(?:[-+]?[0-9]{{1,13}}{re.escape(decimal_separator)}[0-9]{{2}}\n)*')
+
+
+def parse_cents_array(texts: Sequence[str], decimal_separator: str = '.') -> np.ndarray:
+    """
+    A column of decimal strings in int64 cents. Columns whose amounts all
+    have exactly two places (as in DATEV exports) are checked with one
+    regular expression and parsed by NumPy in one go; any other column
+    goes through parse_cents value by value. ValueError like parse_cents.
+    """
+    if not texts:
+        return np.zeros(0, dtype=CENTS)
+    joined = '\n'.join(texts) + '\n'
+    if _regular_amounts(decimal_separator).fullmatch(joined):
+        cents = np.fromstring(joined.replace(decimal_separator, ''), dtype=CENTS, sep='\n')
+        if len(cents) == len(texts):
+            return cents
+    return np.fromiter((parse_cents(text, decimal_separator) for text in texts), dtype=CENTS, count=len(texts))
+
+
+def from_cents(cents: int) -> Decimal:
+    """Integer cents as a Decimal with two places (1234 -> Decimal('12.34'))."""
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def sql_amount(cents: Any):
+    """
+    SQL expression of an amount from an integer cents expression, e.g. to
+    INSERT ... SELECT into DECIMAL(15,2) columns (exact NUMERIC division on
+    PostgreSQL; a literal 100.0 keeps SQLite from dividing integers).
+    """
+    return cast(cents, Numeric) / literal_column('100.0')
+
+
+def cents_array(values: Iterable[Any]) -> np.ndarray:
+    """Amounts (see to_cents) as an int64 array of cents."""
+    return np.fromiter((to_cents(value) for value in values), dtype=CENTS)
+
+
+def sum_by(index: np.ndarray, cents: np.ndarray, size: int) -> np.ndarray:
+    """
+    Sums of cents per group (index[i] is the group of cents[i], 0 <= index
+    < size), in int64. np.bincount would sum in float64 and round beyond
+    2**53 cents.
+    """
+    totals = np.zeros(size, dtype=CENTS)
+    np.add.at(totals, index, cents)
+    return totals
+
+
+def entry_totals(entry_index: np.ndarray, debit: np.ndarray, credit: np.ndarray,
+                 entries: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Debit, credit and number of lines of each of entries entries (lines given by their entry's position)."""
+    lines = np.bincount(entry_index, minlength=entries)
+    return sum_by(entry_index, debit, entries), sum_by(entry_index, credit, entries), lines
+
+
+def unbalanced_entries(entry_index: np.ndarray, debit: np.ndarray, credit: np.ndarray,
+                       entries: int) -> np.ndarray:
+    """Positions of the entries whose lines do not balance or that have no lines."""
+    debits, credits, lines = entry_totals(entry_index, debit, credit, entries)
+    return np.flatnonzero((debits != credits) | (lines == 0))
+
+
+def totals_by_key(keys: Iterable[Any], debit: np.ndarray,
+                  credit: np.ndarray) -> Tuple[List[Any], np.ndarray, np.ndarray]:
+    """
+    Debit and credit per distinct key (an account id, (account_id,
+    period_start), ...; one per line): (keys in order of first
+    appearance, debit, credit).
+    """
+    positions: Dict[Any, int] = {}
+    index = np.fromiter((positions.setdefault(key, len(positions)) for key in keys), dtype=np.intp)
+    return list(positions), sum_by(index, debit, len(positions)), sum_by(index, credit, len(positions))
@@ -0,0 +1,92 @@
+"""
+Number ranges for VALEO-NeuroERP repositories
+Document types, their range defaults and the hi-lo number blocks cached per worker
+"""
+
+import asyncio
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# Document types
+JOURNAL_ENTRY = 'journal_entry'
+CUSTOMER = 'customer'
+
+
+class RangeSettings(NamedTuple):
+    prefix: str  # Of ranges created on first use (a range's prefix and width can be changed in the table)
+    width: int
+    gapless: bool  # Numbers are taken in the caller's transaction, so a rollback leaves no gap
+    block_size: int  # Numbers reserved at a time by a worker (gap-tolerant ranges)
+
+
+# Journal numbers must be consecutive without gaps (GoBD); customer numbers may skip
+RANGES: Dict[str, RangeSettings] = {
+    JOURNAL_ENTRY: RangeSettings('JE', 8, gapless=True, block_size=1),
+    CUSTOMER: RangeSettings('K', 7, gapless=False, block_size=100),
+}
+
+
+def range_settings(document_type: str) -> RangeSettings:
+    settings = RANGES.get(document_type)
+    if settings is None:
+        raise ValueError(f"Unknown document type {document_type}; use one of {', '.join(RANGES)}")
+    return settings
+
+
+def format_number(prefix: str, width: int, value: int) -> str:
+    return f"{prefix}{value:0{width}d}"
+
+
+class NumberBlock:
+    """Reserved numbers [next_value, end) of a range, handed out from memory."""
+
+    def __init__(self, first: int, end: int, prefix: str, width: int):
+        self.next_value = first
+        self.end = end
+        self.prefix = prefix
+        self.width = width
+
+    @property
+    def remaining(self) -> int:
+        return self.end - self.next_value
+
+    def take(self, count: int) -> List[str]:
+        """Up to count numbers (fewer once the block runs out)."""
+        first = self.next_value
+        self.next_value = min(first + count, self.end)
+        return [format_number(self.prefix, self.width, value) for value in range(first, self.next_value)]
+
+
+class NumberBlocks:
+    """
+    The number blocks of this worker, one per tenant and document type.
+    Writers of the same range take their numbers under the range's lock;
+    only the one that finds the block empty reserves the next one. The
+    numbers left in a block are skipped when the worker stops.
+    """
+
+    def __init__(self):
+        self._blocks: Dict[Tuple[str, str], NumberBlock] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+    @staticmethod
+    def key(document_type: str, tenant_id: Any) -> Tuple[str, str]:
+        # UUID objects and their strings share a block
+        return document_type, str(tenant_id)
+
+    def lock(self, key: Tuple[str, str]) -> asyncio.Lock:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    def get(self, key: Tuple[str, str]) -> Optional[NumberBlock]:
+        return self._blocks.get(key)
+
+    def set(self, key: Tuple[str, str], block: NumberBlock) -> None:
+        self._blocks[key] = block
+
+    def clear(self) -> None:
+        self._blocks.clear()
+
+
+number_blocks = NumberBlocks()
@@ -0,0 +1,95 @@
+"""
+Pagination results for VALEO-NeuroERP repositories
+Offset pages with totals and keyset (cursor) pages with opaque cursors
+over a stable (sort_key, id) ordering
+"""
+
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Generic, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+NEXT = "next"
+PREV = "prev"
+
+
+class InvalidCursorError(ValueError):
+    """Raised for cursors that cannot be decoded."""
+
+
+class Page(Generic[T]):
+    """One keyset page with cursors to its neighbours."""
+
+    def __init__(self, items: List[T], next_cursor: Optional[str] = None,
+                 prev_cursor: Optional[str] = None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.prev_cursor is not None
+
+
+class OffsetPage(Generic[T]):
+    """One offset page with the total number of matching rows."""
+
+    def __init__(self, items: List[T], total: int, approximate: bool = False):
+        self.items = items
+        self.total = total
+        # True if total is a planner estimate rather than an exact count
+        self.approximate = approximate
+
+
+def _serialize(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    return value
+
+
+def encode_cursor(sort_value: Any, id_value: Any, direction: str) -> str:
+    """Encode a position (sort key and id of a boundary row) as an opaque token."""
+    payload = json.dumps([_serialize(sort_value), _serialize(id_value), direction], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Decode a token into (sort_value, id_value, direction); values are still serialized."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, id_value, direction = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+    if direction not in (NEXT, PREV):
+        raise InvalidCursorError(f"Invalid cursor direction: {direction}")
+    return sort_value, id_value, direction
+
+
+def cursor_value(column, raw: Any) -> Any:
+    """Convert a serialized cursor value back to the column's Python type."""
+    if raw is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return raw
+    try:
+        if python_type is datetime:
+            return datetime.fromisoformat(raw)
+        if python_type is date:
+            return date.fromisoformat(raw)
+        if python_type in (uuid.UUID, Decimal):
+            return python_type(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor value: {raw}") from e
+    return raw
@@ -0,0 +1,44 @@
+"""
+Account period balances for VALEO-NeuroERP repositories
+Monthly periods and the errors of posting into or closing them
+"""
+
+from datetime import date, datetime
+from typing import Union
+
+
+class PeriodClosedError(ValueError):
+    """Raised when entries are posted into (or a period is closed again after) a closed period."""
+
+    def __init__(self, period_start: date, message: str = "is closed"):
+        self.period_start = period_start
+        super().__init__(f"Period {period_label(period_start)} {message}")
+
+
+class PeriodOrderError(ValueError):
+    """Raised when a period is closed before the periods preceding it."""
+
+
+def month_start(value: Union[date, datetime]) -> date:
+    """First day of the month (the period) a date falls into."""
+    return date(value.year, value.month, 1)
+
+
+def next_month(period_start: date) -> date:
+    """First day of the following month (the exclusive end of the period)."""
+    if period_start.month == 12:
+        return date(period_start.year + 1, 1, 1)
+    return date(period_start.year, period_start.month + 1, 1)
+
+
+def period_label(period_start: date) -> str:
+    return f"{period_start.year:04d}-{period_start.month:02d}"
+
+
+def parse_period(value: str) -> date:
+    """First day of a YYYY-MM period (ValueError otherwise)."""
+    try:
+        year, month = value.split("-")
+        return date(int(year), int(month), 1)
+    except ValueError:
+        raise ValueError(f"Invalid period {value!r}; expected YYYY-MM") from None
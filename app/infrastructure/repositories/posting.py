@@ -0,0 +1,165 @@
+"""
+Journal posting for VALEO-NeuroERP repositories
+Posting errors, the progress of a batch posting and the in-memory posting jobs
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from ...core.unit_of_work import unit_of_work
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+# Finished jobs kept for status queries (oldest dropped first)
+MAX_FINISHED_JOBS = 200
+# Entry errors kept per job; the counters stay exact beyond it
+MAX_ERRORS = 1000
+
+
+class UnbalancedEntryError(ValueError):
+    """Raised when an entry's lines do not balance (or it has none)."""
+
+    def __init__(self, entry_id: Any, debit: Any, credit: Any):
+        self.entry_id = entry_id
+        if debit == credit:
+            super().__init__(f"Journal entry {entry_id} has no lines")
+        else:
+            super().__init__(f"Journal entry {entry_id} does not balance (debit {debit}, credit {credit})")
+
+
+class PostingProgress:
+    """Counters of a batch posting, updated after every chunk."""
+
+    def __init__(self, total: int = 0):
+        self.total = total
+        self.posted = 0
+        self.skipped = 0  # Not a draft, not found or being posted by someone else
+        self.failed = 0
+        self.chunks = 0
+        self.errors: List[Dict[str, str]] = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def processed(self) -> int:
+        return self.posted + self.skipped + self.failed
+
+    @property
+    def entries_per_second(self) -> float:
+        return self.posted / self.elapsed if self.elapsed else 0.0
+
+    def record(self, posted: int = 0, skipped: int = 0, failed: Optional[Dict[Any, str]] = None) -> None:
+        """Count one finished chunk."""
+        self.posted += posted
+        self.skipped += skipped
+        for entry_id, error in (failed or {}).items():
+            self.failed += 1
+            if len(self.errors) < MAX_ERRORS:
+                self.errors.append({'entry_id': str(entry_id), 'error': error})
+        self.chunks += 1
+        self.elapsed = time.perf_counter() - self.started
+
+
+class PostingJob:
+    """A batch posting running in the background."""
+
+    def __init__(self, tenant_id: Any, entry_ids: List[Any], chunk_size: Optional[int] = None):
+        self.id = uuid.uuid4().hex
+        self.tenant_id = tenant_id
+        self.entry_ids = entry_ids
+        self.chunk_size = chunk_size
+        self.status = QUEUED
+        self.error: Optional[str] = None
+        self.progress = PostingProgress(len(entry_ids))
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        progress = self.progress
+        return {
+            'id': self.id,
+            'tenant_id': str(self.tenant_id),
+            'status': self.status,
+            'total': progress.total,
+            'processed': progress.processed,
+            'posted': progress.posted,
+            'skipped': progress.skipped,
+            'failed': progress.failed,
+            'chunks': progress.chunks,
+            'entries_per_second': round(progress.entries_per_second, 1),
+            'duration_ms': round(progress.elapsed * 1000, 1),
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+            'errors': progress.errors,
+        }
+
+
+class PostingJobs:
+    """
+    The posting jobs of this process. Jobs live in memory: their status is
+    answered by the worker that runs them, and finished jobs are dropped
+    once more than max_finished have completed.
+    """
+
+    def __init__(self, max_finished: int = MAX_FINISHED_JOBS):
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, PostingJob]" = OrderedDict()
+
+    def start(self, tenant_id: Any, entry_ids: Iterable[Any], repository_factory: Callable[[], Any],
+              chunk_size: Optional[int] = None) -> PostingJob:
+        """Create a job and run it in the background (repository_factory resolves the repository in its unit of work)."""
+        job = PostingJob(tenant_id, list(dict.fromkeys(entry_ids)), chunk_size)
+        self._jobs[job.id] = job
+        self._prune()
+        job.task = asyncio.create_task(run_posting_job(job, repository_factory))
+        return job
+
+    def get(self, job_id: str) -> Optional[PostingJob]:
+        return self._jobs.get(job_id)
+
+    def _prune(self) -> None:
+        finished = [job.id for job in self._jobs.values() if job.status in (COMPLETED, FAILED)]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+
+posting_jobs = PostingJobs()
+
+
+async def run_posting_job(job: PostingJob, repository_factory: Callable[[], Any]) -> None:
+    """Post the job's entries in its own unit of work; every chunk commits on its own."""
+    job.status = RUNNING
+    try:
+        async with unit_of_work(f"journal posting job {job.id}", commit_chunks=True):
+            await repository_factory().post_entries(
+                job.entry_ids, job.tenant_id, chunk_size=job.chunk_size, progress=job.progress
+            )
+        job.status = COMPLETED
+    except asyncio.CancelledError:
+        job.status = FAILED
+        job.error = "Cancelled"
+        job.finished_at = datetime.utcnow()
+        raise
+    except Exception as e:
+        job.status = FAILED
+        job.error = str(e)
+        logger.error(f"Journal posting job {job.id} failed: {e}")
+    job.finished_at = datetime.utcnow()
+    progress = job.progress
+    logger.info(
+        f"Journal posting job {job.id}: {progress.posted} posted, {progress.skipped} skipped, "
+        f"{progress.failed} failed in {progress.elapsed:.1f}s ({progress.entries_per_second:.0f} entries/s)"
+    )
@@ -0,0 +1,44 @@
+"""
+Column projection for VALEO-NeuroERP repositories
+Sparse fieldsets: only the requested columns are selected and rows come
+back as plain dicts instead of ORM entities
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import inspect
+
+
+class InvalidFieldsError(ValueError):
+    """Raised for requested fields that are not columns of the entity."""
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Split a fields=a,b,c parameter; None (or only commas) means all columns."""
+    if fields is None:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    return names or None
+
+
+def projected_columns(model, fields: Sequence[str], required: Sequence[str] = ('id',)) -> list:
+    """
+    Column attributes for the requested fields, required ones first and
+    without duplicates. Relationships and unknown names are rejected.
+    """
+    column_attrs = inspect(model).column_attrs
+    names = list(dict.fromkeys([*required, *fields]))
+    unknown = [name for name in names if name not in column_attrs]
+    if unknown:
+        raise InvalidFieldsError(f"Unknown field(s) for {model.__name__}: {', '.join(unknown)}")
+    return [getattr(model, name) for name in names]
+
+
+def column_keys(columns: Sequence) -> List[str]:
+    return [column.key for column in columns]
+
+
+def row_dicts(rows: Iterable[Sequence[Any]], keys: Sequence[str]) -> List[Dict[str, Any]]:
+    """Plain dicts of projected rows (trailing extra columns such as a window count are dropped)."""
+    return [dict(zip(keys, row)) for row in rows]
+
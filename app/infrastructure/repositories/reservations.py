@@ -0,0 +1,122 @@
+"""
+Stock reservations for VALEO-NeuroERP repositories
+Reservation errors and the in-memory available-to-promise (ATP) snapshot
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from ...core.config import settings
+from ...core.unit_of_work import unit_of_work
+
+logger = logging.getLogger(__name__)
+
+# Reservation states
+ACTIVE = 'active'
+COMMITTED = 'committed'
+RELEASED = 'released'
+EXPIRED = 'expired'
+
+# Rows stamped (updated_at) up to this long before their transaction committed
+# are still picked up by the incremental refresh
+COMMIT_LAG = timedelta(seconds=30)
+# A tenant's snapshot is reloaded in full this often, bounding any drift
+FULL_RELOAD_SECONDS = 300.0
+
+
+class InsufficientStockError(ValueError):
+    """Raised when a reservation asks for more than is available to promise."""
+
+    def __init__(self, shortages: Dict[Any, Dict[str, Decimal]]):
+        # article id -> {'requested': ..., 'available': ...}
+        self.shortages = shortages
+        super().__init__(
+            "Insufficient stock for " + ", ".join(
+                f"{id} (requested {s['requested']}, available {s['available']})" for id, s in shortages.items()
+            )
+        )
+
+
+class TenantLevels:
+    """Available stock per article of one tenant and when it was read."""
+
+    __slots__ = ("levels", "since", "refreshed", "loaded", "lock")
+
+    def __init__(self):
+        self.levels: Dict[Any, Decimal] = {}
+        self.since: Optional[datetime] = None  # updated_at from which the next refresh reads
+        self.refreshed = 0.0
+        self.loaded = 0.0
+        self.lock = asyncio.Lock()
+
+
+class AtpSnapshot:
+    """
+    Available-to-promise per article, held in memory per tenant.
+
+    A tenant is loaded in full on first use. Once older than max_age it is
+    refreshed incrementally with the articles changed since the previous
+    refresh: every stock change (update_stock, reservations, their expiry)
+    moves the article's updated_at, so those rows are the change feed.
+    Concurrent queries share one refresh.
+
+    Answers may be up to max_age old; they are for display and quoting.
+    Reservations check availability in the database and never oversell.
+    """
+
+    def __init__(self, max_age: float = 1.0):
+        self.max_age = max_age
+        self._tenants: Dict[str, TenantLevels] = {}
+
+    async def available(self, repository, tenant_id: Any, article_ids: Iterable[Any]) -> Dict[Any, Optional[Decimal]]:
+        """Available stock of the articles (None for unknown or inactive ones)."""
+        tenant = await self._fresh(repository, tenant_id)
+        return {id: tenant.levels.get(id) for id in article_ids}
+
+    def clear(self) -> None:
+        self._tenants.clear()
+
+    async def _fresh(self, repository, tenant_id: Any) -> TenantLevels:
+        tenant = self._tenants.setdefault(str(tenant_id), TenantLevels())
+        if time.monotonic() - tenant.refreshed < self.max_age:
+            return tenant
+        async with tenant.lock:
+            # Another query may have refreshed while this one waited
+            if time.monotonic() - tenant.refreshed >= self.max_age:
+                await self._refresh(repository, tenant_id, tenant)
+        return tenant
+
+    async def _refresh(self, repository, tenant_id: Any, tenant: TenantLevels) -> None:
+        started, now = time.monotonic(), datetime.utcnow()
+        full = tenant.since is None or started - tenant.loaded >= FULL_RELOAD_SECONDS
+        rows = await repository.get_stock_levels(tenant_id, None if full else tenant.since)
+        if full:
+            tenant.levels = {row.id: row.available_stock for row in rows}
+            tenant.loaded = started
+        else:
+            for row in rows:
+                if row.is_active:
+                    tenant.levels[row.id] = row.available_stock
+                else:
+                    tenant.levels.pop(row.id, None)
+        tenant.since = now - COMMIT_LAG
+        tenant.refreshed = started
+        logger.debug(f"ATP snapshot of tenant {tenant_id}: {'loaded' if full else 'refreshed'} {len(rows)} articles")
+
+
+atp_snapshot = AtpSnapshot(settings.ATP_SNAPSHOT_MAX_AGE)
+
+
+async def run_expiry_sweep(repository_factory: Callable[[], Any], interval: float) -> None:
+    """Background task: expire overdue reservations every interval seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with unit_of_work("reservation expiry sweep"):
+                await repository_factory().expire_reservations()
+        except Exception as e:
+            logger.error(f"Reservation expiry sweep failed: {e}")
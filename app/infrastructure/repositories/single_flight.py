@@ -0,0 +1,164 @@
+"""
+Lookup coalescing for VALEO-NeuroERP repositories
+Concurrent identical lookups share one in-flight database call
+(single flight), with per-key counters
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bound for the per-key counters; further keys are counted under "<other>"
+MAX_KEYS = 500
+
+
+class KeyStats:
+    """Counters of one lookup key."""
+
+    __slots__ = ("calls", "queries", "coalesced", "negative_hits", "peak_waiters")
+
+    def __init__(self):
+        self.calls = 0
+        self.queries = 0
+        self.coalesced = 0
+        self.negative_hits = 0
+        self.peak_waiters = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class LookupMetrics:
+    """Per-key lookup counters, bounded like the query fingerprints of db_telemetry."""
+
+    def __init__(self):
+        self.keys: Dict[str, KeyStats] = {}
+        self._lock = threading.Lock()
+
+    def _stats_for(self, key: str) -> KeyStats:
+        stats = self.keys.get(key)
+        if stats is None:
+            if len(self.keys) >= MAX_KEYS:
+                key = "<other>"
+                stats = self.keys.get(key)
+            if stats is None:
+                stats = self.keys[key] = KeyStats()
+        return stats
+
+    def record(self, key: str, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            stats = self._stats_for(key)
+            setattr(stats, counter, getattr(stats, counter) + amount)
+
+    def observe_waiters(self, key: str, waiters: int) -> None:
+        with self._lock:
+            stats = self._stats_for(key)
+            stats.peak_waiters = max(stats.peak_waiters, waiters)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.keys.clear()
+
+    def snapshot(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Hottest keys first."""
+        with self._lock:
+            items = [(key, stats.to_dict()) for key, stats in self.keys.items()]
+        items.sort(key=lambda item: item[1]["calls"], reverse=True)
+        return [dict(key=key, **stats) for key, stats in items[:limit]]
+
+    def totals(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                name: sum(getattr(stats, name) for stats in self.keys.values())
+                for name in ("calls", "queries", "coalesced", "negative_hits")
+            }
+
+    def prometheus(self, limit: int = 20) -> str:
+        """Counters of the hottest keys in the Prometheus text exposition format."""
+        lines: List[str] = []
+        hot_keys = self.snapshot(limit)
+        for name, help_text in (
+            ("calls", "Lookups per key that were not answered by the cache"),
+            ("queries", "Database calls per key (one per flight)"),
+            ("coalesced", "Lookups that joined an in-flight call"),
+            ("negative_hits", "Lookups answered by a cached miss"),
+        ):
+            lines.append(f"# HELP lookup_{name}_total {help_text}")
+            lines.append(f"# TYPE lookup_{name}_total counter")
+            for stats in hot_keys:
+                label = stats["key"].replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'lookup_{name}_total{{key="{label}"}} {stats[name]}')
+        return "\n".join(lines) + "\n"
+
+
+class _Flight:
+    __slots__ = ("future", "waiters")
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time within an event loop.
+
+    The first caller (leader) runs call(), which returns its own result and
+    a shareable value; callers arriving while it runs wait for the shared
+    value instead of issuing their own call. The shared value must not be
+    bound to the leader's session (the repositories share the serialised
+    entity). A failure is raised to all waiters; if the leader is cancelled
+    the waiters run the call themselves.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Tuple[int, str], _Flight] = {}
+        self.metrics = LookupMetrics()
+
+    async def run(self, key: str, call: Callable[[], Awaitable[Tuple[Any, Any]]]) -> Tuple[Any, bool]:
+        """Returns (the leader's result or the shared value, whether this caller led)."""
+        loop = asyncio.get_running_loop()
+        # Futures belong to one loop; flights of different loops never mix
+        flight_key = (id(loop), key)
+        self.metrics.record(key, "calls")
+
+        flight = self._flights.get(flight_key)
+        if flight is not None:
+            flight.waiters += 1
+            self.metrics.record(key, "coalesced")
+            self.metrics.observe_waiters(key, flight.waiters)
+            try:
+                return await asyncio.shield(flight.future), False
+            except asyncio.CancelledError:
+                if not flight.future.cancelled():
+                    raise
+                logger.debug(f"Leader of lookup {key} was cancelled, running it again")
+            return await self.run(key, call)
+
+        flight = self._flights[flight_key] = _Flight(loop.create_future())
+        self.metrics.record(key, "queries")
+        try:
+            result, shared = await call()
+        except asyncio.CancelledError:
+            flight.future.cancel()
+            raise
+        except BaseException as e:
+            flight.future.set_exception(e)
+            # Retrieved here so a flight without waiters does not log "never retrieved"
+            flight.future.exception()
+            raise
+        else:
+            flight.future.set_result(shared)
+            return result, True
+        finally:
+            self._flights.pop(flight_key, None)
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+
+# Shared by all repositories of the process
+single_flight = SingleFlight()
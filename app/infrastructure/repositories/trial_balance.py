@@ -0,0 +1,163 @@
+"""
+Trial balance for VALEO-NeuroERP repositories
+Period buckets, rollups over the chart of accounts and the report cache
+(invalidated whenever entries of the tenant are posted)
+"""
+
+import json
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional
+
+from .entity_cache import EntityCache, entity_cache, tenant_tag
+
+# Entry states that count towards balances (a reversed entry stays booked, its reversal offsets it)
+BOOKED = ('posted', 'reversed')
+
+# Period granularities; the database aggregates per month, coarser periods add months up
+PERIODS = ('month', 'quarter', 'year', 'total')
+
+# Cache "table" of the reports
+CACHE_TABLE = 'finance_trial_balance'
+# session.info key of the tenants whose entries the session's open transaction posted
+PENDING_TENANTS = 'trial_balance_pending'
+
+ZERO = Decimal('0.00')
+_AMOUNTS = ('debit', 'credit', 'balance')
+
+
+def period_key(year: int, month: int, period: str) -> str:
+    """Label of the period a month falls into: 2026-03, 2026-Q1, 2026 or total."""
+    if period == 'month':
+        return f"{year:04d}-{month:02d}"
+    if period == 'quarter':
+        return f"{year:04d}-Q{(month - 1) // 3 + 1}"
+    if period == 'year':
+        return f"{year:04d}"
+    return 'total'
+
+
+def _amounts() -> Dict[str, Decimal]:
+    return {'debit': ZERO, 'credit': ZERO, 'balance': ZERO}
+
+
+def _add(target: Dict[str, Any], debit: Decimal, credit: Decimal) -> None:
+    target['debit'] += debit
+    target['credit'] += credit
+    target['balance'] = target['debit'] - target['credit']
+
+
+def build_trial_balance(rows: Iterable[Any], tenant_id: Any, start_date: date, end_date: date,
+                        period: str) -> Dict[str, Any]:
+    """
+    Trial balance from per account and month movements (rows with id,
+    account_number, account_name, account_type, category, year, month,
+    debit, credit), rolled up to category, account type and total.
+    Balances are debit minus credit.
+    """
+    accounts: Dict[Any, Dict[str, Any]] = {}
+    categories: Dict[tuple, Dict[str, Any]] = {}
+    account_types: Dict[str, Dict[str, Any]] = {}
+    periods: Dict[str, None] = {}
+    totals = _amounts()
+
+    for row in rows:
+        debit, credit = row.debit or ZERO, row.credit or ZERO
+        key = period_key(int(row.year), int(row.month), period)
+        periods[key] = None
+        account = accounts.get(row.id)
+        if account is None:
+            account = accounts[row.id] = {
+                'account_id': row.id, 'account_number': row.account_number, 'account_name': row.account_name,
+                'account_type': row.account_type, 'category': row.category, **_amounts(), 'periods': {},
+            }
+        _add(account, debit, credit)
+        _add(account['periods'].setdefault(key, _amounts()), debit, credit)
+        category = categories.setdefault(
+            (row.account_type, row.category),
+            {'account_type': row.account_type, 'category': row.category, **_amounts()},
+        )
+        _add(category, debit, credit)
+        _add(account_types.setdefault(row.account_type, {'account_type': row.account_type, **_amounts()}),
+             debit, credit)
+        _add(totals, debit, credit)
+
+    return {
+        'tenant_id': str(tenant_id),
+        'period_start': start_date.isoformat(),
+        'period_end': end_date.isoformat(),
+        'period': period,
+        'periods': sorted(periods),
+        'accounts': sorted(accounts.values(), key=lambda account: account['account_number']),
+        'categories': [categories[key] for key in sorted(categories)],
+        'account_types': [account_types[key] for key in sorted(account_types)],
+        'total_debit': totals['debit'],
+        'total_credit': totals['credit'],
+        'in_balance': totals['debit'] == totals['credit'],
+    }
+
+
+# Cache
+
+def _encode(value: Any) -> str:
+    # Decimal amounts and UUID account ids
+    return str(value)
+
+
+def _decode(values: Dict[str, Any]) -> Dict[str, Any]:
+    for name in (*_AMOUNTS, 'total_debit', 'total_credit'):
+        if isinstance(values.get(name), str):
+            values[name] = Decimal(values[name])
+    return values
+
+
+def _key(tenant_id: Any, start_date: date, end_date: date, period: str) -> str:
+    return f"{CACHE_TABLE}:{tenant_id}:{start_date.isoformat()}:{end_date.isoformat()}:{period}"
+
+
+def _tag(tenant_id: Any) -> str:
+    return tenant_tag(CACHE_TABLE, tenant_id)
+
+
+async def cached_report(session, tenant_id: Any, start_date: date, end_date: date,
+                        period: str, cache: EntityCache = entity_cache) -> Optional[Dict[str, Any]]:
+    """The cached report, or None (always while the session holds uncommitted postings of the tenant)."""
+    if not cache.enabled or str(tenant_id) in session.info.get(PENDING_TENANTS, ()):
+        return None
+    payload = await cache.get(CACHE_TABLE, _key(tenant_id, start_date, end_date, period))
+    return json.loads(payload, object_hook=_decode) if payload is not None else None
+
+
+async def cache_report(tenant_id: Any, start_date: date, end_date: date, period: str,
+                       report: Dict[str, Any], cache: EntityCache = entity_cache) -> None:
+    if not cache.enabled:
+        return
+    await cache.set(CACHE_TABLE, (_key(tenant_id, start_date, end_date, period),),
+                    json.dumps(report, default=_encode), (_tag(tenant_id),))
+
+
+async def invalidate_trial_balance(session, tenant_ids: Iterable[Any], cache: EntityCache = entity_cache) -> None:
+    """
+    Drop the cached reports of the tenants after their entries were posted.
+    Inside a unit of work they are dropped once more after the commit (a
+    report computed meanwhile by another request does not include the
+    postings yet), and the session bypasses the cache until then.
+    """
+    tenants = {str(tenant_id) for tenant_id in tenant_ids}
+    if not tenants:
+        return
+    await cache.invalidate(CACHE_TABLE, [_tag(tenant) for tenant in tenants])
+    unit_of_work = session.info.get('unit_of_work')
+    if unit_of_work is None:
+        return
+    pending = session.info.get(PENDING_TENANTS)
+    if pending is None:
+        pending = session.info[PENDING_TENANTS] = set()
+
+        async def after_complete(committed: bool) -> None:
+            posted = session.info.pop(PENDING_TENANTS, set())
+            if committed and posted:
+                await cache.invalidate(CACHE_TABLE, [_tag(tenant) for tenant in posted])
+
+        unit_of_work.after_complete(after_complete)
+    pending.update(tenants)
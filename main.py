@@ -9,15 +9,22 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
+import asyncio
 import logging
 import time
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from app.core.config import settings
-from app.core.database import create_tables
+from app.core.database import create_tables, dispose_engines, replica_router
+from app.core.replica_routing import run_health_checks
 from app.api.v1.api import api_router
 from app.core.logging import setup_logging
 from app.core.container_config import configure_container  # Import container configuration
+from app.core.unit_of_work import unit_of_work
+from app.core.dependency_container import container
+from app.infrastructure.repositories import StockReservationRepository
+from app.infrastructure.repositories.entity_cache import entity_cache
+from app.infrastructure.repositories.reservations import run_expiry_sweep
 
 # Setup logging
 setup_logging()
@@ -45,10 +52,28 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize database: {e}")
         raise
 
+    # Probe read replicas in the background so failed ones rejoin the rotation
+    health_task = asyncio.create_task(run_health_checks(replica_router)) if replica_router.enabled else None
+    # Keep tenants' reads on the primary after writes on the other workers
+    writes_task = asyncio.create_task(replica_router.listen()) if replica_router.shares_writes else None
+    # Apply entity cache invalidations broadcast by the other workers
+    cache_task = asyncio.create_task(entity_cache.listen()) if entity_cache.enabled else None
+    # Return the stock of expired reservations
+    expiry_task = asyncio.create_task(run_expiry_sweep(
+        lambda: container.resolve(StockReservationRepository), settings.STOCK_RESERVATION_SWEEP_SECONDS
+    ))
+
     yield
 
     # Shutdown
     logger.info("Shutting down VALEO-NeuroERP API server...")
+    for task in (health_task, writes_task, cache_task, expiry_task):
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    await entity_cache.close()
+    await dispose_engines()
 
 # Create FastAPI application
 app = FastAPI(
@@ -101,6 +126,24 @@ async def log_requests(request: Request, call_next):
         logger.error(".2f")
         raise
 
+# Request-scoped unit of work: one database session per request
+@app.middleware("http")
+async def unit_of_work_scope(request: Request, call_next):
+    """Share one session across all repositories of a request and commit it once"""
+    # GET requests only read, so their queries may be served by a read replica
+    read_only = request.method in ("GET", "HEAD")
+    async with unit_of_work(f"{request.method} {request.url.path}", read_only=read_only) as uow:
+        response = await call_next(request)
+
+        # Report leaks against the route template rather than the concrete URL
+        route = request.scope.get("route")
+        if route is not None:
+            uow.route = f"{request.method} {route.path}"
+
+        if response.status_code >= 400:
+            uow.mark_rollback_only()
+        return response
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""
+Concurrency benchmark: synchronous vs. asyncio repository sessions
+
+Fires N parallel list requests (CustomerRepositoryImpl.get_all + count)
+against the same database, once with a blocking Session and once with an
+AsyncSession, and reports p50/p95/p99 latency per request.
+
+Usage:
+    python scripts/benchmarks/bench_async_repositories.py --customers 20000 --concurrency 200
+    python scripts/benchmarks/bench_async_repositories.py --database-url postgresql://user:pw@localhost/bench
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, get_async_database_url
+from app.core.models import Customer
+from app.infrastructure.repositories.implementations import CustomerRepositoryImpl
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def seed(url: str, tenant_id: uuid.UUID, customers: int) -> None:
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine, tables=[Customer.__table__])
+    Base.metadata.create_all(engine, tables=[Customer.__table__])
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "tenant_id": tenant_id,
+            "customer_number": f"K{i:08d}",
+            "company_name": f"Kunde {i} GmbH",
+            "contact_person": f"Ansprechpartner {i}",
+            "is_active": True,
+        }
+        for i in range(customers)
+    ]
+    with engine.begin() as connection:
+        for start in range(0, len(rows), 5000):
+            connection.execute(insert(Customer), rows[start:start + 5000])
+    engine.dispose()
+
+
+async def list_request(session_factory, tenant_id, skip, limit, arrived):
+    # Latency is measured from the arrival of the burst, as a client would see it:
+    # a request stuck behind a blocking query on the event loop is counted as waiting.
+    session = session_factory()
+    try:
+        repository = CustomerRepositoryImpl(session)
+        await repository.get_all(tenant_id, skip, limit)
+        await repository.count(tenant_id)
+    finally:
+        if hasattr(session, "close") and asyncio.iscoroutinefunction(session.close):
+            await session.close()
+        else:
+            session.close()
+    return (time.perf_counter() - arrived) * 1000
+
+
+async def run(session_factory, tenant_id, concurrency, limit, customers):
+    started = time.perf_counter()
+    tasks = [
+        list_request(session_factory, tenant_id, (i * limit) % max(customers - limit, 1), limit, started)
+        for i in range(concurrency)
+    ]
+    latencies = await asyncio.gather(*tasks)
+    return latencies, (time.perf_counter() - started) * 1000
+
+
+def report(label, latencies, wall_ms):
+    print(
+        f"{label:<8} p50={statistics.median(latencies):8.1f} ms  "
+        f"p95={percentile(latencies, 95):8.1f} ms  p99={percentile(latencies, 99):8.1f} ms  "
+        f"wall={wall_ms:8.1f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Synchronous SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--customers", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_async.db'}"
+    tenant_id = uuid.uuid4()
+    seed(url, tenant_id, args.customers)
+
+    sync_engine = create_engine(url, pool_size=10, max_overflow=20, pool_timeout=30)
+    async_engine = create_async_engine(get_async_database_url(url), pool_size=10, max_overflow=20, pool_timeout=30)
+
+    print(f"{args.concurrency} parallel list requests over {args.customers} customers ({url.split('://')[0]})")
+    latencies, wall = await run(sessionmaker(bind=sync_engine), tenant_id, args.concurrency, args.limit, args.customers)
+    report("sync", latencies, wall)
+    latencies, wall = await run(
+        async_sessionmaker(bind=async_engine, expire_on_commit=False),
+        tenant_id, args.concurrency, args.limit, args.customers,
+    )
+    report("async", latencies, wall)
+
+    await async_engine.dispose()
+    sync_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
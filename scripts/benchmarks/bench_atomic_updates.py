@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""
+Benchmark: atomic balance updates vs. read-modify-write under contention
+
+--writers concurrent writers (threads, one session each) post --postings
+amounts of 1.00 to the same hot account:
+  - legacy    get_by_id, balance += amount, commit (the former update_balance)
+  - atomic    AccountRepositoryImpl.update_balance (UPDATE ... SET balance =
+              balance + :amount RETURNING)
+  - batched   AccountRepositoryImpl.update_balances, --batch postings per statement
+and reports postings per second, failed postings and lost updates (expected
+minus actual final balance). Read-modify-write loses updates as soon as two
+writers read the same balance; the atomic variants must end at exactly
+writers * postings.
+
+Usage:
+    python scripts/benchmarks/bench_atomic_updates.py --writers 64 --postings 50
+    python scripts/benchmarks/bench_atomic_updates.py --database-url postgresql://user:pw@localhost/bench
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.models import Account
+from app.infrastructure.repositories.implementations import AccountRepositoryImpl
+
+AMOUNT = Decimal("1.00")
+
+
+async def legacy(repository, account_id, tenant_id, postings, batch):
+    for _ in range(postings):
+        account = await repository.get_by_id(account_id, tenant_id)
+        account.balance += AMOUNT
+        await repository._commit()
+
+
+async def atomic(repository, account_id, tenant_id, postings, batch):
+    for _ in range(postings):
+        await repository.update_balance(account_id, AMOUNT, tenant_id)
+
+
+async def batched(repository, account_id, tenant_id, postings, batch):
+    for start in range(0, postings, batch):
+        await repository.update_balances(
+            [(account_id, AMOUNT)] * min(batch, postings - start), tenant_id
+        )
+
+
+def run(name, writer, factory, account_id, tenant_id, args):
+    with factory() as session:
+        session.get(Account, account_id).balance = Decimal(0)
+        session.commit()
+
+    failed = [0]
+    start = threading.Barrier(args.writers + 1)
+
+    def work():
+        session = factory()
+        start.wait()
+        try:
+            asyncio.run(writer(AccountRepositoryImpl(session), account_id, tenant_id, args.postings, args.batch))
+        except Exception:
+            failed[0] += 1
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=work) for _ in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with factory() as session:
+        balance = session.scalar(select(Account.balance).where(Account.id == account_id))
+    expected = args.writers * args.postings * AMOUNT
+    print(f"{name:<8} {args.writers * args.postings / elapsed:>13.0f} {failed[0]:>15} "
+          f"{expected:>10} {balance:>10} {expected - balance:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Synchronous SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--writers", type=int, default=64)
+    parser.add_argument("--postings", type=int, default=50, help="Postings per writer")
+    parser.add_argument("--batch", type=int, default=10, help="Postings per statement of the batched variant")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_atomic.db'}"
+    connect_args = {"timeout": 60, "check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(url, pool_size=args.writers, max_overflow=0, connect_args=connect_args)
+    Base.metadata.drop_all(engine, tables=[Account.__table__])
+    Base.metadata.create_all(engine, tables=[Account.__table__])
+    factory = sessionmaker(bind=engine)
+
+    tenant_id, account_id = uuid.uuid4(), uuid.uuid4()
+    with factory() as session:
+        session.add(Account(id=account_id, tenant_id=tenant_id, account_number="1200",
+                            account_name="Bank", account_type="asset", category="Umlaufvermögen"))
+        session.commit()
+
+    print(f"{args.writers} writers x {args.postings} postings on one account ({engine.dialect.name})")
+    print(f"{'update':<8} {'postings/s':>13} {'failed writers':>15} {'expected':>10} {'balance':>10} {'lost':>6}")
+    for name, writer in (("legacy", legacy), ("atomic", atomic), ("batched", batched)):
+        run(name, writer, factory, account_id, tenant_id, args)
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
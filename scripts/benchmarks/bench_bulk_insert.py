@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Benchmark: per-row create vs. bulk_create / bulk_upsert
+
+Inserts generated articles through ArticleRepositoryImpl and reports rows
+per second for
+  - create()       one transaction per row (sampled on --single-rows rows)
+  - bulk_create()  COPY on PostgreSQL (psycopg2), executemany elsewhere
+  - bulk_upsert()  INSERT ... ON CONFLICT DO UPDATE over the same rows
+Target for the nightly ERP sync: > 20,000 rows/s on a laptop PostgreSQL.
+
+Usage:
+    python scripts/benchmarks/bench_bulk_insert.py --rows 300000
+    python scripts/benchmarks/bench_bulk_insert.py --database-url postgresql://user:pw@localhost/bench
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.models import Article
+from app.infrastructure.repositories.implementations import ArticleRepositoryImpl
+
+
+def articles(count: int, prefix: str = "A"):
+    return [
+        {
+            "article_number": f"{prefix}{i:08d}",
+            "name": f"Artikel {i}",
+            "unit": "kg",
+            "category": "Futtermittel",
+            "sales_price": Decimal("12.50"),
+            "barcode": f"40{i:011d}",
+        }
+        for i in range(count)
+    ]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Synchronous SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--single-rows", type=int, default=1000, help="Rows inserted with create() for comparison")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_bulk.db'}"
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine, tables=[Article.__table__])
+    Base.metadata.create_all(engine, tables=[Article.__table__])
+    session = sessionmaker(bind=engine)()
+    repository = ArticleRepositoryImpl(session)
+    tenant_id = uuid.uuid4()
+
+    rows = articles(args.single_rows, prefix="S")
+    started = time.perf_counter()
+    for row in rows:
+        await repository.create(row, tenant_id)
+    single_s = time.perf_counter() - started
+
+    rows = articles(args.rows)
+    started = time.perf_counter()
+    created = await repository.bulk_create(rows, tenant_id, chunk_size=args.chunk_size)
+    create_s = time.perf_counter() - started
+
+    for row in rows:
+        row["sales_price"] = Decimal("13.90")
+    started = time.perf_counter()
+    upserted = await repository.bulk_upsert(rows, tenant_id, chunk_size=args.chunk_size)
+    upsert_s = time.perf_counter() - started
+
+    print(f"{'operation':<14} {'rows':>9} {'failed':>7} {'seconds':>8} {'rows/s':>10}")
+    print(f"{'create':<14} {args.single_rows:>9} {0:>7} {single_s:>8.2f} {args.single_rows / single_s:>10.0f}")
+    print(f"{'bulk_create':<14} {created.succeeded:>9} {created.failed:>7} {create_s:>8.2f} {created.succeeded / create_s:>10.0f}")
+    print(f"{'bulk_upsert':<14} {upserted.succeeded:>9} {upserted.failed:>7} {upsert_s:>8.2f} {upserted.succeeded / upsert_s:>10.0f}")
+    print(f"COPY used: {repository._copy_supported}, chunk size {args.chunk_size}")
+
+    session.close()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Benchmark: ILIKE scan vs. indexed customer search
+
+Seeds one tenant with --customers customers (default 1,000,000) and measures
+the median latency of
+  - ilike         the previous '%term%' filter on company_name/contact_person
+  - search        CustomerRepositoryImpl.search (pg_trgm / FTS5, ranked)
+  - autocomplete  CustomerRepositoryImpl.autocomplete (prefix)
+for a set of rare and frequent terms.
+
+Usage:
+    python scripts/benchmarks/bench_crm_search.py --customers 1000000
+    python scripts/benchmarks/bench_crm_search.py --database-url postgresql://user:pw@localhost/bench
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import create_engine, or_, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.models import Customer
+from app.infrastructure.repositories.implementations import CustomerRepositoryImpl
+
+PREFIXES = ["Agrar", "Land", "Hof", "Mühle", "Futter", "Saat", "Raiffeisen", "Bio", "Milch", "Forst"]
+SUFFIXES = ["GmbH", "KG", "eG", "AG", "GbR", "e.K."]
+CITIES = ["Nord", "Süd", "Ost", "West", "Mitte", "Emsland", "Allgäu", "Altmark", "Börde", "Eifel"]
+FIRST_NAMES = ["Hans", "Eva", "Otto", "Anna", "Karl", "Maria", "Paul", "Lena", "Jan", "Greta"]
+LAST_NAMES = ["Müller", "Schmidt", "Meier", "Schulz", "Becker", "Hoffmann", "Wagner", "Koch", "Bauer", "Wolf"]
+
+# (term, kind): frequent words match ~10% of the rows, the unique number one row
+TERMS = ["Agrar", "Schmidt", "Emsland", "K00424242", "hofmann"]
+PREFIX_TERMS = ["Mü", "Raiff", "Ems", "Gre"]
+
+
+def customers(count: int):
+    rng = random.Random(42)
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield {
+            "customer_number": f"K{i:08d}",
+            "company_name": f"{rng.choice(PREFIXES)} {rng.choice(CITIES)} K{i:08d} {rng.choice(SUFFIXES)}",
+            "contact_person": f"{first} {last}",
+            "email": f"{first.lower()}.{i}@example.de",
+        }
+
+
+async def timed(coroutine_factory, repeats: int) -> float:
+    durations = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await coroutine_factory()
+        durations.append((time.perf_counter() - started) * 1000)
+    return statistics.median(durations)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Synchronous SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--customers", type=int, default=1000000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_search.db'}"
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine, tables=[Customer.__table__])
+    Base.metadata.create_all(engine, tables=[Customer.__table__])
+    session = sessionmaker(bind=engine)()
+    repository = CustomerRepositoryImpl(session)
+    tenant_id = uuid.uuid4()
+
+    print(f"Seeding {args.customers} customers ...")
+    started = time.perf_counter()
+    await repository.bulk_create(list(customers(args.customers)), tenant_id, chunk_size=10000)
+    print(f"Seeded in {time.perf_counter() - started:.1f}s")
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as connection:
+            connection.exec_driver_sql("ANALYZE crm_customers")
+
+    async def ilike(term: str):
+        statement = select(Customer).where(
+            Customer.tenant_id == tenant_id,
+            Customer.is_active == True,
+            or_(Customer.company_name.ilike(f"%{term}%"), Customer.contact_person.ilike(f"%{term}%")),
+        ).limit(args.limit)
+        return (await repository._read(statement, tenant_id)).scalars().all()
+
+    async def ilike_total(term: str):
+        statement = select(Customer.id).where(
+            Customer.tenant_id == tenant_id,
+            or_(Customer.company_name.ilike(f"%{term}%"), Customer.contact_person.ilike(f"%{term}%")),
+        )
+        return len((await repository._read(statement, tenant_id)).all())
+
+    print(f"{'term':<12} {'matches':>8} {'ilike ms':>9} {'search ms':>10} {'page+total ms':>14}")
+    for term in TERMS:
+        matches = await ilike_total(term)
+        ilike_ms = await timed(lambda: ilike(term), args.repeats)
+        search_ms = await timed(lambda: repository.search(tenant_id, term, args.limit), args.repeats)
+        page_ms = await timed(lambda: repository.get_all_with_total(tenant_id, 0, args.limit, term), args.repeats)
+        print(f"{term:<12} {matches:>8} {ilike_ms:>9.2f} {search_ms:>10.2f} {page_ms:>14.2f}")
+
+    print(f"{'prefix':<12} {'autocomplete ms':>16}")
+    for prefix in PREFIX_TERMS:
+        autocomplete_ms = await timed(lambda: repository.autocomplete(tenant_id, prefix, 10), args.repeats)
+        print(f"{prefix:<12} {autocomplete_ms:>16.2f}")
+
+    session.close()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+"""
+Benchmark: importing a DATEV Buchungsstapel
+
+Writes a DATEV file of --rows rows over --accounts accounts: mostly rows
+with a Gegenkonto (an entry of two lines each) and every --split-every-th
+entry split over three rows without Gegenkonto; every --invalid-every-th
+entry has a row with an unknown account and is rejected. Then imports it:
+  - one-by-one   JournalEntryRepositoryImpl.create per entry, one
+                 transaction each (what POST /journal-entries/ does;
+                 the first --one-by-one-limit entries only)
+  - import       JournalImportRepositoryImpl.run_import: streamed in
+                 --chunk-size row transactions, staged (COPY on PostgreSQL)
+                 and merged with INSERT ... SELECT
+
+The imported lines must balance per entry and the rejected rows must be
+recorded. Reports rows per second and the time 1,000,000 rows would take.
+
+Usage:
+    python scripts/benchmarks/bench_datev_import.py --rows 200000
+    python scripts/benchmarks/bench_datev_import.py --database-url postgresql://user:pw@localhost/bench --rows 1000000 --post
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base
+from app.core.models import (
+    Account, AccountPeriodBalance, JournalEntry, JournalEntryLine, JournalImport, JournalImportError,
+    JournalImportLine, NumberRange
+)
+from app.core.unit_of_work import UnitOfWork
+from app.infrastructure.repositories.datev import (
+    ACCOUNT, AMOUNT, CONTRA_ACCOUNT, COST_CENTER, CURRENCY, DOCUMENT, DOCUMENT_DATE, SIDE, TEXT
+)
+from app.infrastructure.repositories.implementations import JournalEntryRepositoryImpl, JournalImportRepositoryImpl
+from app.infrastructure.repositories.journal_import import import_path
+
+TABLES = [
+    Account.__table__, JournalEntry.__table__, JournalEntryLine.__table__, AccountPeriodBalance.__table__,
+    NumberRange.__table__, JournalImport.__table__, JournalImportError.__table__, JournalImportLine.__table__,
+]
+HEADINGS = [
+    AMOUNT, SIDE, CURRENCY, 'Kurs', 'Basis-Umsatz', 'WKZ Basis-Umsatz', ACCOUNT, CONTRA_ACCOUNT,
+    'BU-Schlüssel', DOCUMENT_DATE, DOCUMENT, 'Belegfeld 2', 'Skonto', TEXT, COST_CENTER,
+]
+
+
+def write_file(path: Path, rows: int, accounts: int, split_every: int, invalid_every: int, seed: int):
+    """The DATEV file; returns the entries and the rows of rejected entries it holds."""
+    rng = random.Random(seed)
+    header = ['EXTF', '700', '21', 'Buchungsstapel', '13', datetime.now().strftime('%Y%m%d%H%M%S%f')[:17], '',
+              'RE', 'bench', '', '29098', '55003', '20260101', '4', '20260101', '20261231', 'Bench', '', '1', '0', '0',
+              'EUR']
+    written, entries, rejected_rows = 0, 0, 0
+    with open(path, 'w', encoding='cp1252', newline='') as file:
+        file.write(';'.join(header) + '\r\n')
+        file.write(';'.join(HEADINGS) + '\r\n')
+        while written < rows:
+            entries += 1
+            document = f"RE{entries:08d}"
+            document_date = f"{rng.randint(1, 28):02d}{rng.randint(1, 12):02d}"
+            account = lambda: f"{1000 + rng.randrange(accounts)}"
+            cents = rng.randint(1, 10_000_000)
+            invalid = invalid_every and entries % invalid_every == 0
+            if split_every and entries % split_every == 0:
+                # Debit split over two accounts against one credit
+                part = rng.randint(0, cents)
+                lines = [(cents, 'H', account(), ''), (part, 'S', account(), ''), (cents - part, 'S', account(), '')]
+                lines = [line for line in lines if line[0]]
+            else:
+                lines = [(cents, rng.choice('SH'), account(), account())]
+            if invalid:
+                lines[0] = (*lines[0][:2], '99999', lines[0][3])
+                rejected_rows += len(lines)
+            for amount, side, konto, contra in lines:
+                euros, rest = divmod(amount, 100)
+                file.write(
+                    f'{euros},{rest:02d};"{side}";"EUR";;;;{konto};{contra};;{document_date};"{document}";;;'
+                    f'"Rechnung {document}";"{rng.randrange(20)}"\r\n'
+                )
+                written += 1
+    return entries, rejected_rows
+
+
+def seed(engine, tenant_id, accounts: int) -> None:
+    Base.metadata.drop_all(engine, tables=TABLES)
+    Base.metadata.create_all(engine, tables=TABLES)
+    with engine.begin() as connection:
+        connection.execute(insert(Account), [
+            {"id": uuid.uuid4(), "tenant_id": tenant_id, "account_number": f"{1000 + i:06d}",
+             "account_name": f"Konto {i}", "account_type": "asset", "category": "bench", "balance": Decimal(0)}
+            for i in range(accounts)
+        ])
+
+
+def check(engine, tenant_id, imported: JournalImport, rejected_rows: int) -> None:
+    """Every imported entry balances and matches its lines; the rejected rows are recorded."""
+    with engine.begin() as connection:
+        unbalanced = connection.execute(
+            select(func.count()).select_from(
+                select(JournalEntryLine.journal_entry_id)
+                .group_by(JournalEntryLine.journal_entry_id)
+                # Rounded to cents: SQLite sums NUMERIC as float
+                .having(func.round(func.sum(JournalEntryLine.debit_amount) - func.sum(JournalEntryLine.credit_amount), 2) != 0)
+                .subquery()
+            )
+        ).scalar()
+        entries, lines = connection.execute(
+            select(func.count(func.distinct(JournalEntryLine.journal_entry_id)), func.count())
+            .where(JournalEntryLine.tenant_id == tenant_id)
+        ).one()
+        errors = connection.execute(
+            select(func.count()).where(JournalImportError.import_id == imported.id)
+        ).scalar()
+    assert not unbalanced, f"{unbalanced} imported entries do not balance"
+    assert (entries, lines) == (imported.entries, imported.lines), (entries, lines, imported.entries, imported.lines)
+    assert errors == imported.failed_rows == rejected_rows, (errors, imported.failed_rows, rejected_rows)
+
+
+async def one_by_one(factory, path: Path, tenant_id, limit: int) -> int:
+    """Entries of the file's first rows (one row, one entry with a Gegenkonto) created one by one."""
+    with factory() as session:
+        chart = dict(session.execute(select(Account.account_number, Account.id)).all())
+    created = 0
+    with open(path, encoding='cp1252') as file:
+        next(file), next(file)
+        for row in file:
+            fields = row.rstrip('\r\n').split(';')
+            if not fields[7]:
+                continue
+            amount = Decimal(fields[0].replace(',', '.'))
+            debit, credit = chart.get(f"{int(fields[6]):06d}"), chart.get(f"{int(fields[7]):06d}")
+            if debit is None or credit is None:
+                continue
+            if fields[1] == '"H"':
+                debit, credit = credit, debit
+            entry_date = datetime(2026, int(fields[9][2:]), int(fields[9][:2]))
+            with factory() as session:
+                await JournalEntryRepositoryImpl(session).create({
+                    "entry_date": entry_date, "posting_date": entry_date, "description": fields[13].strip('"'),
+                    "reference": fields[10].strip('"'), "source": "import",
+                    "lines": [
+                        {"account_id": debit, "debit_amount": amount, "credit_amount": Decimal(0), "line_number": 1},
+                        {"account_id": credit, "debit_amount": Decimal(0), "credit_amount": amount, "line_number": 2},
+                    ],
+                }, tenant_id)
+            created += 1
+            if created >= limit:
+                break
+    return created
+
+
+async def run_import(factory, import_id, tenant_id, post: bool, chunk_size: int) -> JournalImport:
+    # A unit of work like the import job's: the chunks commit, the repositories only flush
+    unit_of_work = UnitOfWork("bench run_import", session_factory=factory, commit_chunks=True)
+    repository = JournalImportRepositoryImpl(unit_of_work.session)
+    await repository.create_import(import_id, tenant_id, "bench.csv", post)
+    imported = await repository.run_import(import_id, tenant_id, chunk_size)
+    await unit_of_work.complete()
+    return imported
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Synchronous SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=100000, help="Rows of the DATEV file")
+    parser.add_argument("--accounts", type=int, default=500)
+    parser.add_argument("--split-every", type=int, default=10, help="Every n-th entry spans three rows (0: none)")
+    parser.add_argument("--invalid-every", type=int, default=1000, help="Every n-th entry is rejected (0: none)")
+    parser.add_argument("--chunk-size", type=int, default=JournalImportRepositoryImpl.import_chunk_size)
+    parser.add_argument("--post", action="store_true", help="Import posted entries (balances updated)")
+    parser.add_argument("--one-by-one-limit", type=int, default=2000,
+                        help="Entries created one by one (the slow baseline; 0 to skip)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    directory = Path(tempfile.mkdtemp())
+    settings.JOURNAL_IMPORT_DIR = str(directory)
+    url = args.database_url or f"sqlite:///{directory / 'bench_datev_import.db'}"
+    engine = create_engine(url)
+    tenant_id = uuid.uuid4()
+    import_id = uuid.uuid4()
+    path = import_path(import_id)
+
+    started = time.perf_counter()
+    entries, rejected_rows = write_file(path, args.rows, args.accounts, args.split_every, args.invalid_every, args.seed)
+    print(f"Wrote {args.rows} rows ({entries} entries, {path.stat().st_size / 2**20:.0f} MiB) "
+          f"in {time.perf_counter() - started:.1f}s")
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    print(f"{'variant':>12} {'rows':>9} {'entries':>9} {'s':>8} {'rows/s':>9} {'1M rows s':>10}")
+    if args.one_by_one_limit:
+        seed(engine, tenant_id, args.accounts)
+        started = time.perf_counter()
+        created = await one_by_one(factory, path, tenant_id, args.one_by_one_limit)
+        elapsed = time.perf_counter() - started
+        print(f"{'one-by-one':>12} {created:>9} {created:>9} {elapsed:>8.2f} {created / elapsed:>9.0f} "
+              f"{1_000_000 / (created / elapsed):>10.0f}")
+
+    seed(engine, tenant_id, args.accounts)
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+    started = time.perf_counter()
+    imported = await run_import(factory, import_id, tenant_id, args.post, args.chunk_size)
+    elapsed = time.perf_counter() - started
+    print(f"{'import':>12} {imported.rows:>9} {imported.entries:>9} {elapsed:>8.2f} {imported.rows / elapsed:>9.0f} "
+          f"{1_000_000 / (imported.rows / elapsed):>10.1f}")
+    print(f"{imported.lines} lines imported, {imported.failed_rows} rows rejected")
+    check(engine, tenant_id, imported, rejected_rows)
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""
+Benchmark: entity cache for get_by_id / get_by_customer_number
+
+Seeds --customers customers and measures the median lookup latency of
+  - database    CustomerRepositoryImpl.get_by_id (no cache)
+  - redis       CachedRepository, L1 emptied before every lookup (L2 hit)
+  - l1          CachedRepository, in-process hit
+then checks that update/delete invalidate the entry, also in a second
+cache instance ("another worker") through the pub/sub broadcast.
+
+Runs against fakeredis unless --redis-url points to a Redis server.
+
+Usage:
+    python scripts/benchmarks/bench_entity_cache.py --customers 10000
+    python scripts/benchmarks/bench_entity_cache.py --redis-url redis://localhost:6379/15
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.models import Customer
+from app.infrastructure.repositories.cached_repository import CachedRepository
+from app.infrastructure.repositories.entity_cache import EntityCache
+from app.infrastructure.repositories.implementations import CustomerRepositoryImpl
+
+
+def redis_clients(url):
+    """Two clients on one server (two workers sharing Redis)."""
+    if url:
+        from redis import asyncio as redis_asyncio
+        return redis_asyncio.from_url(url), redis_asyncio.from_url(url)
+    import fakeredis
+    server = fakeredis.FakeServer()
+    return fakeredis.FakeAsyncRedis(server=server), fakeredis.FakeAsyncRedis(server=server)
+
+
+async def median_ms(lookup, ids, before=None) -> float:
+    durations = []
+    for id in ids:
+        if before is not None:
+            before()
+        started = time.perf_counter()
+        await lookup(id)
+        durations.append((time.perf_counter() - started) * 1000)
+    return statistics.median(durations)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Synchronous SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--redis-url", default=None, help="Redis URL (default: fakeredis)")
+    parser.add_argument("--customers", type=int, default=10000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_cache.db'}"
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine, tables=[Customer.__table__])
+    Base.metadata.create_all(engine, tables=[Customer.__table__])
+    session = sessionmaker(bind=engine)()
+    repository = CustomerRepositoryImpl(session)
+    tenant_id = uuid.uuid4()
+
+    await repository.bulk_create([
+        {"customer_number": f"K{i:08d}", "company_name": f"Landhandel {i}", "email": f"info{i}@example.de"}
+        for i in range(args.customers)
+    ], tenant_id, chunk_size=5000)
+    ids = [row[0] for row in session.query(Customer.id).all()]
+    sample = [random.choice(ids) for _ in range(args.lookups)]
+
+    redis_a, redis_b = redis_clients(args.redis_url)
+    prefix = f"bench:{uuid.uuid4().hex[:8]}"
+    cache = EntityCache(redis_a, ttl=300, l1_size=args.customers, l1_ttl=60, prefix=prefix)
+    other_worker = EntityCache(redis_b, ttl=300, l1_size=args.customers, l1_ttl=60, prefix=prefix)
+    listener = asyncio.create_task(other_worker.listen())
+    cached = CachedRepository(repository, cache)
+    cached_elsewhere = CachedRepository(CustomerRepositoryImpl(session), other_worker)
+
+    database_ms = await median_ms(lambda id: repository.get_by_id(id, tenant_id), sample)
+    fill_ms = await median_ms(lambda id: cached.get_by_id(id, tenant_id), sample)
+    redis_ms = await median_ms(lambda id: cached.get_by_id(id, tenant_id), sample, before=cache.l1.clear)
+    await median_ms(lambda id: cached.get_by_id(id, tenant_id), sample)  # warm L1
+    l1_ms = await median_ms(lambda id: cached.get_by_id(id, tenant_id), sample)
+
+    print(f"{'lookup':<24} {'median ms':>10}")
+    for name, value in (("database", database_ms), ("miss + fill", fill_ms),
+                        ("redis (L2)", redis_ms), ("in-process (L1)", l1_ms)):
+        print(f"{name:<24} {value:>10.3f}")
+
+    # Invalidation
+    target = sample[0]
+    number = (await cached.get_by_id(target, tenant_id)).customer_number
+    assert (await cached_elsewhere.get_by_customer_number(number, tenant_id)).company_name.startswith("Landhandel")
+    await asyncio.sleep(0.1)  # let the listener subscribe
+    await cached.update(target, {"company_name": "Umbenannt GmbH"}, tenant_id)
+    await asyncio.sleep(0.1)  # broadcast delivery
+    checks = {
+        "update seen by id": (await cached.get_by_id(target, tenant_id)).company_name == "Umbenannt GmbH",
+        "update seen by number": (await cached.get_by_customer_number(number, tenant_id)).company_name == "Umbenannt GmbH",
+        "update seen by other worker": (
+            (await cached_elsewhere.get_by_customer_number(number, tenant_id)).company_name == "Umbenannt GmbH"
+        ),
+    }
+    await cached.delete(target, tenant_id)
+    await asyncio.sleep(0.1)
+    checks["delete seen by id"] = await cached.get_by_id(target, tenant_id) is None
+    checks["delete seen by other worker"] = await cached_elsewhere.get_by_id(target, tenant_id) is None
+    for name, ok in checks.items():
+        print(f"{name:<30} {'ok' if ok else 'FAILED'}")
+
+    stats = cache.metrics.snapshot()["crm_customers"]
+    print(f"hit ratio {stats['hit_ratio']:.2%} (l1 {stats['l1_hits']}, redis {stats['l2_hits']}, "
+          f"misses {stats['misses']}, invalidations {stats['invalidations']}, errors {stats['errors']})")
+
+    listener.cancel()
+    await cache.close()
+    await other_worker.close()
+    session.close()
+    engine.dispose()
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
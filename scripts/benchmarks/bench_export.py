@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""
+Benchmark: streaming export vs. paging through offset pages
+
+Seeds --customers customers and pulls the full tenant as NDJSON
+  - paged     get_all_with_total with limit 1000, skip += 1000 (what BI jobs did)
+  - stream    BaseRepositoryImpl.stream (server-side cursor, GET /export/customers)
+  - since     stream with since= (incremental pull of the last 1% changed rows)
+and reports duration, number of queries, bytes and peak Python memory
+(tracemalloc) per variant. Peak memory of the stream stays at one batch
+whatever the number of customers.
+
+Usage:
+    python scripts/benchmarks/bench_export.py --customers 200000
+    python scripts/benchmarks/bench_export.py --database-url postgresql://user:pw@localhost/bench
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.models import Customer
+from app.infrastructure.repositories.export import export_repository
+from app.infrastructure.repositories.implementations import CustomerRepositoryImpl
+
+_json = TypeAdapter(Any)
+
+
+def seed(engine, tenant_id: uuid.UUID, customers: int) -> datetime:
+    """Insert the customers; the last 1% were changed recently. Returns the cut-off for since=."""
+    Base.metadata.drop_all(engine, tables=[Customer.__table__])
+    Base.metadata.create_all(engine, tables=[Customer.__table__])
+    now = datetime.utcnow()
+    recent = customers - customers // 100
+    with engine.begin() as connection:
+        for start in range(0, customers, 10000):
+            connection.execute(insert(Customer), [
+                {
+                    "id": uuid.uuid4(), "tenant_id": tenant_id, "customer_number": f"K{i:08d}",
+                    "company_name": f"Landhandel {i} GmbH", "email": f"info{i}@example.de",
+                    "city": "Oldenburg", "postal_code": "26121", "is_active": True,
+                    "created_at": now - timedelta(days=30),
+                    "updated_at": now - (timedelta(minutes=5) if i >= recent else timedelta(days=30)),
+                }
+                for i in range(start, min(start + 10000, customers))
+            ])
+    return now - timedelta(hours=1)
+
+
+async def paged(repository, tenant_id, emit):
+    keys, skip = repository.stream_fields(), 0
+    while True:
+        page = await repository.get_all_with_total(tenant_id, skip, 1000)
+        for customer in page.items:
+            emit({key: getattr(customer, key) for key in keys})
+        skip += 1000
+        if skip >= page.total:
+            return
+
+
+async def streamed(repository, tenant_id, emit, since=None):
+    async for rows in repository.stream(tenant_id, since):
+        for row in rows:
+            emit(row)
+
+
+async def measure(name, pull, session, counter):
+    session.expunge_all()
+    written = [0, 0]
+
+    def emit(row):
+        written[0] += 1
+        written[1] += len(_json.dump_json(row)) + 1
+
+    counter[0] = 0
+    tracemalloc.start()
+    started = time.perf_counter()
+    await pull(emit)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<8} {written[0]:>9} {counter[0]:>8} {elapsed:>9.2f} {written[1] / 1e6:>9.1f} {peak / 1e6:>9.1f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Synchronous SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--customers", type=int, default=200000)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_export.db'}"
+    engine = create_engine(url)
+    tenant_id = uuid.uuid4()
+    since = seed(engine, tenant_id, args.customers)
+
+    counter = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        counter[0] += 1
+
+    session = sessionmaker(bind=engine)()
+    customers = CustomerRepositoryImpl(session)
+    export = export_repository("customers", session)
+
+    print(f"{args.customers} customers")
+    print(f"{'pull':<8} {'rows':>9} {'queries':>8} {'seconds':>9} {'MB out':>9} {'peak MB':>9}")
+    await measure("paged", lambda emit: paged(customers, tenant_id, emit), session, counter)
+    await measure("stream", lambda emit: streamed(export, tenant_id, emit), session, counter)
+    await measure("since", lambda emit: streamed(export, tenant_id, emit, since), session, counter)
+
+    session.close()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
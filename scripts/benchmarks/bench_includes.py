@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""
+Benchmark: related entity expansion (include=customer,assigned_user)
+
+Seeds --customers customers, --users users and a lead per row of the
+largest page, then lists pages of leads with their customer and assigned
+user embedded and counts the SQL statements per page:
+  - n+1       one get_by_id per row and relation
+  - loader    the request's DataLoader (one get_many per relation)
+
+The loader must issue the same number of statements for every page size:
+the page query plus one per include.
+
+Usage:
+    python scripts/benchmarks/bench_includes.py --page-sizes 10,100,1000
+    python scripts/benchmarks/bench_includes.py --database-url postgresql://user:pw@localhost/bench
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.models import Customer, Lead, User
+from app.api.v1.endpoints.includes import Relation, expand, included_fields
+from app.api.v1.schemas.crm import Customer as CustomerSchema, Lead as LeadSchema
+from app.api.v1.schemas.shared import User as UserSchema
+from app.infrastructure.repositories.base_repository import BaseRepositoryImpl
+from app.infrastructure.repositories.implementations import CustomerRepositoryImpl, LeadRepositoryImpl
+
+TABLES = [Customer.__table__, Lead.__table__, User.__table__]
+INCLUDES = ['customer', 'assigned_user']
+
+
+def seed(engine, tenant_id, leads: int, customers: int, users: int) -> None:
+    Base.metadata.drop_all(engine, tables=TABLES)
+    Base.metadata.create_all(engine, tables=TABLES)
+    customer_ids = [uuid.uuid4() for _ in range(customers)]
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    with engine.begin() as connection:
+        connection.execute(insert(Customer), [
+            {"id": id, "tenant_id": tenant_id, "customer_number": f"K{i:07d}", "company_name": f"Kunde {i}"}
+            for i, id in enumerate(customer_ids)
+        ])
+        connection.execute(insert(User), [
+            {"id": id, "tenant_id": tenant_id, "username": f"user{i}", "email": f"user{i}@example.com",
+             "password_hash": "-", "first_name": "Vor", "last_name": f"Name {i}"}
+            for i, id in enumerate(user_ids)
+        ])
+        connection.execute(insert(Lead), [
+            {"id": uuid.uuid4(), "tenant_id": tenant_id, "source": "web", "company_name": f"Interessent {i}",
+             "contact_person": f"Person {i}", "email": f"lead{i}@example.com",
+             "converted_to_customer_id": customer_ids[i % customers], "assigned_to": user_ids[i % users]}
+            for i in range(leads)
+        ])
+
+
+async def list_page(session, tenant_id, size: int, batched: bool):
+    leads = LeadRepositoryImpl(session)
+    relations = {
+        'customer': Relation('converted_to_customer_id', lambda: CustomerRepositoryImpl(session), CustomerSchema),
+        'assigned_user': Relation('assigned_to', lambda: BaseRepositoryImpl(session, User), UserSchema),
+    }
+    names = included_fields(None, INCLUDES, relations, LeadSchema, leads)
+    rows = (await leads.get_all_with_total(tenant_id, 0, size, total_mode="estimate", fields=names)).items
+    if batched:
+        return await expand(rows, INCLUDES, relations, tenant_id)
+    for row in rows:
+        for name in INCLUDES:
+            relation = relations[name]
+            row[name] = await relation.repository().get_by_id(row[relation.foreign_key], tenant_id)
+    return rows
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Synchronous SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--page-sizes", default="10,100,1000")
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--users", type=int, default=20)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.page_sizes.split(",")]
+
+    url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_includes.db'}"
+    engine = create_engine(url)
+    # The users table declares some indexes twice; create it without them
+    for index in [index for index in User.__table__.indexes if index.name.startswith("ix_shared_users_")]:
+        User.__table__.indexes.discard(index)
+    tenant_id = uuid.uuid4()
+    seed(engine, tenant_id, max(sizes), args.customers, args.users)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    statements = [0]
+    event.listen(engine, "before_cursor_execute", lambda *_: statements.__setitem__(0, statements[0] + 1))
+
+    print(f"{'page size':>10} {'n+1 queries':>12} {'n+1 ms':>9} {'loader queries':>15} {'loader ms':>10}")
+    constant = set()
+    for size in sizes:
+        results = []
+        for batched in (False, True):
+            with factory() as session:
+                statements[0] = 0
+                started = time.perf_counter()
+                rows = await list_page(session, tenant_id, size, batched)
+                results.append((statements[0], (time.perf_counter() - started) * 1000))
+            assert all(row['customer'] is not None and row['assigned_user'] is not None for row in rows)
+        constant.add(results[1][0])
+        print(f"{size:>10} {results[0][0]:>12} {results[0][1]:>9.1f} {results[1][0]:>15} {results[1][1]:>10.1f}")
+    print(f"loader query count {'constant' if len(constant) == 1 else 'NOT constant'} across page sizes")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
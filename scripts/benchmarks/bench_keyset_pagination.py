@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Benchmark: offset vs. keyset (cursor) pagination
+
+Seeds one tenant with pages * limit customers, then measures the latency
+of selected pages (1 ... 10,000) with offset pagination
+(CustomerRepositoryImpl.get_all) and keyset pagination
+(CustomerRepositoryImpl.get_page). Keyset cursors are collected by
+walking all pages once; each sampled page is then fetched repeatedly.
+
+Usage:
+    python scripts/benchmarks/bench_keyset_pagination.py --pages 10000 --limit 20
+    python scripts/benchmarks/bench_keyset_pagination.py --database-url postgresql://user:pw@localhost/bench
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.models import Customer
+from app.infrastructure.repositories.implementations import CustomerRepositoryImpl
+
+SAMPLE_PAGES = (1, 10, 100, 1000, 2500, 5000, 7500, 10000)
+
+
+def seed(url: str, tenant_id: uuid.UUID, customers: int) -> None:
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine, tables=[Customer.__table__])
+    Base.metadata.create_all(engine, tables=[Customer.__table__])
+    started = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        for start in range(0, customers, 10000):
+            connection.execute(insert(Customer), [
+                {
+                    "id": uuid.uuid4(),
+                    "tenant_id": tenant_id,
+                    "customer_number": f"K{i:08d}",
+                    "company_name": f"Kunde {i} GmbH",
+                    "is_active": True,
+                    # Several customers per second so the id tie-breaker matters
+                    "created_at": started + timedelta(seconds=i // 4),
+                    "updated_at": started,
+                }
+                for i in range(start, min(start + 10000, customers))
+            ])
+    engine.dispose()
+
+
+async def timed(coroutine_factory, repeats: int) -> float:
+    durations = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await coroutine_factory()
+        durations.append((time.perf_counter() - started) * 1000)
+    return statistics.median(durations)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Synchronous SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--pages", type=int, default=10000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_keyset.db'}"
+    tenant_id = uuid.uuid4()
+    customers = args.pages * args.limit
+    print(f"Seeding {customers} customers ...")
+    seed(url, tenant_id, customers)
+
+    engine = create_engine(url)
+    session = sessionmaker(bind=engine)()
+    repository = CustomerRepositoryImpl(session)
+    sample_pages = [page for page in SAMPLE_PAGES if page <= args.pages]
+
+    # Walk all pages once to collect the cursor leading to each sampled page
+    cursors = {1: None}
+    cursor = None
+    walk_started = time.perf_counter()
+    for page in range(1, args.pages + 1):
+        result = await repository.get_page(tenant_id, args.limit, cursor)
+        cursor = result.next_cursor
+        if page + 1 in sample_pages:
+            cursors[page + 1] = cursor
+        if cursor is None:
+            break
+    walk_s = time.perf_counter() - walk_started
+
+    print(f"{'page':>6} {'offset ms':>10} {'keyset ms':>10}")
+    for page in sample_pages:
+        skip = (page - 1) * args.limit
+        offset_ms = await timed(lambda: repository.get_all(tenant_id, skip, args.limit), args.repeats)
+        keyset_ms = await timed(lambda: repository.get_page(tenant_id, args.limit, cursors[page]), args.repeats)
+        print(f"{page:>6} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+    print(f"Walked {args.pages} keyset pages in {walk_s:.1f}s ({walk_s / args.pages * 1000:.2f} ms/page)")
+
+    session.close()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""
+Load test: single-flight coalescing of hot lookups
+
+Fires --callers concurrent identical lookups (each with its own
+AsyncSession, like separate POS requests) and counts the SELECTs that
+reach the database for
+  - get_by_barcode               existing article
+  - get_by_barcode               unknown barcode, twice (negative caching)
+  - get_by_customer_number       existing customer
+once on the plain repositories and once through CachedRepository with
+coalescing (Redis caching off, so every burst really goes to the database
+layer).
+
+Usage:
+    python scripts/benchmarks/bench_lookup_coalescing.py --callers 500
+    python scripts/benchmarks/bench_lookup_coalescing.py --database-url postgresql://user:pw@localhost/bench
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, get_async_database_url
+from app.core.models import Article, Customer
+from app.infrastructure.repositories.cached_repository import CachedRepository
+from app.infrastructure.repositories.entity_cache import EntityCache
+from app.infrastructure.repositories.implementations import ArticleRepositoryImpl, CustomerRepositoryImpl
+from app.infrastructure.repositories.single_flight import SingleFlight
+
+
+class QueryCounter:
+    def __init__(self, engine, table: str):
+        self.table = table
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and self.table in statement:
+            self.count += 1
+
+
+async def burst(session_factory, wrap, lookup, callers: int, counter: QueryCounter):
+    """Run callers identical lookups at once; returns (queries, results, p50 ms, p99 ms)."""
+    counter.count = 0
+    durations = []
+
+    async def caller():
+        async with session_factory() as session:
+            repository = wrap(session)
+            started = time.perf_counter()
+            result = await lookup(repository)
+            durations.append((time.perf_counter() - started) * 1000)
+            return result
+
+    results = await asyncio.gather(*(caller() for _ in range(callers)))
+    durations.sort()
+    return counter.count, results, statistics.median(durations), durations[int(len(durations) * 0.99) - 1]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Synchronous SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--callers", type=int, default=500)
+    parser.add_argument("--pool-size", type=int, default=20)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_coalescing.db'}"
+    sync_engine = create_engine(url)
+    tables = [Article.__table__, Customer.__table__]
+    Base.metadata.drop_all(sync_engine, tables=tables)
+    Base.metadata.create_all(sync_engine, tables=tables)
+    tenant_id = uuid.uuid4()
+    with sessionmaker(bind=sync_engine)() as session:
+        await ArticleRepositoryImpl(session).bulk_create([
+            {"article_number": f"A{i:06d}", "name": f"Artikel {i}", "unit": "kg", "category": "Saatgut",
+             "sales_price": Decimal("9.90"), "barcode": f"40{i:011d}"}
+            for i in range(1000)
+        ], tenant_id)
+        await CustomerRepositoryImpl(session).bulk_create([
+            {"customer_number": f"K{i:06d}", "company_name": f"Hof {i}"} for i in range(1000)
+        ], tenant_id)
+    sync_engine.dispose()
+
+    engine = create_async_engine(get_async_database_url(url), pool_size=args.pool_size, max_overflow=0)
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    article_queries = QueryCounter(engine.sync_engine, "inventory_articles")
+    customer_queries = QueryCounter(engine.sync_engine, "crm_customers")
+
+    flights = SingleFlight()
+    # No Redis: every burst reaches the database layer, only coalescing and misses apply
+    cache = EntityCache(None, enabled=False, negative_ttl=2.0)
+
+    scenarios = [
+        ("get_by_barcode hit", ArticleRepositoryImpl, article_queries,
+         lambda repository: repository.get_by_barcode("4000000000042", tenant_id)),
+        ("get_by_barcode miss", ArticleRepositoryImpl, article_queries,
+         lambda repository: repository.get_by_barcode("4999999999999", tenant_id)),
+        ("get_by_barcode miss again", ArticleRepositoryImpl, article_queries,
+         lambda repository: repository.get_by_barcode("4999999999999", tenant_id)),
+        ("get_by_customer_number", CustomerRepositoryImpl, customer_queries,
+         lambda repository: repository.get_by_customer_number("K000042", tenant_id)),
+    ]
+
+    print(f"{args.callers} concurrent callers per burst, pool size {args.pool_size}")
+    print(f"{'lookup':<28} {'mode':<10} {'queries':>8} {'found':>6} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, repository_class, counter, lookup in scenarios:
+        for mode, wrap in (
+            ("plain", lambda session, cls=repository_class: cls(session)),
+            ("coalesced", lambda session, cls=repository_class: CachedRepository(cls(session), cache, flights)),
+        ):
+            queries, results, p50, p99 = await burst(session_factory, wrap, lookup, args.callers, counter)
+            found = sum(result is not None for result in results)
+            print(f"{name:<28} {mode:<10} {queries:>8} {found:>6} {p50:>8.2f} {p99:>8.2f}")
+
+    print("hottest keys:")
+    for stats in flights.metrics.snapshot(limit=5):
+        print(f"  {stats['key']}: calls {stats['calls']}, queries {stats['queries']}, "
+              f"coalesced {stats['coalesced']}, negative hits {stats['negative_hits']}, "
+              f"peak waiters {stats['peak_waiters']}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
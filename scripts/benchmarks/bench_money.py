@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+"""
+Benchmark: balance validation and aggregation of journal lines
+
+Generates --lines journal lines (entries of two to four lines over
+--accounts accounts; every --unbalanced-every-th entry off by one cent)
+and checks every entry's balance and sums debit and credit per account:
+  - decimal   Decimal amounts summed in Python (exact, the repository's totals)
+  - float     float amounts summed in Python with the endpoint's old
+              abs(debit - credit) > 0.01 tolerance
+  - int64     int64 cent arrays, money.unbalanced_entries and money.totals_by_key
+
+Also times the boundary conversion (Decimal -> cents, cents -> Decimal)
+and parsing DATEV amounts ("1234,56") with money.parse_cents (value by
+value) and money.parse_cents_array (a column at once) against Decimal.
+
+Reports ms, lines per second, unbalanced entries found and accounts whose
+totals differ from the exact ones. decimal and int64 must agree.
+
+Usage:
+    python scripts/benchmarks/bench_money.py --lines 1000000
+    python scripts/benchmarks/bench_money.py --lines 5000000 --accounts 2000 --unbalanced-every 500
+"""
+
+import argparse
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import numpy as np
+
+from app.infrastructure.repositories.money import (
+    CENTS, cents_array, from_cents, parse_cents, parse_cents_array, to_cents, totals_by_key, unbalanced_entries
+)
+
+
+def generate(lines: int, accounts: int, unbalanced_every: int, seed: int):
+    """Lines as (entry position, account, debit cents, credit cents) columns."""
+    rng = random.Random(seed)
+    entry_index, account, debit, credit = [], [], [], []
+    entry = 0
+    while len(debit) < lines:
+        size = rng.randint(2, 4)
+        amounts = [rng.randint(1, 10_000_000) for _ in range(size - 1)]
+        # The last line offsets the others; every unbalanced_every-th entry misses by a cent
+        offset = sum(amounts) + (1 if unbalanced_every and entry % unbalanced_every == unbalanced_every - 1 else 0)
+        for i, amount in enumerate(amounts + [offset]):
+            entry_index.append(entry)
+            account.append(rng.randrange(accounts))
+            debit.append(amount if i < size - 1 else 0)
+            credit.append(0 if i < size - 1 else amount)
+        entry += 1
+    return entry, entry_index, account, debit, credit
+
+
+def python_variant(entries: int, entry_index, account, debit, credit, zero, balanced):
+    """Entry and account totals in plain Python over one amount type."""
+    entry_debit, entry_credit = [zero] * entries, [zero] * entries
+    by_account = {}
+    for entry, account_id, d, c in zip(entry_index, account, debit, credit):
+        entry_debit[entry] += d
+        entry_credit[entry] += c
+        totals = by_account.get(account_id)
+        if totals is None:
+            by_account[account_id] = [d, c]
+        else:
+            totals[0] += d
+            totals[1] += c
+    unbalanced = [i for i in range(entries) if not balanced(entry_debit[i], entry_credit[i])]
+    return unbalanced, by_account
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def report(variant: str, lines: int, seconds: float, unbalanced: int = None, mismatches: int = None) -> None:
+    found = "" if unbalanced is None else f"{unbalanced:>11}"
+    wrong = "" if mismatches is None else f"{mismatches:>11}"
+    print(f"{variant:>16} {seconds * 1000:>10.1f} {lines / seconds:>12.0f} {found:>11} {wrong:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=1000000, help="Journal lines to validate")
+    parser.add_argument("--accounts", type=int, default=500)
+    parser.add_argument("--unbalanced-every", type=int, default=1000, help="Every n-th entry misses by a cent (0: none)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    entries, entry_index, account, debit_cents, credit_cents = generate(
+        args.lines, args.accounts, args.unbalanced_every, args.seed
+    )
+    lines = len(debit_cents)
+    debit_decimal = [from_cents(cents) for cents in debit_cents]
+    credit_decimal = [from_cents(cents) for cents in credit_cents]
+    debit_float = [cents / 100 for cents in debit_cents]
+    credit_float = [cents / 100 for cents in credit_cents]
+    print(f"{lines} lines in {entries} entries over {args.accounts} accounts")
+    print(f"{'variant':>16} {'ms':>10} {'lines/s':>12} {'unbalanced':>11} {'wrong sums':>11}")
+
+    (exact_unbalanced, exact_totals), seconds = timed(
+        python_variant, entries, entry_index, account, debit_decimal, credit_decimal,
+        Decimal('0.00'), lambda d, c: d == c,
+    )
+    report("decimal", lines, seconds, len(exact_unbalanced), 0)
+
+    (float_unbalanced, float_totals), seconds = timed(
+        python_variant, entries, entry_index, account, debit_float, credit_float,
+        0.0, lambda d, c: abs(d - c) <= 0.01,
+    )
+    wrong = sum(
+        1 for id, (d, c) in exact_totals.items()
+        if Decimal(repr(float_totals[id][0])) != d or Decimal(repr(float_totals[id][1])) != c
+    )
+    report("float", lines, seconds, len(float_unbalanced), wrong)
+
+    # Boundary: the Decimal values of the API / DECIMAL(15,2) columns in and out
+    (debit, credit), seconds = timed(lambda: (cents_array(debit_decimal), cents_array(credit_decimal)))
+    report("decimal->cents", lines, seconds)
+    entry_positions = np.asarray(entry_index, dtype=np.intp)
+
+    def vectorized():
+        unbalanced = unbalanced_entries(entry_positions, debit, credit, entries)
+        return unbalanced, totals_by_key(account, debit, credit)
+
+    (unbalanced, (account_ids, account_debit, account_credit)), seconds = timed(vectorized)
+    int_totals = {
+        id: (d, c) for id, d, c in zip(account_ids, account_debit.tolist(), account_credit.tolist())
+    }
+    wrong = sum(
+        1 for id, (d, c) in exact_totals.items()
+        if from_cents(int_totals[id][0]) != d or from_cents(int_totals[id][1]) != c
+    )
+    report("int64", lines, seconds, len(unbalanced), wrong)
+    assert unbalanced.tolist() == exact_unbalanced and not wrong, "int64 and Decimal results differ"
+
+    _, seconds = timed(lambda: [from_cents(cents) for cents in account_debit.tolist()])
+    report("cents->decimal", len(account_ids), seconds)
+
+    # Parsing: DATEV amounts with a decimal comma
+    texts = [f"{cents // 100},{cents % 100:02d}" for cents in debit_cents]
+    parsed, seconds = timed(lambda: [Decimal(text.replace(',', '.')) for text in texts])
+    report("parse decimal", lines, seconds)
+    cents, seconds = timed(lambda: np.fromiter((parse_cents(text, ",") for text in texts), dtype=CENTS, count=lines))
+    report("parse cents", lines, seconds)
+    column, seconds = timed(parse_cents_array, texts, ",")
+    report("parse column", lines, seconds)
+    assert np.array_equal(column, cents)
+    assert all(to_cents(amount) == value for amount, value in zip(parsed[:10000], cents[:10000].tolist()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+"""
+Benchmark: document number allocation under concurrent writers
+
+--writers threads (each one worker with its own session and number
+blocks, as separate processes or nodes would be) create --per-writer
+customers each, one transaction per customer, numbered by
+  - max+1    SELECT MAX(customer_number) + 1 and INSERT, retried when
+             another writer took the number (unique violation / lock)
+  - gapless  the next number of a gapless range, reserved in the
+             customer's transaction (how journal numbers are taken)
+  - hi-lo    CustomerRepositoryImpl.create: numbers from --block-size
+             blocks reserved in short transactions of their own
+
+Every variant must hand out unique numbers; the gapless numbers must be
+1..n without gaps. Reports numbers per second, retries and skipped numbers.
+
+Usage:
+    python scripts/benchmarks/bench_number_ranges.py --writers 32 --per-writer 200
+    python scripts/benchmarks/bench_number_ranges.py --database-url postgresql://user:pw@localhost/bench --block-size 500
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.models import Customer, NumberRange
+from app.infrastructure.repositories import number_ranges
+from app.infrastructure.repositories.implementations import CustomerRepositoryImpl, NumberRangeRepositoryImpl
+from app.infrastructure.repositories.number_ranges import CUSTOMER, JOURNAL_ENTRY, NumberBlocks
+
+TABLES = [Customer.__table__, NumberRange.__table__]
+
+
+async def max_plus_one(session, factory, tenant_id, count: int) -> int:
+    repository = CustomerRepositoryImpl(session)
+    retries = 0
+    for i in range(count):
+        while True:
+            current = session.execute(
+                select(func.max(Customer.customer_number)).where(Customer.tenant_id == tenant_id)
+            ).scalar()
+            number = f"M{int(current[1:]) + 1 if current else 1:07d}"
+            try:
+                await repository.create({"customer_number": number, "company_name": f"Kunde {i}"}, tenant_id)
+                break
+            except (IntegrityError, OperationalError):
+                retries += 1
+    return retries
+
+
+async def gapless(session, factory, tenant_id, count: int) -> int:
+    ranges = NumberRangeRepositoryImpl(session, factory, NumberBlocks())
+    repository = CustomerRepositoryImpl(session, ranges)
+    for i in range(count):
+        # Reserved in the customer's transaction; create() commits both
+        number, = await ranges.next_numbers(JOURNAL_ENTRY, tenant_id)
+        await repository.create({"customer_number": number, "company_name": f"Kunde {i}"}, tenant_id)
+    return 0
+
+
+async def hi_lo(session, factory, tenant_id, count: int) -> int:
+    # Own blocks per writer: every writer is a worker of its own
+    repository = CustomerRepositoryImpl(session, NumberRangeRepositoryImpl(session, factory, NumberBlocks()))
+    for i in range(count):
+        await repository.create({"company_name": f"Kunde {i}"}, tenant_id)
+    return 0
+
+
+def run(variant, allocate, factory, args) -> None:
+    tenant_id = uuid.uuid4()
+    retries = [0]
+    errors = []
+    lock = threading.Lock()
+    start = threading.Barrier(args.writers + 1)
+
+    def work():
+        session = factory()
+        start.wait()
+        try:
+            result = asyncio.run(allocate(session, factory, tenant_id, args.per_writer))
+            with lock:
+                retries[0] += result
+        except Exception as e:
+            errors.append(e)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=work) for _ in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    assert not errors, errors[:3]
+
+    with factory() as session:
+        numbers = session.execute(select(Customer.customer_number).where(Customer.tenant_id == tenant_id)).scalars().all()
+    values = sorted(int(number.lstrip("MJEK")) for number in numbers)
+    expected = args.writers * args.per_writer
+    assert len(numbers) == expected == len(set(numbers)), f"{variant}: {len(numbers)} numbers, {len(set(numbers))} unique"
+    if variant == "gapless":
+        assert values == list(range(1, expected + 1)), "gapless numbers have gaps"
+    skipped = values[-1] - len(values)
+    print(f"{variant:>8} {expected:>8} {elapsed:>8.2f} {expected / elapsed:>10.0f} {retries[0]:>8} {skipped:>8}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Synchronous SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--writers", type=int, default=32)
+    parser.add_argument("--per-writer", type=int, default=100, help="Customers created by each writer")
+    parser.add_argument("--block-size", type=int, default=number_ranges.RANGES[CUSTOMER].block_size)
+    args = parser.parse_args()
+
+    number_ranges.RANGES[CUSTOMER] = number_ranges.RANGES[CUSTOMER]._replace(block_size=args.block_size)
+    # max+1 collisions are expected; keep their error logs out of the table
+    logging.getLogger("app.infrastructure.repositories").setLevel(logging.CRITICAL)
+    url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_number_ranges.db'}"
+    connect_args = {"timeout": 60, "check_same_thread": False} if url.startswith("sqlite") else {}
+    # Every writer holds a session and briefly a second one for its block reservations
+    engine = create_engine(url, pool_size=args.writers * 2, max_overflow=0, connect_args=connect_args)
+    Base.metadata.drop_all(engine, tables=TABLES)
+    Base.metadata.create_all(engine, tables=TABLES)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    print(f"{args.writers} writers x {args.per_writer} customers, block size {args.block_size}")
+    print(f"{'variant':>8} {'numbers':>8} {'s':>8} {'numbers/s':>10} {'retries':>8} {'skipped':>8}")
+    for variant, allocate in (("max+1", max_plus_one), ("gapless", gapless), ("hi-lo", hi_lo)):
+        run(variant, allocate, factory, args)
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""
+Benchmark: posting thousands of draft journal entries
+
+Seeds --entries balanced draft entries (two lines each, over --accounts
+accounts and the months of one year) and posts them:
+  - one-by-one   post_entry per entry, one transaction each (the status
+                 change, the period balances and two account updates per entry)
+  - batch        post_entries, --chunk-size entries per transaction, each
+                 account balance updated once per chunk
+
+Both variants post a fresh set of drafts; the account balances must equal
+the sum of the posted lines afterwards. Reports entries per second.
+
+Usage:
+    python scripts/benchmarks/bench_post_batch.py --entries 20000
+    python scripts/benchmarks/bench_post_batch.py --database-url postgresql://user:pw@localhost/bench --entries 100000 --chunk-size 1000
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import create_engine, delete, func, insert, select, text, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.models import Account, AccountPeriodBalance, JournalEntry, JournalEntryLine
+from app.core.unit_of_work import UnitOfWork
+from app.infrastructure.repositories.implementations import JournalEntryRepositoryImpl
+
+TABLES = [Account.__table__, JournalEntry.__table__, JournalEntryLine.__table__, AccountPeriodBalance.__table__]
+CHUNK = 20000
+
+
+def seed(engine, tenant_id, entries: int, accounts: int) -> list:
+    Base.metadata.drop_all(engine, tables=TABLES)
+    Base.metadata.create_all(engine, tables=TABLES)
+    account_ids = [uuid.uuid4() for _ in range(accounts)]
+    with engine.begin() as connection:
+        connection.execute(insert(Account), [
+            {"id": id, "tenant_id": tenant_id, "account_number": f"{1000 + i:06d}", "account_name": f"Konto {i}",
+             "account_type": "asset", "category": "bench", "balance": Decimal(0)}
+            for i, id in enumerate(account_ids)
+        ])
+    entry_ids = []
+    for offset in range(0, entries, CHUNK):
+        rows, lines = [], []
+        for i in range(offset, min(offset + CHUNK, entries)):
+            entry_id = uuid.uuid4()
+            entry_ids.append(entry_id)
+            entry_date = datetime(2026, i % 12 + 1, i % 28 + 1, 12)
+            amount = Decimal(i % 997 + 1)
+            rows.append({
+                "id": entry_id, "tenant_id": tenant_id, "entry_number": f"JE{i:09d}", "entry_date": entry_date,
+                "posting_date": entry_date, "description": f"Buchung {i}", "source": "system",
+                "status": "draft", "total_debit": amount, "total_credit": amount,
+            })
+            for line_number, account_id, debit, credit in (
+                (1, account_ids[i % accounts], amount, Decimal(0)),
+                (2, account_ids[(i * 7 + 1) % accounts], Decimal(0), amount),
+            ):
+                lines.append({
+                    "id": uuid.uuid4(), "tenant_id": tenant_id, "journal_entry_id": entry_id, "account_id": account_id,
+                    "entry_date": entry_date, "debit_amount": debit, "credit_amount": credit, "line_number": line_number,
+                })
+        with engine.begin() as connection:
+            connection.execute(insert(JournalEntry), rows)
+            connection.execute(insert(JournalEntryLine), lines)
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+    return entry_ids
+
+
+def reset(engine, tenant_id) -> None:
+    """Back to all drafts, zero balances and no snapshots."""
+    with engine.begin() as connection:
+        connection.execute(update(JournalEntry).values(status="draft", posted_at=None))
+        connection.execute(update(Account).values(balance=Decimal(0)))
+        connection.execute(delete(AccountPeriodBalance))
+
+
+def check(engine, tenant_id) -> None:
+    """Account balances must match the posted lines (debit - credit)."""
+    with engine.begin() as connection:
+        expected = dict(connection.execute(
+            select(JournalEntryLine.account_id, func.sum(JournalEntryLine.debit_amount - JournalEntryLine.credit_amount))
+            .join(JournalEntry, JournalEntry.id == JournalEntryLine.journal_entry_id)
+            .where(JournalEntry.tenant_id == tenant_id, JournalEntry.status == "posted")
+            .group_by(JournalEntryLine.account_id)
+        ).all())
+        balances = dict(connection.execute(select(Account.id, Account.balance)).all())
+    mismatches = [id for id, balance in balances.items() if Decimal(balance) != Decimal(expected.get(id, 0))]
+    assert not mismatches, f"{len(mismatches)} account balances do not match the posted lines"
+
+
+async def one_by_one(factory, entry_ids, tenant_id) -> int:
+    posted = 0
+    for entry_id in entry_ids:
+        with factory() as session:
+            posted += await JournalEntryRepositoryImpl(session).post_entry(entry_id, tenant_id)
+    return posted
+
+
+async def batch(factory, entry_ids, tenant_id, chunk_size: int) -> int:
+    # A unit of work like the posting job's: the chunks commit, the repositories only flush
+    unit_of_work = UnitOfWork("bench post_entries", session_factory=factory, commit_chunks=True)
+    progress = await JournalEntryRepositoryImpl(unit_of_work.session).post_entries(entry_ids, tenant_id, chunk_size)
+    await unit_of_work.complete()
+    assert progress.failed == 0, progress.errors[:3]
+    return progress.posted
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Synchronous SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--entries", type=int, default=5000, help="Draft entries to post")
+    parser.add_argument("--accounts", type=int, default=200)
+    parser.add_argument("--chunk-size", type=int, default=JournalEntryRepositoryImpl.posting_chunk_size)
+    parser.add_argument("--one-by-one-limit", type=int, default=2000,
+                        help="Entries posted one by one (the slow baseline; 0 to skip)")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_post_batch.db'}"
+    engine = create_engine(url)
+    tenant_id = uuid.uuid4()
+    started = time.perf_counter()
+    entry_ids = seed(engine, tenant_id, args.entries, args.accounts)
+    print(f"Seeded {args.entries} draft entries in {time.perf_counter() - started:.1f}s")
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    print(f"{'variant':>12} {'entries':>8} {'s':>8} {'entries/s':>10}")
+    variants = [("batch", entry_ids)]
+    if args.one_by_one_limit:
+        variants.insert(0, ("one-by-one", entry_ids[:args.one_by_one_limit]))
+    for variant, ids in variants:
+        reset(engine, tenant_id)
+        started = time.perf_counter()
+        if variant == "batch":
+            posted = await batch(factory, ids, tenant_id, args.chunk_size)
+        else:
+            posted = await one_by_one(factory, ids, tenant_id)
+        elapsed = time.perf_counter() - started
+        print(f"{variant:>12} {posted:>8} {elapsed:>8.2f} {posted / elapsed:>10.0f}")
+        check(engine, tenant_id)
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
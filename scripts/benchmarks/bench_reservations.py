@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+"""
+Benchmark: stock reservations and available-to-promise
+
+Seeds --articles articles with --stock units each and measures
+  - oversell  --writers concurrent writers (threads, one session each)
+              reserve 1 unit of the same article until it is sold out;
+              successful reservations must equal the stock exactly
+  - order     StockReservationRepositoryImpl.reserve_for_order with
+              --lines lines in one transaction (median latency)
+  - atp       available stock of 50 articles from the in-memory snapshot
+              vs. a database query per call (median latency)
+
+Usage:
+    python scripts/benchmarks/bench_reservations.py --writers 64 --stock 500
+    python scripts/benchmarks/bench_reservations.py --database-url postgresql://user:pw@localhost/bench
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.models import Article, StockReservation
+from app.infrastructure.repositories.implementations import ArticleRepositoryImpl, StockReservationRepositoryImpl
+from app.infrastructure.repositories.reservations import AtpSnapshot, InsufficientStockError
+
+TABLES = [Article.__table__, StockReservation.__table__]
+
+
+def seed(engine, tenant_id, articles: int, stock: int) -> list:
+    Base.metadata.drop_all(engine, tables=TABLES)
+    Base.metadata.create_all(engine, tables=TABLES)
+    ids = [uuid.uuid4() for _ in range(articles)]
+    with engine.begin() as connection:
+        connection.execute(insert(Article), [
+            {"id": id, "tenant_id": tenant_id, "article_number": f"A{i:07d}", "name": f"Artikel {i}",
+             "unit": "Stk", "category": "Ersatzteile", "sales_price": Decimal("9.90"),
+             "current_stock": stock, "reserved_stock": 0, "available_stock": stock}
+            for i, id in enumerate(ids)
+        ])
+    return ids
+
+
+def oversell(factory, tenant_id, article_id, args):
+    reserved, rejected = [0], [0]
+    lock = threading.Lock()
+    start = threading.Barrier(args.writers + 1)
+
+    async def reserve_until_sold_out(repository):
+        while True:
+            try:
+                await repository.reserve(article_id, 1, tenant_id, "bench")
+            except InsufficientStockError:
+                with lock:
+                    rejected[0] += 1
+                return
+            with lock:
+                reserved[0] += 1
+
+    def work():
+        session = factory()
+        start.wait()
+        try:
+            asyncio.run(reserve_until_sold_out(StockReservationRepositoryImpl(session)))
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=work) for _ in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with factory() as session:
+        article = session.get(Article, article_id)
+    print(f"oversell: {args.writers} writers, stock {args.stock}: {reserved[0]} reserved, {rejected[0]} rejected, "
+          f"{reserved[0] / elapsed:.0f} reservations/s")
+    print(f"          article reserved {article.reserved_stock}, available {article.available_stock} "
+          f"-> {'no oversell' if reserved[0] == args.stock and article.available_stock == 0 else 'OVERSOLD'}")
+
+
+async def order(session, tenant_id, ids, args):
+    repository = StockReservationRepositoryImpl(session)
+    durations = []
+    for run in range(args.repeat):
+        lines = [(id, 1) for id in ids[1:args.lines + 1]]
+        started = time.perf_counter()
+        await repository.reserve_for_order(lines, tenant_id, f"SO-{run}")
+        durations.append((time.perf_counter() - started) * 1000)
+        await repository.release_order(f"SO-{run}", tenant_id)
+    print(f"order:    {args.lines} lines in one transaction, median {statistics.median(durations):.1f} ms")
+
+
+async def atp(session, tenant_id, ids, args):
+    repository = ArticleRepositoryImpl(session)
+    snapshot = AtpSnapshot(max_age=1.0)
+    wanted = ids[:50]
+    await snapshot.available(repository, tenant_id, wanted)
+
+    def median_ms(samples):
+        return statistics.median(samples) * 1000
+
+    from_snapshot, from_database = [], []
+    for _ in range(args.repeat * 10):
+        started = time.perf_counter()
+        await snapshot.available(repository, tenant_id, wanted)
+        from_snapshot.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        result = await repository._read(
+            select(Article.id, Article.available_stock).where(Article.tenant_id == tenant_id, Article.id.in_(wanted)),
+            tenant_id,
+        )
+        result.all()
+        from_database.append(time.perf_counter() - started)
+        session.commit()
+    print(f"atp:      50 articles, snapshot median {median_ms(from_snapshot):.3f} ms, "
+          f"database median {median_ms(from_database):.3f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Synchronous SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--articles", type=int, default=5000)
+    parser.add_argument("--stock", type=int, default=500, help="Units of the contended article")
+    parser.add_argument("--writers", type=int, default=64)
+    parser.add_argument("--lines", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_reservations.db'}"
+    connect_args = {"timeout": 60, "check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(url, pool_size=args.writers, max_overflow=0, connect_args=connect_args)
+    tenant_id = uuid.uuid4()
+    ids = seed(engine, tenant_id, args.articles, args.stock)
+    factory = sessionmaker(bind=engine)
+
+    oversell(factory, tenant_id, ids[0], args)
+    with factory() as session:
+        await order(session, tenant_id, ids, args)
+        await atp(session, tenant_id, ids, args)
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
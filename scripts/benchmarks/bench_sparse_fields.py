@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+Benchmark: sparse fieldsets (fields=) vs. full entities
+
+Seeds --articles articles (with a description text, as the ERP sync
+delivers them) and measures latency and JSON payload size of one list
+page for
+  - full      ArticleRepositoryImpl.get_all_with_total / get_page, ORM entities,
+              every column serialized
+  - sparse    the same calls with fields= (a five-column grid view), Core
+              select of those columns, plain dict rows
+Latency covers query, row handling and JSON serialization. The full
+variant skips the per-row schema validation of the endpoints, so the
+measured reduction is a lower bound.
+
+Usage:
+    python scripts/benchmarks/bench_sparse_fields.py --articles 20000 --limit 500
+    python scripts/benchmarks/bench_sparse_fields.py --database-url postgresql://user:pw@localhost/bench
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.models import Article
+from app.infrastructure.repositories.implementations import ArticleRepositoryImpl
+from app.infrastructure.repositories.pagination import OffsetPage, Page
+
+GRID_FIELDS = ["article_number", "name", "unit", "sales_price", "current_stock"]
+
+_json = TypeAdapter(Any)
+
+
+def full_rows(items) -> list:
+    columns = [attribute.key for attribute in inspect(Article).column_attrs]
+    return [{key: getattr(item, key) for key in columns} for item in items]
+
+
+async def measure(fetch, to_rows, session, repeat: int):
+    """Median ms of fetch + serialization and the payload size in bytes."""
+    durations, payload = [], b""
+    for _ in range(repeat):
+        # Every run starts with an empty identity map, as a new request would
+        session.expunge_all()
+        started = time.perf_counter()
+        items = await fetch()
+        payload = _json.dump_json(to_rows(items))
+        durations.append((time.perf_counter() - started) * 1000)
+    return statistics.median(durations), len(payload)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Synchronous SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--articles", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_sparse.db'}"
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine, tables=[Article.__table__])
+    Base.metadata.create_all(engine, tables=[Article.__table__])
+    session = sessionmaker(bind=engine)()
+    repository = ArticleRepositoryImpl(session)
+    tenant_id = uuid.uuid4()
+
+    await repository.bulk_create([
+        {"article_number": f"A{i:07d}", "name": f"Winterweizen Sorte {i}", "unit": "kg", "category": "Saatgut",
+         "subcategory": "Getreide", "barcode": f"40{i:011d}", "supplier_number": f"L{i:06d}",
+         "sales_price": Decimal("0.89"), "purchase_price": Decimal("0.61"), "weight": Decimal("25.00"),
+         "description": f"Zertifiziertes Z-Saatgut, Sorte {i}, gebeizt, Sackware 25 kg. " * 6}
+        for i in range(args.articles)
+    ], tenant_id, chunk_size=5000)
+    page = await repository.get_page(tenant_id, args.limit)
+    cursor = page.next_cursor
+
+    scenarios = [
+        ("offset page", lambda fields: repository.get_all_with_total(tenant_id, args.limit, args.limit, fields=fields)),
+        ("cursor page", lambda fields: repository.get_page(tenant_id, args.limit, cursor, fields=fields)),
+        ("detail", lambda fields: repository.get_by_id(page.items[0].id, tenant_id, fields=fields)),
+    ]
+
+    print(f"{args.articles} articles, page size {args.limit}, fields={','.join(GRID_FIELDS)}")
+    print(f"{'request':<14} {'mode':<8} {'median ms':>10} {'payload':>10} {'-latency':>9} {'-bytes':>7}")
+    for name, call in scenarios:
+        results = {}
+        for mode, fields in (("full", None), ("sparse", GRID_FIELDS)):
+            async def fetch(call=call, fields=fields):
+                result = await call(fields)
+                return result.items if isinstance(result, (OffsetPage, Page)) else [result]
+            to_rows = full_rows if fields is None else list
+            results[mode] = await measure(fetch, to_rows, session, args.repeat)
+        (full_ms, full_bytes), (sparse_ms, sparse_bytes) = results["full"], results["sparse"]
+        print(f"{name:<14} {'full':<8} {full_ms:>10.2f} {full_bytes:>10}")
+        print(f"{name:<14} {'sparse':<8} {sparse_ms:>10.2f} {sparse_bytes:>10} "
+              f"{1 - sparse_ms / full_ms:>9.0%} {1 - sparse_bytes / full_bytes:>7.0%}")
+
+    session.close()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
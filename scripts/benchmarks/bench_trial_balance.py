@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""
+Benchmark: trial balance over a large journal
+
+Seeds --lines journal entry lines (two per entry, spread over 24 months
+and --accounts accounts, one entry in ten left as draft) and builds the
+trial balance for a year:
+  - python      all lines of the booked entries loaded and summed in Python
+  - set-based   JournalEntryService.get_trial_balance, one GROUP BY per account and month
+  - cached      the same report again, served from the report cache
+
+The set-based and Python totals must agree.
+
+Usage:
+    python scripts/benchmarks/bench_trial_balance.py --lines 1000000
+    python scripts/benchmarks/bench_trial_balance.py --database-url postgresql://user:pw@localhost/bench --lines 10000000
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.models import Account, JournalEntry, JournalEntryLine
+from app.core.production_service_implementations import ProductionJournalEntryService
+from app.infrastructure.repositories.entity_cache import entity_cache
+from app.infrastructure.repositories.implementations import JournalEntryRepositoryImpl
+from app.infrastructure.repositories.trial_balance import BOOKED
+
+TABLES = [Account.__table__, JournalEntry.__table__, JournalEntryLine.__table__]
+CHUNK = 50000
+MONTHS = 24
+DRAFT_EVERY = 10
+
+
+def seed(engine, tenant_id, lines: int, accounts: int) -> None:
+    Base.metadata.drop_all(engine, tables=TABLES)
+    Base.metadata.create_all(engine, tables=TABLES)
+    account_ids = [uuid.uuid4() for _ in range(accounts)]
+    with engine.begin() as connection:
+        connection.execute(insert(Account), [
+            {"id": id, "tenant_id": tenant_id, "account_number": f"{1000 + i:06d}", "account_name": f"Konto {i}",
+             "account_type": ("asset", "liability", "equity", "revenue", "expense")[i % 5],
+             "category": f"category_{i % 12}"}
+            for i, id in enumerate(account_ids)
+        ])
+    for offset in range(0, lines // 2, CHUNK // 2):
+        entries, entry_lines = [], []
+        for i in range(offset, min(offset + CHUNK // 2, lines // 2)):
+            entry_id = uuid.uuid4()
+            entry_date = datetime(2025 + (i % MONTHS) // 12, (i % MONTHS) % 12 + 1, i % 28 + 1, 12)
+            amount = Decimal(i % 997 + 1)
+            entries.append({
+                "id": entry_id, "tenant_id": tenant_id, "entry_number": f"JE{i:09d}", "entry_date": entry_date,
+                "posting_date": entry_date, "description": f"Buchung {i}", "source": "system",
+                "status": "draft" if i % DRAFT_EVERY == 0 else "posted", "total_debit": amount, "total_credit": amount,
+            })
+            for line_number, account_id, debit, credit in (
+                (1, account_ids[i % accounts], amount, Decimal(0)),
+                (2, account_ids[(i * 7 + 1) % accounts], Decimal(0), amount),
+            ):
+                entry_lines.append({
+                    "id": uuid.uuid4(), "tenant_id": tenant_id, "journal_entry_id": entry_id, "account_id": account_id,
+                    "entry_date": entry_date, "debit_amount": debit, "credit_amount": credit, "line_number": line_number,
+                })
+        with engine.begin() as connection:
+            connection.execute(insert(JournalEntry), entries)
+            connection.execute(insert(JournalEntryLine), entry_lines)
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+
+
+def python_trial_balance(session, tenant_id, start: datetime, end: datetime) -> Decimal:
+    """The naive way: every line of the range through the application."""
+    statement = (
+        select(JournalEntryLine.account_id, JournalEntryLine.debit_amount, JournalEntryLine.credit_amount)
+        .join(JournalEntry, JournalEntry.id == JournalEntryLine.journal_entry_id)
+        .where(JournalEntry.tenant_id == tenant_id, JournalEntry.status.in_(BOOKED),
+               JournalEntry.entry_date >= start, JournalEntry.entry_date < end)
+    )
+    balances = defaultdict(lambda: [Decimal(0), Decimal(0)])
+    for account_id, debit, credit in session.execute(statement):
+        balances[account_id][0] += debit
+        balances[account_id][1] += credit
+    return sum(debit for debit, _ in balances.values())
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Synchronous SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--lines", type=int, default=200000, help="Journal entry lines to seed (10000000 for the full run)")
+    parser.add_argument("--accounts", type=int, default=500)
+    parser.add_argument("--period", default="month", choices=["month", "quarter", "year", "total"])
+    parser.add_argument("--skip-python", action="store_true", help="Skip the load-everything baseline")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_trial_balance.db'}"
+    engine = create_engine(url)
+    tenant_id = uuid.uuid4()
+    started = time.perf_counter()
+    seed(engine, tenant_id, args.lines, args.accounts)
+    print(f"Seeded {args.lines} lines in {time.perf_counter() - started:.1f}s")
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    start, end = date(2025, 1, 1), date(2025, 12, 31)
+
+    print(f"{'variant':>10} {'ms':>10} {'total debit':>16}")
+    if not args.skip_python:
+        with factory() as session:
+            started = time.perf_counter()
+            total = python_trial_balance(session, tenant_id, datetime(2025, 1, 1), datetime(2026, 1, 1))
+            print(f"{'python':>10} {(time.perf_counter() - started) * 1000:>10.1f} {total:>16}")
+
+    for variant in ("set-based", "cached"):
+        with factory() as session:
+            service = ProductionJournalEntryService(JournalEntryRepositoryImpl(session))
+            started = time.perf_counter()
+            report = await service.get_trial_balance(start, end, tenant_id, args.period)
+            print(f"{variant:>10} {(time.perf_counter() - started) * 1000:>10.1f} {report['total_debit']:>16}")
+        assert report["in_balance"]
+        if not args.skip_python:
+            assert report["total_debit"] == total
+    if not entity_cache.enabled:
+        print("entity cache disabled (ENABLE_CACHE=false): the cached run recomputed the report")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
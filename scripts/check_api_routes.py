@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+Local check that static and action routes reach their endpoints
+
+Sends a request for every route below through the application and checks
+which endpoint FastAPI resolved it to. The tenants and users routers are
+included without prefix, so their GET /{id} routes shadow any other
+single-segment path such as /customers:autocomplete.
+
+The requests leave out required parameters and bodies, so they stop at
+validation (422) and need no database.
+
+Usage:
+    python scripts/check_api_routes.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+
+from main import app
+
+# (method, path, endpoint function)
+ROUTES = [
+    ("GET", "/api/v1/customers/autocomplete", "autocomplete_customers"),
+    ("GET", "/api/v1/leads/autocomplete", "autocomplete_leads"),
+    ("GET", "/api/v1/contacts/autocomplete", "autocomplete_contacts"),
+    ("POST", "/api/v1/customers:batch", "batch_customers"),
+    ("POST", "/api/v1/accounts:batch", "batch_accounts"),
+    ("POST", "/api/v1/articles:batch", "batch_articles"),
+    ("GET", "/api/v1/stock-reservations/atp", "available_to_promise"),
+    ("POST", "/api/v1/journal-entries:post", "post_journal_entries"),
+    ("POST", "/api/v1/journal-entries:reverse", "reverse_journal_entries"),
+    ("POST", "/api/v1/journal-entries:import", "import_journal_entries"),
+    ("GET", "/api/v1/journal-entries/trial-balance", "get_trial_balance"),
+    ("POST", "/api/v1/journal-entries/00000000-0000-0000-0000-000000000000/reverse", "reverse_journal_entry"),
+    ("GET", "/api/v1/accounts/00000000-0000-0000-0000-000000000000/ledger", "get_account_ledger"),
+    ("GET", "/api/v1/journal-entries/imports/00000000-0000-0000-0000-000000000000", "get_journal_import"),
+    ("POST", "/api/v1/journal-entries/imports/00000000-0000-0000-0000-000000000000:resume", "resume_journal_import"),
+]
+
+
+async def main() -> int:
+    resolved = []
+
+    async def recording(scope, receive, send):
+        # The router stores the matched route in the request scope
+        await app(scope, receive, send)
+        resolved.append(scope.get("route"))
+
+    failures = 0
+    transport = httpx.ASGITransport(app=recording)
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+        for method, path, endpoint in ROUTES:
+            response = await client.request(method, path)
+            route = resolved[-1]
+            name = route.name if route is not None else None
+            ok = name == endpoint
+            failures += not ok
+            print(f"{'ok' if ok else 'FAIL':<5} {method:<5} {path:<80} -> {name} ({response.status_code})")
+
+    print("All routes reach their endpoints" if not failures else f"{failures} routes reach the wrong endpoint")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
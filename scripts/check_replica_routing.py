@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+"""
+Local check for read-replica routing
+
+Uses two SQLite files - one as primary, one as "replica" - seeded with
+different company names, so every read shows which database answered.
+Checks replica reads, writes on the primary, read-your-writes (also
+across two workers sharing a fake Redis), that a failing statement leaves
+the replica in rotation, the fallback to the primary when the replica
+fails and that replica checkout waits are recorded under the replica's name.
+
+Usage:
+    python scripts/check_replica_routing.py
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import fakeredis
+import fakeredis.aioredis
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.db_telemetry import TimedQueuePool, telemetry
+from app.core.models import Customer
+from app.core.replica_routing import ReplicaRouter, RoutingSession, create_replica_router
+from app.infrastructure.repositories.implementations import CustomerRepositoryImpl
+
+TENANT_ID = uuid.uuid4()
+
+
+def seed(url: str, label: str) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine, tables=[Customer.__table__])
+    with engine.begin() as connection:
+        connection.execute(insert(Customer), [
+            {
+                "id": uuid.uuid4(),
+                "tenant_id": TENANT_ID,
+                "customer_number": f"K{i:04d}",
+                "company_name": f"{label} {i}",
+                "is_active": True,
+            }
+            for i in range(3)
+        ])
+    engine.dispose()
+
+
+def answered_by(customers) -> str:
+    return customers[0].company_name.split()[0] if customers else "-"
+
+
+def check(name: str, actual: str, expected: str) -> bool:
+    ok = actual == expected
+    print(f"  [{'OK' if ok else 'FAIL'}] {name}: {actual}")
+    return ok
+
+
+async def main() -> int:
+    workdir = Path(tempfile.mkdtemp(prefix="replica_check_"))
+    primary_url = f"sqlite:///{workdir / 'primary.db'}"
+    replica_url = f"sqlite:///{workdir / 'replica.db'}"
+    seed(primary_url, "primary")
+    seed(replica_url, "replica")
+
+    router = create_replica_router(
+        [replica_url], health_interval=0.5, read_your_writes_window=0.5, poolclass=TimedQueuePool
+    )
+    telemetry.instrument(router.replicas[0].engine, "replica_check")
+
+    class CheckSession(RoutingSession):
+        replica_router = router
+
+    primary = create_engine(primary_url)
+    session_factory = sessionmaker(bind=primary, class_=CheckSession, autoflush=False)
+    results = []
+
+    def new_session(read_only: bool = False):
+        session = session_factory()
+        session.info['read_only'] = read_only
+        return session
+
+    print("Read-only session (GET request)")
+    with new_session(read_only=True) as session:
+        customers = await CustomerRepositoryImpl(session).get_all(TENANT_ID)
+        results.append(check("list served by", answered_by(customers), "replica"))
+
+    print("Write, then read in the same session")
+    with new_session() as session:
+        repository = CustomerRepositoryImpl(session)
+        await repository.create({"customer_number": "K9999", "company_name": "primary new"}, TENANT_ID)
+        customers = await repository.get_all(TENANT_ID)
+        results.append(check("read after write served by", answered_by(customers), "primary"))
+
+    print("Read-your-writes window")
+    with new_session(read_only=True) as session:
+        customers = await CustomerRepositoryImpl(session).get_all(TENANT_ID)
+        results.append(check("read within window served by", answered_by(customers), "primary"))
+    time.sleep(0.6)
+    with new_session(read_only=True) as session:
+        customers = await CustomerRepositoryImpl(session).get_all(TENANT_ID)
+        results.append(check("read after window served by", answered_by(customers), "replica"))
+
+    print("Read-your-writes window across workers")
+    server = fakeredis.FakeServer()
+    workers = [
+        ReplicaRouter(router.replicas, read_your_writes_window=0.5, redis=fakeredis.aioredis.FakeRedis(server=server))
+        for _ in range(2)
+    ]
+    listeners = [asyncio.create_task(worker.listen()) for worker in workers]
+    await asyncio.sleep(0.05)
+    worker_factories = []
+    for worker in workers:
+        class WorkerSession(RoutingSession):
+            replica_router = worker
+        worker_factories.append(sessionmaker(bind=primary, class_=WorkerSession, autoflush=False))
+    with worker_factories[0]() as session:
+        await CustomerRepositoryImpl(session).create({"customer_number": "K9998", "company_name": "primary new"},
+                                                     TENANT_ID)
+    # Published and received on the event loop, not while the statement runs
+    await asyncio.sleep(0.05)
+    with worker_factories[1]() as session:
+        session.info['read_only'] = True
+        customers = await CustomerRepositoryImpl(session).get_all(TENANT_ID)
+        results.append(check("other worker's read within window served by", answered_by(customers), "primary"))
+    await asyncio.sleep(0.8)
+    with worker_factories[1]() as session:
+        session.info['read_only'] = True
+        customers = await CustomerRepositoryImpl(session).get_all(TENANT_ID)
+        results.append(check("other worker's read after window served by", answered_by(customers), "replica"))
+    for listener in listeners:
+        listener.cancel()
+    await asyncio.gather(*listeners, return_exceptions=True)
+
+    print("Statement error on the replica")
+    with new_session(read_only=True) as session:
+        try:
+            # The driver cannot bind the parameter: the statement's error, not the replica's
+            await CustomerRepositoryImpl(session)._read(text("SELECT :value"), TENANT_ID, {"value": object()})
+            error = "-"
+        except DBAPIError as e:
+            error = type(e).__name__
+        results.append(check("statement error raised", error, "ProgrammingError"))
+    results.append(check("replica healthy", str(router.replicas[0].healthy), "True"))
+
+    print("Replica failure")
+    with router.replicas[0].engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE {Customer.__tablename__}"))
+    with new_session(read_only=True) as session:
+        customers = await CustomerRepositoryImpl(session).get_all(TENANT_ID)
+        results.append(check("read with broken replica served by", answered_by(customers), "primary"))
+    results.append(check("replica healthy", str(router.replicas[0].healthy), "False"))
+    with new_session(read_only=True) as session:
+        customers = await CustomerRepositoryImpl(session).get_all(TENANT_ID)
+        results.append(check("next read skips replica, served by", answered_by(customers), "primary"))
+
+    print("Replica recovery")
+    seed(replica_url, "replica")
+    router.check_health()
+    results.append(check("replica healthy", str(router.replicas[0].healthy), "True"))
+    with new_session(read_only=True) as session:
+        customers = await CustomerRepositoryImpl(session).get_all(TENANT_ID)
+        results.append(check("read served by", answered_by(customers), "replica"))
+
+    print("Pool telemetry")
+    waits = telemetry.pools["replica_check"].checkout_wait
+    results.append(check("replica checkouts timed", str(waits.count > 0), "True"))
+    # dispose() replaces the pool, which must keep reporting under the replica's name
+    router.replicas[0].engine.dispose()
+    before = waits.count
+    with new_session(read_only=True) as session:
+        await CustomerRepositoryImpl(session).get_all(TENANT_ID)
+    results.append(check("checkouts timed after dispose", str(waits.count > before), "True"))
+
+    router.dispose()
+    primary.dispose()
+    print("All checks passed" if all(results) else "Some checks FAILED")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
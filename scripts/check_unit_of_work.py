@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+"""
+Local check that a unit of work commits or rolls back a request's writes once
+
+Runs bulk writes inside a unit of work, on a synchronous and (if the
+driver is installed) an asyncio session, against the configured database
+(DATABASE_URL, e.g. a SQLite file). Bulk chunks are savepoints there, so a
+rollback-only unit of work must discard them with everything else, and a
+chunk retried row by row must still be committed exactly once. The same
+holds for the chunks of a bulk reversal (POST /journal-entries:reverse),
+which must not be visible to other connections before the request commits.
+
+Usage:
+    DATABASE_URL=sqlite:////tmp/check_unit_of_work.db python scripts/check_unit_of_work.py
+"""
+
+import asyncio
+import sys
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import func, insert, select
+
+from app.core.database import AsyncSessionLocal, Base, SessionLocal, async_engine, engine
+from app.core.models import Account, AccountPeriodBalance, Customer, JournalEntry, JournalEntryLine, NumberRange
+from app.core.unit_of_work import UnitOfWork
+from app.infrastructure.repositories.implementations import CustomerRepositoryImpl, JournalEntryRepositoryImpl
+from app.infrastructure.repositories.journal_query import JournalEntryQuery
+
+TABLES = [
+    Customer.__table__, Account.__table__, JournalEntry.__table__, JournalEntryLine.__table__,
+    AccountPeriodBalance.__table__, NumberRange.__table__,
+]
+
+
+def customers(count: int, duplicate: bool = False) -> list:
+    rows = [{"id": uuid.uuid4(), "customer_number": f"K{i:04d}", "company_name": f"Kunde {i}"} for i in range(count)]
+    if duplicate:
+        # Same primary key twice: the chunk fails and is retried row by row
+        rows.append(dict(rows[0], customer_number="K9999"))
+    return rows
+
+
+def stored(tenant_id) -> int:
+    with engine.connect() as connection:
+        return connection.execute(
+            select(func.count()).select_from(Customer).where(Customer.tenant_id == tenant_id)
+        ).scalar()
+
+
+def reversed_entries(tenant_id) -> int:
+    with engine.connect() as connection:
+        return connection.execute(
+            select(func.count()).select_from(JournalEntry)
+            .where(JournalEntry.tenant_id == tenant_id, JournalEntry.status == 'reversed')
+        ).scalar()
+
+
+async def posted_entries(session_factory, count: int):
+    """A tenant with count posted entries (source 'check') over two accounts."""
+    tenant_id = uuid.uuid4()
+    debit, credit = uuid.uuid4(), uuid.uuid4()
+    with engine.begin() as connection:
+        connection.execute(insert(Account), [
+            {"id": id, "tenant_id": tenant_id, "account_number": number, "account_name": number,
+             "account_type": "asset", "category": "check", "balance": Decimal(0)}
+            for id, number in ((debit, "001000"), (credit, "002000"))
+        ])
+    unit_of_work = UnitOfWork("check entries", session_factory=session_factory)
+    repository = JournalEntryRepositoryImpl(unit_of_work.session)
+    now = datetime.utcnow()
+    for i in range(count):
+        entry = await repository.create({
+            "entry_date": now, "posting_date": now, "description": f"Buchung {i}", "source": "check",
+            "lines": [
+                {"account_id": debit, "debit_amount": Decimal(10), "credit_amount": Decimal(0), "line_number": 1},
+                {"account_id": credit, "debit_amount": Decimal(0), "credit_amount": Decimal(10), "line_number": 2},
+            ],
+        }, tenant_id)
+        await repository.post_entry(entry.id, tenant_id)
+    await unit_of_work.complete()
+    return tenant_id
+
+
+def check(name: str, actual, expected) -> bool:
+    ok = actual == expected
+    print(f"  [{'OK' if ok else 'FAIL'}] {name}: {actual}")
+    return ok
+
+
+async def run(session_factory, label: str) -> list:
+    results = []
+    print(f"{label} session")
+
+    tenant_id = uuid.uuid4()
+    unit_of_work = UnitOfWork(f"check {label} rollback", session_factory=session_factory)
+    await CustomerRepositoryImpl(unit_of_work.session).bulk_create(customers(5), tenant_id)
+    unit_of_work.mark_rollback_only()
+    await unit_of_work.complete()
+    results.append(check("rows after rollback-only unit of work", stored(tenant_id), 0))
+
+    tenant_id = uuid.uuid4()
+    unit_of_work = UnitOfWork(f"check {label} error", session_factory=session_factory)
+    await CustomerRepositoryImpl(unit_of_work.session).bulk_create(customers(5), tenant_id)
+    await unit_of_work.complete(success=False)
+    results.append(check("rows after failed unit of work", stored(tenant_id), 0))
+
+    tenant_id = uuid.uuid4()
+    unit_of_work = UnitOfWork(f"check {label} commit", session_factory=session_factory)
+    repository = CustomerRepositoryImpl(unit_of_work.session)
+    await repository.create({"customer_number": "K8888", "company_name": "Einzeln"}, tenant_id)
+    result = await repository.bulk_create(customers(5, duplicate=True), tenant_id)
+    await unit_of_work.complete()
+    results.append(check("rows rejected by the retried chunk", result.failed, 1))
+    results.append(check("rows after committed unit of work", stored(tenant_id), 6))
+
+    tenant_id = await posted_entries(session_factory, 5)
+    query = JournalEntryQuery().from_source("check")
+    unit_of_work = UnitOfWork(f"check {label} reversal rollback", session_factory=session_factory)
+    progress = await JournalEntryRepositoryImpl(unit_of_work.session).reverse_entries(
+        query, "Storno", tenant_id, chunk_size=2
+    )
+    results.append(check("entries reversed in the request", progress.posted, 5))
+    results.append(check("reversals seen before the request commits", reversed_entries(tenant_id), 0))
+    unit_of_work.mark_rollback_only()
+    await unit_of_work.complete()
+    results.append(check("reversals after rollback-only unit of work", reversed_entries(tenant_id), 0))
+
+    unit_of_work = UnitOfWork(f"check {label} reversal commit", session_factory=session_factory)
+    await JournalEntryRepositoryImpl(unit_of_work.session).reverse_entries(query, "Storno", tenant_id, chunk_size=2)
+    await unit_of_work.complete()
+    results.append(check("reversals after committed unit of work", reversed_entries(tenant_id), 5))
+    return results
+
+
+async def main() -> int:
+    Base.metadata.create_all(engine, tables=TABLES)
+    results = await run(SessionLocal, "sync")
+    if AsyncSessionLocal is not None:
+        results += await run(AsyncSessionLocal, "async")
+        await async_engine.dispose()
+    engine.dispose()
+    print("All checks passed" if all(results) else "Some checks FAILED")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Period close job for the account balance snapshots
+
+Closes the open months of a tenant in order, from the month after the
+last closed one (or the month of its first posted entry) through
+--through, writing the closing balance of every account per month.
+The first run backfills the snapshots of the whole history; afterwards
+it is meant to run once a month (cron) after the books of the previous
+month are complete. Entries dated in a closed month can no longer be
+posted.
+
+Usage:
+    python scripts/close_periods.py --tenant-id <uuid>
+    python scripts/close_periods.py --tenant-id <uuid> --through 2026-09 --database-url postgresql://user:pw@host/erp
+"""
+
+import argparse
+import asyncio
+import sys
+import uuid
+from datetime import date
+from pathlib import Path
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.infrastructure.repositories.implementations import AccountPeriodBalanceRepositoryImpl
+from app.infrastructure.repositories.period_balances import month_start, next_month, parse_period, period_label
+
+
+def previous_month() -> date:
+    this_month = month_start(date.today())
+    return month_start(date.fromordinal(this_month.toordinal() - 1))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL, help="Synchronous SQLAlchemy URL (default: DATABASE_URL)")
+    parser.add_argument("--tenant-id", type=uuid.UUID, required=True)
+    parser.add_argument("--through", type=parse_period, default=None, help="Last month to close, YYYY-MM (default: previous month)")
+    args = parser.parse_args()
+    through = args.through or previous_month()
+
+    engine = create_engine(args.database_url)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    closed = 0
+    with factory() as session:
+        repository = AccountPeriodBalanceRepositoryImpl(session)
+        period = await repository.next_period_to_close(args.tenant_id)
+        if period is None:
+            print("No posted entries; nothing to close")
+        while period is not None and period <= through:
+            accounts = await repository.close_period(period, args.tenant_id)
+            print(f"Closed {period_label(period)}: {accounts} accounts")
+            closed += 1
+            period = next_month(period)
+    print(f"{closed} period(s) closed through {period_label(through)}")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
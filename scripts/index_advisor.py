@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+"""
+Index advisor for the tenant / soft-delete access patterns
+
+Replays the repository query shapes (app/infrastructure/repositories/index_advisor.py)
+against a database, reads their EXPLAIN plans and proposes composite and
+partial indexes, e.g. (tenant_id, customer_number) WHERE is_active. Each
+candidate is created, explained and dropped again; the report lists the
+plan cost before and after, and the used candidates are written as an
+Alembic migration (CREATE INDEX CONCURRENTLY).
+
+Plans depend on table statistics: run it against a production-sized copy,
+not the live database (trying a candidate locks its table for writes).
+Without --database-url a temporary SQLite database is seeded with
+--seed rows per table; SQLite reports no costs, only the chosen plan.
+
+Usage:
+    python scripts/index_advisor.py --database-url postgresql://user:pw@staging/erp --tenant-id <uuid>
+    python scripts/index_advisor.py --seed 20000 --output alembic/versions/007_tenant_active_indexes.py
+"""
+
+import argparse
+import asyncio
+import re
+import sys
+import tempfile
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+# Projektpfad hinzufügen, um Backend-Importe zu ermöglichen
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine, func, insert, select, text
+
+from app.core.database import Base
+from app.core.models import Account, Article, Contact, Customer, Lead, StockReservation
+from app.infrastructure.repositories.index_advisor import advise, render_migration, report
+
+VERSIONS = Path(__file__).resolve().parents[1] / "alembic" / "versions"
+TABLES = [Customer.__table__, Contact.__table__, Lead.__table__, Account.__table__,
+          Article.__table__, StockReservation.__table__]
+# Other tenants' and soft-deleted rows, so the plans see realistic selectivity
+TENANTS = 10
+INACTIVE_EVERY = 5
+
+
+def seed(engine, rows: int) -> uuid.UUID:
+    Base.metadata.drop_all(engine, tables=TABLES)
+    Base.metadata.create_all(engine, tables=TABLES)
+    tenants = [uuid.uuid4() for _ in range(TENANTS)]
+    expires_at = datetime.utcnow()
+
+    def common(i):
+        return {"id": uuid.uuid4(), "tenant_id": tenants[i % TENANTS], "is_active": i % INACTIVE_EVERY != 0}
+
+    customers = [dict(common(i), customer_number=f"K{i:07d}", company_name=f"Kunde {i}") for i in range(rows)]
+    articles = [dict(common(i), article_number=f"A{i:07d}", barcode=f"{4000000000000 + i}", name=f"Artikel {i}",
+                     unit="Stk", category="Ersatzteile", sales_price=Decimal("9.90")) for i in range(rows)]
+    with engine.begin() as connection:
+        connection.execute(insert(Customer), customers)
+        connection.execute(insert(Article), articles)
+        connection.execute(insert(Contact), [
+            dict(common(i), customer_id=customers[i]["id"], first_name="Vor", last_name=f"Name {i}",
+                 email=f"kontakt{i}@example.com")
+            for i in range(rows)
+        ])
+        connection.execute(insert(Lead), [
+            dict(common(i), source="web", company_name=f"Interessent {i}", contact_person=f"Person {i}",
+                 email=f"lead{i}@example.com", status=("new", "qualified", "lost")[i % 3])
+            for i in range(rows)
+        ])
+        connection.execute(insert(Account), [
+            dict(common(i), account_number=f"{i:06d}", account_name=f"Konto {i}", category="current_assets",
+                 account_type=("asset", "liability", "revenue", "expense")[i % 4])
+            for i in range(rows)
+        ])
+        connection.execute(insert(StockReservation), [
+            {"id": uuid.uuid4(), "tenant_id": tenants[i % TENANTS], "article_id": articles[i]["id"],
+             "quantity": 1, "reference_number": f"SO-{i:07d}", "expires_at": expires_at}
+            for i in range(rows)
+        ])
+        if engine.dialect.name == "sqlite":
+            connection.execute(text("ANALYZE"))
+        else:
+            connection.execute(text("ANALYZE " + ", ".join(table.name for table in TABLES)))
+    return tenants[0]
+
+
+def busiest_tenant(engine):
+    with engine.connect() as connection:
+        return connection.execute(
+            select(Customer.tenant_id).group_by(Customer.tenant_id).order_by(func.count().desc()).limit(1)
+        ).scalar()
+
+
+def next_revision(output=None) -> tuple:
+    # A migration being regenerated does not count
+    revisions = sorted(int(match.group(1)) for path in VERSIONS.glob("*.py")
+                       if (match := re.match(r"(\d+)_", path.name))
+                       and not (output and path.resolve() == Path(output).resolve()))
+    latest = revisions[-1] if revisions else 0
+    return f"{latest + 1:03d}", f"{latest:03d}"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Synchronous SQLAlchemy URL (default: seeded temporary SQLite file)")
+    parser.add_argument("--tenant-id", type=uuid.UUID, default=None, help="Tenant to replay with (default: the one with most customers)")
+    parser.add_argument("--seed", type=int, default=20000, help="Rows per table for the temporary SQLite database")
+    parser.add_argument("--output", default=None, help="Write the migration here (default: print it)")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'index_advisor.db'}"
+    engine = create_engine(url)
+    tenant_id = seed(engine, args.seed) if args.database_url is None else (args.tenant_id or busiest_tenant(engine))
+
+    candidates = await advise(engine, tenant_id)
+    print(report(candidates))
+
+    revision, down_revision = next_revision(args.output)
+    migration = render_migration(candidates, revision, down_revision)
+    if args.output:
+        Path(args.output).write_text(migration, encoding="utf-8")
+        print(f"\nMigration written to {args.output}")
+    else:
+        print("\n" + migration)
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())